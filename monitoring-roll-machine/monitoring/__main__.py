@@ -1,7 +1,44 @@
 """
 Main entry point for the monitoring application.
 """
-from .ui.main_window import main
+import argparse
+import sys
+from typing import List, Optional
+
+from .startup import startup_timer, import_time_report
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Parse command line options and start the Qt application."""
+    parser = argparse.ArgumentParser(prog="monitoring-roll-machine")
+    parser.add_argument(
+        "--startup-report",
+        metavar="MODULE",
+        nargs="?",
+        const="monitoring.ui.main_window",
+        help="print the import-time report for MODULE and exit"
+    )
+    parser.add_argument(
+        "--dashboard",
+        action="store_true",
+        help="show the multi-machine trend dashboard fed by the acquisition daemon"
+    )
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    if args.startup_report:
+        print(import_time_report(args.startup_report))
+        return
+
+    if args.dashboard:
+        from .ui.dashboard_view import main as run_dashboard
+        run_dashboard()
+        return
+
+    # Qt and the monitor stack are only imported once we know we need the UI
+    from .ui.main_window import main as run_ui
+    startup_timer.mark("ui_imported")
+    run_ui()
+
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
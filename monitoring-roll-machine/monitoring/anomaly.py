@@ -0,0 +1,206 @@
+"""
+Deteksi anomali online pada stream count dan speed satu mesin.
+
+Semua statistik bermemori tetap: mean/varians EWMA kecepatan saat berjalan,
+CUSUM sisi bawah untuk penurunan mendadak, dan beberapa timestamp untuk
+stall dan slip. ``update()`` hanya aritmetika float (beberapa mikrodetik
+per sampel) sehingga dijalankan langsung di thread akuisisi. Count adalah
+panjang roll dalam meter (dari ``length_um``) dan speed dalam meter/menit,
+sehingga ambang panjang berlaku sama untuk panel meter maupun yard.
+
+- ``STALL``: mesin yang sedang berjalan berhenti (speed 0, count diam)
+  selama ``stall_s``.
+- ``SLIPPAGE``: speed > 0 tetapi count tidak bertambah selama ``slip_s``
+  padahal pada speed itu seharusnya sudah bertambah ``slip_length``.
+- ``SPEED_DROP``: CUSUM atas speed ternormalisasi melewati ``cusum_h``.
+- ``COUNT_GLITCH``: count turun tanpa kembali ke sekitar nol (bukan reset
+  roll), atau loncat jauh melebihi yang mungkin pada speed saat itu.
+"""
+from dataclasses import dataclass
+from enum import Enum
+from typing import Optional, Dict, Any, List
+import inspect
+import math
+
+
+class AnomalyKind(Enum):
+    """Jenis anomali."""
+    STALL = "stall"
+    SLIPPAGE = "slippage"
+    SPEED_DROP = "speed_drop"
+    COUNT_GLITCH = "count_glitch"
+
+
+@dataclass(frozen=True)
+class Anomaly:
+    """Satu anomali yang terdeteksi."""
+    kind: AnomalyKind
+    timestamp: float
+    value: float
+    message: str
+
+
+class AnomalyDetector:
+    """Detektor anomali untuk satu mesin; panggil ``update()`` setiap sampel.
+
+    Stall dan slippage dilaporkan sekali saat mulai dan aktif lagi setelah
+    kondisinya hilang. Setelah ``SPEED_DROP`` baseline kecepatan dipelajari
+    ulang dari nilai baru.
+    """
+    def __init__(
+        self,
+        alpha: float = 0.05,
+        cusum_k: float = 1.0,
+        cusum_h: float = 6.0,
+        warmup: int = 20,
+        min_std_ratio: float = 0.02,
+        stall_s: float = 30.0,
+        slip_s: float = 10.0,
+        slip_length: float = 1.0,
+        reset_tolerance: float = 1.0,
+        jump_factor: float = 5.0,
+        jump_margin: float = 5.0
+    ) -> None:
+        self.alpha = alpha
+        self.cusum_k = cusum_k
+        self.cusum_h = cusum_h
+        self.warmup = warmup
+        self.min_std_ratio = min_std_ratio
+        self.stall_s = stall_s
+        self.slip_s = slip_s
+        self.slip_length = slip_length
+        self.reset_tolerance = reset_tolerance
+        self.jump_factor = jump_factor
+        self.jump_margin = jump_margin
+        self.reset()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "AnomalyDetector":
+        """Buat detector; ``anomaly_thresholds`` menimpa parameter default."""
+        thresholds = config.get("anomaly_thresholds", {})
+        return cls(**{k: v for k, v in thresholds.items() if k in _PARAMETERS})
+
+    def reset(self) -> None:
+        """Lupakan baseline dan state (mis. setelah reconnect)."""
+        self.mean = 0.0
+        self.var = 0.0
+        self.samples = 0
+        self.cusum = 0.0
+        self._last_time: Optional[float] = None
+        self._last_count: Optional[float] = None
+        self._running = False
+        # Waktu mulai kondisi stall/slip yang sedang berlangsung
+        self._stopped_since: Optional[float] = None
+        self._slip_since: Optional[float] = None
+        self._slip_expected = 0.0
+        self._active: Dict[AnomalyKind, bool] = {kind: False for kind in AnomalyKind}
+
+    def update(self, timestamp: float, count: float, speed: float) -> List[Anomaly]:
+        """Proses satu sampel (detik, count meter, speed meter/menit); return anomali baru."""
+        anomalies: List[Anomaly] = []
+        last_time, last_count = self._last_time, self._last_count
+        self._last_time, self._last_count = timestamp, count
+        if last_time is None:
+            return anomalies
+        dt = timestamp - last_time
+        if dt <= 0:
+            return anomalies
+        delta = count - last_count
+
+        # Counter mundur: reset roll jika kembali ke sekitar nol, selain itu glitch sensor
+        if delta < 0:
+            if count > self.reset_tolerance:
+                anomalies.append(Anomaly(
+                    AnomalyKind.COUNT_GLITCH, timestamp, count,
+                    f"count turun dari {last_count:g} ke {count:g} tanpa reset"
+                ))
+            delta = 0.0
+        else:
+            expected = max(speed, self.mean) / 60.0 * dt
+            if delta > expected * self.jump_factor + self.jump_margin:
+                anomalies.append(Anomaly(
+                    AnomalyKind.COUNT_GLITCH, timestamp, delta,
+                    f"count loncat {delta:g} dalam {dt:.1f} s (speed {speed:g})"
+                ))
+
+        # Slip: speed dilaporkan tetapi count tidak bergerak
+        if speed > 0 and delta == 0:
+            if self._slip_since is None:
+                self._slip_since = last_time
+                self._slip_expected = 0.0
+            self._slip_expected += speed / 60.0 * dt
+            # Speed rendah: count baru bergerak setelah lebih dari satu resolusi
+            stalled_s = timestamp - self._slip_since
+            if stalled_s >= self.slip_s and self._slip_expected >= self.slip_length:
+                self._raise(
+                    anomalies, AnomalyKind.SLIPPAGE, timestamp, speed,
+                    f"count tidak bertambah selama {stalled_s:.0f} s pada speed {speed:g}"
+                )
+        else:
+            self._slip_since = None
+            self._active[AnomalyKind.SLIPPAGE] = False
+
+        # Stall: mesin yang tadinya berjalan berhenti total
+        if speed <= 0 and delta == 0:
+            if self._running and self._stopped_since is None:
+                self._stopped_since = last_time
+            if self._stopped_since is not None and timestamp - self._stopped_since >= self.stall_s:
+                self._raise(anomalies, AnomalyKind.STALL, timestamp, self.mean,
+                            f"mesin berhenti selama {timestamp - self._stopped_since:.0f} s")
+            return anomalies
+        self._stopped_since = None
+        self._active[AnomalyKind.STALL] = False
+
+        if speed > 0:
+            self._running = True
+            self._update_speed(timestamp, speed, anomalies)
+        return anomalies
+
+    def _update_speed(self, timestamp: float, speed: float, anomalies: List[Anomaly]) -> None:
+        """CUSUM sisi bawah lalu update EWMA; hanya untuk sampel saat berjalan."""
+        if self.samples == 0:
+            self.mean = speed
+            self.samples = 1
+            return
+        if self.samples >= self.warmup:
+            std = max(math.sqrt(self.var), self.mean * self.min_std_ratio, 1e-9)
+            self.cusum = max(0.0, self.cusum + (self.mean - speed) / std - self.cusum_k)
+            if self.cusum > self.cusum_h:
+                anomalies.append(Anomaly(
+                    AnomalyKind.SPEED_DROP, timestamp, speed,
+                    f"speed turun ke {speed:g} dari rata-rata {self.mean:.1f}"
+                ))
+                # Pelajari ulang baseline dari level baru
+                self.mean = speed
+                self.var = 0.0
+                self.samples = 1
+                self.cusum = 0.0
+                return
+        diff = speed - self.mean
+        increment = self.alpha * diff
+        self.mean += increment
+        self.var = (1.0 - self.alpha) * (self.var + diff * increment)
+        self.samples += 1
+
+    def _raise(
+        self,
+        anomalies: List[Anomaly],
+        kind: AnomalyKind,
+        timestamp: float,
+        value: float,
+        message: str
+    ) -> None:
+        """Tambah anomali jika jenis ini belum aktif."""
+        if not self._active[kind]:
+            self._active[kind] = True
+            anomalies.append(Anomaly(kind, timestamp, value, message))
+
+
+_PARAMETERS = frozenset(inspect.signature(AnomalyDetector).parameters)
+
+
+def create_anomaly_detector(config: Dict[str, Any]) -> Optional[AnomalyDetector]:
+    """Detector dari konfigurasi, atau None jika ``anomaly_detection`` dimatikan."""
+    if not config.get("anomaly_detection", True):
+        return None
+    return AnomalyDetector.from_config(config)
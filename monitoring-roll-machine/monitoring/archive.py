@@ -0,0 +1,422 @@
+"""
+Arsip jangka panjang terkompresi, dipartisi per mesin dan per hari.
+
+Setiap partisi ``<root>/<mesin>/<YYYY-MM-DD>.jska`` berisi blok-blok sampel.
+Dalam satu blok, timestamp disimpan sebagai delta-of-delta dan count/speed/
+total (``total_um``) sebagai delta (gaya Gorilla), semuanya zigzag varint per
+kolom lalu dikompres zlib. Count mentah beserta satuan dan bit desimal
+disimpan apa adanya, sehingga ``length_um`` bisa dihitung ulang secara
+eksak. File ``.idx`` di sebelahnya mencatat offset dan rentang waktu setiap
+blok sehingga query hanya membaca blok yang relevan.
+"""
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Optional, Dict, Any, List, Iterator, Tuple, Callable
+import json
+import logging
+import os
+import struct
+import threading
+import time
+import zlib
+
+from .normalize import raw_scale
+
+logger = logging.getLogger(__name__)
+
+PARTITION_SUFFIX = ".jska"
+INDEX_SUFFIX = ".idx"
+
+# Header blok: magic, jumlah sampel, timestamp pertama & terakhir (ms), panjang payload, crc32
+_BLOCK_HEADER = struct.Struct("<4sIqqII")
+_BLOCK_MAGIC = b"JSK2"
+# Blok versi pertama, tanpa kolom total
+_BLOCK_MAGIC_V1 = b"JSKB"
+_BLOCK_MAGICS = (_BLOCK_MAGIC, _BLOCK_MAGIC_V1)
+
+_FLAG_DECIMAL = 0x01
+_FLAG_YARD = 0x02
+
+
+@dataclass(frozen=True)
+class ArchiveSample:
+    """Satu sampel arsip."""
+    timestamp_ms: int
+    current_count: float
+    current_speed: int
+    shift: int
+    decimal_place: bool = False
+    unit: str = "meter"
+    # Total monoton dari ``CountNormalizer``; 0 untuk blok versi pertama
+    total_um: int = 0
+
+    @property
+    def length_um(self) -> int:
+        """Panjang roll dalam mikrometer, apa pun satuan panel."""
+        raw = _count_units(self) if self.decimal_place else _count_units(self) // 10
+        return raw * raw_scale(self.unit, self.decimal_place)
+
+    @property
+    def fields(self) -> Dict[str, Any]:
+        """Field dalam format ``parse_fields`` plus ``length_um``/``total_um``."""
+        return {
+            "decimal_place": self.decimal_place,
+            "unit": self.unit,
+            "current_count": self.current_count,
+            "current_speed": self.current_speed,
+            "shift": self.shift,
+            "length_um": self.length_um,
+            "total_um": self.total_um,
+        }
+
+    @classmethod
+    def from_fields(cls, timestamp_ms: int, fields: Dict[str, Any]) -> "ArchiveSample":
+        """Buat sampel dari field hasil parser."""
+        return cls(
+            timestamp_ms=int(timestamp_ms),
+            current_count=fields.get("current_count", 0),
+            current_speed=int(fields.get("current_speed", 0)),
+            shift=int(fields.get("shift", 0)),
+            decimal_place=bool(fields.get("decimal_place", False)),
+            unit=fields.get("unit", "meter"),
+            total_um=int(fields.get("total_um", 0))
+        )
+
+
+def _zigzag(value: int) -> int:
+    """Petakan integer bertanda ke tak bertanda (0, -1, 1, -2 -> 0, 1, 2, 3)."""
+    return (value << 1) ^ (value >> 63)
+
+
+def _unzigzag(value: int) -> int:
+    """Kebalikan ``_zigzag``."""
+    return (value >> 1) ^ -(value & 1)
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    """Tulis integer tak bertanda sebagai LEB128."""
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varints(data: bytes, count: int, pos: int) -> Tuple[List[int], int]:
+    """Baca ``count`` varint mulai ``pos``; return (nilai, posisi berikutnya)."""
+    values = []
+    for _ in range(count):
+        result = shift = 0
+        while True:
+            byte = data[pos]
+            pos += 1
+            result |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                break
+            shift += 7
+        values.append(result)
+    return values, pos
+
+
+def _count_units(sample: ArchiveSample) -> int:
+    """Count sebagai fixed point persepuluhan (resolusi mode desimal mesin)."""
+    return int(round(sample.current_count * 10))
+
+
+def encode_block(samples: List[ArchiveSample]) -> bytes:
+    """Encode sampel terurut waktu menjadi payload blok (belum dikompres)."""
+    columns = [bytearray() for _ in range(6)]
+    prev_ts = prev_delta = prev_count = prev_speed = prev_total = 0
+    for index, sample in enumerate(samples):
+        if index == 0:
+            # Timestamp pertama ada di header blok
+            delta = 0
+        else:
+            delta = sample.timestamp_ms - prev_ts
+        _write_varint(columns[0], _zigzag(delta - prev_delta))
+        prev_ts, prev_delta = sample.timestamp_ms, delta
+
+        count = _count_units(sample)
+        _write_varint(columns[1], _zigzag(count - prev_count))
+        _write_varint(columns[2], _zigzag(sample.current_speed - prev_speed))
+        prev_count, prev_speed = count, sample.current_speed
+
+        _write_varint(columns[3], sample.shift)
+        flags = _FLAG_DECIMAL if sample.decimal_place else 0
+        flags |= _FLAG_YARD if sample.unit == "yard" else 0
+        columns[4].append(flags)
+        _write_varint(columns[5], _zigzag(sample.total_um - prev_total))
+        prev_total = sample.total_um
+    return b"".join(bytes(c) for c in columns)
+
+
+def decode_block(
+    payload: bytes,
+    count: int,
+    first_ts: int,
+    with_total: bool = True
+) -> List[ArchiveSample]:
+    """Decode payload blok menjadi sampel (``with_total=False`` untuk blok versi pertama)."""
+    dods, pos = _read_varints(payload, count, 0)
+    count_deltas, pos = _read_varints(payload, count, pos)
+    speed_deltas, pos = _read_varints(payload, count, pos)
+    shifts, pos = _read_varints(payload, count, pos)
+    flags = payload[pos:pos + count]
+    total_deltas = _read_varints(payload, count, pos + count)[0] if with_total else [0] * count
+
+    samples = []
+    ts, delta, units, speed, total = first_ts, 0, 0, 0, 0
+    for i in range(count):
+        delta += _unzigzag(dods[i])
+        ts += delta
+        units += _unzigzag(count_deltas[i])
+        speed += _unzigzag(speed_deltas[i])
+        total += _unzigzag(total_deltas[i])
+        decimal = bool(flags[i] & _FLAG_DECIMAL)
+        samples.append(ArchiveSample(
+            timestamp_ms=ts,
+            current_count=units / 10.0 if decimal else units // 10,
+            current_speed=speed,
+            shift=shifts[i],
+            decimal_place=decimal,
+            unit="yard" if flags[i] & _FLAG_YARD else "meter",
+            total_um=total
+        ))
+    return samples
+
+
+def partition_day(timestamp_ms: int) -> date:
+    """Tanggal lokal partisi untuk timestamp (ms epoch)."""
+    return datetime.fromtimestamp(timestamp_ms / 1000).date()
+
+
+class Archive:
+    """Penulis dan pembaca arsip terpartisi.
+
+    Sampel ditampung per partisi dan ditulis sebagai satu blok setiap
+    ``block_size`` sampel atau saat ``flush()``. Listener blok (mis. rollup
+    ``HistoryQuery``) dipanggil setelah setiap blok ditulis.
+    """
+    def __init__(
+        self,
+        root: str = "archive",
+        block_size: int = 1024,
+        compress_level: int = 6
+    ) -> None:
+        self.root = root
+        self.block_size = block_size
+        self.compress_level = compress_level
+        self._buffers: Dict[Tuple[str, date], List[ArchiveSample]] = {}
+        self._block_listeners: List[Callable[[str, date], None]] = []
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def add_block_listener(self, listener: Callable[[str, date], None]) -> None:
+        """Panggil ``listener(mesin, hari)`` setelah blok ditulis (di bawah lock arsip)."""
+        self._block_listeners.append(listener)
+
+    def partition_path(self, machine: str, day: date) -> str:
+        """Path file partisi."""
+        return os.path.join(self.root, machine, day.isoformat() + PARTITION_SUFFIX)
+
+    def append(self, machine: str, sample: ArchiveSample) -> None:
+        """Tambah sampel; blok ditulis saat buffer partisi penuh."""
+        key = (machine, partition_day(sample.timestamp_ms))
+        with self._lock:
+            buffer = self._buffers.setdefault(key, [])
+            buffer.append(sample)
+            if len(buffer) >= self.block_size:
+                self._write_block(*key, self._buffers.pop(key))
+
+    def append_record(self, machine: str, record: Dict[str, Any]) -> None:
+        """Tambah record sesi (``timestamp`` + ``fields``).
+
+        ``timestamp`` berupa integer nanodetik epoch (baris ``MonitoringSession``)
+        atau string ISO (CSV hasil ekspor); tanpa timestamp dipakai waktu sekarang.
+        """
+        fields = record.get("fields")
+        if not fields:
+            return
+        timestamp = record.get("timestamp")
+        if isinstance(timestamp, int):
+            timestamp_ms = timestamp // 1_000_000
+        elif timestamp is not None:
+            timestamp_ms = int(datetime.fromisoformat(timestamp).timestamp() * 1000)
+        else:
+            timestamp_ms = time.time_ns() // 1_000_000
+        self.append(machine, ArchiveSample.from_fields(timestamp_ms, fields))
+
+    def flush(self) -> None:
+        """Tulis semua buffer ke disk."""
+        with self._lock:
+            buffers, self._buffers = self._buffers, {}
+            for (machine, day), samples in buffers.items():
+                self._write_block(machine, day, samples)
+
+    def machines(self) -> List[str]:
+        """Mesin yang punya partisi."""
+        return sorted(
+            name for name in os.listdir(self.root)
+            if os.path.isdir(os.path.join(self.root, name))
+        )
+
+    def partitions(self, machine: str) -> List[date]:
+        """Tanggal partisi yang tersedia untuk mesin."""
+        directory = os.path.join(self.root, machine)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(
+            date.fromisoformat(name[:-len(PARTITION_SUFFIX)])
+            for name in os.listdir(directory) if name.endswith(PARTITION_SUFFIX)
+        )
+
+    def span(self, machine: str) -> Optional[Tuple[int, int]]:
+        """Rentang ms ``[awal, akhir)`` hari-hari yang punya data (termasuk buffer)."""
+        with self._lock:
+            days = set(self.partitions(machine))
+            days.update(day for m, day in self._buffers if m == machine)
+        if not days:
+            return None
+        return day_range_ms(min(days))[0], day_range_ms(max(days))[1]
+
+    def query(self, machine: str, start_ms: int, end_ms: int) -> Iterator[ArchiveSample]:
+        """Sampel mesin dengan ``start_ms <= timestamp < end_ms``, terurut waktu."""
+        first_day, last_day = partition_day(start_ms), partition_day(max(start_ms, end_ms - 1))
+        days = [d for d in self.partitions(machine) if first_day <= d <= last_day]
+        with self._lock:
+            pending = {
+                day: list(samples) for (m, day), samples in self._buffers.items()
+                if m == machine and first_day <= day <= last_day
+            }
+        for day in sorted(set(days) | pending.keys()):
+            samples: List[ArchiveSample] = []
+            if day in days:
+                samples.extend(self._read_partition(machine, day, start_ms, end_ms))
+            samples.extend(pending.get(day, []))
+            samples.sort(key=lambda s: s.timestamp_ms)
+            for sample in samples:
+                if start_ms <= sample.timestamp_ms < end_ms:
+                    yield sample
+
+    def load_index(self, machine: str, day: date) -> List[Dict[str, int]]:
+        """Index blok partisi; dibangun ulang jika tidak cocok dengan file data."""
+        path = self.partition_path(machine, day)
+        try:
+            with open(path + INDEX_SUFFIX, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            if index.get("size") == os.path.getsize(path):
+                return index["blocks"]
+        except (OSError, ValueError, KeyError):
+            pass
+        # Index hilang atau tertinggal (misalnya crash setelah blok ditulis)
+        blocks = self._scan_blocks(path)
+        self._save_index(path, blocks)
+        return blocks
+
+    def read_blocks(self, machine: str, day: date, from_offset: int = 0) -> Iterator[ArchiveSample]:
+        """Sampel dari blok partisi yang dimulai di ``from_offset`` atau sesudahnya."""
+        blocks = [b for b in self.load_index(machine, day) if b["offset"] >= from_offset]
+        return self._read_blocks(self.partition_path(machine, day), blocks)
+
+    def _read_partition(
+        self,
+        machine: str,
+        day: date,
+        start_ms: int,
+        end_ms: int
+    ) -> Iterator[ArchiveSample]:
+        """Baca hanya blok partisi yang rentang waktunya beririsan dengan query."""
+        blocks = [
+            b for b in self.load_index(machine, day)
+            if b["last"] >= start_ms and b["first"] < end_ms
+        ]
+        return self._read_blocks(self.partition_path(machine, day), blocks)
+
+    @staticmethod
+    def _read_blocks(path: str, blocks: List[Dict[str, int]]) -> Iterator[ArchiveSample]:
+        """Decode blok-blok (entri index) dari file partisi."""
+        if not blocks:
+            return
+        with open(path, "rb") as f:
+            for block in blocks:
+                f.seek(block["offset"])
+                header = f.read(_BLOCK_HEADER.size)
+                magic, count, first_ts, _, length, crc = _BLOCK_HEADER.unpack(header)
+                payload = f.read(length)
+                if magic not in _BLOCK_MAGICS or zlib.crc32(payload) != crc:
+                    logger.error(f"Blok rusak di {path} offset {block['offset']}, dilewati")
+                    continue
+                yield from decode_block(
+                    zlib.decompress(payload), count, first_ts, with_total=magic == _BLOCK_MAGIC
+                )
+
+    def _write_block(self, machine: str, day: date, samples: List[ArchiveSample]) -> None:
+        """Tambahkan satu blok ke partisi lalu perbarui index."""
+        if not samples:
+            return
+        samples = sorted(samples, key=lambda s: s.timestamp_ms)
+        payload = zlib.compress(encode_block(samples), self.compress_level)
+        path = self.partition_path(machine, day)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        blocks = self.load_index(machine, day) if os.path.exists(path) else []
+        with open(path, "ab") as f:
+            offset = f.tell()
+            f.write(_BLOCK_HEADER.pack(
+                _BLOCK_MAGIC,
+                len(samples),
+                samples[0].timestamp_ms,
+                samples[-1].timestamp_ms,
+                len(payload),
+                zlib.crc32(payload)
+            ))
+            f.write(payload)
+        blocks.append({
+            "offset": offset,
+            "first": samples[0].timestamp_ms,
+            "last": samples[-1].timestamp_ms,
+            "count": len(samples)
+        })
+        self._save_index(path, blocks)
+        logger.debug(f"{len(samples)} sampel diarsipkan ke {path} ({len(payload)} byte)")
+        for listener in self._block_listeners:
+            try:
+                listener(machine, day)
+            except Exception as e:
+                logger.error(f"Listener blok arsip gagal untuk {path}: {e}")
+
+    @staticmethod
+    def _scan_blocks(path: str) -> List[Dict[str, int]]:
+        """Bangun index dengan melompati payload setiap blok."""
+        blocks: List[Dict[str, int]] = []
+        if not os.path.exists(path):
+            return blocks
+        with open(path, "rb") as f:
+            while True:
+                offset = f.tell()
+                header = f.read(_BLOCK_HEADER.size)
+                if len(header) < _BLOCK_HEADER.size:
+                    break
+                magic, count, first_ts, last_ts, length, _ = _BLOCK_HEADER.unpack(header)
+                if magic not in _BLOCK_MAGICS:
+                    logger.error(f"Partisi {path} rusak di offset {offset}")
+                    break
+                f.seek(length, os.SEEK_CUR)
+                blocks.append({
+                    "offset": offset, "first": first_ts, "last": last_ts, "count": count
+                })
+        return blocks
+
+    @staticmethod
+    def _save_index(path: str, blocks: List[Dict[str, int]]) -> None:
+        """Simpan index secara atomik."""
+        # Nama sementara unik: reader juga bisa membangun ulang index
+        tmp_path = f"{path}{INDEX_SUFFIX}.{os.getpid()}.{threading.get_ident()}.tmp"
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"size": size, "blocks": blocks}, f)
+        os.replace(tmp_path, path + INDEX_SUFFIX)
+
+
+def day_range_ms(day: date) -> Tuple[int, int]:
+    """Rentang ms epoch untuk satu hari lokal."""
+    start = datetime.combine(day, datetime.min.time())
+    return int(start.timestamp() * 1000), int((start + timedelta(days=1)).timestamp() * 1000)
@@ -0,0 +1,201 @@
+"""
+Bus publish/subscribe in-process untuk data monitor.
+
+Publisher (thread polling) hanya memasukkan pesan ke antrian terbatas milik
+setiap subscriber; callback subscriber dijalankan di thread-nya sendiri
+sehingga consumer yang lambat tidak menunda polling berikutnya.
+"""
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum
+from typing import Optional, Dict, Any, Callable, List, Iterable, Deque
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+TOPIC_DATA = "data"
+TOPIC_ERROR = "error"
+TOPIC_EVENT = "event"
+DEFAULT_MACHINE = "default"
+
+
+class OverflowPolicy(Enum):
+    """Perilaku saat antrian subscriber penuh."""
+    DROP_OLDEST = "drop_oldest"   # buang pesan tertua
+    COALESCE = "coalesce"         # simpan hanya pesan terbaru per mesin/topik
+    BLOCK = "block"               # publisher menunggu (dengan batas waktu), bukan untuk akuisisi
+
+
+@dataclass(frozen=True)
+class Message:
+    """Satu pesan di bus."""
+    topic: str
+    machine: str
+    payload: Any
+    timestamp: float
+
+
+class Subscription:
+    """Subscriber dengan antrian terbatas dan thread pengiriman sendiri."""
+    def __init__(
+        self,
+        callback: Callable[[Any], None],
+        topic: str = TOPIC_DATA,
+        machines: Optional[Iterable[str]] = None,
+        fields: Optional[Iterable[str]] = None,
+        maxsize: int = 256,
+        policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+        block_timeout: float = 1.0,
+        name: Optional[str] = None
+    ) -> None:
+        self.callback = callback
+        self.topic = topic
+        self.machines = frozenset(machines) if machines is not None else None
+        self.fields = frozenset(fields) if fields is not None else None
+        self.maxsize = maxsize
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.name = name or getattr(callback, "__name__", "subscriber")
+        self.dropped = 0
+        self.delivered = 0
+        self._queue: Deque[Message] = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._overflowing = False
+        self._thread = threading.Thread(
+            target=self._dispatch_loop, name=f"bus-{self.name}", daemon=True
+        )
+        self._thread.start()
+
+    @property
+    def pending(self) -> int:
+        """Jumlah pesan yang belum dikirim ke callback."""
+        with self._cond:
+            return len(self._queue)
+
+    def matches(self, message: Message) -> bool:
+        """Cek filter topik, mesin dan field."""
+        if message.topic != self.topic:
+            return False
+        if self.machines is not None and message.machine not in self.machines:
+            return False
+        if self.fields is not None:
+            fields = message.payload.get("fields") if isinstance(message.payload, dict) else None
+            return bool(fields) and not self.fields.isdisjoint(fields)
+        return True
+
+    def offer(self, message: Message) -> bool:
+        """Masukkan pesan ke antrian sesuai policy; False jika pesan dibuang."""
+        with self._cond:
+            if self._closed:
+                return False
+            if self.policy is OverflowPolicy.COALESCE:
+                # Ganti pesan lama dari mesin yang sama, posisinya dipertahankan
+                for index, queued in enumerate(self._queue):
+                    if queued.machine == message.machine:
+                        self._queue[index] = message
+                        self.dropped += 1
+                        return True
+            if len(self._queue) >= self.maxsize:
+                if self.policy is OverflowPolicy.BLOCK:
+                    deadline = time.monotonic() + self.block_timeout
+                    while len(self._queue) >= self.maxsize and not self._closed:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self.dropped += 1
+                            logger.warning(f"Subscriber {self.name} penuh, pesan dibuang")
+                            return False
+                        self._cond.wait(remaining)
+                    if self._closed:
+                        return False
+                else:
+                    self._queue.popleft()
+                    self.dropped += 1
+                    if not self._overflowing:
+                        # Sekali per episode penuh, agar log tidak banjir
+                        self._overflowing = True
+                        logger.warning(f"Subscriber {self.name} penuh, pesan tertua dibuang")
+            self._queue.append(message)
+            self._cond.notify_all()
+            return True
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Kirim sisa pesan lalu hentikan thread subscriber."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def _dispatch_loop(self) -> None:
+        """Ambil pesan dari antrian dan panggil callback."""
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                message = self._queue.popleft()
+                if not self._queue:
+                    self._overflowing = False
+                # Bangunkan publisher yang menunggu (policy BLOCK)
+                self._cond.notify_all()
+            try:
+                self.callback(self._project(message.payload))
+                self.delivered += 1
+            except Exception as e:
+                logger.error(f"Error in subscriber {self.name}: {e}")
+
+    def _project(self, payload: Any) -> Any:
+        """Batasi field payload data ke field yang diminta subscriber."""
+        if self.fields is None or not isinstance(payload, dict) or "fields" not in payload:
+            return payload
+        projected = dict(payload)
+        projected["fields"] = {k: v for k, v in payload["fields"].items() if k in self.fields}
+        return projected
+
+
+class DataBus:
+    """Bus pub/sub dengan antrian per subscriber."""
+    def __init__(self) -> None:
+        self._subscriptions: List[Subscription] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback: Callable[[Any], None], **options: Any) -> Subscription:
+        """Daftarkan subscriber; opsi diteruskan ke ``Subscription``."""
+        subscription = Subscription(callback, **options)
+        with self._lock:
+            self._subscriptions = self._subscriptions + [subscription]
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription, timeout: Optional[float] = None) -> None:
+        """Hapus subscriber dan hentikan threadnya setelah antrian kosong."""
+        with self._lock:
+            self._subscriptions = [s for s in self._subscriptions if s is not subscription]
+        subscription.close(timeout)
+
+    def publish(self, topic: str, payload: Any, machine: str = DEFAULT_MACHINE) -> int:
+        """Kirim pesan ke semua subscriber yang cocok; return jumlah penerima."""
+        message = Message(topic, machine, payload, time.monotonic())
+        # Salinan list diganti utuh saat (un)subscribe, jadi aman dibaca tanpa lock
+        delivered = 0
+        for subscription in self._subscriptions:
+            if subscription.matches(message) and subscription.offer(message):
+                delivered += 1
+        return delivered
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Statistik antrian per subscriber."""
+        return {
+            s.name: {"pending": s.pending, "delivered": s.delivered, "dropped": s.dropped}
+            for s in self._subscriptions
+        }
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Hentikan semua subscriber."""
+        with self._lock:
+            subscriptions, self._subscriptions = self._subscriptions, []
+        for subscription in subscriptions:
+            subscription.close(timeout)
@@ -0,0 +1,79 @@
+"""
+Deteksi perubahan: teruskan hanya sampel yang berubah melewati deadband.
+"""
+from typing import Optional, Dict, Any, Callable
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Deadband default per field; field lain dibandingkan dengan kesamaan biasa
+DEFAULT_DEADBANDS: Dict[str, float] = {
+    "current_count": 0.0,
+    "current_speed": 0.0,
+}
+
+
+class ChangeDetector:
+    """Filter sampel berdasarkan perubahan field dan heartbeat periodik.
+
+    Pembanding adalah nilai terakhir yang *diteruskan*, bukan sampel terakhir,
+    sehingga perubahan kecil yang terus bertambah tetap lolos setelah total
+    perubahannya melewati deadband.
+    """
+    def __init__(
+        self,
+        deadbands: Optional[Dict[str, float]] = None,
+        heartbeat_interval: float = 30.0,
+        clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.deadbands = dict(DEFAULT_DEADBANDS if deadbands is None else deadbands)
+        self.heartbeat_interval = heartbeat_interval
+        self._clock = clock
+        self._last: Optional[Dict[str, Any]] = None
+        self._last_emit = 0.0
+        self.suppressed = 0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "ChangeDetector":
+        """Buat detector dari konfigurasi aplikasi."""
+        return cls(
+            deadbands={**DEFAULT_DEADBANDS, **config.get("change_deadbands", {})},
+            heartbeat_interval=config.get("heartbeat_interval", 30.0)
+        )
+
+    def reset(self) -> None:
+        """Lupakan nilai terakhir; sampel berikutnya pasti diteruskan."""
+        self._last = None
+
+    def changed(self, fields: Dict[str, Any]) -> bool:
+        """Cek apakah field berbeda dari nilai terakhir yang diteruskan."""
+        if self._last is None or fields.keys() != self._last.keys():
+            return True
+        for key, value in fields.items():
+            previous = self._last[key]
+            deadband = self.deadbands.get(key)
+            numeric = isinstance(value, (int, float)) and isinstance(previous, (int, float))
+            if deadband is not None and numeric:
+                if abs(value - previous) > deadband:
+                    return True
+            elif value != previous:
+                return True
+        return False
+
+    def should_emit(self, fields: Dict[str, Any]) -> bool:
+        """True jika sampel harus diteruskan (berubah atau waktunya heartbeat)."""
+        now = self._clock()
+        if self.changed(fields) or now - self._last_emit >= self.heartbeat_interval:
+            self._last = dict(fields)
+            self._last_emit = now
+            return True
+        self.suppressed += 1
+        return False
+
+
+def create_change_detector(config: Dict[str, Any]) -> Optional[ChangeDetector]:
+    """Detector dari konfigurasi, atau None jika ``change_detection`` dimatikan."""
+    if not config.get("change_detection", True):
+        return None
+    return ChangeDetector.from_config(config)
@@ -0,0 +1,158 @@
+"""
+Antrian command ke mesin JSK3588 dengan prioritas dan batching.
+"""
+from concurrent.futures import Future
+from typing import Optional, Dict, Any, List, Tuple, TYPE_CHECKING
+import itertools
+import logging
+import queue
+import threading
+import time
+
+from .parser import build_packet, parse_packet
+
+if TYPE_CHECKING:
+    from .serial_handler import JSKSerialPort
+
+logger = logging.getLogger(__name__)
+
+# Command protokol JSK3588
+CMD_RESET = 0x01
+CMD_RESET_ACCUMULATION = 0x04
+CMD_SET_LENGTH = 0x10
+CMD_SET_PARAMETERS = (0x10, 0x11, 0x12, 0x13)
+
+# Prioritas: angka kecil dikirim lebih dulu
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 10
+PRIORITY_LOW = 20
+
+
+class CommandError(Exception):
+    """Exception jika command tidak mendapat acknowledgement yang valid."""
+    pass
+
+
+class _Request:
+    """Satu command yang menunggu dikirim."""
+    def __init__(self, packet: bytes) -> None:
+        self.packet = packet
+        self.future: "Future[Dict[str, Any]]" = Future()
+
+
+class CommandQueue:
+    """Antrian command per port yang berbagi bus dengan polling status.
+
+    Worker mengambil lock I/O port (lock yang sama dengan ``query_status``),
+    sehingga command disisipkan di antara dua polling tanpa tabrakan. Command
+    yang mengantri berurutan dikirim dalam satu ``write`` lalu ack-nya dibaca
+    sesuai urutan.
+    """
+    def __init__(
+        self,
+        port: "JSKSerialPort",
+        batch_size: int = 8,
+        ack_timeout: Optional[float] = None
+    ) -> None:
+        self.port = port
+        self.batch_size = batch_size
+        self.ack_timeout = ack_timeout
+        self._queue: "queue.PriorityQueue[Any]" = queue.PriorityQueue()
+        self._counter = itertools.count()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stopped = False
+
+    @property
+    def stopped(self) -> bool:
+        """True jika queue sudah dihentikan."""
+        return self._stopped
+
+    def submit(
+        self,
+        com: int,
+        data: bytes = b"",
+        priority: int = PRIORITY_NORMAL
+    ) -> "Future[Dict[str, Any]]":
+        """Antrikan command; Future berisi paket ack yang sudah di-parse."""
+        request = _Request(build_packet(com, data))
+        with self._lock:
+            if self._stopped:
+                raise CommandError("Command queue sudah dihentikan")
+            # Counter menjaga urutan FIFO untuk prioritas yang sama
+            self._queue.put((priority, next(self._counter), request))
+            if not self._thread or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._worker, name="jsk-commands", daemon=True
+                )
+                self._thread.start()
+        return request.future
+
+    def stop(self) -> None:
+        """Hentikan worker dan batalkan command yang belum terkirim."""
+        with self._lock:
+            self._stopped = True
+        self._queue.put((PRIORITY_HIGH - 1, next(self._counter), None))
+        if self._thread:
+            self._thread.join()
+        while not self._queue.empty():
+            _, _, request = self._queue.get_nowait()
+            if request is not None:
+                request.future.cancel()
+
+    def _drain(self, limit: int) -> List[Tuple[int, int, _Request]]:
+        """Ambil hingga ``limit`` command yang sudah mengantri tanpa menunggu."""
+        batch: List[Tuple[int, int, _Request]] = []
+        while len(batch) < limit:
+            try:
+                entry = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry[2] is None:
+                # Sentinel stop: kembalikan agar worker berhenti setelah batch ini
+                self._queue.put(entry)
+                break
+            if entry[2].future.set_running_or_notify_cancel():
+                batch.append(entry)
+        return batch
+
+    def _worker(self) -> None:
+        """Loop worker: kirim command per batch hingga antrian dihentikan."""
+        while True:
+            entry = self._queue.get()
+            if entry[2] is None:
+                return
+            if not entry[2].future.set_running_or_notify_cancel():
+                continue
+            with self.port.exclusive():
+                # Command yang masuk selama menunggu bus ikut dalam batch ini
+                batch = sorted([entry] + self._drain(self.batch_size - 1), key=lambda e: e[:2])
+                self._execute([request for _, _, request in batch])
+
+    def _execute(self, batch: List[_Request]) -> None:
+        """Kirim satu batch command dan pasangkan ack sesuai urutan."""
+        timeout = self.port.timeout if self.ack_timeout is None else self.ack_timeout
+        self.port.discard_pending()
+        if not self.port.send(b"".join(r.packet for r in batch)):
+            self._fail(batch, CommandError(f"Port {self.port.port} tidak terhubung"))
+            return
+        for index, request in enumerate(batch):
+            try:
+                frame = self.port.read_frame(deadline=time.monotonic() + timeout)
+            except Exception as e:
+                self._fail(batch[index:], CommandError(f"Error membaca ack: {e}"))
+                return
+            if frame is None:
+                self._fail(batch[index:], CommandError("Tidak ada ack dari mesin"))
+                return
+            try:
+                request.future.set_result(parse_packet(frame))
+            except Exception as e:
+                request.future.set_exception(CommandError(f"Ack tidak valid: {e}"))
+        logger.debug(f"Batch {len(batch)} command terkirim ke {self.port.port}")
+
+    def _fail(self, batch: List[_Request], error: Exception) -> None:
+        """Gagalkan semua Future dalam batch."""
+        logger.warning(f"{len(batch)} command gagal: {error}")
+        for request in batch:
+            request.future.set_exception(error)
@@ -1,32 +1,320 @@
 """
 Modul untuk menangani konfigurasi aplikasi.
+
+``AppConfig`` dimuat sekali per proses, divalidasi terhadap ``SCHEMA``,
+disimpan secara atomik (file sementara + rename, dengan debounce), dan
+memberi tahu subscriber setiap kali nilai berubah.
 """
-import os
+from collections.abc import MutableMapping
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Callable, Iterable, Iterator, List, Tuple, Union
 import json
-from typing import Dict, Any
+import logging
+import os
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
 
 CONFIG_FILE = os.path.join(os.path.dirname(__file__), "config.json")
 
-def load_config() -> Dict[str, Any]:
-    """Load konfigurasi dari file."""
-    if os.path.exists(CONFIG_FILE):
+BAUDRATES = (1200, 2400, 4800, 9600, 19200, 38400, 57600, 115200)
+
+
+class ConfigError(ValueError):
+    """Exception untuk nilai konfigurasi yang tidak valid."""
+    pass
+
+
+@dataclass(frozen=True)
+class Setting:
+    """Definisi satu key konfigurasi."""
+    type: Union[type, Tuple[type, ...]]
+    default: Any
+    check: Optional[Callable[[Any], bool]] = None
+
+
+def _positive(value: float) -> bool:
+    """Nilai harus lebih dari nol."""
+    return value > 0
+
+
+SCHEMA: Dict[str, Setting] = {
+    "serial_port": Setting(str, "COM1", bool),
+    "serial_port_key": Setting((str, type(None)), None),
+    "baudrate": Setting(int, 19200, lambda v: v in BAUDRATES),
+    "poll_interval": Setting(float, 1.0, _positive),
+    "poll_min_interval": Setting(float, 0.2, _positive),
+    "poll_max_interval": Setting(float, 5.0, _positive),
+    "push_target_length": Setting(bool, False),
+    "daemon_address": Setting((str, type(None)), None),
+    "machine_id": Setting(str, "default", bool),
+    "shared_state_name": Setting(str, "monitoring_roll_state", bool),
+    "shared_state_interval_ms": Setting(int, 100, _positive),
+    "dashboard_machines": Setting(
+        list, ["default"], lambda v: bool(v) and all(isinstance(m, str) and m for m in v)
+    ),
+    "change_detection": Setting(bool, True),
+    "change_deadbands": Setting(dict, {}),
+    "heartbeat_interval": Setting(float, 30.0, _positive),
+    "anomaly_detection": Setting(bool, True),
+    "anomaly_thresholds": Setting(dict, {}),
+    "session_run_length": Setting(bool, True),
+    "archive": Setting(bool, True),
+    "archive_dir": Setting(str, os.path.join("exports", "archive"), bool),
+    "journal": Setting(bool, True),
+    "journal_dir": Setting(str, os.path.join("exports", "journal"), bool),
+    "plot_window_s": Setting(float, 600.0, _positive),
+    "ui_frame_ms": Setting(int, 100, _positive),
+    "dashboard_fps": Setting(int, 30, _positive),
+    "eta_window_s": Setting(float, 120.0, _positive),
+    "shift_start_hours": Setting(
+        list,
+        [6, 14, 22],
+        lambda v: bool(v) and all(isinstance(h, (int, float)) and 0 <= h < 24 for h in v)
+    ),
+    "show_history_on_start": Setting(bool, True),
+    "auto_connect": Setting(bool, False),
+    "language": Setting(str, "en"),
+}
+
+# Key lama dari UI Kivy dipetakan ke key yang dipakai bersama
+KEY_ALIASES = {
+    "port": "serial_port",
+    "port_key": "serial_port_key",
+}
+
+
+def normalize_keys(values: Dict[str, Any]) -> Dict[str, Any]:
+    """Ganti key lama dengan key standar."""
+    return {KEY_ALIASES.get(key, key): value for key, value in values.items()}
+
+
+def validate(key: str, value: Any) -> Any:
+    """Validasi dan konversi satu nilai; raise ConfigError jika tidak valid."""
+    setting = SCHEMA.get(key)
+    if setting is None:
+        # Key di luar schema tetap disimpan apa adanya jika bisa di-serialize
+        if not isinstance(value, (str, int, float, bool, list, dict, type(None))):
+            raise ConfigError(f"{key}: tipe {type(value).__name__} tidak bisa disimpan")
+        return value
+    if setting.type is float and isinstance(value, int) and not isinstance(value, bool):
+        value = float(value)
+    elif setting.type is int and isinstance(value, str) and value.isdigit():
+        value = int(value)
+    if not isinstance(value, setting.type) or (setting.type is int and isinstance(value, bool)):
+        type_name = getattr(setting.type, '__name__', setting.type)
+        raise ConfigError(f"{key}: {value!r} bukan {type_name}")
+    if setting.check and value is not None and not setting.check(value):
+        raise ConfigError(f"{key}: nilai {value!r} tidak valid")
+    return value
+
+
+def check_consistency(values: Callable[[str], Any]) -> None:
+    """Validasi antar key (``values`` = getter nilai efektif); raise ConfigError."""
+    low, high = values("poll_min_interval"), values("poll_max_interval")
+    if low > high:
+        raise ConfigError(f"poll_min_interval {low!r} lebih besar dari poll_max_interval {high!r}")
+
+
+class AppConfig(MutableMapping):
+    """Konfigurasi aplikasi bertipe dengan notifikasi perubahan.
+
+    Bisa dipakai seperti dict (``config.get("baudrate")``); key dalam schema
+    yang belum diset mengembalikan nilai default-nya.
+    """
+    def __init__(
+        self,
+        values: Optional[Dict[str, Any]] = None,
+        path: Optional[str] = None,
+        save_delay: float = 0.5
+    ) -> None:
+        self.path = path
+        self.save_delay = save_delay
+        self._values: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+        self._listeners: List[Tuple[Callable[[Dict[str, Any]], None], Optional[frozenset]]] = []
+        self._save_timer: Optional[threading.Timer] = None
+        self._dirty = False
+        for key, value in normalize_keys(values or {}).items():
+            try:
+                self._values[key] = validate(key, value)
+            except ConfigError as e:
+                logger.warning(f"Config diabaikan, pakai default: {e}")
         try:
-            with open(CONFIG_FILE, "r") as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"Error loading config: {e}")
-            return {}
-    return {}
+            check_consistency(self.get)
+        except ConfigError as e:
+            logger.warning(f"Config diabaikan, pakai default: {e}")
+            self._values.pop("poll_min_interval", None)
+            self._values.pop("poll_max_interval", None)
+
+    @classmethod
+    def load(cls, path: str = CONFIG_FILE, save_delay: float = 0.5) -> "AppConfig":
+        """Muat konfigurasi dari file JSON."""
+        values: Dict[str, Any] = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    values = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.error(f"Error loading config: {e}")
+        return cls(values, path=path, save_delay=save_delay)
+
+    def __getitem__(self, key: str) -> Any:
+        key = KEY_ALIASES.get(key, key)
+        with self._lock:
+            if key in self._values:
+                return self._values[key]
+        if key in SCHEMA:
+            return SCHEMA[key].default
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self.update({key: value})
+
+    def __delitem__(self, key: str) -> None:
+        key = KEY_ALIASES.get(key, key)
+        with self._lock:
+            old = self[key]
+            del self._values[key]
+            new = self.get(key)
+        if new != old:
+            self._notify({key: new})
+        self._schedule_save()
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            return iter(list(dict.fromkeys([*SCHEMA, *self._values])))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(set(SCHEMA) | set(self._values))
+
+    def __getattr__(self, key: str) -> Any:
+        # Akses bertipe: config.baudrate, config.poll_interval, ...
+        if key.startswith("_") or key not in SCHEMA:
+            raise AttributeError(key)
+        return self[key]
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Semua nilai efektif (termasuk default)."""
+        return {key: self[key] for key in self}
+
+    def update(self, other: Any = (), **kwargs: Any) -> Dict[str, Any]:
+        """Validasi lalu terapkan perubahan; return key yang benar-benar berubah.
+
+        Semua nilai divalidasi lebih dulu (juga kombinasinya dengan nilai yang
+        sudah ada), sehingga perubahan yang tidak valid tidak diterapkan sebagian.
+        """
+        changes = normalize_keys({**dict(other), **kwargs})
+        validated = {key: validate(key, value) for key, value in changes.items()}
+        with self._lock:
+            check_consistency(lambda key: validated[key] if key in validated else self.get(key))
+            changed = {key: value for key, value in validated.items() if self.get(key) != value}
+            self._values.update(validated)
+        if changed:
+            self._notify(changed)
+            self._schedule_save()
+        return changed
+
+    def subscribe(
+        self,
+        callback: Callable[[Dict[str, Any]], None],
+        keys: Optional[Iterable[str]] = None
+    ) -> None:
+        """Daftarkan callback perubahan; hanya dipanggil untuk ``keys`` jika diberikan."""
+        self._listeners.append((callback, frozenset(keys) if keys is not None else None))
+
+    def unsubscribe(self, callback: Callable[[Dict[str, Any]], None]) -> None:
+        """Hapus callback perubahan."""
+        self._listeners = [(cb, keys) for cb, keys in self._listeners if cb != callback]
+
+    def save(self) -> None:
+        """Simpan sekarang secara atomik (file sementara lalu rename)."""
+        with self._lock:
+            if self._save_timer:
+                self._save_timer.cancel()
+                self._save_timer = None
+            if not self.path:
+                self._dirty = False
+                return
+            data = dict(self._values)
+            self._dirty = False
+        directory = os.path.dirname(os.path.abspath(self.path))
+        try:
+            # Nama unik per panggilan; file sementara sisa crash tidak menghalangi
+            fd, tmp_path = tempfile.mkstemp(prefix=".config-", suffix=".tmp", dir=directory)
+            try:
+                with open(fd, "w", encoding="utf-8") as f:
+                    # mkstemp membuat 0600; file config mengikuti umask seperti open() biasa
+                    umask = os.umask(0)
+                    os.umask(umask)
+                    os.chmod(tmp_path, 0o666 & ~umask)
+                    json.dump(data, f, indent=4)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            logger.error(f"Error saving config: {e}")
+            with self._lock:
+                self._dirty = True
+
+    def flush(self) -> None:
+        """Simpan perubahan yang masih tertunda (misalnya saat aplikasi ditutup)."""
+        if self._dirty:
+            self.save()
+
+    def _schedule_save(self) -> None:
+        """Simpan setelah ``save_delay``; perubahan beruntun cukup ditulis sekali."""
+        with self._lock:
+            self._dirty = True
+            if self._save_timer:
+                self._save_timer.cancel()
+            self._save_timer = threading.Timer(self.save_delay, self.flush)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def _notify(self, changed: Dict[str, Any]) -> None:
+        """Panggil subscriber yang key-nya ikut berubah."""
+        for callback, keys in list(self._listeners):
+            relevant = changed if keys is None else {k: v for k, v in changed.items() if k in keys}
+            if not relevant:
+                continue
+            try:
+                callback(relevant)
+            except Exception as e:
+                logger.error(f"Error in config listener: {e}")
+
+
+_config: Optional[AppConfig] = None
+_config_lock = threading.Lock()
+
+
+def get_config() -> AppConfig:
+    """Konfigurasi bersama untuk seluruh aplikasi (dimuat sekali)."""
+    global _config
+    with _config_lock:
+        if _config is None:
+            _config = AppConfig.load(CONFIG_FILE)
+        return _config
+
+
+def load_config() -> Dict[str, Any]:
+    """Salinan konfigurasi saat ini sebagai dict biasa."""
+    return get_config().as_dict()
+
 
 def save_config(config: Dict[str, Any]) -> None:
-    """Simpan konfigurasi ke file."""
-    try:
-        # Pastikan hanya data yang bisa di-serialize ke JSON yang disimpan
-        serializable_config = {
-            k: v for k, v in config.items()
-            if isinstance(v, (str, int, float, bool, list, dict))
-        }
-        with open(CONFIG_FILE, "w") as f:
-            json.dump(serializable_config, f, indent=4)
-    except Exception as e:
-        print(f"Error saving config: {e}") 
\ No newline at end of file
+    """Terapkan ``config`` ke konfigurasi bersama lalu simpan."""
+    shared = get_config()
+    if config is not shared:
+        try:
+            shared.update({k: v for k, v in config.items() if v != shared.get(k)})
+        except ConfigError as e:
+            logger.error(f"Error saving config: {e}")
+            return
+    shared.flush()
@@ -0,0 +1,350 @@
+"""
+Konversi massal CSV sesi lama (kolom ``fields`` berisi repr dict) secara paralel.
+
+Format output:
+- ``csv``: CSV datar, satu file per input (ditulis langsung oleh worker).
+- ``archive``: arsip kolomnar terkompresi (``monitoring.archive``).
+- ``sqlite``: tabel ``samples`` di satu file database.
+
+Parsing (bagian yang berat) berjalan di process pool; untuk ``archive`` dan
+``sqlite`` worker mengirim sampel per potongan ``CHUNK_ROWS`` baris lewat
+antrian terbatas dan proses utama menulisnya ke store bersama begitu tiba,
+sehingga tidak ada file yang ditampung utuh di memori.
+"""
+from concurrent.futures import ProcessPoolExecutor, Future, FIRST_COMPLETED, wait
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Tuple, Iterator, Callable, TYPE_CHECKING
+import argparse
+import ast
+import csv
+import logging
+import multiprocessing
+import os
+import queue
+import sqlite3
+import sys
+import time
+
+if TYPE_CHECKING:
+    from .archive import Archive
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("csv", "archive", "sqlite")
+FIELD_COLUMNS = ("decimal_place", "unit", "current_count", "current_speed", "shift")
+
+# (timestamp_ms, current_count, current_speed, shift, decimal_place, unit, repeat, until_ms)
+Row = Tuple[int, float, int, int, bool, str, int, int]
+
+# Sampel per potongan yang dikirim worker ke proses utama
+CHUNK_ROWS = 5000
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    machine TEXT NOT NULL,
+    timestamp_ms INTEGER NOT NULL,
+    current_count REAL NOT NULL,
+    current_speed INTEGER NOT NULL,
+    shift INTEGER NOT NULL,
+    decimal_place INTEGER NOT NULL,
+    unit TEXT NOT NULL,
+    repeat INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS samples_machine_time ON samples (machine, timestamp_ms);
+"""
+
+
+class RowError(ValueError):
+    """Baris CSV yang tidak valid."""
+    pass
+
+
+@dataclass
+class FileResult:
+    """Hasil konversi satu file."""
+    path: str
+    rows: int = 0
+    invalid: int = 0
+    bytes: int = 0
+    output: Optional[str] = None
+    errors: List[str] = field(default_factory=list)
+
+
+def parse_fields(text: str) -> Dict[str, Any]:
+    """Parse kolom ``fields`` (repr dict) dengan aman, tanpa ``eval``."""
+    try:
+        value = ast.literal_eval(text)
+    except (ValueError, SyntaxError) as e:
+        raise RowError(f"fields tidak valid: {e}")
+    if not isinstance(value, dict):
+        raise RowError("fields bukan dict")
+    missing = [k for k in ("current_count", "current_speed", "shift") if k not in value]
+    if missing:
+        raise RowError(f"fields tanpa {', '.join(missing)}")
+    for key in ("current_count", "current_speed", "shift"):
+        if not isinstance(value[key], (int, float)) or isinstance(value[key], bool):
+            raise RowError(f"{key} bukan angka: {value[key]!r}")
+    return value
+
+
+def parse_row(record: Dict[str, str]) -> Tuple[Dict[str, Any], Row]:
+    """Validasi satu baris CSV; return (baris datar, sampel)."""
+    try:
+        timestamp = datetime.fromisoformat(record["timestamp"])
+    except (KeyError, TypeError, ValueError):
+        raise RowError(f"timestamp tidak valid: {record.get('timestamp')!r}")
+    fields = parse_fields(record.get("fields") or "")
+    repeat = int(record.get("repeat") or 1)
+    try:
+        # Baris run-length: sampel terakhir yang sama pada ``until``
+        until = datetime.fromisoformat(record["until"]) if record.get("until") else timestamp
+    except ValueError:
+        raise RowError(f"until tidak valid: {record.get('until')!r}")
+    flat = {k: v for k, v in record.items() if k != "fields"}
+    flat.update({k: fields.get(k) for k in FIELD_COLUMNS})
+    sample = (
+        int(timestamp.timestamp() * 1000),
+        fields["current_count"],
+        int(fields["current_speed"]),
+        int(fields["shift"]),
+        bool(fields.get("decimal_place", False)),
+        fields.get("unit", "meter"),
+        repeat,
+        int(until.timestamp() * 1000)
+    )
+    return flat, sample
+
+
+def _iter_rows(path: str, result: FileResult) -> Iterator[Tuple[Dict[str, Any], Row]]:
+    """Baca file baris per baris; baris tidak valid dicatat lalu dilewati."""
+    with open(path, newline="", encoding="utf-8") as f:
+        for line_no, record in enumerate(csv.DictReader(f), start=2):
+            try:
+                yield parse_row(record)
+            except (RowError, ValueError) as e:
+                result.invalid += 1
+                if len(result.errors) < 10:
+                    result.errors.append(f"{os.path.basename(path)}:{line_no}: {e}")
+
+
+def convert_file(
+    path: str,
+    fmt: str,
+    output: str,
+    chunks: Optional["queue.Queue[Tuple[str, List[Row]]]"] = None,
+    chunk_rows: int = CHUNK_ROWS
+) -> FileResult:
+    """Konversi satu file (dijalankan di worker process).
+
+    Untuk ``archive``/``sqlite`` sampel dikirim ke ``chunks`` per potongan
+    ``chunk_rows``; semua potongan sudah terkirim saat fungsi kembali.
+    """
+    result = FileResult(path=path, bytes=os.path.getsize(path))
+    if fmt != "csv":
+        chunk: List[Row] = []
+        for _, sample in _iter_rows(path, result):
+            chunk.append(sample)
+            result.rows += 1
+            if len(chunk) >= chunk_rows:
+                chunks.put((path, chunk))
+                chunk = []
+        if chunk:
+            chunks.put((path, chunk))
+        return result
+
+    target = os.path.join(output, os.path.basename(path))
+    if os.path.abspath(target) == os.path.abspath(path):
+        raise ValueError(f"Output akan menimpa input {path}")
+    tmp_path = target + ".tmp"
+    writer: Optional[csv.DictWriter] = None
+    try:
+        with open(tmp_path, "w", newline="", encoding="utf-8") as out:
+            for flat, _ in _iter_rows(path, result):
+                if writer is None:
+                    writer = csv.DictWriter(
+                        out, fieldnames=list(flat.keys()), extrasaction="ignore"
+                    )
+                    writer.writeheader()
+                writer.writerow(flat)
+                result.rows += 1
+        if writer is None:
+            # Tidak ada baris valid: jangan buat file output kosong
+            os.unlink(tmp_path)
+            return result
+        os.replace(tmp_path, target)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    result.output = target
+    return result
+
+
+def _write_sqlite(db: sqlite3.Connection, machine: str, samples: List[Row]) -> None:
+    """Masukkan sampel ke tabel samples."""
+    db.executemany(
+        "INSERT INTO samples (machine, timestamp_ms, current_count, current_speed, shift,"
+        " decimal_place, unit, repeat) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        [(machine, *sample[:7]) for sample in samples]
+    )
+    db.commit()
+
+
+def _write_archive(archive: "Archive", machine: str, samples: List[Row]) -> None:
+    """Masukkan sampel ke arsip kolomnar.
+
+    Baris run-length (``repeat`` > 1) dikembalikan menjadi ``repeat`` sampel
+    yang tersebar rata dari ``timestamp`` hingga ``until``.
+    """
+    from .archive import ArchiveSample
+    for ts, count, speed, shift, decimal, unit, repeat, until in samples:
+        step = (until - ts) / (repeat - 1) if repeat > 1 else 0
+        for i in range(repeat):
+            sample = ArchiveSample(ts + round(i * step), count, speed, shift, decimal, unit)
+            archive.append(machine, sample)
+
+
+def collect_inputs(paths: List[str]) -> List[str]:
+    """Kumpulkan file CSV dari daftar file/direktori."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(
+                os.path.join(path, name) for name in sorted(os.listdir(path))
+                if name.endswith(".csv")
+            )
+        else:
+            files.append(path)
+    return files
+
+
+def convert(
+    inputs: List[str],
+    fmt: str,
+    output: str,
+    machine: str = "default",
+    workers: Optional[int] = None
+) -> Dict[str, Any]:
+    """Konversi semua input secara paralel; return ringkasan throughput."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Format tidak dikenal: {fmt}")
+    files = collect_inputs(inputs)
+    if fmt in ("csv", "archive"):
+        os.makedirs(output, exist_ok=True)
+
+    archive = db = None
+    if fmt == "archive":
+        from .archive import Archive
+        archive = Archive(output)
+    elif fmt == "sqlite":
+        db = sqlite3.connect(output)
+        db.executescript(SQLITE_SCHEMA)
+
+    summary = {"files": 0, "rows": 0, "invalid": 0, "bytes": 0, "failed": 0}
+    start = time.perf_counter()
+
+    def write(chunk: List[Row]) -> None:
+        if db is not None:
+            _write_sqlite(db, machine, chunk)
+        elif archive is not None:
+            _write_archive(archive, machine, chunk)
+
+    manager = multiprocessing.Manager() if fmt != "csv" else None
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Antrian terbatas: worker menunggu jika penulisan tertinggal
+            limit = (workers or os.cpu_count() or 1) * 2
+            chunks = manager.Queue(maxsize=limit) if manager else None
+            futures: Dict[Future, str] = {
+                pool.submit(convert_file, path, fmt, output, chunks): path for path in files
+            }
+            pending = set(futures)
+            while pending:
+                if chunks is not None:
+                    try:
+                        write(chunks.get(timeout=0.05)[1])
+                        continue
+                    except queue.Empty:
+                        pass
+                done, pending = wait(pending, timeout=0 if chunks is not None else None,
+                                     return_when=FIRST_COMPLETED)
+                if done and chunks is not None:
+                    # Potongan terakhir file yang selesai sudah ada di antrian
+                    _drain(chunks, write)
+                for future in done:
+                    _collect(future, futures[future], summary)
+    finally:
+        if manager is not None:
+            manager.shutdown()
+        if archive is not None:
+            archive.flush()
+        if db is not None:
+            db.close()
+
+    elapsed = time.perf_counter() - start
+    summary["seconds"] = elapsed
+    summary["rows_per_second"] = summary["rows"] / elapsed if elapsed else 0.0
+    summary["mb_per_second"] = summary["bytes"] / 1e6 / elapsed if elapsed else 0.0
+    return summary
+
+
+def _drain(
+    chunks: "queue.Queue[Tuple[str, List[Row]]]",
+    write: Callable[[List[Row]], None]
+) -> None:
+    """Tulis semua potongan yang sudah ada di antrian."""
+    while True:
+        try:
+            write(chunks.get_nowait()[1])
+        except queue.Empty:
+            return
+
+
+def _collect(future: Future, path: str, summary: Dict[str, Any]) -> None:
+    """Tambahkan hasil satu file ke ringkasan."""
+    try:
+        result = future.result()
+    except Exception as e:
+        summary["failed"] += 1
+        logger.error(f"Gagal mengonversi {path}: {e}")
+        return
+    for error in result.errors:
+        logger.warning(error)
+    summary["files"] += 1
+    summary["rows"] += result.rows
+    summary["invalid"] += result.invalid
+    summary["bytes"] += result.bytes
+
+
+def format_summary(summary: Dict[str, Any]) -> str:
+    """Ringkasan konversi yang mudah dibaca."""
+    return (
+        f"{summary['files']} file, {summary['rows']} baris "
+        f"({summary['invalid']} tidak valid, {summary['failed']} file gagal) "
+        f"dalam {summary['seconds']:.2f} s: "
+        f"{summary['rows_per_second']:.0f} baris/s, {summary['mb_per_second']:.1f} MB/s"
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point ``monitoring-roll-convert``."""
+    parser = argparse.ArgumentParser(
+        prog="monitoring-roll-convert",
+        description="Konversi CSV sesi lama ke CSV datar, arsip kolomnar atau SQLite."
+    )
+    parser.add_argument("inputs", nargs="+", help="file CSV atau direktori ekspor")
+    parser.add_argument("--format", choices=FORMATS, default="csv", dest="fmt")
+    parser.add_argument("--output", required=True, help="direktori output (file .db untuk sqlite)")
+    parser.add_argument("--machine", default="default", help="nama mesin untuk archive/sqlite")
+    parser.add_argument("--workers", type=int, default=None, help="jumlah proses (default: CPU)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    summary = convert(args.inputs, args.fmt, args.output, args.machine, args.workers)
+    print(format_summary(summary))
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
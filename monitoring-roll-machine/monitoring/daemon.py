@@ -0,0 +1,542 @@
+"""
+Daemon akuisisi headless: serial + monitor + rekaman sesi tanpa UI.
+
+UI terhubung sebagai client ringan lewat socket TCP lokal dengan pesan JSON
+per baris, sehingga GUI bisa di-restart tanpa kehilangan sampel. Estimator
+ETA berjalan di daemon; snapshot-nya dikirim ke client setiap
+``ETA_INTERVAL`` detik agar client menghitung ETA roll dan forecast shift.
+"""
+from datetime import datetime
+from typing import Optional, Dict, Any, Callable, List, Tuple
+import argparse
+import json
+import logging
+import queue
+import os
+import signal
+import socket
+import threading
+
+from .archive import Archive, ArchiveSample
+from .anomaly import create_anomaly_detector
+from .bus import DataBus, OverflowPolicy, TOPIC_EVENT
+from .change_filter import create_change_detector
+from .config import load_config
+from .eta import EtaEstimator, EtaSnapshot
+from .journal import EventJournal, Event, EventType
+from .logging_utils import setup_logging
+from .monitor import Monitor
+from .parser import received_at
+from .profiling import get_profiler, stage
+from .query import HistoryQuery
+from .ports import get_port_registry
+from .scheduler import AdaptivePollScheduler
+from .serial_handler import JSKSerialPort, ConnectionState
+from .session import MonitoringSession
+from .shared_state import SharedStateWriter, SHM_NAME, segment_name
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Interval kirim snapshot ETA ke client (detik); ETA dibulatkan ke menit di UI
+ETA_INTERVAL = 1.0
+
+
+def parse_address(address: str) -> Tuple[str, int]:
+    """Parse ``host:port`` (atau hanya ``port``) menjadi tuple alamat."""
+    host, _, port = address.rpartition(":")
+    return host or DEFAULT_HOST, int(port)
+
+
+def encode_message(message: Dict[str, Any]) -> bytes:
+    """Encode pesan protokol daemon menjadi satu baris JSON."""
+    return (json.dumps(message, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+class _ClientConnection:
+    """Satu client UI; pesan dikirim dari thread sendiri lewat antrian terbatas."""
+    def __init__(self, sock: socket.socket, address: Any, max_pending: int = 256) -> None:
+        self.sock = sock
+        self.address = address
+        self.dropped = 0
+        self._queue: "queue.Queue[Optional[bytes]]" = queue.Queue(maxsize=max_pending)
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def send(self, payload: bytes) -> None:
+        """Antrikan pesan; client yang lambat kehilangan pesan, bukan memperlambat akuisisi."""
+        try:
+            self._queue.put_nowait(payload)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self) -> None:
+        """Tutup koneksi client."""
+        try:
+            self._queue.put_nowait(None)
+        except queue.Full:
+            pass
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+    def _write_loop(self) -> None:
+        """Kirim pesan dari antrian ke socket."""
+        while True:
+            payload = self._queue.get()
+            if payload is None:
+                return
+            try:
+                self.sock.sendall(payload)
+            except OSError:
+                return
+
+
+class AcquisitionDaemon:
+    """Jalankan JSKSerialPort + Monitor + MonitoringSession dan layani client UI."""
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        export_dir: str = "exports",
+        simulation_mode: bool = False
+    ) -> None:
+        self.config = config
+        self.host = host
+        self.port = port
+        self.simulation_mode = simulation_mode
+        # Periode idle disimpan sebagai satu baris dengan jumlah pengulangan
+        self.session = MonitoringSession(
+            export_dir=export_dir,
+            run_length=config.get("session_run_length", True)
+        )
+        self.machine = config.get("machine_id", "default")
+        self.shared_state: Optional[SharedStateWriter] = None
+        self.bus = DataBus()
+        self.archive: Optional[Archive] = None
+        self.history: Optional[HistoryQuery] = None
+        if config.get("archive", True):
+            self.archive = Archive(config.get("archive_dir", os.path.join(export_dir, "archive")))
+            self.history = HistoryQuery(self.archive)
+        self.journal: Optional[EventJournal] = None
+        if config.get("journal", True):
+            self.journal = EventJournal(
+                config.get("journal_dir", os.path.join(export_dir, "journal"))
+            )
+        self._dropped: Dict[str, int] = {}
+        self.monitor: Optional[Monitor] = None
+        self.latest: Optional[Dict[str, Any]] = None
+        self.latest_eta: Optional[Dict[str, Any]] = None
+        self.state = ConnectionState.CLOSED
+        self._clients: List[_ClientConnection] = []
+        self._clients_lock = threading.Lock()
+        self._server: Optional[socket.socket] = None
+        self._stop_event = threading.Event()
+        self._session_lock = threading.Lock()
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """Alamat server yang sedang listen."""
+        if self._server:
+            return self._server.getsockname()[:2]
+        return self.host, self.port
+
+    def start(self) -> None:
+        """Buka port serial, mulai monitor dan server client."""
+        self._stop_event.clear()
+        try:
+            # Satu segmen per daemon: daemon mesin lain menulis segmennya sendiri
+            self.shared_state = SharedStateWriter(
+                segment_name(self.config.get("shared_state_name", SHM_NAME), self.machine), slots=1
+            )
+        except (OSError, ValueError) as e:
+            # Client tetap bisa memakai stream JSON
+            logger.warning(f"Shared state tidak tersedia: {e}")
+        self._server = socket.create_server((self.host, self.port))
+        self._server.settimeout(0.5)
+        threading.Thread(target=self._accept_loop, name="daemon-accept", daemon=True).start()
+
+        serial_port = self._create_serial_port()
+        serial_port.enable_auto_recover()
+        # Perekam sesi dan arsip diberi antrian besar tetapi tidak pernah menahan
+        # thread akuisisi; sampel yang terbuang dijurnal oleh _journal_drops.
+        # Shared state cukup nilai terbaru
+        self.bus.subscribe(self._record, maxsize=8192, name="session")
+        if self.shared_state:
+            self.bus.subscribe(
+                self._publish_shared_state,
+                policy=OverflowPolicy.COALESCE,
+                name="shared_state"
+            )
+        if self.archive:
+            self.bus.subscribe(self._archive, maxsize=8192, name="archive")
+        self.bus.subscribe(self._broadcast_data, name="clients")
+        self.bus.subscribe(
+            self._broadcast_alert, topic=TOPIC_EVENT, maxsize=16, name="client_alerts"
+        )
+        self.monitor = Monitor(
+            serial_port=serial_port,
+            on_error=self._handle_error,
+            poll_interval=self.config.get("poll_interval", 1.0),
+            scheduler=AdaptivePollScheduler.from_config(self.config),
+            on_state=self._handle_state,
+            bus=self.bus,
+            machine=self.machine,
+            change_detector=create_change_detector(self.config),
+            journal=self.journal,
+            anomaly_detector=create_anomaly_detector(self.config),
+            # Config daemon berupa dict biasa; jendela ETA dan jam shift dari sini
+            eta=EtaEstimator.from_config(self.config)
+        )
+        try:
+            serial_port.open()
+        except Exception as e:
+            # Port belum ada: biarkan state machine terus mencoba
+            logger.error(f"Port {serial_port.port} belum bisa dibuka: {e}")
+            serial_port.start_reconnect()
+        self.session.start()
+        self.monitor.start()
+        threading.Thread(target=self._eta_loop, name="daemon-eta", daemon=True).start()
+        # Listener monitor baru terpasang setelah port dibuka
+        self.state = serial_port.state
+        logger.info(f"Daemon akuisisi listen di {self.address[0]}:{self.address[1]}")
+
+    def stop(self) -> Optional[str]:
+        """Hentikan akuisisi, ekspor sesi dan putuskan semua client."""
+        self._stop_event.set()
+        if self.monitor:
+            self.monitor.stop()
+            self.monitor.serial_port.stop()
+        # Tunggu subscriber menyelesaikan antriannya sebelum sesi diekspor
+        self.bus.close()
+        if self.archive:
+            self.archive.flush()
+        if self.journal:
+            self.journal.close()
+        if self._server:
+            self._server.close()
+        with self._clients_lock:
+            clients, self._clients = self._clients, []
+        for client in clients:
+            client.close()
+        if self.shared_state:
+            self.shared_state.close()
+            self.shared_state = None
+        with self._session_lock:
+            return self.session.end() if self.session.data else None
+
+    def run_forever(self) -> None:
+        """Jalankan daemon hingga SIGINT/SIGTERM."""
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: self._stop_event.set())
+        self.start()
+        try:
+            while not self._stop_event.wait(1.0):
+                self._journal_drops()
+        finally:
+            filepath = self.stop()
+            if filepath:
+                logger.info(f"Sesi terakhir diekspor ke {filepath}")
+
+    def _create_serial_port(self) -> JSKSerialPort:
+        """Buat JSKSerialPort dari konfigurasi (mengikuti adapter yang berpindah)."""
+        registry = get_port_registry()
+        port_key = self.config.get("serial_port_key")
+        port = (port_key and registry.resolve(port_key)) or self.config.get("serial_port", "COM1")
+        return JSKSerialPort(
+            port=port,
+            baudrate=self.config.get("baudrate", 19200),
+            simulation_mode=self.simulation_mode,
+            hardware_key=port_key or registry.key_for(port),
+            port_resolver=registry.resolve
+        )
+
+    def _record(self, data: Dict[str, Any]) -> None:
+        """Rekam sampel ke sesi."""
+        with self._session_lock:
+            self._rollover_session()
+            with stage("session"):
+                self.session.add_data(data)
+
+    def _archive(self, data: Dict[str, Any]) -> None:
+        """Simpan sampel ke arsip jangka panjang dan rollup historis."""
+        if data.get("fields"):
+            wall_ns, _ = received_at(data)
+            sample = ArchiveSample.from_fields(wall_ns // 1_000_000, data["fields"])
+            self.history.record(self.machine, sample)
+
+    def _publish_shared_state(self, data: Dict[str, Any]) -> None:
+        """Tulis sampel terbaru ke shared memory."""
+        if self.shared_state and data.get("fields"):
+            self.shared_state.write(self.machine, data["fields"], received_at(data)[0])
+
+    def _broadcast_data(self, data: Dict[str, Any]) -> None:
+        """Kirim sampel ke semua client."""
+        self.latest = data
+        self._broadcast({"type": "data", "data": data})
+
+    def _broadcast_alert(self, event: Event) -> None:
+        """Kirim anomali yang terdeteksi ke semua client."""
+        if event.type is EventType.ANOMALY:
+            self._broadcast({
+                "type": "alert",
+                "machine": event.machine,
+                "timestamp_ms": event.timestamp_ms,
+                "fields": event.fields,
+            })
+
+    def _handle_error(self, error: Exception) -> None:
+        """Teruskan error monitor ke client."""
+        self._broadcast({"type": "error", "message": str(error)})
+
+    def _handle_state(self, state: ConnectionState) -> None:
+        """Teruskan perubahan state koneksi ke client."""
+        self.state = state
+        self._broadcast({"type": "state", "state": state.value})
+
+    def _journal_drops(self) -> None:
+        """Catat sampel yang dibuang subscriber bus sejak pemeriksaan terakhir."""
+        if not self.monitor:
+            return
+        for name, stats in self.bus.stats().items():
+            dropped = stats["dropped"] - self._dropped.get(name, 0)
+            if dropped > 0:
+                self.monitor.publish_event(
+                    EventType.SAMPLES_DROPPED, subscriber=name, count=dropped
+                )
+            self._dropped[name] = stats["dropped"]
+
+    def _rollover_session(self) -> None:
+        """Ekspor dan mulai sesi baru saat berganti hari agar memori tidak terus tumbuh."""
+        start_time = self.session.start_time
+        if start_time and start_time.date() != datetime.now().date() and self.session.data:
+            # Ekspor di background agar perekaman hari baru tidak tertahan
+            self.session.end_async()
+            self.session.start()
+
+    def _eta_loop(self) -> None:
+        """Kirim snapshot estimator ETA monitor ke client secara berkala."""
+        while not self._stop_event.wait(ETA_INTERVAL):
+            snapshot = self.monitor.eta.snapshot()
+            self.latest_eta = snapshot.to_dict() if snapshot else None
+            self._broadcast({"type": "eta", "eta": self.latest_eta})
+
+    def _broadcast(self, message: Dict[str, Any]) -> None:
+        """Kirim pesan ke semua client yang terhubung."""
+        payload = encode_message(message)
+        with self._clients_lock:
+            clients = list(self._clients)
+        for client in clients:
+            client.send(payload)
+
+    def _accept_loop(self) -> None:
+        """Terima client baru hingga daemon berhenti."""
+        while not self._stop_event.is_set():
+            try:
+                sock, address = self._server.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            client = _ClientConnection(sock, address)
+            # Client baru langsung mendapat state dan sampel terakhir
+            client.send(encode_message({"type": "state", "state": self.state.value}))
+            if self.latest:
+                client.send(encode_message({"type": "data", "data": self.latest}))
+            if self.latest_eta:
+                client.send(encode_message({"type": "eta", "eta": self.latest_eta}))
+            with self._clients_lock:
+                self._clients.append(client)
+            threading.Thread(target=self._read_loop, args=(client,), daemon=True).start()
+            logger.info(f"Client UI terhubung dari {address}")
+
+    def _read_loop(self, client: _ClientConnection) -> None:
+        """Baca perintah dari client hingga koneksi ditutup."""
+        try:
+            for line in client.sock.makefile("r", encoding="utf-8"):
+                self._handle_request(client, line)
+        except (OSError, ValueError):
+            pass
+        finally:
+            with self._clients_lock:
+                if client in self._clients:
+                    self._clients.remove(client)
+            client.close()
+            logger.info(f"Client UI {client.address} terputus (drop {client.dropped} pesan)")
+
+    def _handle_request(self, client: _ClientConnection, line: str) -> None:
+        """Proses satu perintah JSON dari client."""
+        try:
+            request = json.loads(line)
+        except ValueError:
+            logger.warning(f"Perintah client tidak valid: {line.strip()[:80]}")
+            return
+        command = request.get("cmd")
+        if command == "product" and self.monitor:
+            self.monitor.update_product_info(
+                request.get("info", {}),
+                push_to_machine=bool(request.get("push_to_machine", False))
+            )
+        elif command == "status":
+            client.send(encode_message({"type": "data", "data": self.latest}))
+        else:
+            logger.warning(f"Perintah client tidak dikenal: {command}")
+
+
+class DaemonClient:
+    """Client UI untuk daemon akuisisi, dengan antarmuka mirip Monitor.
+
+    Callback dipanggil dari thread client; UI harus memindahkannya ke thread UI.
+    Jika daemon di-restart, client menyambung ulang secara otomatis. ``eta``
+    berisi snapshot estimator terakhir dari daemon (antarmuka ``roll_eta`` dan
+    ``shift_projection`` sama dengan ``Monitor.eta``), atau None.
+    """
+    def __init__(
+        self,
+        address: str,
+        on_data: Optional[Callable[[Dict[str, Any]], None]] = None,
+        on_error: Optional[Callable[[Exception], None]] = None,
+        on_state: Optional[Callable[[ConnectionState], None]] = None,
+        reconnect_interval: float = 1.0,
+        on_alert: Optional[Callable[[Event], None]] = None,
+        on_connect: Optional[Callable[[], None]] = None
+    ) -> None:
+        self.host, self.port = parse_address(address)
+        self.on_data = on_data
+        self.on_error = on_error
+        self.on_state = on_state
+        self.on_alert = on_alert
+        # Dipanggil setiap kali tersambung (ulang); daemon mungkin sudah di-restart
+        self.on_connect = on_connect
+        self.reconnect_interval = reconnect_interval
+        self.latest: Optional[Dict[str, Any]] = None
+        self.eta: Optional[EtaSnapshot] = None
+        self.is_running = False
+        self._sock: Optional[socket.socket] = None
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Mulai menerima data dari daemon."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="daemon-client", daemon=True)
+        self._thread.start()
+        self.is_running = True
+
+    def stop(self) -> None:
+        """Putuskan dari daemon (akuisisi di daemon tetap berjalan)."""
+        self._stop_event.set()
+        if self._sock:
+            try:
+                self._sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if self._thread:
+            self._thread.join()
+        self.is_running = False
+
+    def get_status(self) -> Optional[Dict[str, Any]]:
+        """Sampel terakhir yang diterima dari daemon."""
+        return self.latest
+
+    def update_product_info(
+        self,
+        product_info: Dict[str, Any],
+        push_to_machine: bool = False
+    ) -> None:
+        """Kirim info produk ke daemon."""
+        self._request({"cmd": "product", "info": product_info, "push_to_machine": push_to_machine})
+
+    def _request(self, message: Dict[str, Any]) -> None:
+        """Kirim perintah ke daemon jika terhubung."""
+        if not self._sock:
+            logger.warning("Daemon belum terhubung, perintah diabaikan")
+            return
+        try:
+            self._sock.sendall(encode_message(message))
+        except OSError as e:
+            logger.error(f"Error sending to daemon: {e}")
+
+    def _run(self) -> None:
+        """Loop koneksi: sambung, baca pesan, sambung ulang jika terputus."""
+        while not self._stop_event.is_set():
+            try:
+                self._sock = socket.create_connection((self.host, self.port), timeout=2.0)
+                self._sock.settimeout(None)
+                if self.on_connect:
+                    self.on_connect()
+                for line in self._sock.makefile("r", encoding="utf-8"):
+                    self._dispatch(json.loads(line))
+            except (OSError, ValueError) as e:
+                if not self._stop_event.is_set():
+                    logger.debug(f"Koneksi daemon {self.host}:{self.port}: {e}")
+            finally:
+                if self._sock:
+                    self._sock.close()
+                    self._sock = None
+            if not self._stop_event.is_set() and self.on_state:
+                self.on_state(ConnectionState.RECONNECTING)
+            self._stop_event.wait(self.reconnect_interval)
+
+    def _dispatch(self, message: Dict[str, Any]) -> None:
+        """Teruskan pesan daemon ke callback."""
+        kind = message.get("type")
+        if kind == "data" and message.get("data"):
+            self.latest = message["data"]
+            if self.on_data:
+                self.on_data(self.latest)
+        elif kind == "eta":
+            self.eta = EtaSnapshot.from_dict(message["eta"]) if message.get("eta") else None
+        elif kind == "state" and self.on_state:
+            self.on_state(ConnectionState(message["state"]))
+        elif kind == "error" and self.on_error:
+            self.on_error(RuntimeError(message.get("message", "")))
+        elif kind == "alert" and self.on_alert:
+            self.on_alert(Event(
+                EventType.ANOMALY,
+                message.get("machine", ""),
+                message.get("timestamp_ms", 0),
+                message.get("fields", {})
+            ))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Entry point ``monitoring-roll-daemon``."""
+    parser = argparse.ArgumentParser(prog="monitoring-roll-daemon")
+    parser.add_argument("--listen", default=None, help="host:port untuk client UI")
+    parser.add_argument("--port", dest="serial_port", help="port serial (override config)")
+    parser.add_argument("--baudrate", type=int, help="baudrate (override config)")
+    parser.add_argument("--export-dir", default="exports", help="direktori ekspor sesi")
+    parser.add_argument("--simulate", action="store_true", help="pakai mock serial")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    # kill -USR1 <pid> menulis snapshot profiling ke direktori profiles/
+    get_profiler().install_signal_handler()
+    config = load_config()
+    if args.serial_port:
+        config["serial_port"] = args.serial_port
+        config.pop("serial_port_key", None)
+    if args.baudrate:
+        config["baudrate"] = args.baudrate
+    default_address = config.get("daemon_address", f"{DEFAULT_HOST}:{DEFAULT_PORT}")
+    host, port = parse_address(args.listen or default_address)
+
+    AcquisitionDaemon(
+        config,
+        host=host,
+        port=port,
+        export_dir=args.export_dir,
+        simulation_mode=args.simulate
+    ).run_forever()
+
+
+if __name__ == "__main__":
+    main()
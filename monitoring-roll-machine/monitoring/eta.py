@@ -0,0 +1,271 @@
+"""
+Perkiraan waktu selesai roll dan output akhir shift.
+
+``EtaEstimator`` menerima (timestamp, panjang roll, total) dalam meter,
+dari ``length_um``/``total_um`` hasil ``CountNormalizer``, setiap sampel dan
+menyaring laju produksi (meter/detik, dari selisih total) dengan EWMA
+berbasis waktu: bobot sampel lama meluruh dengan konstanta waktu ``tau_s``,
+sehingga interval polling yang tidak rata tetap benar. Varians EW dari laju
+sesaat memberi batas kepercayaan. Update O(1) per sampel; perkiraan bisa
+dihitung setiap frame dan diekstrapolasi dari sampel terakhir.
+
+``EtaSnapshot`` adalah state estimator yang cukup untuk menghitung perkiraan
+yang sama di proses lain: daemon akuisisi mengirimnya ke client UI.
+"""
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta
+from typing import Optional, Tuple, Sequence, Any, Dict
+import math
+import threading
+import time
+
+# Sampel yang jaraknya lebih dari ini (koneksi putus, mesin dimatikan) tidak dihitung sebagai laju
+MAX_GAP_S = 60.0
+
+
+@dataclass(frozen=True)
+class Estimate:
+    """Nilai perkiraan dengan batas bawah dan atas."""
+    value: float
+    low: float
+    high: float
+
+
+@dataclass(frozen=True)
+class RollEta:
+    """Perkiraan selesai roll saat ini."""
+    remaining: float
+    rate: float
+    # Detik dari ``now``; None jika mesin berhenti (laju nol)
+    seconds: Optional[float]
+    seconds_low: Optional[float]
+    seconds_high: Optional[float]
+    now: float
+
+    @property
+    def completes_at(self) -> Optional[float]:
+        """Perkiraan waktu selesai (detik epoch)."""
+        return None if self.seconds is None else self.now + self.seconds
+
+
+@dataclass(frozen=True)
+class EtaSnapshot:
+    """State estimator pada satu saat; menghitung perkiraan tanpa estimator."""
+    # Laju tersaring dan batasnya (meter/detik)
+    rate: float
+    rate_low: float
+    rate_high: float
+    last_time: float
+    last_count: float
+    # Waktu terakhir counter naik; None jika belum pernah
+    last_progress: Optional[float]
+    shift_start: float
+    shift_end: float
+    shift_output: float
+    max_gap_s: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Bentuk JSON untuk protokol daemon."""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, values: Dict[str, Any]) -> "EtaSnapshot":
+        """Kebalikan ``to_dict``."""
+        return cls(**values)
+
+    def roll_eta(self, target: float, now: Optional[float] = None) -> RollEta:
+        """Perkiraan selesai roll untuk panjang ``target``."""
+        now = time.time() if now is None else now
+        rate, low, high = self.rate, self.rate_low, self.rate_high
+        if self.last_progress is None or now - self.last_progress > self.max_gap_s:
+            # Mesin berhenti: tidak ada perkiraan sampai counter naik lagi
+            rate = low = high = 0.0
+        # Ekstrapolasi dari sampel terakhir agar hitung mundur berjalan setiap frame
+        elapsed = max(0.0, min(now - self.last_time, self.max_gap_s))
+        remaining = max(target - self.last_count - rate * elapsed, 0.0)
+
+        def seconds(r: float) -> Optional[float]:
+            if remaining == 0:
+                return 0.0
+            return remaining / r if r > 0 else None
+
+        return RollEta(remaining, rate, seconds(rate), seconds(high), seconds(low), now)
+
+    def shift_projection(self, now: Optional[float] = None) -> Optional[Estimate]:
+        """Perkiraan total output pada akhir shift berjalan; None setelah shift selesai."""
+        now = time.time() if now is None else now
+        if now >= self.shift_end:
+            return None
+        # Output sejak sampel terakhir juga masih harus diproduksi
+        left = self.shift_end - max(self.last_time, self.shift_start)
+        return Estimate(
+            self.shift_output + self.rate * left,
+            self.shift_output + self.rate_low * left,
+            self.shift_output + self.rate_high * left
+        )
+
+
+class RateFilter:
+    """Rata-rata dan varians EW dengan peluruhan berbasis waktu."""
+    def __init__(self, tau_s: float = 120.0) -> None:
+        self.tau_s = tau_s
+        self.reset()
+
+    def reset(self) -> None:
+        self.mean: Optional[float] = None
+        self.var = 0.0
+        self.interval = 0.0
+
+    def update(self, value: float, dt: float) -> None:
+        """Tambah satu nilai yang berlaku selama ``dt`` detik."""
+        if self.mean is None:
+            self.mean = value
+            self.interval = dt
+            return
+        alpha = 1.0 - math.exp(-dt / self.tau_s)
+        diff = value - self.mean
+        increment = alpha * diff
+        self.mean += increment
+        self.var = (1.0 - alpha) * (self.var + diff * increment)
+        self.interval += alpha * (dt - self.interval)
+
+    @property
+    def stderr(self) -> float:
+        """Standard error rata-rata: varians dibagi jumlah sampel efektif dalam ``tau_s``."""
+        if self.mean is None or self.interval <= 0:
+            return 0.0
+        n_eff = max(1.0, 2.0 * self.tau_s / self.interval)
+        return math.sqrt(self.var / n_eff)
+
+
+def shift_window(timestamp: float, start_hours: Sequence[float]) -> Tuple[float, float]:
+    """(mulai, selesai) shift yang memuat ``timestamp`` (detik epoch, waktu lokal)."""
+    moment = datetime.fromtimestamp(timestamp)
+    midnight = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    hours = sorted(start_hours)
+    # Awal shift kemarin, hari ini dan besok; shift terakhir kemarin berjalan melewati tengah malam
+    starts = [midnight + timedelta(days=day, hours=h) for day in (-1, 0, 1) for h in hours]
+    for start, end in zip(starts, starts[1:]):
+        if start <= moment < end:
+            return start.timestamp(), end.timestamp()
+    raise ValueError(f"Jam mulai shift tidak valid: {start_hours}")
+
+
+class EtaEstimator:
+    """Laju tersaring, perkiraan selesai roll dan output akhir shift.
+
+    ``update()`` dipanggil dari thread akuisisi, perkiraan dibaca dari thread
+    UI; state dilindungi lock.
+    """
+    def __init__(
+        self,
+        tau_s: float = 120.0,
+        z: float = 1.96,
+        shift_start_hours: Sequence[float] = (6, 14, 22),
+        max_gap_s: float = MAX_GAP_S
+    ) -> None:
+        self.z = z
+        self.shift_start_hours = tuple(shift_start_hours)
+        self.max_gap_s = max_gap_s
+        self.rate = RateFilter(tau_s)
+        self._lock = threading.Lock()
+        self._last_time: Optional[float] = None
+        self._last_count = 0.0
+        self._last_total: Optional[float] = None
+        # Waktu terakhir counter naik; EWMA tidak pernah tepat nol saat mesin berhenti
+        self._last_progress: Optional[float] = None
+        self._shift: Optional[Tuple[float, float]] = None
+        self.shift_output = 0.0
+
+    @classmethod
+    def from_config(cls, config: Any) -> "EtaEstimator":
+        """Buat estimator dari key ``eta_window_s`` dan ``shift_start_hours``."""
+        return cls(
+            tau_s=config.get("eta_window_s", 120.0),
+            shift_start_hours=config.get("shift_start_hours", [6, 14, 22])
+        )
+
+    def update(self, timestamp: float, count: float, total: Optional[float] = None) -> None:
+        """Tambah sampel (detik epoch): panjang roll dan total monoton dalam meter.
+
+        Tanpa ``total`` produksi dihitung dari selisih panjang roll.
+        """
+        with self._lock:
+            if self._shift is None or timestamp >= self._shift[1]:
+                self._shift = shift_window(timestamp, self.shift_start_hours)
+                self.shift_output = 0.0
+            last_time, last_count, last_total = self._last_time, self._last_count, self._last_total
+            self._last_time, self._last_count, self._last_total = timestamp, count, total
+            if last_time is None:
+                return
+            dt = timestamp - last_time
+            if dt <= 0 or dt > self.max_gap_s:
+                return
+            if total is not None and last_total is not None:
+                # Total sudah melewati wraparound, reset roll dan ganti satuan
+                produced = max(total - last_total, 0.0)
+            else:
+                # Counter turun = roll baru dimulai dari nol
+                produced = count - last_count if count >= last_count else count
+            self.rate.update(produced / dt, dt)
+            self.shift_output += produced
+            if produced > 0:
+                self._last_progress = timestamp
+
+    def configure(
+        self, tau_s: Optional[float] = None, shift_start_hours: Optional[Sequence[float]] = None
+    ) -> None:
+        """Ganti jendela laju dan/atau jam mulai shift tanpa membuat estimator baru."""
+        with self._lock:
+            if tau_s is not None:
+                self.rate.tau_s = tau_s
+            if shift_start_hours is not None:
+                self.shift_start_hours = tuple(shift_start_hours)
+                # Batas shift dihitung ulang pada sampel berikutnya
+                self._shift = None
+
+    def reset(self) -> None:
+        """Lupakan laju dan output shift (mis. saat ganti mesin)."""
+        with self._lock:
+            self.rate.reset()
+            self._last_time = None
+            self._last_count = 0.0
+            self._last_total = None
+            self._last_progress = None
+            self._shift = None
+            self.shift_output = 0.0
+
+    def _rate_bounds(self) -> Optional[Tuple[float, float, float]]:
+        """(laju, bawah, atas) per detik; None sebelum ada dua sampel."""
+        mean = self.rate.mean
+        if mean is None:
+            return None
+        margin = self.z * self.rate.stderr
+        return max(mean, 0.0), max(mean - margin, 0.0), max(mean + margin, 0.0)
+
+    def snapshot(self) -> Optional[EtaSnapshot]:
+        """State saat ini untuk dihitung di tempat lain; None sebelum ada laju."""
+        with self._lock:
+            bounds = self._rate_bounds()
+            if bounds is None or self._last_time is None or self._shift is None:
+                return None
+            return EtaSnapshot(
+                *bounds,
+                last_time=self._last_time,
+                last_count=self._last_count,
+                last_progress=self._last_progress,
+                shift_start=self._shift[0],
+                shift_end=self._shift[1],
+                shift_output=self.shift_output,
+                max_gap_s=self.max_gap_s
+            )
+
+    def roll_eta(self, target: float, now: Optional[float] = None) -> Optional[RollEta]:
+        """Perkiraan selesai roll untuk panjang ``target``; None sebelum ada laju."""
+        snapshot = self.snapshot()
+        return snapshot.roll_eta(target, now) if snapshot else None
+
+    def shift_projection(self, now: Optional[float] = None) -> Optional[Estimate]:
+        """Perkiraan total output pada akhir shift berjalan."""
+        snapshot = self.snapshot()
+        return snapshot.shift_projection(now) if snapshot else None
@@ -0,0 +1,156 @@
+"""
+Job ekspor di background dengan progress dan pembatalan.
+"""
+from concurrent.futures import ThreadPoolExecutor, Future
+from enum import Enum
+from typing import Optional, Dict, Any, List, Callable
+import itertools
+import logging
+import threading
+
+from .exporter import export_to_csv, ExportCancelled
+
+logger = logging.getLogger(__name__)
+
+
+class JobState(Enum):
+    """Status job ekspor."""
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class ExportJob:
+    """Satu ekspor yang berjalan di background."""
+    def __init__(
+        self,
+        job_id: int,
+        path: str,
+        on_progress: Optional[Callable[["ExportJob"], None]] = None,
+        on_done: Optional[Callable[["ExportJob"], None]] = None
+    ) -> None:
+        self.id = job_id
+        self.path = path
+        self.state = JobState.PENDING
+        self.progress = 0.0
+        self.error: Optional[BaseException] = None
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.future: Optional[Future] = None
+        self._cancel = threading.Event()
+
+    @property
+    def finished(self) -> bool:
+        """True jika job sudah selesai, gagal atau dibatalkan."""
+        return self.state in (JobState.DONE, JobState.FAILED, JobState.CANCELLED)
+
+    def cancel(self) -> None:
+        """Minta job berhenti; file tujuan tidak diubah."""
+        self._cancel.set()
+        if self.future and self.future.cancel():
+            # Belum sempat berjalan
+            self._finish(JobState.CANCELLED)
+
+    def is_cancelled(self) -> bool:
+        """True jika pembatalan sudah diminta."""
+        return self._cancel.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> JobState:
+        """Tunggu job selesai; return state akhir."""
+        if self.future:
+            try:
+                self.future.result(timeout)
+            except Exception:
+                pass
+        return self.state
+
+    def _set_progress(self, progress: float) -> None:
+        """Catat progress dan panggil callback."""
+        self.progress = progress
+        if self.on_progress:
+            self.on_progress(self)
+
+    def _finish(self, state: JobState, error: Optional[BaseException] = None) -> None:
+        """Tandai job selesai dan panggil callback."""
+        self.state = state
+        self.error = error
+        if self.on_done:
+            try:
+                self.on_done(self)
+            except Exception as e:
+                logger.error(f"Error in export callback: {e}")
+
+
+class ExportManager:
+    """Menjalankan job ekspor di thread worker, terpisah dari polling dan UI.
+
+    ``jobs`` hanya menyimpan ``keep_finished`` job selesai terakhir, sehingga
+    manager yang hidup selama aplikasi tidak menumpuk job lama.
+    """
+    def __init__(self, max_workers: int = 1, keep_finished: int = 16) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="export")
+        self._ids = itertools.count(1)
+        self.keep_finished = keep_finished
+        self.jobs: Dict[int, ExportJob] = {}
+
+    def submit(
+        self,
+        rows: List[Dict[str, Any]],
+        path: str,
+        on_progress: Optional[Callable[[ExportJob], None]] = None,
+        on_done: Optional[Callable[[ExportJob], None]] = None
+    ) -> ExportJob:
+        """Antrikan ekspor ``rows`` ke CSV ``path``.
+
+        ``rows`` disalin per baris saat submit, sehingga perekaman bisa terus
+        berjalan (dan mengubah dict barisnya). Callback dipanggil dari thread worker.
+        """
+        job = ExportJob(next(self._ids), path, on_progress, on_done)
+        snapshot = [dict(row) for row in rows]
+        self._prune()
+        self.jobs[job.id] = job
+        job.future = self._executor.submit(self._run, job, snapshot)
+        return job
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Hentikan worker; job yang belum berjalan dibatalkan."""
+        for job in list(self.jobs.values()):
+            if job.state is JobState.PENDING:
+                job.cancel()
+        self._executor.shutdown(wait=wait)
+
+    def _prune(self) -> None:
+        """Buang job selesai yang lebih lama dari ``keep_finished`` terakhir."""
+        finished = [job_id for job_id, job in self.jobs.items() if job.finished]
+        for job_id in finished[:max(len(finished) - self.keep_finished, 0)]:
+            del self.jobs[job_id]
+
+    def _run(self, job: ExportJob, rows: List[Dict[str, Any]]) -> None:
+        """Jalankan satu job di thread worker."""
+        job.state = JobState.RUNNING
+        try:
+            export_to_csv(rows, job.path, on_progress=job._set_progress, cancelled=job.is_cancelled)
+        except ExportCancelled:
+            logger.info(f"Ekspor {job.path} dibatalkan")
+            job._finish(JobState.CANCELLED)
+        except Exception as e:
+            logger.error(f"Ekspor {job.path} gagal: {e}")
+            job._finish(JobState.FAILED, e)
+        else:
+            logger.info(f"Data diekspor ke: {job.path}")
+            job._finish(JobState.DONE)
+
+
+_manager: Optional[ExportManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_export_manager() -> ExportManager:
+    """ExportManager bersama untuk seluruh aplikasi."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = ExportManager()
+        return _manager
@@ -2,14 +2,76 @@
 Ekspor data monitoring ke file CSV.
 """
 import csv
-from typing import List, Dict
+import os
+import tempfile
+from datetime import datetime
+from typing import List, Dict, Optional, Callable, Any
 
-def export_to_csv(data: List[Dict], path: str) -> None:
-    """Ekspor list of dict ke file CSV."""
+# Kolom waktu sesi (integer nanodetik epoch) yang diformat ISO saat ekspor
+TIMESTAMP_FIELDS = ("timestamp", "until")
+
+
+def _umask_mode() -> int:
+    """Izin file baru sesuai umask proses (mkstemp sendiri selalu 0600)."""
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+class ExportCancelled(Exception):
+    """Exception jika ekspor dibatalkan sebelum selesai."""
+    pass
+
+
+def format_timestamp(timestamp_ns: int) -> str:
+    """Nanodetik epoch ke string ISO waktu lokal (resolusi mikrodetik)."""
+    seconds, ns = divmod(timestamp_ns, 1_000_000_000)
+    return datetime.fromtimestamp(seconds).replace(microsecond=ns // 1000).isoformat()
+
+
+def _format_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Salinan baris dengan kolom waktu integer diformat."""
+    if not any(isinstance(row.get(key), int) for key in TIMESTAMP_FIELDS):
+        return row
+    row = dict(row)
+    for key in TIMESTAMP_FIELDS:
+        if isinstance(row.get(key), int):
+            row[key] = format_timestamp(row[key])
+    return row
+
+
+def export_to_csv(
+    data: List[Dict],
+    path: str,
+    on_progress: Optional[Callable[[float], None]] = None,
+    cancelled: Optional[Callable[[], bool]] = None,
+    chunk_size: int = 1000
+) -> None:
+    """Ekspor list of dict ke file CSV.
+
+    File ditulis ke file sementara di direktori yang sama lalu di-rename,
+    sehingga pembaca tidak pernah melihat CSV setengah jadi.
+    """
     if not data:
         return
     fieldnames = list(data[0].keys())
-    with open(path, mode="w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(data) 
\ No newline at end of file
+    directory = os.path.dirname(os.path.abspath(path))
+    # Nama unik dari mkstemp: sisa file sementara lama tidak menggagalkan ekspor
+    fd, tmp_path = tempfile.mkstemp(prefix=".export-", suffix=".tmp", dir=directory)
+    try:
+        with open(fd, mode="w", newline="", encoding="utf-8") as f:
+            os.chmod(tmp_path, _umask_mode())
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            for start in range(0, len(data), chunk_size):
+                if cancelled and cancelled():
+                    raise ExportCancelled(f"Ekspor {path} dibatalkan")
+                writer.writerows(_format_row(row) for row in data[start:start + chunk_size])
+                if on_progress:
+                    on_progress(min(start + chunk_size, len(data)) / len(data))
+        os.replace(tmp_path, path)
+    except BaseException:
+        # tmp_path selalu milik panggilan ini (mkstemp), aman dihapus
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
@@ -0,0 +1,394 @@
+"""
+Jurnal event produksi biner yang append-only dengan index.
+
+Event operasional (koneksi, parse error, roll selesai, perubahan setting,
+sampel yang dibuang) disimpan per mesin per hari di
+``<root>/<mesin>/<YYYY-MM-DD>.jsj``. Setiap record berisi header tetap
+(panjang, CRC32, tipe, timestamp ms) diikuti payload dengan schema tetap per
+tipe. Di sebelahnya ada index ``.jsx`` berisi entri lebar tetap
+(timestamp, offset, tipe) sehingga query per tipe/mesin/rentang waktu hanya
+membaca record yang cocok.
+"""
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from enum import IntEnum
+from typing import Optional, Dict, Any, List, Tuple, Iterator, Iterable, BinaryIO
+import argparse
+import json
+import logging
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+
+from .archive import partition_day, day_range_ms
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_SUFFIX = ".jsj"
+INDEX_SUFFIX = ".jsx"
+
+# payload length, crc32, tipe, timestamp ms
+_RECORD_HEADER = struct.Struct("<HIBq")
+# timestamp ms, offset, tipe
+_INDEX_ENTRY = struct.Struct("<qIB")
+
+
+class EventType(IntEnum):
+    """Tipe event jurnal; nilainya disimpan di file, jangan diubah."""
+    CONNECTED = 1
+    DISCONNECTED = 2
+    PARSE_ERROR = 3
+    ROLL_COMPLETED = 4
+    SETTINGS_CHANGED = 5
+    SAMPLES_DROPPED = 6
+    ANOMALY = 7
+
+
+# Schema tetap per tipe: (nama field, jenis)
+SCHEMAS: Dict[EventType, Tuple[Tuple[str, str], ...]] = {
+    EventType.CONNECTED: (("port", "str"), ("baudrate", "u32")),
+    EventType.DISCONNECTED: (("port", "str"), ("state", "str")),
+    EventType.PARSE_ERROR: (("message", "str"),),
+    EventType.ROLL_COMPLETED: (("length", "f64"), ("duration_s", "f64"), ("shift", "u8")),
+    EventType.SETTINGS_CHANGED: (("key", "str"), ("value", "str")),
+    EventType.SAMPLES_DROPPED: (("subscriber", "str"), ("count", "u32")),
+    EventType.ANOMALY: (("kind", "str"), ("value", "f64"), ("message", "str")),
+}
+
+# Tipe yang dikenal build ini; record tipe lain (dari versi lebih baru) dilewati saat dibaca
+_KNOWN_TYPES = frozenset(int(t) for t in EventType)
+
+_NUMERIC = {"u8": struct.Struct("<B"), "u32": struct.Struct("<I"), "f64": struct.Struct("<d")}
+_STR_LEN = struct.Struct("<H")
+
+
+class JournalError(ValueError):
+    """Event yang tidak sesuai schema."""
+    pass
+
+
+@dataclass(frozen=True)
+class Event:
+    """Satu event jurnal."""
+    type: EventType
+    machine: str
+    timestamp_ms: int
+    fields: Dict[str, Any] = field(default_factory=dict)
+
+
+def encode_payload(event_type: EventType, fields: Dict[str, Any]) -> bytes:
+    """Encode field event sesuai schema tipenya."""
+    out = bytearray()
+    for name, kind in SCHEMAS[event_type]:
+        value = fields.get(name)
+        try:
+            if kind == "str":
+                raw = str("" if value is None else value).encode("utf-8")[:0xFFFF]
+                out += _STR_LEN.pack(len(raw)) + raw
+            else:
+                out += _NUMERIC[kind].pack(value or 0)
+        except struct.error as e:
+            raise JournalError(f"{event_type.name}.{name}: {value!r} ({e})")
+    return bytes(out)
+
+
+def decode_payload(event_type: EventType, payload: bytes) -> Dict[str, Any]:
+    """Kebalikan dari ``encode_payload``."""
+    fields: Dict[str, Any] = {}
+    pos = 0
+    for name, kind in SCHEMAS[event_type]:
+        if kind == "str":
+            (length,) = _STR_LEN.unpack_from(payload, pos)
+            pos += _STR_LEN.size
+            fields[name] = payload[pos:pos + length].decode("utf-8", errors="replace")
+            pos += length
+        else:
+            (fields[name],) = _NUMERIC[kind].unpack_from(payload, pos)
+            pos += _NUMERIC[kind].size
+    return fields
+
+
+def encode_record(event_type: int, timestamp_ms: int, payload: bytes) -> bytes:
+    """Header + payload satu record."""
+    crc = zlib.crc32(payload, zlib.crc32(struct.pack("<Bq", event_type, timestamp_ms)))
+    return _RECORD_HEADER.pack(len(payload), crc, event_type, timestamp_ms) + payload
+
+
+class EventJournal:
+    """Penulis dan pembaca jurnal event.
+
+    Satu proses (daemon atau UI yang melakukan akuisisi) menulis jurnal satu
+    mesin; pembaca boleh berjalan di proses lain.
+    """
+    def __init__(self, root: str = "journal") -> None:
+        self.root = root
+        # mesin -> (hari, file jurnal, file index, ukuran jurnal)
+        self._open: Dict[str, Tuple[date, BinaryIO, BinaryIO, int]] = {}
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def journal_path(self, machine: str, day: date) -> str:
+        """Path file jurnal."""
+        return os.path.join(self.root, machine, day.isoformat() + JOURNAL_SUFFIX)
+
+    def record(
+        self,
+        event_type: EventType,
+        machine: str,
+        timestamp_ms: Optional[int] = None,
+        **fields: Any
+    ) -> Event:
+        """Tambahkan event ke jurnal; return event yang tersimpan."""
+        event_type = EventType(event_type)
+        if timestamp_ms is None:
+            timestamp_ms = time.time_ns() // 1_000_000
+        payload = encode_payload(event_type, fields)
+        record = encode_record(event_type, timestamp_ms, payload)
+        day = partition_day(timestamp_ms)
+        with self._lock:
+            journal, index, size = self._writer(machine, day)
+            journal.write(record)
+            journal.flush()
+            index.write(_INDEX_ENTRY.pack(timestamp_ms, size, event_type))
+            index.flush()
+            self._open[machine] = (day, journal, index, size + len(record))
+        return Event(event_type, machine, timestamp_ms, decode_payload(event_type, payload))
+
+    def write_event(self, event: Event) -> None:
+        """Simpan event dari bus (subscriber ``TOPIC_EVENT``)."""
+        try:
+            self.record(event.type, event.machine, event.timestamp_ms, **event.fields)
+        except (OSError, JournalError) as e:
+            logger.error(f"Gagal menulis jurnal: {e}")
+
+    def close(self) -> None:
+        """Tutup semua file yang sedang ditulis."""
+        with self._lock:
+            for _, journal, index, _ in self._open.values():
+                journal.close()
+                index.close()
+            self._open.clear()
+
+    def machines(self) -> List[str]:
+        """Mesin yang punya jurnal."""
+        return sorted(
+            name for name in os.listdir(self.root)
+            if os.path.isdir(os.path.join(self.root, name))
+        )
+
+    def days(self, machine: str) -> List[date]:
+        """Hari yang punya jurnal untuk mesin."""
+        directory = os.path.join(self.root, machine)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(
+            date.fromisoformat(name[:-len(JOURNAL_SUFFIX)])
+            for name in os.listdir(directory) if name.endswith(JOURNAL_SUFFIX)
+        )
+
+    def query(
+        self,
+        types: Optional[Iterable[EventType]] = None,
+        machine: Optional[str] = None,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None
+    ) -> Iterator[Event]:
+        """Event yang cocok dengan filter, urut per mesin lalu waktu.
+
+        Hanya file hari dalam rentang yang dibuka, dan dari setiap file hanya
+        record yang lolos filter index yang dibaca.
+        """
+        wanted = frozenset(EventType(t) for t in types) if types is not None else None
+        machines = [machine] if machine is not None else self.machines()
+        for name in machines:
+            for day in self.days(name):
+                day_start, day_end = day_range_ms(day)
+                if start_ms is not None and day_end <= start_ms:
+                    continue
+                if end_ms is not None and day_start >= end_ms:
+                    continue
+                yield from self._query_file(name, day, wanted, start_ms, end_ms)
+
+    def load_index(self, machine: str, day: date) -> List[Tuple[int, int, int]]:
+        """Entri index (timestamp, offset, tipe); record di luar index ikut di-scan."""
+        path = self.journal_path(machine, day)
+        entries = self._read_index(path + INDEX_SUFFIX)
+        indexed_end = self._record_end(path, entries[-1][1]) if entries else 0
+        if indexed_end is None:
+            # Index menunjuk ke luar file: bangun ulang
+            entries, indexed_end = [], 0
+        if os.path.getsize(path) > indexed_end:
+            entries.extend(self._scan(path, indexed_end)[0])
+        return entries
+
+    def _query_file(
+        self,
+        machine: str,
+        day: date,
+        wanted: Optional[frozenset],
+        start_ms: Optional[int],
+        end_ms: Optional[int]
+    ) -> Iterator[Event]:
+        """Baca record yang lolos filter index dari satu file."""
+        selected = [
+            (ts, offset) for ts, offset, event_type in self.load_index(machine, day)
+            if (event_type in wanted if wanted is not None else event_type in _KNOWN_TYPES)
+            and (start_ms is None or ts >= start_ms)
+            and (end_ms is None or ts < end_ms)
+        ]
+        if not selected:
+            return
+        selected.sort()
+        with open(self.journal_path(machine, day), "rb") as f:
+            for _, offset in selected:
+                f.seek(offset)
+                parsed = self._read_record(f)
+                if parsed is not None:
+                    event_type, timestamp_ms, payload = EventType(parsed[0]), parsed[1], parsed[2]
+                    yield Event(
+                        event_type, machine, timestamp_ms, decode_payload(event_type, payload)
+                    )
+
+    def _writer(self, machine: str, day: date) -> Tuple[BinaryIO, BinaryIO, int]:
+        """File jurnal dan index yang sedang ditulis untuk mesin (ganti saat berganti hari)."""
+        current = self._open.get(machine)
+        if current and current[0] == day:
+            return current[1], current[2], current[3]
+        if current:
+            current[1].close()
+            current[2].close()
+        path = self.journal_path(machine, day)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        size = self._repair(path)
+        journal = open(path, "ab")
+        index = open(path + INDEX_SUFFIX, "ab")
+        self._open[machine] = (day, journal, index, size)
+        return journal, index, size
+
+    def _repair(self, path: str) -> int:
+        """Pastikan index lengkap dan buang record terpotong di ekor; return ukuran file."""
+        if not os.path.exists(path):
+            open(path + INDEX_SUFFIX, "wb").close()
+            return 0
+        index_path = path + INDEX_SUFFIX
+        entries = self._read_index(index_path) if os.path.exists(index_path) else []
+        indexed_end = self._record_end(path, entries[-1][1]) if entries else 0
+        if indexed_end is None:
+            entries, indexed_end = [], 0
+        missing, valid_end = self._scan(path, indexed_end)
+        if valid_end < os.path.getsize(path):
+            logger.warning(f"Jurnal {path} terpotong di offset {valid_end}, ekor dibuang")
+            os.truncate(path, valid_end)
+        with open(index_path, "wb") as f:
+            f.writelines(_INDEX_ENTRY.pack(*entry) for entry in entries + missing)
+        return valid_end
+
+    @staticmethod
+    def _read_index(path: str) -> List[Tuple[int, int, int]]:
+        """Baca entri index lebar tetap."""
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return []
+        usable = len(data) - len(data) % _INDEX_ENTRY.size
+        return list(_INDEX_ENTRY.iter_unpack(data[:usable]))
+
+    @staticmethod
+    def _read_record(f: BinaryIO) -> Optional[Tuple[int, int, bytes]]:
+        """Baca satu record di posisi file; None jika terpotong atau rusak.
+
+        Validitas hanya ditentukan oleh panjang dan CRC: record dengan tipe
+        yang tidak dikenal tetap valid (ditulis versi yang lebih baru) dan
+        tidak boleh dibuang oleh ``_repair``.
+        """
+        header = f.read(_RECORD_HEADER.size)
+        if len(header) < _RECORD_HEADER.size:
+            return None
+        length, crc, event_type, timestamp_ms = _RECORD_HEADER.unpack(header)
+        payload = f.read(length)
+        if len(payload) < length:
+            return None
+        if zlib.crc32(payload, zlib.crc32(struct.pack("<Bq", event_type, timestamp_ms))) != crc:
+            return None
+        return event_type, timestamp_ms, payload
+
+    def _record_end(self, path: str, offset: int) -> Optional[int]:
+        """Offset akhir record di ``offset``; None jika record tidak valid."""
+        with open(path, "rb") as f:
+            f.seek(offset)
+            if self._read_record(f) is None:
+                return None
+            return f.tell()
+
+    def _scan(self, path: str, offset: int) -> Tuple[List[Tuple[int, int, int]], int]:
+        """Scan record mulai ``offset``; return (entri index, akhir record valid terakhir)."""
+        entries: List[Tuple[int, int, int]] = []
+        with open(path, "rb") as f:
+            f.seek(offset)
+            while True:
+                parsed = self._read_record(f)
+                if parsed is None:
+                    break
+                entries.append((parsed[1], offset, parsed[0]))
+                offset = f.tell()
+        return entries, offset
+
+
+def create_journal(config: Dict[str, Any]) -> Optional[EventJournal]:
+    """Jurnal dari konfigurasi, atau None jika ``journal`` dimatikan."""
+    if not config.get("journal", True):
+        return None
+    return EventJournal(config.get("journal_dir", os.path.join("exports", "journal")))
+
+
+def format_event(event: Event) -> str:
+    """Satu baris teks untuk event."""
+    timestamp = datetime.fromtimestamp(event.timestamp_ms / 1000).isoformat(timespec="milliseconds")
+    fields = " ".join(f"{k}={v}" for k, v in event.fields.items())
+    return f"{timestamp} {event.machine} {event.type.name} {fields}"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point ``monitoring-roll-journal``."""
+    parser = argparse.ArgumentParser(
+        prog="monitoring-roll-journal", description="Query jurnal event."
+    )
+    parser.add_argument(
+        "--root", default=os.path.join("exports", "journal"), help="direktori jurnal"
+    )
+    parser.add_argument("--machine", default=None)
+    parser.add_argument(
+        "--type", dest="types", action="append", choices=[t.name for t in EventType]
+    )
+    parser.add_argument("--since", type=datetime.fromisoformat, default=None, help="ISO datetime")
+    parser.add_argument("--until", type=datetime.fromisoformat, default=None, help="ISO datetime")
+    parser.add_argument("--hours", type=float, default=None, help="hanya N jam terakhir")
+    parser.add_argument("--json", action="store_true", help="satu objek JSON per baris")
+    args = parser.parse_args(argv)
+
+    since = args.since
+    if args.hours is not None:
+        since = datetime.now() - timedelta(hours=args.hours)
+    events = EventJournal(args.root).query(
+        types=[EventType[t] for t in args.types] if args.types else None,
+        machine=args.machine,
+        start_ms=int(since.timestamp() * 1000) if since else None,
+        end_ms=int(args.until.timestamp() * 1000) if args.until else None
+    )
+    for event in events:
+        if args.json:
+            print(json.dumps({
+                "type": event.type.name, "machine": event.machine,
+                "timestamp_ms": event.timestamp_ms, **event.fields
+            }))
+        else:
+            print(format_event(event))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
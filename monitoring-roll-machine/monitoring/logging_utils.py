@@ -1,18 +1,160 @@
 """
 Utilitas untuk setup logging aplikasi.
+
+Handler file dan console berjalan di thread ``QueueListener``; thread polling
+hanya memasukkan record ke antrian terbatas, sehingga logging tidak pernah
+menambah latensi akuisisi. Jika antrian penuh record dibuang (dan dihitung),
+dan pesan yang sama berulang-ulang dibatasi oleh ``RateLimitFilter``.
 """
+import atexit
 import os
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+import threading
+import time
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 from datetime import datetime
+from typing import Optional, Dict, Tuple, Callable, List
+
+
+class RateLimitFilter(logging.Filter):
+    """Batasi pesan identik menjadi ``burst`` record per ``interval`` detik.
+
+    Record pertama setelah jendela baru membawa jumlah pesan yang ditahan.
+    Jika pesannya berhenti, ``flush()`` (dipanggil berkala) membuat record
+    ringkasan untuk jendela yang sudah lewat.
+    """
+    def __init__(
+        self,
+        burst: int = 5,
+        interval: float = 60.0,
+        max_keys: int = 1000,
+        clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self.max_keys = max_keys
+        self.clock = clock
+        self.suppressed = 0
+        # key -> [awal jendela, jumlah dalam jendela, jumlah ditahan]
+        self._windows: Dict[Tuple[str, int, str], list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = (record.name, record.levelno, record.getMessage())
+        now = self.clock()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.interval:
+                held = window[2] if window else 0
+                if window is None and len(self._windows) >= self.max_keys:
+                    self._windows.clear()
+                self._windows[key] = [now, 1, 0]
+                if held:
+                    record.msg = f"{record.getMessage()} ({held} pesan serupa ditahan)"
+                    record.args = None
+                return True
+            window[1] += 1
+            if window[1] <= self.burst:
+                return True
+            window[2] += 1
+            self.suppressed += 1
+            return False
+
+    def flush(self, everything: bool = False) -> List[logging.LogRecord]:
+        """Lupakan jendela yang sudah lewat (atau semua); return ringkasan yang ditahan."""
+        now = self.clock()
+        records = []
+        with self._lock:
+            expired = [
+                key for key, window in self._windows.items()
+                if everything or now - window[0] >= self.interval
+            ]
+            for key in expired:
+                held = self._windows.pop(key)[2]
+                if held:
+                    name, level, message = key
+                    records.append(logging.LogRecord(
+                        name, level, __file__, 0,
+                        f"{message} ({held} pesan serupa ditahan)", None, None
+                    ))
+        return records
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler yang membuang record saat antrian penuh, tanpa pernah menunggu."""
+    def __init__(self, log_queue: "queue.Queue[logging.LogRecord]") -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._reported = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Format lengkap (termasuk traceback) dikerjakan di thread listener;
+        # di sini pesan cukup dibekukan agar argumen yang berubah tidak ikut.
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.dropped > self._reported and self._put(self._dropped_record(record)):
+            self._reported = self.dropped
+        if not self._put(record):
+            self.dropped += 1
+
+    def _put(self, record: logging.LogRecord) -> bool:
+        """Masukkan record tanpa blocking; False jika antrian penuh."""
+        try:
+            self.queue.put_nowait(record)
+            return True
+        except queue.Full:
+            return False
+
+    def _dropped_record(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Record peringatan tentang jumlah log yang dibuang."""
+        return logging.LogRecord(
+            __name__, logging.WARNING, __file__, 0,
+            f"{self.dropped - self._reported} log record dibuang karena antrian penuh",
+            None, None
+        )
+
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[DroppingQueueHandler] = None
+_rate_limiter: Optional[RateLimitFilter] = None
+_flush_stop: Optional[threading.Event] = None
+
+
+def _flush_rate_limits(
+    handler: DroppingQueueHandler,
+    limiter: RateLimitFilter,
+    stop: threading.Event
+) -> None:
+    """Kirim ringkasan pesan yang ditahan ke antrian secara berkala (melewati filter)."""
+    while not stop.wait(limiter.interval / 2):
+        for record in limiter.flush():
+            handler.enqueue(record)
+
 
 def setup_logging(
     log_dir: str = "logs",
     log_level: int = logging.INFO,
     max_bytes: int = 10 * 1024 * 1024,  # 10MB
-    backup_count: int = 5
-) -> None:
-    """Setup logging dengan file rotation harian."""
+    backup_count: int = 5,
+    queue_size: int = 10000,
+    rate_burst: int = 5,
+    rate_interval: float = 60.0
+) -> DroppingQueueHandler:
+    """Setup logging dengan file rotation harian di belakang antrian.
+
+    Aman dipanggil lebih dari sekali; pemanggilan berikutnya hanya mengubah level.
+    """
+    global _listener, _queue_handler, _rate_limiter, _flush_stop
+    root_logger = logging.getLogger()
+    root_logger.setLevel(log_level)
+    if _queue_handler is not None:
+        return _queue_handler
+
     # Buat direktori log jika belum ada
     if not os.path.exists(log_dir):
         os.makedirs(log_dir)
@@ -38,12 +180,44 @@ def setup_logging(
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(formatter)
 
-    # Root logger
-    root_logger = logging.getLogger()
-    root_logger.setLevel(log_level)
-    root_logger.addHandler(file_handler)
-    root_logger.addHandler(console_handler)
+    # Thread pemanggil hanya menaruh record di antrian
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=queue_size)
+    _queue_handler = DroppingQueueHandler(log_queue)
+    _rate_limiter = RateLimitFilter(burst=rate_burst, interval=rate_interval)
+    _queue_handler.addFilter(_rate_limiter)
+    _listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    _listener.start()
+    _flush_stop = threading.Event()
+    threading.Thread(
+        target=_flush_rate_limits, args=(_queue_handler, _rate_limiter, _flush_stop),
+        name="log-rate-flush", daemon=True
+    ).start()
+    atexit.register(shutdown_logging)
+
+    root_logger.addHandler(_queue_handler)
+    # Warning Python (mis. DeprecationWarning Kivy) ikut lewat antrian dan rate limit
+    logging.captureWarnings(True)
 
     # Suppress noisy loggers
     logging.getLogger("kivy").setLevel(logging.WARNING)
-    logging.getLogger("PIL").setLevel(logging.WARNING) 
\ No newline at end of file
+    logging.getLogger("PIL").setLevel(logging.WARNING)
+    return _queue_handler
+
+
+def shutdown_logging() -> None:
+    """Tulis sisa antrian lalu hentikan thread listener."""
+    global _listener, _queue_handler, _rate_limiter, _flush_stop
+    if _listener is None:
+        return
+    logging.getLogger().removeHandler(_queue_handler)
+    _flush_stop.set()
+    # Jumlah yang masih ditahan ikut ditulis sebelum listener berhenti
+    for record in _rate_limiter.flush(everything=True):
+        _queue_handler.enqueue(record)
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+    _queue_handler = None
+    _rate_limiter = None
+    _flush_stop = None
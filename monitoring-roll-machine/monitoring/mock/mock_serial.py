@@ -3,9 +3,10 @@ Mock serial device untuk testing protokol JSK3588.
 """
 import random
 import time
-from typing import Optional, List, Tuple
+from typing import Optional, List, Tuple, Dict
 from serial import SerialException
 
+
 class MockJSK3588Device:
     """Mock device yang mensimulasikan protokol JSK3588."""
     
@@ -17,6 +18,7 @@ class MockJSK3588Device:
         self._shift = 1
         self._unit = 0  # 0=meter, 1=yard
         self._decimal = 0  # 0=1, 1=0.1
+        self.parameters: Dict[int, int] = {}  # Nilai terakhir command 0x10-0x13
 
     def disconnect(self) -> None:
         """Simulasi device disconnect."""
@@ -48,6 +50,7 @@ class MockJSK3588Device:
             self._current_count = 0
             return self._generate_status_response()
         elif command in [0x10, 0x11, 0x12, 0x13]:  # Set panjang/koefisien
+            self.parameters[command] = int.from_bytes(data[4:-1], 'big')
             return self._generate_status_response()
         
         return None
@@ -99,6 +102,7 @@ class MockJSK3588Device:
         if self._current_count % 1000 == 0:
             self._shift = random.randint(1, 3)
 
+
 class MockSerial:
     """Mock Serial port untuk testing."""
     def __init__(
@@ -132,11 +136,22 @@ class MockSerial:
         if not self.is_open:
             raise SerialException("Port not open")
         
-        response = self._device.process_command(data)
-        if response:
-            self._read_buffer.extend(response)
+        # Beberapa command bisa dikirim dalam satu write (batch)
+        for packet in self._split_packets(data):
+            response = self._device.process_command(packet)
+            if response:
+                self._read_buffer.extend(response)
         return len(data)
 
+    @staticmethod
+    def _split_packets(data: bytes) -> List[bytes]:
+        """Pecah data di setiap header 55 AA."""
+        header = bytes([0x55, 0xAA])
+        starts = [i for i in range(len(data) - 1) if data[i:i + 2] == header]
+        if not starts or starts[0] != 0:
+            starts.insert(0, 0)
+        return [data[a:b] for a, b in zip(starts, starts[1:] + [len(data)])]
+
     def read(self, size: int = 1) -> bytes:
         """Read data dari buffer."""
         if not self.is_open:
@@ -151,6 +166,11 @@ class MockSerial:
             result.append(self._read_buffer.pop(0))
         return bytes(result)
 
+    @property
+    def in_waiting(self) -> int:
+        """Jumlah byte yang siap dibaca."""
+        return len(self._read_buffer)
+
     def reset_input_buffer(self) -> None:
         """Clear input buffer."""
         self._read_buffer = []
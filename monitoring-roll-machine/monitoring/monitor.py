@@ -1,29 +1,89 @@
 """
 Monitor untuk mesin roll kain.
 """
-from typing import Optional, Dict, Any, Callable
+from concurrent.futures import Future
+from typing import Optional, Dict, Any, Callable, List
+import json
 import logging
 import threading
 import time
 
-from .serial_handler import JSKSerialPort
-from .parser import PacketParseError
+from .anomaly import AnomalyDetector
+from .change_filter import ChangeDetector
+from .config import AppConfig
+from .eta import EtaEstimator
+from .bus import (
+    DataBus, Subscription, OverflowPolicy, TOPIC_DATA, TOPIC_ERROR, TOPIC_EVENT, DEFAULT_MACHINE
+)
+from .journal import EventJournal, Event, EventType
+from .normalize import CountNormalizer, from_um, convert_length
+from .serial_handler import JSKSerialPort, ConnectionState
+from .parser import PacketParseError, received_at
+from .profiling import get_profiler, stage, MONITOR_THREAD
+from .scheduler import AdaptivePollScheduler
 
 logger = logging.getLogger(__name__)
 
+
 class Monitor:
-    """Monitor untuk mesin roll kain."""
+    """Monitor untuk mesin roll kain.
+
+    Sampel dan error dipublikasikan ke ``bus``; ``on_data`` dan ``on_error``
+    hanyalah subscriber yang didaftarkan saat start, sehingga dijalankan di
+    thread subscriber dan tidak menunda polling.
+    """
+    # Jeda maksimum cek stop saat menunggu port reconnect
+    RECONNECT_WAIT = 0.2
+    # Key konfigurasi yang diterapkan tanpa restart monitor
+    LIVE_CONFIG_KEYS = (
+        "poll_interval", "poll_min_interval", "poll_max_interval",
+        "serial_port", "serial_port_key", "baudrate",
+        "eta_window_s", "shift_start_hours",
+    )
+
     def __init__(
         self,
         serial_port: JSKSerialPort,
         on_data: Optional[Callable[[Dict[str, Any]], None]] = None,
         on_error: Optional[Callable[[Exception], None]] = None,
-        poll_interval: float = 1.0
+        poll_interval: float = 1.0,
+        scheduler: Optional[AdaptivePollScheduler] = None,
+        on_state: Optional[Callable[[ConnectionState], None]] = None,
+        bus: Optional[DataBus] = None,
+        machine: str = DEFAULT_MACHINE,
+        change_detector: Optional[ChangeDetector] = None,
+        config: Optional[AppConfig] = None,
+        journal: Optional[EventJournal] = None,
+        anomaly_detector: Optional[AnomalyDetector] = None,
+        on_alert: Optional[Callable[[Event], None]] = None,
+        eta: Optional[EtaEstimator] = None
     ) -> None:
         self.serial_port = serial_port
         self.on_data = on_data
         self.on_error = on_error
+        self.on_state = on_state
         self.poll_interval = poll_interval
+        self.scheduler = scheduler
+        self.bus = bus or DataBus()
+        self.machine = machine
+        self.change_detector = change_detector
+        self.config = config
+        self.journal = journal
+        self.anomaly_detector = anomaly_detector
+        # Panjang roll dan total monoton dalam mikrometer, dihitung sekali di sini
+        self.normalizer = CountNormalizer()
+        self.on_alert = on_alert
+        # Laju produksi tersaring; UI membaca perkiraan selesai roll per frame
+        if eta is None:
+            eta = EtaEstimator.from_config(config) if config is not None else EtaEstimator()
+        self.eta = eta
+        self._connected = False
+        self._last_length_um = 0
+        self._resets = 0
+        self._roll_started: Optional[float] = None
+        self._pending_config: Dict[str, Any] = {}
+        self._config_lock = threading.Lock()
+        self._subscriptions: List[Subscription] = []
         self._stop_event = threading.Event()
         self._thread: Optional[threading.Thread] = None
         self.is_running = False
@@ -34,7 +94,47 @@ class Monitor:
             return
 
         self._stop_event.clear()
-        self._thread = threading.Thread(target=self._monitor_loop)
+        if self.scheduler:
+            self.scheduler.reset()
+        self.serial_port.add_state_listener(self._handle_port_state)
+        if self.config is not None:
+            self.config.subscribe(self.apply_config, keys=self.LIVE_CONFIG_KEYS)
+            self.config.subscribe(self._journal_config)
+        if self.journal:
+            # Event jarang; antrian besar cukup, dan publish tidak pernah menunggu
+            # jurnal yang tersendat (yang terbuang tercatat di ``dropped``)
+            self._subscriptions.append(self.bus.subscribe(
+                self.journal.write_event,
+                topic=TOPIC_EVENT,
+                machines=[self.machine],
+                maxsize=1024,
+                name="journal"
+            ))
+        if self.on_alert:
+            self._subscriptions.append(self.bus.subscribe(
+                self._dispatch_alert,
+                topic=TOPIC_EVENT,
+                machines=[self.machine],
+                maxsize=16,
+                name="on_alert"
+            ))
+        if self.on_data:
+            self._subscriptions.append(self.bus.subscribe(
+                self.on_data, topic=TOPIC_DATA, machines=[self.machine], name="on_data"
+            ))
+        if self.on_error:
+            # UI hanya perlu error terbaru, bukan antrian error yang menumpuk
+            self._subscriptions.append(self.bus.subscribe(
+                self.on_error,
+                topic=TOPIC_ERROR,
+                machines=[self.machine],
+                maxsize=8,
+                policy=OverflowPolicy.COALESCE,
+                name="on_error"
+            ))
+        # Port biasanya sudah dibuka sebelum listener terpasang
+        self._journal_connection(self.serial_port.state)
+        self._thread = threading.Thread(target=self._monitor_loop, name=MONITOR_THREAD)
         self._thread.daemon = True
         self._thread.start()
         self.is_running = True
@@ -45,28 +145,209 @@ class Monitor:
         self._stop_event.set()
         if self._thread:
             self._thread.join()
+        self.serial_port.remove_state_listener(self._handle_port_state)
+        if self.config is not None:
+            self.config.unsubscribe(self.apply_config)
+            self.config.unsubscribe(self._journal_config)
+        for subscription in self._subscriptions:
+            self.bus.unsubscribe(subscription)
+        self._subscriptions = []
         self.is_running = False
         logger.info("Monitor stopped")
 
     def _monitor_loop(self) -> None:
         """Loop utama monitoring."""
+        profiler = get_profiler()
         while not self._stop_event.is_set():
+            profiler.checkpoint()
+            self._apply_pending_config()
+            if self.serial_port.state is ConnectionState.RECONNECTING:
+                # Jangan polling port yang sedang reconnect; lanjut begitu tersambung
+                self.serial_port.wait_connected(self.RECONNECT_WAIT)
+                continue
+
+            data: Optional[Dict[str, Any]] = None
             try:
                 # Query status mesin
-                data = self.serial_port.query_status()
-                if data and self.on_data:
-                    self.on_data(data)
+                with stage("poll"):
+                    data = self.serial_port.query_status()
+                if data and "fields" in data:
+                    wall_ns, mono_ns = received_at(data)
+                    self.normalizer.apply(data["fields"])
+                    self._track_roll(data["fields"], wall_ns, mono_ns)
+                    if self.anomaly_detector:
+                        self._check_anomalies(data["fields"], mono_ns)
+                if data and self._should_publish(data):
+                    self.bus.publish(TOPIC_DATA, data, self.machine)
             except PacketParseError as e:
                 logger.warning(f"Packet parse error: {e}")
-                if self.on_error:
-                    self.on_error(e)
+                self.bus.publish(TOPIC_ERROR, e, self.machine)
+                self.publish_event(EventType.PARSE_ERROR, message=str(e))
             except Exception as e:
                 logger.error(f"Monitor error: {e}")
-                if self.on_error:
-                    self.on_error(e)
+                self.bus.publish(TOPIC_ERROR, e, self.machine)
             finally:
-                # Tunggu interval sebelum query berikutnya
-                time.sleep(self.poll_interval)
+                # Tunggu interval sebelum query berikutnya (bisa dibangunkan oleh stop)
+                self._stop_event.wait(self._next_interval(data))
+
+    def apply_config(self, changes: Dict[str, Any]) -> None:
+        """Terima perubahan konfigurasi; diterapkan di thread monitor sebelum polling berikutnya."""
+        with self._config_lock:
+            self._pending_config.update(changes)
+
+    def _apply_pending_config(self) -> None:
+        """Terapkan perubahan konfigurasi yang tertunda."""
+        with self._config_lock:
+            changes, self._pending_config = self._pending_config, {}
+        if not changes:
+            return
+        logger.info(f"Konfigurasi monitor diperbarui: {changes}")
+        if "poll_interval" in changes:
+            self.poll_interval = changes["poll_interval"]
+        if self.scheduler:
+            low = changes.get("poll_min_interval", self.scheduler.min_interval)
+            high = changes.get("poll_max_interval", self.scheduler.max_interval)
+            if low <= high:
+                self.scheduler.min_interval, self.scheduler.max_interval = low, high
+            else:
+                logger.warning(f"Interval polling min {low} > max {high} diabaikan")
+            if "poll_interval" in changes:
+                self.scheduler.base_interval = min(
+                    max(changes["poll_interval"], self.scheduler.min_interval),
+                    self.scheduler.max_interval
+                )
+            self.scheduler.reset()
+        if {"eta_window_s", "shift_start_hours"} & changes.keys():
+            self.eta.configure(
+                tau_s=changes.get("eta_window_s"),
+                shift_start_hours=changes.get("shift_start_hours")
+            )
+        if {"serial_port", "serial_port_key", "baudrate"} & changes.keys():
+            self.serial_port.reconfigure(
+                port=changes.get("serial_port"),
+                baudrate=changes.get("baudrate"),
+                hardware_key=changes.get("serial_port_key")
+            )
+
+    def publish_event(self, event_type: EventType, **fields: Any) -> None:
+        """Publikasikan event operasional ke bus (dicatat oleh jurnal)."""
+        event = Event(event_type, self.machine, time.time_ns() // 1_000_000, fields)
+        self.bus.publish(TOPIC_EVENT, event, self.machine)
+
+    def _track_roll(self, fields: Dict[str, Any], wall_ns: int, mono_ns: int) -> None:
+        """Reset counter yang dikenali ``CountNormalizer`` menandai roll selesai."""
+        length_um = fields["length_um"]
+        # ETA butuh wall clock untuk batas shift; durasi roll memakai monotonic
+        self.eta.update(
+            wall_ns / 1e9, from_um(length_um, "meter"), from_um(fields["total_um"], "meter")
+        )
+        now = mono_ns / 1e9
+        if self.normalizer.resets != self._resets and self._last_length_um:
+            self.publish_event(
+                EventType.ROLL_COMPLETED,
+                length=from_um(self._last_length_um, "meter"),
+                duration_s=now - self._roll_started if self._roll_started else 0.0,
+                shift=fields.get("shift", 0)
+            )
+            self._roll_started = None
+        self._resets = self.normalizer.resets
+        if length_um and self._roll_started is None:
+            self._roll_started = now
+        self._last_length_um = length_um
+
+    def _check_anomalies(self, fields: Dict[str, Any], mono_ns: int) -> None:
+        """Jalankan detector anomali pada setiap sampel (sebelum filter perubahan).
+
+        Panjang dan speed dalam meter, sehingga ambang tidak bergantung satuan panel.
+        """
+        speed = convert_length(fields.get("current_speed", 0), fields.get("unit", "meter"), "meter")
+        anomalies = self.anomaly_detector.update(
+            mono_ns / 1e9, from_um(fields["length_um"], "meter"), speed
+        )
+        for anomaly in anomalies:
+            logger.warning(f"Anomali {anomaly.kind.value} pada {self.machine}: {anomaly.message}")
+            self.publish_event(
+                EventType.ANOMALY,
+                kind=anomaly.kind.value,
+                value=float(anomaly.value),
+                message=anomaly.message
+            )
+
+    def _dispatch_alert(self, event: Event) -> None:
+        """Teruskan event anomali ke ``on_alert``."""
+        if event.type is EventType.ANOMALY:
+            self.on_alert(event)
+
+    def _journal_config(self, changes: Dict[str, Any]) -> None:
+        """Catat setiap perubahan konfigurasi sebagai event."""
+        for key, value in changes.items():
+            self.publish_event(EventType.SETTINGS_CHANGED, key=key, value=json.dumps(value))
+
+    def _should_publish(self, data: Dict[str, Any]) -> bool:
+        """Sampel tanpa perubahan berarti tidak diteruskan ke subscriber."""
+        if not self.change_detector or "fields" not in data:
+            return True
+        return self.change_detector.should_emit(data["fields"])
+
+    def _handle_port_state(self, state: ConnectionState) -> None:
+        """Teruskan perubahan state koneksi ke callback on_state."""
+        self._journal_connection(state)
+        if state is ConnectionState.CONNECTED:
+            if self.scheduler:
+                self.scheduler.reset()
+            # Nilai pertama setelah reconnect selalu diteruskan
+            if self.change_detector:
+                self.change_detector.reset()
+        if self.on_state:
+            self.on_state(state)
+
+    def _journal_connection(self, state: ConnectionState) -> None:
+        """Catat connect/disconnect; DEGRADED masih dianggap tersambung."""
+        if state is ConnectionState.CONNECTED and not self._connected:
+            self._connected = True
+            self.publish_event(
+                EventType.CONNECTED,
+                port=self.serial_port.port,
+                baudrate=self.serial_port.baudrate
+            )
+        elif self._connected and state not in (ConnectionState.CONNECTED, ConnectionState.DEGRADED):
+            self._connected = False
+            self.publish_event(
+                EventType.DISCONNECTED, port=self.serial_port.port, state=state.value
+            )
+
+    def _next_interval(self, data: Optional[Dict[str, Any]]) -> float:
+        """Tentukan jeda sebelum polling berikutnya."""
+        if not self.scheduler:
+            return self.poll_interval
+        return self.scheduler.next_interval(data.get("fields") if data else None)
+
+    def update_product_info(
+        self,
+        product_info: Dict[str, Any],
+        push_to_machine: bool = False
+    ) -> Optional["Future[Dict[str, Any]]"]:
+        """Update info produk; target panjang dipakai untuk mempercepat polling.
+
+        Jika ``push_to_machine``, target juga dikirim ke mesin lewat antrian
+        command tanpa menghentikan polling.
+        """
+        target = product_info.get("target_length")
+        if self.scheduler:
+            self.scheduler.set_target(target)
+        if push_to_machine and target:
+            future = self.serial_port.set_target_length(target)
+            future.add_done_callback(self._log_command_result)
+            return future
+        return None
+
+    def _log_command_result(self, future: "Future[Dict[str, Any]]") -> None:
+        """Log acknowledgement command dari mesin."""
+        error = future.exception() if not future.cancelled() else None
+        if error:
+            logger.error(f"Machine command failed: {error}")
+        else:
+            logger.info("Machine command acknowledged")
 
     def get_status(self) -> Optional[Dict[str, Any]]:
         """Get status terkini dari mesin."""
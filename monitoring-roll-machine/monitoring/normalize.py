@@ -0,0 +1,106 @@
+"""
+Normalisasi counter panjang ke satuan fixed-point tetap.
+
+Counter JSK3588 adalah 24 bit dengan resolusi 1 atau 0,1 (bit desimal)
+dalam meter atau yard. ``CountNormalizer`` mengubahnya sekali saat ingest
+menjadi integer mikrometer: 0,1 m dan 0,1 yard sama-sama bilangan bulat
+mikrometer, sehingga tidak ada pembulatan. Hasilnya:
+
+- ``length_um``: panjang roll saat ini.
+- ``total_um``: total panjang monoton sejak start (int 64-bit), melewati
+  wraparound 24-bit, reset roll dan pergantian satuan/desimal.
+
+Agregasi selanjutnya cukup memakai aritmetika integer tanpa memeriksa
+satuan lagi.
+"""
+from typing import Dict, Any, Optional, Tuple
+
+COUNTER_BITS = 24
+COUNTER_MODULUS = 1 << COUNTER_BITS
+
+UM_PER_METER = 1_000_000
+UM_PER_YARD = 914_400  # 1 yard = 0,9144 m (definisi eksak)
+UM_PER_UNIT = {"meter": UM_PER_METER, "yard": UM_PER_YARD}
+
+
+def raw_scale(unit: str, decimal_place: bool) -> int:
+    """Mikrometer per satu langkah counter."""
+    um = UM_PER_UNIT[unit]
+    return um // 10 if decimal_place else um
+
+
+def raw_count(fields: Dict[str, Any]) -> int:
+    """Nilai counter mentah (integer 24 bit) dari hasil ``parse_fields``."""
+    count = fields["current_count"]
+    return round(count * 10) if fields.get("decimal_place") else int(count)
+
+
+def to_um(value: float, unit: str) -> int:
+    """Panjang dalam ``unit`` ke mikrometer."""
+    return round(value * UM_PER_UNIT[unit])
+
+
+def from_um(um: int, unit: str) -> float:
+    """Mikrometer ke panjang dalam ``unit``."""
+    return um / UM_PER_UNIT[unit]
+
+
+def convert_length(value: float, from_unit: str, to_unit: str) -> float:
+    """Konversi panjang antar satuan lewat mikrometer."""
+    return from_um(to_um(value, from_unit), to_unit)
+
+
+class CountNormalizer:
+    """Counter mentah ke panjang roll dan total monoton dalam mikrometer.
+
+    Counter yang turun ditafsirkan:
+
+    - wraparound jika nilai sebelumnya dekat batas 24 bit dan selisih modulo
+      kecil (``wrap_window`` langkah);
+    - reset roll jika turun ke paling banyak ``reset_tolerance_um``;
+      panjang sejak reset ditambahkan ke total;
+    - selain itu glitch sensor: baseline dipindah tanpa menambah total
+      (dilaporkan oleh ``AnomalyDetector``).
+    """
+    def __init__(
+        self, wrap_window: int = 1 << 16, reset_tolerance_um: int = 5 * UM_PER_METER
+    ) -> None:
+        self.wrap_window = wrap_window
+        self.reset_tolerance_um = reset_tolerance_um
+        self.reset()
+
+    def reset(self) -> None:
+        """Mulai total dari nol."""
+        self.total_um = 0
+        self.wraps = 0
+        self.resets = 0
+        self._last: Optional[Tuple[int, int]] = None  # (raw, skala)
+
+    def update(self, raw: int, scale: int) -> Tuple[int, int]:
+        """Tambah pembacaan counter mentah; return (length_um, total_um)."""
+        length_um = raw * scale
+        last = self._last
+        self._last = (raw, scale)
+        if last is None:
+            return length_um, self.total_um
+        last_raw, last_scale = last
+        if scale != last_scale:
+            # Satuan/desimal diubah di panel: baseline baru, tidak ada panjang yang diketahui
+            return length_um, self.total_um
+        if raw >= last_raw:
+            self.total_um += (raw - last_raw) * scale
+        else:
+            forward = (raw - last_raw) % COUNTER_MODULUS
+            if forward <= self.wrap_window:
+                self.wraps += 1
+                self.total_um += forward * scale
+            elif length_um <= self.reset_tolerance_um:
+                self.resets += 1
+                self.total_um += length_um
+        return length_um, self.total_um
+
+    def apply(self, fields: Dict[str, Any]) -> Dict[str, Any]:
+        """Tambahkan ``length_um`` dan ``total_um`` ke field hasil ``parse_fields``."""
+        scale = raw_scale(fields.get("unit", "meter"), bool(fields.get("decimal_place")))
+        fields["length_um"], fields["total_um"] = self.update(raw_count(fields), scale)
+        return fields
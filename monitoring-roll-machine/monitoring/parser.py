@@ -1,17 +1,33 @@
 """
 Parser dan validator protokol JSK3588 untuk monitoring mesin roll kain.
 """
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, Optional, Tuple, List
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
 HEADER = bytes([0x55, 0xAA])
+# header(2) + com(1) + len(1) + chk(1), tanpa data
+FRAME_OVERHEAD = 5
+
+# Waktu frame diterima (integer nanodetik), ditambahkan query_status ke data
+RECEIVED_NS = "received_ns"
+RECEIVED_MONO_NS = "received_mono_ns"
+RECEIVED_KEYS = frozenset((RECEIVED_NS, RECEIVED_MONO_NS))
+
 
 class PacketParseError(Exception):
     """Exception untuk error parsing paket JSK3588."""
     pass
 
+
+def build_packet(com: int, data: bytes = b"") -> bytes:
+    """Susun paket JSK3588: header, COM, LEN, data, checksum."""
+    body = HEADER + bytes([com, len(data)]) + data
+    return body + bytes([sum(body) & 0xFF])
+
+
 def validate_checksum(packet: bytes) -> bool:
     """Validasi checksum paket JSK3588."""
     if len(packet) < 3:
@@ -19,6 +35,7 @@ def validate_checksum(packet: bytes) -> bool:
     chk = sum(packet[:-1]) & 0xFF
     return chk == packet[-1]
 
+
 def parse_packet(packet: bytes) -> Dict[str, Any]:
     """Parse paket JSK3588, validasi header, checksum, dan panjang data."""
     if not packet.startswith(HEADER):
@@ -47,6 +64,17 @@ def parse_packet(packet: bytes) -> Dict[str, Any]:
     except Exception as e:
         raise PacketParseError(f"Error parsing fields: {str(e)}")
 
+
+def received_at(data: Dict[str, Any]) -> Tuple[int, int]:
+    """(wall clock, monotonic) nanodetik saat frame diterima; sekarang jika tidak ada."""
+    wall_ns = data.get(RECEIVED_NS)
+    mono_ns = data.get(RECEIVED_MONO_NS)
+    return (
+        time.time_ns() if wall_ns is None else wall_ns,
+        time.monotonic_ns() if mono_ns is None else mono_ns
+    )
+
+
 def parse_fields(data: bytes) -> Dict[str, Any]:
     """Parse field D6..D0 dari data payload JSK3588."""
     if len(data) < 7:
@@ -76,4 +104,65 @@ def parse_fields(data: bytes) -> Dict[str, Any]:
             "shift": shift,
         }
     except Exception as e:
-        raise PacketParseError(f"Error parsing field values: {str(e)}") 
\ No newline at end of file
+        raise PacketParseError(f"Error parsing field values: {str(e)}") 
+
+
+class FrameDecoder:
+    """Decoder inkremental yang memotong stream byte menjadi frame JSK3588.
+
+    Panjang frame diambil dari byte LEN (``LEN + 5``), sehingga pembacaan
+    bisa selesai begitu satu frame lengkap diterima tanpa menunggu timeout.
+    """
+    def __init__(self, max_data_length: int = 64) -> None:
+        self.max_data_length = max_data_length
+        self._buffer = bytearray()
+
+    def feed(self, data: bytes) -> None:
+        """Tambahkan byte yang diterima ke buffer."""
+        self._buffer.extend(data)
+
+    def clear(self) -> None:
+        """Buang semua byte yang belum menjadi frame."""
+        self._buffer.clear()
+
+    @property
+    def pending(self) -> int:
+        """Jumlah byte di buffer yang belum menjadi frame."""
+        return len(self._buffer)
+
+    def next_frame(self) -> Optional[bytes]:
+        """Ambil satu frame lengkap dari buffer, atau None jika belum lengkap."""
+        while True:
+            start = self._buffer.find(HEADER)
+            if start < 0:
+                # Simpan byte terakhir jika itu awal header yang terpotong
+                keep = 1 if self._buffer[-1:] == HEADER[:1] else 0
+                del self._buffer[:len(self._buffer) - keep]
+                return None
+            if start:
+                logger.debug(f"Membuang {start} byte sebelum header")
+                del self._buffer[:start]
+            if len(self._buffer) < 4:
+                return None
+            length = self._buffer[3]
+            if length > self.max_data_length:
+                # LEN tidak masuk akal: anggap header palsu dan sinkron ulang
+                del self._buffer[:1]
+                continue
+            size = length + FRAME_OVERHEAD
+            if len(self._buffer) < size:
+                return None
+            frame = bytes(self._buffer[:size])
+            del self._buffer[:size]
+            return frame
+
+    def frames(self, data: bytes = b"") -> List[bytes]:
+        """Feed data lalu ambil semua frame lengkap yang tersedia."""
+        if data:
+            self.feed(data)
+        result = []
+        frame = self.next_frame()
+        while frame is not None:
+            result.append(frame)
+            frame = self.next_frame()
+        return result
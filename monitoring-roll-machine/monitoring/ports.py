@@ -0,0 +1,214 @@
+"""
+Registry port serial di background dengan cache dan deteksi hotplug.
+"""
+from dataclasses import dataclass
+from typing import Optional, List, Dict, Callable, Any
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+DEV_DIR = "/dev"
+
+
+@dataclass(frozen=True)
+class PortInfo:
+    """Informasi satu port serial hasil enumerasi."""
+    device: str
+    description: str = ""
+    hwid: str = ""
+    vid: Optional[int] = None
+    pid: Optional[int] = None
+    serial_number: Optional[str] = None
+    location: Optional[str] = None
+
+    @property
+    def key(self) -> str:
+        """Identitas adapter yang stabil walau nama device node berubah."""
+        if self.vid is None or self.pid is None:
+            return self.device
+        parts = [f"{self.vid:04X}:{self.pid:04X}"]
+        # Tanpa serial number, lokasi USB membedakan dua adapter yang sama
+        parts.append(self.serial_number or self.location or "")
+        return ":".join(parts)
+
+    @classmethod
+    def from_list_ports(cls, info: Any) -> "PortInfo":
+        """Buat PortInfo dari ListPortInfo milik pyserial."""
+        return cls(
+            device=info.device,
+            description=info.description or "",
+            hwid=info.hwid or "",
+            vid=info.vid,
+            pid=info.pid,
+            serial_number=info.serial_number,
+            location=info.location
+        )
+
+
+def _enumerate_ports() -> List[PortInfo]:
+    """Enumerasi port serial via pyserial (lambat, jangan di thread UI)."""
+    import serial.tools.list_ports
+    return [PortInfo.from_list_ports(p) for p in serial.tools.list_ports.comports()]
+
+
+class PortRegistry:
+    """Cache port serial yang diperbarui oleh thread background.
+
+    Enumerasi hanya dijalankan saat start, saat ``refresh()`` diminta, saat
+    isi ``/dev`` berubah (hotplug di Linux), atau setiap ``rescan_interval``
+    detik sebagai fallback (misalnya di Windows). Listener menerima daftar
+    port baru dari thread registry; UI harus memindahkannya ke thread UI.
+    """
+    def __init__(
+        self,
+        watch_interval: float = 0.5,
+        rescan_interval: float = 10.0,
+        enumerate_ports: Callable[[], List[PortInfo]] = _enumerate_ports
+    ) -> None:
+        self.watch_interval = watch_interval
+        self.rescan_interval = rescan_interval
+        self._enumerate = enumerate_ports
+        self._ports: List[PortInfo] = []
+        self._by_key: Dict[str, PortInfo] = {}
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[List[PortInfo]], None]] = []
+        self._ready = threading.Event()
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def is_ready(self) -> bool:
+        """True setelah enumerasi pertama selesai."""
+        return self._ready.is_set()
+
+    def start(self) -> None:
+        """Mulai thread registry."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._watch_loop, name="port-registry", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Hentikan thread registry."""
+        self._stop_event.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join()
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Tunggu enumerasi pertama selesai."""
+        return self._ready.wait(timeout)
+
+    def ports(self) -> List[PortInfo]:
+        """Daftar port dari cache (tidak memblokir)."""
+        with self._lock:
+            return list(self._ports)
+
+    def devices(self) -> List[str]:
+        """Nama device dari cache, misalnya ``COM3`` atau ``/dev/ttyUSB0``."""
+        return [p.device for p in self.ports()]
+
+    def refresh(self) -> None:
+        """Minta enumerasi ulang di background."""
+        self._wake.set()
+
+    def subscribe(self, callback: Callable[[List[PortInfo]], None]) -> None:
+        """Daftarkan listener perubahan port; langsung dipanggil jika cache siap."""
+        self._listeners.append(callback)
+        if self.is_ready:
+            callback(self.ports())
+
+    def unsubscribe(self, callback: Callable[[List[PortInfo]], None]) -> None:
+        """Hapus listener perubahan port."""
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def key_for(self, device: str) -> Optional[str]:
+        """Key adapter untuk nama device, atau None jika tidak dikenal."""
+        with self._lock:
+            for info in self._ports:
+                if info.device == device:
+                    return info.key
+        return None
+
+    def resolve(self, key: str) -> Optional[str]:
+        """Nama device saat ini untuk key adapter (hasil remap setelah hotplug)."""
+        with self._lock:
+            info = self._by_key.get(key)
+        return info.device if info else None
+
+    def rescan(self) -> List[PortInfo]:
+        """Enumerasi sekarang di thread pemanggil dan perbarui cache."""
+        try:
+            ports = sorted(self._enumerate(), key=lambda p: p.device)
+        except Exception as e:
+            logger.error(f"Error enumerating serial ports: {e}")
+            ports = self.ports()
+
+        with self._lock:
+            changed = ports != self._ports or not self._ready.is_set()
+            moved = [
+                (self._by_key[p.key].device, p.device) for p in ports
+                if p.key in self._by_key and self._by_key[p.key].device != p.device
+            ]
+            self._ports = ports
+            # Key lama tetap diingat agar adapter yang dicabut bisa dikenali lagi
+            self._by_key.update({p.key: p for p in ports})
+        self._ready.set()
+
+        for old, new in moved:
+            logger.info(f"Adapter berpindah dari {old} ke {new}")
+        if changed:
+            logger.info(f"Found ports: {[p.device for p in ports]}")
+            self._notify(ports)
+        return ports
+
+    def _notify(self, ports: List[PortInfo]) -> None:
+        """Panggil semua listener dengan daftar port terbaru."""
+        for callback in list(self._listeners):
+            try:
+                callback(list(ports))
+            except Exception as e:
+                logger.error(f"Error in port listener: {e}")
+
+    def _dev_signature(self) -> Optional[int]:
+        """mtime ``/dev``; berubah setiap device node ditambah atau dihapus."""
+        try:
+            return os.stat(DEV_DIR).st_mtime_ns
+        except OSError:
+            return None
+
+    def _watch_loop(self) -> None:
+        """Loop registry: enumerasi saat hotplug, refresh, atau rescan periodik."""
+        signature = self._dev_signature()
+        self.rescan()
+        elapsed = 0.0
+        while not self._stop_event.is_set():
+            woken = self._wake.wait(self.watch_interval)
+            if self._stop_event.is_set():
+                break
+            self._wake.clear()
+            elapsed += self.watch_interval
+            current = self._dev_signature()
+            if woken or current != signature or elapsed >= self.rescan_interval:
+                signature = current
+                elapsed = 0.0
+                self.rescan()
+
+
+_registry: Optional[PortRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_port_registry() -> PortRegistry:
+    """Registry port bersama untuk seluruh aplikasi (dijalankan saat pertama dipakai)."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = PortRegistry()
+            _registry.start()
+        return _registry
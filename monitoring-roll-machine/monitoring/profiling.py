@@ -0,0 +1,318 @@
+"""
+Profiling aplikasi yang sedang berjalan tanpa restart.
+
+- ``StageTimers``: timer per tahap (poll, parse, session, ui_update, plot)
+  yang selalu aktif dan murah (``perf_counter_ns`` + satu lock).
+- Snapshot sampling: thread terpisah membaca ``sys._current_frames()``
+  secara berkala untuk thread monitor dan thread UI.
+- Snapshot ``cProfile``: diaktifkan di dalam thread target sendiri lewat
+  ``Profiler.checkpoint()`` yang dipanggil di setiap iterasi loop-nya.
+
+Hasil ditulis ke ``profile_dir``; snapshot bisa dipicu dari dialog setting
+atau lewat SIGUSR1.
+"""
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Tuple, Callable, Iterator
+import cProfile
+import io
+import logging
+import os
+import pstats
+import signal
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+MONITOR_THREAD = "monitor"
+UI_THREAD = "MainThread"
+DEFAULT_THREADS = (MONITOR_THREAD, UI_THREAD)
+
+
+class StageTimers:
+    """Akumulator durasi per tahap: jumlah, total, maksimum dan terakhir."""
+    def __init__(self) -> None:
+        self._stats: Dict[str, List[int]] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def time(self, stage: str) -> Iterator[None]:
+        """Ukur blok ``with`` sebagai satu eksekusi ``stage``."""
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter_ns() - start)
+
+    def record(self, stage: str, elapsed_ns: int) -> None:
+        """Catat satu eksekusi tahap."""
+        with self._lock:
+            stats = self._stats.get(stage)
+            if stats is None:
+                self._stats[stage] = [1, elapsed_ns, elapsed_ns, elapsed_ns]
+            else:
+                stats[0] += 1
+                stats[1] += elapsed_ns
+                stats[2] = max(stats[2], elapsed_ns)
+                stats[3] = elapsed_ns
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Statistik per tahap dalam milidetik."""
+        with self._lock:
+            items = [(stage, list(stats)) for stage, stats in self._stats.items()]
+        return {
+            stage: {
+                "count": count,
+                "total_ms": total / 1e6,
+                "mean_ms": total / count / 1e6,
+                "max_ms": peak / 1e6,
+                "last_ms": last / 1e6,
+            }
+            for stage, (count, total, peak, last) in items
+        }
+
+    def reset(self) -> None:
+        """Hapus semua statistik."""
+        with self._lock:
+            self._stats.clear()
+
+    def report(self) -> str:
+        """Tabel teks statistik tahap."""
+        lines = [
+            f"{'stage':<12} {'count':>8} {'mean ms':>9} {'max ms':>9} "
+            f"{'last ms':>9} {'total ms':>10}"
+        ]
+        for stage, s in sorted(self.snapshot().items()):
+            lines.append(
+                f"{stage:<12} {s['count']:>8} {s['mean_ms']:>9.3f} {s['max_ms']:>9.3f} "
+                f"{s['last_ms']:>9.3f} {s['total_ms']:>10.1f}"
+            )
+        return "\n".join(lines)
+
+
+def _frame_stack(frame: Any) -> Tuple[str, ...]:
+    """Stack frame dari luar ke dalam sebagai ``file:fungsi:baris``."""
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+        frame = frame.f_back
+    return tuple(reversed(stack))
+
+
+def sample_threads(
+    duration: float,
+    interval: float = 0.005,
+    threads: Optional[Tuple[str, ...]] = DEFAULT_THREADS,
+    stop: Optional[threading.Event] = None
+) -> Dict[str, Counter]:
+    """Sampling stack thread bernama ``threads`` (None: semua) selama ``duration`` detik."""
+    own = threading.get_ident()
+    samples: Dict[str, Counter] = {}
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline and not (stop and stop.is_set()):
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            name = names.get(ident, str(ident))
+            if ident == own or (threads is not None and name not in threads):
+                continue
+            samples.setdefault(name, Counter())[_frame_stack(frame)] += 1
+        time.sleep(interval)
+    return samples
+
+
+def format_samples(samples: Dict[str, Counter], top: int = 25) -> str:
+    """Ringkasan sampling: fungsi teratas per thread (self dan kumulatif)."""
+    lines = []
+    for name, stacks in sorted(samples.items()):
+        total = sum(stacks.values())
+        own: Counter = Counter()
+        cumulative: Counter = Counter()
+        for stack, count in stacks.items():
+            own[stack[-1]] += count
+            for entry in set(stack):
+                cumulative[entry] += count
+        lines.append(f"== thread {name}: {total} sampel")
+        lines.append(f"{'self %':>7} {'cum %':>7}  fungsi")
+        for entry, count in own.most_common(top):
+            cum = 100 * cumulative[entry] / total
+            lines.append(f"{100 * count / total:>7.1f} {cum:>7.1f}  {entry}")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def collapsed_stacks(samples: Dict[str, Counter]) -> str:
+    """Format ``thread;frame;frame count`` untuk flamegraph."""
+    return "\n".join(
+        f"{';'.join((name,) + stack)} {count}"
+        for name, stacks in sorted(samples.items())
+        for stack, count in stacks.most_common()
+    )
+
+
+class Profiler:
+    """Titik masuk profiling: timer tahap dan snapshot on-demand."""
+    def __init__(self, profile_dir: str = "profiles") -> None:
+        self.profile_dir = profile_dir
+        self.timers = StageTimers()
+        self._lock = threading.Lock()
+        self._busy = False
+        # Permintaan cProfile per nama thread: deadline monotonic
+        self._cprofile_requests: Dict[str, float] = {}
+        self._cprofiles: Dict[str, Tuple[cProfile.Profile, float]] = {}
+        self._cprofile_results: Dict[str, pstats.Stats] = {}
+        self._cprofile_done = threading.Condition(self._lock)
+
+    @property
+    def busy(self) -> bool:
+        """True jika snapshot sedang berjalan."""
+        return self._busy
+
+    def checkpoint(self) -> None:
+        """Dipanggil di setiap iterasi loop thread yang bisa di-profile dengan cProfile."""
+        if not self._cprofile_requests and not self._cprofiles:
+            return
+        name = threading.current_thread().name
+        now = time.monotonic()
+        with self._lock:
+            active = self._cprofiles.get(name)
+            if active is None:
+                deadline = self._cprofile_requests.pop(name, None)
+                if deadline is not None:
+                    profile = cProfile.Profile()
+                    try:
+                        profile.enable()
+                    except ValueError as e:
+                        # Python 3.12+: hanya satu profiler aktif per proses
+                        logger.warning(f"cProfile untuk thread {name} tidak bisa diaktifkan: {e}")
+                        return
+                    self._cprofiles[name] = (profile, deadline)
+                return
+            profile, deadline = active
+            if now < deadline:
+                return
+            profile.disable()
+            del self._cprofiles[name]
+            self._cprofile_results[name] = pstats.Stats(profile)
+            self._cprofile_done.notify_all()
+
+    def snapshot(
+        self,
+        mode: str = "sample",
+        duration: float = 10.0,
+        threads: Tuple[str, ...] = DEFAULT_THREADS,
+        on_done: Optional[Callable[[Optional[str]], None]] = None
+    ) -> bool:
+        """Mulai snapshot di background; ``on_done`` menerima path laporan.
+
+        Return False jika snapshot lain masih berjalan.
+        """
+        if mode not in ("sample", "cprofile"):
+            raise ValueError(f"Mode profiling tidak dikenal: {mode}")
+        with self._lock:
+            if self._busy:
+                return False
+            self._busy = True
+
+        def run():
+            path = None
+            try:
+                path = self._run_snapshot(mode, duration, threads)
+                logger.info(f"Snapshot profiling ditulis ke {path}")
+            except Exception as e:
+                logger.error(f"Snapshot profiling gagal: {e}")
+            finally:
+                self._busy = False
+                if on_done:
+                    on_done(path)
+
+        threading.Thread(target=run, name="profiler", daemon=True).start()
+        return True
+
+    def install_signal_handler(self, signum: Optional[int] = None, duration: float = 10.0) -> bool:
+        """Snapshot sampling saat menerima ``signum`` (default SIGUSR1, tidak ada di Windows)."""
+        signum = signum or getattr(signal, "SIGUSR1", None)
+        if signum is None or threading.current_thread() is not threading.main_thread():
+            return False
+        signal.signal(signum, lambda *_: self._start_from_signal(duration))
+        return True
+
+    def _start_from_signal(self, duration: float) -> None:
+        """Handler sinyal: jangan ambil ``_lock`` di sini.
+
+        Handler berjalan di thread utama, yang bisa saja sedang memegang
+        ``_lock`` di ``checkpoint()``; ``snapshot()`` dijalankan di thread lain.
+        """
+        threading.Thread(
+            target=self.snapshot, args=("sample", duration), name="profiler-signal", daemon=True
+        ).start()
+
+    def _run_snapshot(self, mode: str, duration: float, threads: Tuple[str, ...]) -> str:
+        """Jalankan snapshot dan tulis laporan; return path."""
+        started = datetime.now()
+        if mode == "sample":
+            samples = sample_threads(duration, threads=threads)
+            body = format_samples(samples)
+            extra = collapsed_stacks(samples)
+        else:
+            stats = self._collect_cprofile(duration, threads)
+            out = io.StringIO()
+            for name, result in sorted(stats.items()):
+                out.write(f"== thread {name}\n")
+                result.stream = out
+                result.sort_stats("cumulative").print_stats(30)
+            body = out.getvalue() or "Tidak ada thread yang memanggil checkpoint()\n"
+            extra = None
+
+        os.makedirs(self.profile_dir, exist_ok=True)
+        base = os.path.join(self.profile_dir, f"profile_{started.strftime('%Y%m%d_%H%M%S')}_{mode}")
+        with open(base + ".txt", "w", encoding="utf-8") as f:
+            started_at = started.isoformat(timespec='seconds')
+            f.write(f"Snapshot {mode} {duration:.1f} s, mulai {started_at}\n\n")
+            f.write("Timer tahap (sejak start):\n")
+            f.write(self.timers.report() + "\n\n")
+            f.write(body)
+        if extra:
+            with open(base + ".folded", "w", encoding="utf-8") as f:
+                f.write(extra + "\n")
+        return base + ".txt"
+
+    def _collect_cprofile(
+        self, duration: float, threads: Tuple[str, ...]
+    ) -> Dict[str, pstats.Stats]:
+        """Minta cProfile di setiap thread lalu tunggu hasilnya."""
+        with self._lock:
+            self._cprofile_results.clear()
+            deadline = time.monotonic() + duration
+            for name in threads:
+                self._cprofile_requests[name] = deadline
+            # Thread yang tidak pernah memanggil checkpoint() ditunggu paling lama 1 s lebih
+            self._cprofile_done.wait_for(
+                lambda: len(self._cprofile_results) == len(threads),
+                timeout=duration + 1.0
+            )
+            for name in threads:
+                self._cprofile_requests.pop(name, None)
+            # Profile yang masih aktif hanya bisa dimatikan oleh thread-nya sendiri
+            return dict(self._cprofile_results)
+
+
+_profiler: Optional[Profiler] = None
+_profiler_lock = threading.Lock()
+
+
+def get_profiler() -> Profiler:
+    """Profiler bersama untuk seluruh aplikasi."""
+    global _profiler
+    with _profiler_lock:
+        if _profiler is None:
+            _profiler = Profiler()
+        return _profiler
+
+
+def stage(name: str):
+    """Singkatan ``get_profiler().timers.time(name)``."""
+    return (_profiler or get_profiler()).timers.time(name)
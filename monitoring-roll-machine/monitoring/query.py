@@ -0,0 +1,320 @@
+"""
+Query data historis dengan rollup per 1 menit, 15 menit dan 1 jam.
+
+Rollup diperbarui secara inkremental setiap sampel direkam; query memilih
+rollup terkasar yang masih cukup halus untuk resolusi yang diminta, atau
+sampel mentah dari arsip untuk resolusi di bawah satu menit. Hasil query
+disimpan di cache LRU.
+
+Rollup juga disimpan per mesin per hari di ``<mesin>/<YYYY-MM-DD>.rollup``
+di sebelah partisi arsip, diperbarui setiap kali blok arsip ditulis. Proses
+baru (mis. kiosk setelah reboot) cukup memuat file ini; hanya blok yang
+ditulis setelah file rollup terakhir disimpan yang perlu di-decode.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date
+from typing import Optional, Dict, List, Tuple, Iterable
+import json
+import logging
+import os
+import threading
+
+from .archive import Archive, ArchiveSample, PARTITION_SUFFIX
+from .normalize import from_um
+
+logger = logging.getLogger(__name__)
+
+# Resolusi rollup dalam detik, dari yang terhalus
+ROLLUP_RESOLUTIONS = (60, 900, 3600)
+
+ROLLUP_SUFFIX = ".rollup"
+# Versi 2: panjang dalam meter dari ``length_um`` (versi 1 memakai count panel)
+ROLLUP_VERSION = 2
+
+# resolusi -> awal bucket (ms) -> bucket
+Rollups = Dict[int, Dict[int, "_Bucket"]]
+
+
+@dataclass(frozen=True)
+class HistoryPoint:
+    """Agregat satu bucket waktu."""
+    start_ms: int
+    samples: int
+    speed_mean: float
+    speed_max: int
+    length: float  # panjang roll terakhir dalam bucket (meter)
+
+
+class _Bucket:
+    """Akumulator agregat yang bisa digabung."""
+    __slots__ = ("samples", "speed_sum", "speed_max", "length", "last_ms")
+
+    def __init__(self) -> None:
+        self.samples = 0
+        self.speed_sum = 0
+        self.speed_max = 0
+        self.length = 0.0
+        self.last_ms = -1
+
+    def add(self, timestamp_ms: int, speed: int, length: float) -> None:
+        """Tambah satu sampel."""
+        self.samples += 1
+        self.speed_sum += speed
+        self.speed_max = max(self.speed_max, speed)
+        if timestamp_ms >= self.last_ms:
+            self.last_ms = timestamp_ms
+            self.length = length
+
+    def merge(self, other: "_Bucket") -> None:
+        """Gabungkan bucket lain (resolusi lebih halus)."""
+        self.samples += other.samples
+        self.speed_sum += other.speed_sum
+        self.speed_max = max(self.speed_max, other.speed_max)
+        if other.last_ms >= self.last_ms:
+            self.last_ms = other.last_ms
+            self.length = other.length
+
+    def to_list(self) -> list:
+        """Bentuk ringkas untuk file rollup."""
+        return [self.samples, self.speed_sum, self.speed_max, self.length, self.last_ms]
+
+    @classmethod
+    def from_list(cls, values: list) -> "_Bucket":
+        """Kebalikan ``to_list``."""
+        bucket = cls()
+        bucket.samples, bucket.speed_sum, bucket.speed_max, bucket.length, bucket.last_ms = values
+        return bucket
+
+    def point(self, start_ms: int) -> HistoryPoint:
+        """Bentuk HistoryPoint dari akumulator."""
+        return HistoryPoint(
+            start_ms=start_ms,
+            samples=self.samples,
+            speed_mean=self.speed_sum / self.samples if self.samples else 0.0,
+            speed_max=self.speed_max,
+            length=self.length
+        )
+
+
+def _length(sample: ArchiveSample) -> float:
+    """Panjang roll sampel dalam meter (dari ``length_um``, apa pun satuan panel)."""
+    return from_um(sample.length_um, "meter")
+
+
+def _bucket_start(timestamp_ms: int, resolution_s: int) -> int:
+    """Awal bucket untuk timestamp."""
+    size = resolution_s * 1000
+    return timestamp_ms - timestamp_ms % size
+
+
+def _aggregate(
+    buckets: Iterable[Tuple[int, _Bucket]],
+    resolution_s: int
+) -> List[HistoryPoint]:
+    """Gabungkan bucket (terurut waktu) ke resolusi yang lebih kasar."""
+    merged: Dict[int, _Bucket] = {}
+    for start_ms, bucket in buckets:
+        target = merged.setdefault(_bucket_start(start_ms, resolution_s), _Bucket())
+        target.merge(bucket)
+    return [merged[start].point(start) for start in sorted(merged)]
+
+
+def _add_sample(rollups: Rollups, sample: ArchiveSample) -> None:
+    """Tambahkan sampel ke semua resolusi rollup."""
+    for resolution in ROLLUP_RESOLUTIONS:
+        buckets = rollups.setdefault(resolution, {})
+        start = _bucket_start(sample.timestamp_ms, resolution)
+        bucket = buckets.get(start)
+        if bucket is None:
+            bucket = buckets[start] = _Bucket()
+        bucket.add(sample.timestamp_ms, sample.current_speed, _length(sample))
+
+
+class RollupStore:
+    """File rollup per mesin per hari, disinkronkan dengan partisi arsip.
+
+    File mencatat ``size``, panjang partisi yang sudah tercakup. ``sync()``
+    hanya men-decode blok yang dimulai di atau sesudah offset itu, sehingga
+    dipanggil setelah setiap blok ditulis biayanya satu blok; sinkronisasi
+    bersamaan dari proses lain menghasilkan isi yang sama (tidak dobel).
+    """
+    def __init__(self, archive: Archive) -> None:
+        self.archive = archive
+
+    def attach(self) -> None:
+        """Perbarui file rollup setiap kali arsip menulis blok."""
+        self.archive.add_block_listener(self.sync)
+
+    def path(self, machine: str, day: date) -> str:
+        """Path file rollup."""
+        return self.archive.partition_path(machine, day)[:-len(PARTITION_SUFFIX)] + ROLLUP_SUFFIX
+
+    def sync(self, machine: str, day: date) -> Rollups:
+        """Rollup satu hari, dilengkapi dari blok yang belum tercakup lalu disimpan."""
+        path = self.path(machine, day)
+        partition = self.archive.partition_path(machine, day)
+        size = os.path.getsize(partition) if os.path.exists(partition) else 0
+        covered, rollups = self._load(path)
+        if covered > size:
+            # Partisi diganti atau dipotong: bangun ulang hari ini
+            covered, rollups = 0, {}
+        if covered < size:
+            for sample in self.archive.read_blocks(machine, day, covered):
+                _add_sample(rollups, sample)
+            self._save(path, size, rollups)
+        return rollups
+
+    @staticmethod
+    def _load(path: str) -> Tuple[int, Rollups]:
+        """(ukuran partisi tercakup, rollup) dari file; (0, {}) jika belum ada atau rusak."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != ROLLUP_VERSION:
+                logger.info(f"File rollup {path} versi lama, dibangun ulang")
+                return 0, {}
+            rollups = {
+                int(resolution): {
+                    int(start): _Bucket.from_list(values) for start, values in buckets
+                }
+                for resolution, buckets in data["rollups"].items()
+            }
+            return int(data["size"]), rollups
+        except FileNotFoundError:
+            return 0, {}
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"File rollup {path} tidak bisa dibaca ({e}), dibangun ulang")
+            return 0, {}
+
+    @staticmethod
+    def _save(path: str, size: int, rollups: Rollups) -> None:
+        """Simpan secara atomik (nama sementara unik, lalu rename)."""
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        data = {
+            "version": ROLLUP_VERSION,
+            "size": size,
+            "rollups": {
+                str(resolution): [
+                    [start, bucket.to_list()] for start, bucket in sorted(buckets.items())
+                ]
+                for resolution, buckets in rollups.items()
+            },
+        }
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+
+class HistoryQuery:
+    """Query kecepatan dan panjang per mesin pada resolusi tertentu."""
+    def __init__(self, archive: Archive, cache_size: int = 128) -> None:
+        self.archive = archive
+        self.store = RollupStore(archive)
+        self.store.attach()
+        self.cache_size = cache_size
+        self._rollups: Dict[Tuple[str, int], Dict[int, _Bucket]] = {}
+        self._loaded: set = set()
+        self._cache: "OrderedDict[Tuple[str, int, int, int], List[HistoryPoint]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, machine: str, sample: ArchiveSample) -> None:
+        """Simpan sampel ke arsip dan perbarui rollup secara inkremental."""
+        with self._lock:
+            # Di bawah lock yang sama dengan pembangunan rollup agar tidak terhitung dua kali
+            self.archive.append(machine, sample)
+            self._invalidate(machine, sample.timestamp_ms)
+            if machine in self._loaded:
+                self._add_to_rollups(machine, sample)
+
+    def query(
+        self,
+        machine: str,
+        start_ms: int,
+        end_ms: int,
+        resolution_s: int
+    ) -> List[HistoryPoint]:
+        """Titik agregat ``[start_ms, end_ms)`` dengan lebar bucket ``resolution_s`` detik."""
+        key = (machine, start_ms, end_ms, resolution_s)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return self._cache[key]
+            self.misses += 1
+            rollup = self.rollup_for(resolution_s)
+            if rollup is None:
+                raw = (
+                    (s.timestamp_ms, self._single(s))
+                    for s in self.archive.query(machine, start_ms, end_ms)
+                )
+                points = _aggregate(raw, resolution_s)
+            else:
+                self._ensure_rollups(machine)
+                buckets = self._rollups.get((machine, rollup), {})
+                # Bucket rollup yang dimulai sebelum start_ms tidak ikut
+                selected = sorted(
+                    (start, bucket) for start, bucket in buckets.items()
+                    if start_ms <= start < end_ms
+                )
+                points = _aggregate(selected, resolution_s)
+            self._cache[key] = points
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return points
+
+    @staticmethod
+    def rollup_for(resolution_s: int) -> Optional[int]:
+        """Rollup terkasar yang membagi habis resolusi, atau None (pakai data mentah)."""
+        candidates = [r for r in ROLLUP_RESOLUTIONS if r <= resolution_s and resolution_s % r == 0]
+        return candidates[-1] if candidates else None
+
+    def clear_cache(self) -> None:
+        """Kosongkan cache hasil query."""
+        with self._lock:
+            self._cache.clear()
+
+    @staticmethod
+    def _single(sample: ArchiveSample) -> _Bucket:
+        """Bucket berisi satu sampel mentah."""
+        bucket = _Bucket()
+        bucket.add(sample.timestamp_ms, sample.current_speed, _length(sample))
+        return bucket
+
+    def _add_to_rollups(self, machine: str, sample: ArchiveSample) -> None:
+        """Tambahkan sampel ke semua resolusi rollup di memori."""
+        for resolution in ROLLUP_RESOLUTIONS:
+            buckets = self._rollups.setdefault((machine, resolution), {})
+            start = _bucket_start(sample.timestamp_ms, resolution)
+            bucket = buckets.get(start)
+            if bucket is None:
+                bucket = buckets[start] = _Bucket()
+            bucket.add(sample.timestamp_ms, sample.current_speed, _length(sample))
+
+    def _ensure_rollups(self, machine: str) -> None:
+        """Muat rollup mesin dari file rollup per hari (sekali per proses)."""
+        if machine in self._loaded:
+            return
+        # Sampel yang masih di buffer proses ini ditulis dulu sebagai blok,
+        # sehingga file rollup mencakup semuanya (record() menunggu lock ini)
+        self.archive.flush()
+        days = self.archive.partitions(machine)
+        for day in days:
+            for resolution, buckets in self.store.sync(machine, day).items():
+                target = self._rollups.setdefault((machine, resolution), {})
+                for start, bucket in buckets.items():
+                    # Bucket jam yang terpotong batas hari lokal ada di dua file
+                    target.setdefault(start, _Bucket()).merge(bucket)
+        self._loaded.add(machine)
+        logger.info(f"Rollup {machine} dimuat dari {len(days)} file harian")
+
+    def _invalidate(self, machine: str, timestamp_ms: int) -> None:
+        """Buang hasil cache yang rentangnya mencakup sampel baru."""
+        stale = [
+            key for key in self._cache
+            if key[0] == machine and key[1] <= timestamp_ms < key[2]
+        ]
+        for key in stale:
+            del self._cache[key]
@@ -0,0 +1,310 @@
+"""
+Buffer deret waktu berkapasitas tetap untuk grafik real-time.
+
+``TimeSeries`` menyimpan titik (waktu, nilai) di ring buffer yang dialokasi
+sekali; sampel yang lebih rapat dari ``window_s / capacity`` digabung ke
+titik terakhir, sehingga biaya per frame tetap berapa pun panjang riwayat.
+Min/max untuk autoscale dihitung atas jendela waktu dengan deque monoton
+(amortized O(1) per sampel).
+
+``MultiTraceBuffer`` menyimpan banyak trace (satu per mesin) di satu array
+bersama untuk dashboard multi-mesin.
+"""
+from array import array
+from collections import deque
+from typing import Optional, Tuple, Iterator, Deque, Dict, List
+import math
+import threading
+
+
+class RingBuffer:
+    """Ring buffer (waktu, nilai) dengan kapasitas tetap."""
+    def __init__(self, capacity: int) -> None:
+        if capacity < 2:
+            raise ValueError("Kapasitas minimal 2")
+        self.capacity = capacity
+        self.times = array("d", bytes(8 * capacity))
+        self.values = array("d", bytes(8 * capacity))
+        self.head = 0  # slot yang ditulis berikutnya
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def oldest_slot(self) -> int:
+        """Slot titik tertua."""
+        return (self.head - self.count) % self.capacity
+
+    @property
+    def last_slot(self) -> Optional[int]:
+        """Slot titik terbaru."""
+        return (self.head - 1) % self.capacity if self.count else None
+
+    def append(self, timestamp: float, value: float) -> int:
+        """Tambah titik (menimpa yang tertua jika penuh); return slot-nya."""
+        slot = self.head
+        self.times[slot] = timestamp
+        self.values[slot] = value
+        self.head = (slot + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        return slot
+
+    def set(self, slot: int, timestamp: float, value: float) -> None:
+        """Ubah titik di slot."""
+        self.times[slot] = timestamp
+        self.values[slot] = value
+
+    def items(self) -> Iterator[Tuple[float, float]]:
+        """Titik dari yang tertua ke terbaru."""
+        start = self.oldest_slot
+        for i in range(self.count):
+            slot = (start + i) % self.capacity
+            yield self.times[slot], self.values[slot]
+
+    def clear(self) -> None:
+        """Kosongkan buffer (memori tetap dipakai ulang)."""
+        self.head = 0
+        self.count = 0
+
+
+class WindowedExtrema:
+    """Min/max geser atas jendela waktu dengan deque monoton."""
+    def __init__(self, window_s: float) -> None:
+        self.window_s = window_s
+        self._min: Deque[Tuple[float, float]] = deque()
+        self._max: Deque[Tuple[float, float]] = deque()
+
+    def push(self, timestamp: float, low: float, high: Optional[float] = None) -> None:
+        """Tambah rentang nilai (``low``..``high``) pada ``timestamp``."""
+        high = low if high is None else high
+        while self._max and self._max[-1][1] <= high:
+            self._max.pop()
+        self._max.append((timestamp, high))
+        while self._min and self._min[-1][1] >= low:
+            self._min.pop()
+        self._min.append((timestamp, low))
+
+    def expire(self, now: float) -> None:
+        """Buang nilai yang lebih tua dari jendela."""
+        cutoff = now - self.window_s
+        while self._max and self._max[0][0] < cutoff:
+            self._max.popleft()
+        while self._min and self._min[0][0] < cutoff:
+            self._min.popleft()
+
+    @property
+    def min(self) -> Optional[float]:
+        return self._min[0][1] if self._min else None
+
+    @property
+    def max(self) -> Optional[float]:
+        return self._max[0][1] if self._max else None
+
+    def clear(self) -> None:
+        self._min.clear()
+        self._max.clear()
+
+
+class TimeSeries:
+    """Deret waktu untuk grafik: ring buffer + min/max berjendela.
+
+    Titik terakhir adalah "bucket" yang masih terbuka: sampel berikutnya yang
+    datang kurang dari ``spacing`` detik kemudian menggantikan nilainya.
+    """
+    def __init__(self, capacity: int = 1024, window_s: float = 600.0) -> None:
+        self.ring = RingBuffer(capacity)
+        self.extrema = WindowedExtrema(window_s)
+        self.window_s = window_s
+        self._bucket_start: Optional[float] = None
+        self._bucket_low = 0.0
+        self._bucket_high = 0.0
+
+    @property
+    def capacity(self) -> int:
+        return self.ring.capacity
+
+    @property
+    def spacing(self) -> float:
+        """Jarak minimum antar titik tersimpan."""
+        return self.window_s / self.ring.capacity
+
+    def add(self, timestamp: float, value: float) -> Tuple[int, bool]:
+        """Tambah sampel; return (slot yang ditulis, True jika slot baru)."""
+        slot = self.ring.last_slot
+        in_bucket = self._bucket_start is not None and timestamp - self._bucket_start < self.spacing
+        if slot is not None and in_bucket:
+            self.ring.set(slot, timestamp, value)
+            self._bucket_low = min(self._bucket_low, value)
+            self._bucket_high = max(self._bucket_high, value)
+            return slot, False
+        self._close_bucket()
+        self._bucket_start = timestamp
+        self._bucket_low = self._bucket_high = value
+        return self.ring.append(timestamp, value), True
+
+    def limits(self, now: float) -> Optional[Tuple[float, float]]:
+        """(min, max) sampel dalam jendela ``[now - window_s, now]``."""
+        self.extrema.expire(now)
+        low, high = self.extrema.min, self.extrema.max
+        if self._bucket_start is not None and self._bucket_start >= now - self.window_s:
+            low = self._bucket_low if low is None else min(low, self._bucket_low)
+            high = self._bucket_high if high is None else max(high, self._bucket_high)
+        if low is None or high is None:
+            return None
+        return low, high
+
+    def set_window(self, window_s: float) -> None:
+        """Ubah lebar jendela (mengubah jarak minimum antar titik)."""
+        self.window_s = window_s
+        self.extrema.window_s = window_s
+
+    def clear(self) -> None:
+        """Hapus semua titik."""
+        self.ring.clear()
+        self.extrema.clear()
+        self._bucket_start = None
+
+    def items(self) -> Iterator[Tuple[float, float]]:
+        """Titik tersimpan dari yang tertua."""
+        return self.ring.items()
+
+    def _close_bucket(self) -> None:
+        """Masukkan bucket yang ditutup ke min/max berjendela."""
+        if self._bucket_start is not None:
+            self.extrema.push(self._bucket_start, self._bucket_low, self._bucket_high)
+
+
+class MultiTraceBuffer:
+    """Ring buffer bersama untuk banyak trace dengan desimasi per trace.
+
+    Titik trace ke-``i`` ada di ``times``/``values`` pada indeks
+    ``i * capacity .. (i + 1) * capacity``, sehingga renderer bisa membaca
+    semua trace dari dua array tanpa salinan. Seperti ``TimeSeries``, sampel
+    yang lebih rapat dari ``spacing`` menggantikan titik terakhir trace-nya.
+    Tulis dan baca dilindungi ``lock``.
+    """
+    def __init__(self, traces: int = 16, capacity: int = 1024, window_s: float = 600.0) -> None:
+        if capacity < 2:
+            raise ValueError("Kapasitas minimal 2")
+        self.traces = traces
+        self.capacity = capacity
+        self.window_s = window_s
+        self.times = array("d", bytes(8 * traces * capacity))
+        self.values = array("d", bytes(8 * traces * capacity))
+        self.names: List[str] = []
+        self.lock = threading.Lock()
+        # Naik setiap kali trace berubah; renderer hanya membangun ulang trace yang berubah
+        self.versions = [0] * traces
+        self._index: Dict[str, int] = {}
+        self._head = [0] * traces
+        self._count = [0] * traces
+        self._bucket_start: List[Optional[float]] = [None] * traces
+        self._bucket_low = [0.0] * traces
+        self._bucket_high = [0.0] * traces
+        self._extrema = [WindowedExtrema(window_s) for _ in range(traces)]
+
+    @property
+    def spacing(self) -> float:
+        """Jarak minimum antar titik tersimpan per trace."""
+        return self.window_s / self.capacity
+
+    def index(self, name: str) -> int:
+        """Indeks trace untuk ``name``; trace baru dibuat jika belum ada."""
+        index = self._index.get(name)
+        if index is None:
+            if len(self.names) >= self.traces:
+                raise ValueError(f"Buffer penuh ({self.traces} trace), {name} tidak bisa ditambah")
+            index = len(self.names)
+            self.names.append(name)
+            self._index[name] = index
+        return index
+
+    def add(self, name: str, timestamp: float, value: float) -> bool:
+        """Tambah sampel ke trace ``name``; return True jika slot baru dipakai."""
+        with self.lock:
+            index = self.index(name)
+            base = index * self.capacity
+            count = self._count[index]
+            start = self._bucket_start[index]
+            self.versions[index] += 1
+            if start is not None and count and timestamp - start < self.spacing:
+                slot = base + (self._head[index] - 1) % self.capacity
+                self.times[slot] = timestamp
+                self.values[slot] = value
+                self._bucket_low[index] = min(self._bucket_low[index], value)
+                self._bucket_high[index] = max(self._bucket_high[index], value)
+                return False
+            if start is not None:
+                self._extrema[index].push(start, self._bucket_low[index], self._bucket_high[index])
+            self._bucket_start[index] = timestamp
+            self._bucket_low[index] = self._bucket_high[index] = value
+            head = self._head[index]
+            self.times[base + head] = timestamp
+            self.values[base + head] = value
+            self._head[index] = (head + 1) % self.capacity
+            self._count[index] = min(count + 1, self.capacity)
+            return True
+
+    def segments(self, index: int) -> List[Tuple[int, int]]:
+        """Rentang ``[start, stop)`` di array bersama, dari titik tertua ke terbaru."""
+        base = index * self.capacity
+        head, count = self._head[index], self._count[index]
+        oldest = (head - count) % self.capacity
+        if oldest + count <= self.capacity:
+            return [(base + oldest, base + oldest + count)] if count else []
+        return [(base + oldest, base + self.capacity), (base, base + head)]
+
+    def items(self, index: int) -> Iterator[Tuple[float, float]]:
+        """Titik trace dari yang tertua."""
+        for start, stop in self.segments(index):
+            for i in range(start, stop):
+                yield self.times[i], self.values[i]
+
+    def limits(self, index: int, now: float) -> Optional[Tuple[float, float]]:
+        """(min, max) trace dalam jendela ``[now - window_s, now]``."""
+        with self.lock:
+            extrema = self._extrema[index]
+            extrema.expire(now)
+            low, high = extrema.min, extrema.max
+            start = self._bucket_start[index]
+            if start is not None and start >= now - self.window_s:
+                bucket_low, bucket_high = self._bucket_low[index], self._bucket_high[index]
+                low = bucket_low if low is None else min(low, bucket_low)
+                high = bucket_high if high is None else max(high, bucket_high)
+        if low is None or high is None:
+            return None
+        return low, high
+
+    def set_window(self, window_s: float) -> None:
+        """Ubah lebar jendela semua trace."""
+        self.window_s = window_s
+        for extrema in self._extrema:
+            extrema.window_s = window_s
+
+
+def nice_step(span: float, ticks: int = 5) -> float:
+    """Langkah tick 1/2/5 x 10^n sehingga ``span`` terbagi kira-kira ``ticks`` bagian."""
+    raw = span / ticks
+    magnitude = 10.0 ** math.floor(math.log10(raw))
+    for factor in (1, 2, 5, 10):
+        if raw <= factor * magnitude:
+            return factor * magnitude
+    return 10 * magnitude
+
+
+def nice_limits(low: float, high: float, headroom: float = 0.1) -> Tuple[float, float, float]:
+    """Batas sumbu y yang dibulatkan (ymin, ymax, langkah tick) untuk rentang data.
+
+    Batas hanya berubah jika data melewati kelipatan langkah tick, sehingga
+    label sumbu tidak digambar ulang setiap sampel.
+    """
+    span = high - low
+    if span <= 0:
+        span = abs(high) or 1.0
+    bottom = low - span * headroom
+    if low >= 0 > bottom:
+        bottom = 0.0
+    top = high + span * headroom
+    step = nice_step(top - bottom)
+    return float(math.floor(bottom / step) * step), float(math.ceil(top / step) * step), step
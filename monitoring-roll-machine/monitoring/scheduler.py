@@ -0,0 +1,96 @@
+"""
+Penjadwal polling adaptif berdasarkan kondisi mesin.
+"""
+from typing import Optional, Dict, Any
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptivePollScheduler:
+    """Hitung interval polling berikutnya dari status mesin terakhir.
+
+    Polling dipercepat ke ``min_interval`` saat kecepatan berubah atau count
+    mendekati target, dan diperlambat secara eksponensial hingga
+    ``max_interval`` saat mesin diam (speed 0) cukup lama.
+    """
+    def __init__(
+        self,
+        min_interval: float = 0.2,
+        max_interval: float = 5.0,
+        base_interval: float = 1.0,
+        backoff_factor: float = 2.0,
+        idle_polls: int = 5,
+        near_target_ratio: float = 0.05,
+        near_target_margin: float = 5.0
+    ) -> None:
+        if min_interval <= 0 or max_interval < min_interval:
+            raise ValueError("Interval polling tidak valid")
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.base_interval = min(max(base_interval, min_interval), max_interval)
+        self.backoff_factor = backoff_factor
+        self.idle_polls = idle_polls
+        self.near_target_ratio = near_target_ratio
+        self.near_target_margin = near_target_margin
+        self.target: Optional[float] = None
+        self._last_speed: Optional[float] = None
+        self._idle_count = 0
+        self._interval = self.base_interval
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "AdaptivePollScheduler":
+        """Buat scheduler dari dict konfigurasi aplikasi."""
+        return cls(
+            min_interval=float(config.get("poll_min_interval", 0.2)),
+            max_interval=float(config.get("poll_max_interval", 5.0)),
+            base_interval=float(config.get("poll_interval", 1.0))
+        )
+
+    @property
+    def interval(self) -> float:
+        """Interval polling saat ini dalam detik."""
+        return self._interval
+
+    def set_target(self, target: Optional[float]) -> None:
+        """Set target panjang roll (dalam satuan count mesin)."""
+        self.target = target if target and target > 0 else None
+
+    def reset(self) -> None:
+        """Kembalikan scheduler ke interval dasar."""
+        self._last_speed = None
+        self._idle_count = 0
+        self._interval = self.base_interval
+
+    def next_interval(self, fields: Optional[Dict[str, Any]]) -> float:
+        """Hitung interval berikutnya dari field hasil parsing (atau None jika gagal)."""
+        if not fields:
+            # Tidak ada data: pertahankan interval, jangan percepat bus yang bermasalah
+            return self._interval
+
+        speed = fields.get("current_speed", 0) or 0
+        count = fields.get("current_count", 0) or 0
+        speed_changed = self._last_speed is not None and speed != self._last_speed
+        self._last_speed = speed
+
+        if speed_changed or self._is_near_target(count, speed):
+            self._idle_count = 0
+            self._interval = self.min_interval
+        elif speed == 0:
+            self._idle_count += 1
+            if self._idle_count > self.idle_polls:
+                self._interval = min(self._interval * self.backoff_factor, self.max_interval)
+        else:
+            # Mesin berjalan stabil: kembali ke interval dasar
+            self._idle_count = 0
+            self._interval = self.base_interval
+
+        return self._interval
+
+    def _is_near_target(self, count: float, speed: float) -> bool:
+        """Cek apakah count sudah mendekati target roll."""
+        if self.target is None or speed <= 0:
+            return False
+        remaining = self.target - count
+        margin = max(self.target * self.near_target_ratio, self.near_target_margin)
+        return 0 <= remaining <= margin
@@ -1,18 +1,42 @@
 """
 Handler untuk komunikasi serial dengan mesin JSK3588.
 """
-from typing import Optional, Dict, Any, Union, Callable
+from concurrent.futures import Future
+from typing import Optional, Dict, Any, Union, Callable, List, ContextManager, TYPE_CHECKING
+from enum import Enum
 import logging
+import random
+import select
 import time
 import threading
 import serial
 from serial.serialutil import SerialException
 
-from .parser import parse_packet, PacketParseError
-from .mock.mock_serial import MockSerial
+from .parser import parse_packet, PacketParseError, FrameDecoder, RECEIVED_NS, RECEIVED_MONO_NS
+from .profiling import stage
+from .commands import (
+    CommandQueue, CMD_RESET, CMD_RESET_ACCUMULATION, CMD_SET_LENGTH,
+    CMD_SET_PARAMETERS, PRIORITY_NORMAL
+)
+
+if TYPE_CHECKING:
+    from .mock.mock_serial import MockSerial
 
 logger = logging.getLogger(__name__)
 
+# Interval polling ``in_waiting`` untuk port tanpa file descriptor (detik)
+POLL_WAITING_INTERVAL = 0.005
+
+
+class ConnectionState(Enum):
+    """State koneksi port serial."""
+    CLOSED = "closed"
+    CONNECTED = "connected"
+    DEGRADED = "degraded"
+    RECONNECTING = "reconnecting"
+    FAILED = "failed"
+
+
 class JSKSerialPort:
     """Handler untuk komunikasi serial dengan mesin JSK3588."""
     def __init__(
@@ -21,122 +45,478 @@ class JSKSerialPort:
         baudrate: int = 19200,
         timeout: float = 1.0,
         simulation_mode: bool = False,
-        simulate_errors: bool = False
+        simulate_errors: bool = False,
+        reconnect_interval: float = 0.1,
+        max_reconnect_interval: float = 0.8,
+        max_reconnect_attempts: Optional[int] = None,
+        max_failures: int = 3,
+        hardware_key: Optional[str] = None,
+        port_resolver: Optional[Callable[[str], Optional[str]]] = None
     ) -> None:
         self.port = port
         self.baudrate = baudrate
         self.timeout = timeout
         self.simulation_mode = simulation_mode
-        self._serial: Optional[Union[serial.Serial, MockSerial]] = None
+        self.reconnect_interval = reconnect_interval
+        self.max_reconnect_interval = max_reconnect_interval
+        self.max_reconnect_attempts = max_reconnect_attempts
+        self.max_failures = max_failures
+        self.hardware_key = hardware_key
+        self._port_resolver = port_resolver
+        self._serial: Optional[Union[serial.Serial, "MockSerial"]] = None
         self._auto_recover = False
         self._simulate_errors = simulate_errors
+        self._decoder = FrameDecoder()
+        self._fd: Optional[int] = None
+        self._state = ConnectionState.CLOSED
+        self._state_lock = threading.Lock()
+        self._io_lock = threading.RLock()
+        self._connected = threading.Event()
+        self._stop_event = threading.Event()
+        self._recover_thread: Optional[threading.Thread] = None
+        self._failures = 0
+        self._state_listeners: List[Callable[[ConnectionState], None]] = []
+        self._on_disconnect: Optional[Callable[[], None]] = None
+        self._commands: Optional[CommandQueue] = None
 
         if simulation_mode:
-            self._serial_class = lambda: MockSerial(
-                port=port,
-                baudrate=baudrate,
-                timeout=timeout,
-                simulate_errors=simulate_errors
-            )
+            self._serial_class = self._open_mock
         else:
-            self._serial_class = lambda: serial.Serial(
-                port=port,
-                baudrate=baudrate,
-                timeout=timeout
-            )
+            self._serial_class = self._open_serial
+
+    def _open_serial(self) -> serial.Serial:
+        """Buka serial.Serial dengan setting port saat ini."""
+        return serial.Serial(
+            port=self.port,
+            baudrate=self.baudrate,
+            timeout=self.timeout
+        )
+
+    def _open_mock(self) -> "MockSerial":
+        """Buat MockSerial yang sudah terbuka, seperti serial.Serial(port=...)."""
+        # Mock hanya di-import saat mode simulasi dipakai
+        from .mock.mock_serial import MockSerial
+        mock = MockSerial(
+            port=self.port,
+            baudrate=self.baudrate,
+            timeout=self.timeout,
+            simulate_errors=self._simulate_errors
+        )
+        mock.open()
+        return mock
+
+    @property
+    def state(self) -> ConnectionState:
+        """State koneksi saat ini."""
+        return self._state
+
+    @property
+    def is_connected(self) -> bool:
+        """True jika port terbuka dan bisa dipakai (connected atau degraded)."""
+        return self._connected.is_set()
+
+    def wait_connected(self, timeout: Optional[float] = None) -> bool:
+        """Tunggu hingga port kembali terhubung."""
+        return self._connected.wait(timeout)
+
+    def add_state_listener(self, callback: Callable[[ConnectionState], None]) -> None:
+        """Daftarkan callback yang dipanggil setiap state koneksi berubah."""
+        self._state_listeners.append(callback)
+
+    def remove_state_listener(self, callback: Callable[[ConnectionState], None]) -> None:
+        """Hapus callback state koneksi."""
+        if callback in self._state_listeners:
+            self._state_listeners.remove(callback)
 
     def open(self) -> None:
         """Buka koneksi serial."""
-        try:
-            if not self._serial or not self._serial.is_open:
-                self._serial = self._serial_class()
-                logger.info(f"Port {self.port} opened successfully")
-        except Exception as e:
-            logger.error(f"Error opening port {self.port}: {e}")
-            raise
+        with self._io_lock:
+            try:
+                if not self._serial or not self._serial.is_open:
+                    self._serial = self._serial_class()
+                    self._fd = self._selectable_fd()
+                    self._decoder.clear()
+                    logger.info(f"Port {self.port} opened successfully")
+            except Exception as e:
+                logger.error(f"Error opening port {self.port}: {e}")
+                raise
+            self._failures = 0
+        self._set_state(ConnectionState.CONNECTED)
 
     def close(self) -> None:
         """Tutup koneksi serial."""
-        if self._serial and self._serial.is_open:
-            self._serial.close()
-            logger.info(f"Port {self.port} closed")
+        with self._io_lock:
+            self._close_port()
+        self._set_state(ConnectionState.CLOSED)
+
+    def reconfigure(
+        self,
+        port: Optional[str] = None,
+        baudrate: Optional[int] = None,
+        hardware_key: Optional[str] = None
+    ) -> None:
+        """Ganti port/baudrate tanpa membuat objek port baru.
+
+        Baudrate diterapkan langsung pada port yang terbuka; ganti port membuka
+        ulang koneksi. Lock I/O menjamin tidak ada transaksi yang terpotong.
+        """
+        with self._io_lock:
+            if hardware_key is not None:
+                self.hardware_key = hardware_key
+            if baudrate is not None and baudrate != self.baudrate:
+                self.baudrate = baudrate
+                if self._serial is not None and port in (None, self.port):
+                    self._serial.baudrate = baudrate
+                    self._decoder.clear()
+                    logger.info(f"Port {self.port} baudrate diubah ke {baudrate}")
+            if port is not None and port != self.port:
+                was_open = self._serial is not None
+                self._close_port()
+                self.port = port
+                if was_open:
+                    try:
+                        self.open()
+                    except Exception as e:
+                        self._handle_io_error(e)
+
+    def _close_port(self) -> None:
+        """Tutup objek serial tanpa mengubah state koneksi."""
+        if self._serial:
+            try:
+                if self._serial.is_open:
+                    self._serial.close()
+                    logger.info(f"Port {self.port} closed")
+            except Exception as e:
+                # Port yang kabelnya dicabut bisa gagal saat ditutup
+                logger.debug(f"Error closing port {self.port}: {e}")
+        self._serial = None
+        self._fd = None
+
+    def send(self, data: bytes) -> bool:
+        """Kirim data ke port serial. Return False jika port tidak bisa dipakai."""
+        if not self._serial or not self._serial.is_open:
+            logger.warning(f"Port {self.port} not open, data not sent")
+            if self._serial:
+                self._handle_io_error(SerialException("Port not open"))
+            return False
 
-    def send(self, data: bytes) -> None:
-        """Kirim data ke port serial."""
-        if not self._serial:
-            raise SerialException("Port not open")
-        
         try:
             self._serial.write(data)
-            logger.debug(f"[Kirim       ] {data.hex()}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"[Kirim       ] {data.hex()}")
+            return True
         except Exception as e:
             logger.error(f"Error sending data: {e}")
-            raise
+            self._handle_io_error(e)
+            return False
 
     def receive(self, size: int = 1) -> Optional[bytes]:
         """Terima data dari port serial."""
         if not self._serial:
             raise SerialException("Port not open")
-        
+
         try:
             data = self._serial.read(size)
-            if data:
+            if data and logger.isEnabledFor(logging.DEBUG):
                 logger.debug(f"[Terima      ] {data.hex()}")
             return data if data else None
         except Exception as e:
             logger.error(f"Error receiving data: {e}")
+            self._handle_io_error(e)
             raise
 
-    def query_status(self) -> Optional[Dict[str, Any]]:
-        """Query status mesin dan parse hasilnya."""
+    def read_frame(
+        self,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None
+    ) -> Optional[bytes]:
+        """Baca satu frame lengkap, kembali segera setelah frame ter-decode.
+
+        ``deadline`` adalah waktu absolut ``time.monotonic()``; jika tidak
+        diberikan dipakai ``timeout`` (default: timeout port). Return None jika
+        deadline lewat sebelum frame lengkap diterima.
+        """
+        if not self._serial:
+            raise SerialException("Port not open")
+        if deadline is None:
+            deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+
         try:
-            # Kirim query status (command 0x02)
-            query = bytes([0x55, 0xAA, 0x02, 0x00, 0x00, 0x01])
-            self.send(query)
-            resp = self.receive(16)
-            if resp:
-                return parse_packet(resp)
-            else:
-                logger.warning("No response from machine")
-                return None
+            while True:
+                frame = self._decoder.next_frame()
+                if frame is not None:
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug(f"[Terima      ] {frame.hex()}")
+                    return frame
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    if self._decoder.pending:
+                        logger.debug(
+                            f"Frame tidak lengkap ({self._decoder.pending} byte) saat deadline"
+                        )
+                    return None
+                chunk = self._read_available(remaining)
+                if chunk:
+                    self._decoder.feed(chunk)
         except Exception as e:
-            logger.error(f"Error querying status: {e}")
+            logger.error(f"Error receiving frame: {e}")
+            self._handle_io_error(e)
             raise
 
+    def _read_available(self, wait: float) -> bytes:
+        """Tunggu data hingga ``wait`` detik lalu baca byte yang tersedia."""
+        if self._fd is not None:
+            # Tunggu di file descriptor: bangun begitu ada byte masuk
+            ready, _, _ = select.select([self._fd], [], [], wait)
+            if not ready:
+                return b""
+            return self._serial.read(max(self._serial.in_waiting, 1))
+        # Port tanpa fd (Windows, mock): jangan read() yang memblok selama timeout
+        # port; tunggu byte lewat in_waiting sampai ``wait`` habis
+        if not hasattr(self._serial, "in_waiting"):
+            return self._read_with_timeout(wait)
+        deadline = time.monotonic() + wait
+        while True:
+            waiting = self._serial.in_waiting
+            if waiting > 0:
+                return self._serial.read(waiting)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return b""
+            time.sleep(min(POLL_WAITING_INTERVAL, remaining))
+
+    def _read_with_timeout(self, wait: float) -> bytes:
+        """Baca satu byte dengan timeout port sementara dibatasi ``wait``."""
+        timeout = self._serial.timeout
+        self._serial.timeout = wait
+        try:
+            return self._serial.read(1)
+        finally:
+            self._serial.timeout = timeout
+
+    def _selectable_fd(self) -> Optional[int]:
+        """File descriptor port jika bisa dipakai dengan select (POSIX)."""
+        try:
+            fd = self._serial.fileno()
+        except (AttributeError, NotImplementedError, SerialException, ValueError):
+            return None
+        return fd if isinstance(fd, int) else None
+
+    def query_status(self) -> Optional[Dict[str, Any]]:
+        """Query status mesin dan parse hasilnya.
+
+        Error I/O ditangani oleh state machine koneksi (return None);
+        PacketParseError tetap diteruskan ke pemanggil. Waktu frame selesai
+        dibaca disimpan sebagai ``received_ns`` (wall clock) dan
+        ``received_mono_ns`` (monotonic), keduanya integer nanodetik.
+        """
+        # Kirim query status (command 0x02)
+        query = bytes([0x55, 0xAA, 0x02, 0x00, 0x00, 0x01])
+        with self._io_lock:
+            try:
+                self.discard_pending()
+                if not self.send(query):
+                    return None
+                resp = self.read_frame()
+                # Stempel di titik terima, sebelum parsing dan antrian bus
+                received_mono_ns = time.monotonic_ns()
+                received_ns = time.time_ns()
+            except (SerialException, OSError) as e:
+                logger.error(f"Error querying status: {e}")
+                return None
+
+        if not resp:
+            logger.warning("No response from machine")
+            self._record_timeout()
+            return None
+        self._record_success()
+        with stage("parse"):
+            data = parse_packet(resp)
+        data[RECEIVED_NS] = received_ns
+        data[RECEIVED_MONO_NS] = received_mono_ns
+        return data
+
+    def discard_pending(self) -> None:
+        """Buang sisa byte dari respon sebelumnya agar tidak salah pasang.
+
+        Termasuk balasan yang datang setelah deadline dan masih ada di buffer
+        input OS; tanpa ini setiap query berikutnya membaca frame sebelumnya.
+        """
+        with self._io_lock:
+            self._decoder.clear()
+            reset = getattr(self._serial, "reset_input_buffer", None)
+            if reset is None:
+                return
+            try:
+                reset()
+            except (SerialException, OSError) as e:
+                logger.warning(f"Gagal membuang buffer input {self.port}: {e}")
+
+    def exclusive(self) -> ContextManager[Any]:
+        """Lock bus untuk satu transaksi kirim/terima (re-entrant)."""
+        return self._io_lock
+
+    @property
+    def commands(self) -> CommandQueue:
+        """Antrian command port ini (dibuat saat pertama dipakai)."""
+        if self._commands is None or self._commands.stopped:
+            self._commands = CommandQueue(self)
+        return self._commands
+
+    def submit_command(
+        self,
+        com: int,
+        data: bytes = b"",
+        priority: int = PRIORITY_NORMAL
+    ) -> "Future[Dict[str, Any]]":
+        """Antrikan command ke mesin; Future berisi ack yang sudah di-parse."""
+        return self.commands.submit(com, data, priority)
+
+    def reset_count(self, priority: int = PRIORITY_NORMAL) -> "Future[Dict[str, Any]]":
+        """Reset count mesin (command 0x01)."""
+        return self.submit_command(CMD_RESET, priority=priority)
+
+    def reset_accumulation(self, priority: int = PRIORITY_NORMAL) -> "Future[Dict[str, Any]]":
+        """Reset akumulasi mesin (command 0x04)."""
+        return self.submit_command(CMD_RESET_ACCUMULATION, priority=priority)
+
+    def set_parameter(
+        self,
+        com: int,
+        value: int,
+        priority: int = PRIORITY_NORMAL
+    ) -> "Future[Dict[str, Any]]":
+        """Set panjang/koefisien (command 0x10-0x13) dengan nilai 3 byte."""
+        if com not in CMD_SET_PARAMETERS:
+            raise ValueError(f"Command set tidak dikenal: 0x{com:02X}")
+        if not 0 <= value < (1 << 24):
+            raise ValueError(f"Nilai di luar rentang 24-bit: {value}")
+        return self.submit_command(com, value.to_bytes(3, 'big'), priority)
+
+    def set_target_length(
+        self,
+        length: float,
+        decimal_place: bool = False,
+        priority: int = PRIORITY_NORMAL
+    ) -> "Future[Dict[str, Any]]":
+        """Kirim target panjang roll ke mesin (command 0x10)."""
+        value = int(round(length * 10)) if decimal_place else int(round(length))
+        return self.set_parameter(CMD_SET_LENGTH, value, priority)
+
     def enable_auto_recover(self) -> None:
         """Enable auto recovery jika koneksi terputus."""
         self._auto_recover = True
+        self._stop_event.clear()
 
     def disable_auto_recover(self) -> None:
         """Disable auto recovery."""
         self._auto_recover = False
+        self._stop_event.set()
+
+    def _set_state(self, state: ConnectionState) -> None:
+        """Ubah state koneksi dan beri tahu listener."""
+        with self._state_lock:
+            previous = self._state
+            if previous is state:
+                return
+            self._state = state
+        if state in (ConnectionState.CONNECTED, ConnectionState.DEGRADED):
+            self._connected.set()
+        else:
+            self._connected.clear()
+        logger.info(f"Port {self.port}: {previous.value} -> {state.value}")
+
+        for callback in list(self._state_listeners):
+            try:
+                callback(state)
+            except Exception as e:
+                logger.error(f"Error in connection state callback: {e}")
+
+    def _record_success(self) -> None:
+        """Catat respon valid dari mesin."""
+        self._failures = 0
+        if self._state is ConnectionState.DEGRADED:
+            self._set_state(ConnectionState.CONNECTED)
+
+    def _record_timeout(self) -> None:
+        """Catat query tanpa respon; reconnect jika terlalu sering berturut-turut."""
+        self._failures += 1
+        if self._failures >= self.max_failures:
+            self._handle_io_error(SerialException(f"{self._failures} query tanpa respon"))
+        elif self._state is ConnectionState.CONNECTED:
+            self._set_state(ConnectionState.DEGRADED)
+
+    def _handle_io_error(self, error: Exception) -> None:
+        """Tangani error di jalur I/O: tutup port lalu mulai reconnect."""
+        if self._state in (ConnectionState.RECONNECTING, ConnectionState.CLOSED):
+            return
+        logger.warning(f"Koneksi {self.port} bermasalah: {error}")
+        self._handle_disconnect()
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """Delay backoff eksponensial dengan jitter untuk percobaan ke-``attempt``."""
+        delay = min(self.reconnect_interval * (2 ** attempt), self.max_reconnect_interval)
+        return random.uniform(delay / 2, delay)
+
+    def _needs_reconnect(self) -> bool:
+        """Cek apakah port perlu dibuka ulang."""
+        return (
+            self._serial is None
+            or not self._serial.is_open
+            or self._state is ConnectionState.RECONNECTING
+        )
+
+    def _remap_port(self) -> None:
+        """Ikuti adapter jika nama device node-nya berubah setelah hotplug."""
+        if not self._port_resolver or not self.hardware_key:
+            return
+        device = self._port_resolver(self.hardware_key)
+        if device and device != self.port:
+            logger.info(
+                f"Adapter {self.hardware_key} sekarang di {device} (sebelumnya {self.port})"
+            )
+            self.port = device
 
     def _try_recover(self) -> bool:
         """Coba recover koneksi yang terputus."""
         try:
-            self.close()
-            time.sleep(1)  # Tunggu sebentar sebelum reconnect
+            with self._io_lock:
+                self._close_port()
+            self._remap_port()
             self.open()
             return True
         except Exception as e:
-            logger.error(f"Recovery failed: {e}")
+            logger.debug(f"Recovery failed: {e}")
             return False
 
     def auto_recover(self) -> None:
-        """Loop auto-recover koneksi serial jika terputus."""
-        while self._auto_recover:
-            if not self._serial or not self._serial.is_open:
-                logger.warning("Serial port terputus. Mencoba reconnect...")
-                self._try_recover()
-            time.sleep(5)
+        """Loop reconnect dengan backoff eksponensial + jitter sampai port pulih."""
+        attempt = 0
+        while not self._stop_event.is_set():
+            if not self._needs_reconnect():
+                return
+            if self._try_recover():
+                logger.info(f"Port {self.port} reconnected after {attempt + 1} attempt(s)")
+                return
+            attempt += 1
+            if self.max_reconnect_attempts is not None and attempt >= self.max_reconnect_attempts:
+                logger.error(f"Reconnect {self.port} gagal setelah {attempt} percobaan")
+                self._set_state(ConnectionState.FAILED)
+                return
+            self._stop_event.wait(self._backoff_delay(attempt))
 
     def start_auto_recover(self) -> None:
-        """Jalankan thread auto-recover."""
-        threading.Thread(target=self.auto_recover, daemon=True).start()
+        """Jalankan thread reconnect jika belum berjalan."""
+        if self._recover_thread and self._recover_thread.is_alive():
+            return
+        self._recover_thread = threading.Thread(target=self.auto_recover, daemon=True)
+        self._recover_thread.start()
 
     def stop(self) -> None:
-        """Set stop event untuk auto-recover."""
-        self._auto_recover = False
+        """Hentikan reconnect dan antrian command, lalu tutup port."""
+        self.disable_auto_recover()
+        if self._commands:
+            self._commands.stop()
         self.close()
 
     def set_on_disconnect(self, callback: Callable[[], None]) -> None:
@@ -144,6 +524,17 @@ class JSKSerialPort:
         self._on_disconnect = callback
 
     def _handle_disconnect(self) -> None:
-        self.close()
+        """Tutup port, beri tahu listener, lalu reconnect jika auto-recover aktif."""
+        with self._io_lock:
+            self._close_port()
         if self._on_disconnect:
-            self._on_disconnect() 
\ No newline at end of file
+            self._on_disconnect()
+        if self._auto_recover:
+            self.start_reconnect()
+        else:
+            self._set_state(ConnectionState.FAILED)
+
+    def start_reconnect(self) -> None:
+        """Masuk state reconnecting dan jalankan worker reconnect di background."""
+        self._set_state(ConnectionState.RECONNECTING)
+        self.start_auto_recover()
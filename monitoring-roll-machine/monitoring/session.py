@@ -3,16 +3,30 @@ Manajemen sesi monitoring dan ekspor data.
 """
 import os
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable, TYPE_CHECKING
 import logging
-from .exporter import export_to_csv
+
+from .parser import RECEIVED_KEYS, received_at
+
+if TYPE_CHECKING:
+    from .export_jobs import ExportManager, ExportJob
 
 logger = logging.getLogger(__name__)
 
+
 class MonitoringSession:
-    """Manajemen sesi monitoring dan ekspor data."""
-    def __init__(self, export_dir: str = "exports") -> None:
+    """Manajemen sesi monitoring dan ekspor data.
+
+    Dengan ``run_length``, sampel berturut-turut yang nilainya sama digabung
+    menjadi satu baris dengan kolom ``repeat`` (jumlah sampel) dan ``until``
+    (timestamp sampel terakhir).
+
+    ``timestamp``/``until`` adalah waktu frame diterima dalam integer
+    nanodetik epoch; baru diformat saat ekspor.
+    """
+    def __init__(self, export_dir: str = "exports", run_length: bool = False) -> None:
         self.export_dir = export_dir
+        self.run_length = run_length
         self.data: List[Dict[str, Any]] = []
         self.start_time: Optional[datetime] = None
         self.end_time: Optional[datetime] = None
@@ -33,27 +47,57 @@ class MonitoringSession:
         """Tambah data monitoring ke sesi."""
         if not self.start_time:
             self.start()
+        timestamp, _ = received_at(data)
+        data = {k: v for k, v in data.items() if k not in RECEIVED_KEYS}
+        if self.run_length and self.data and self._same_values(self.data[-1], data):
+            last = self.data[-1]
+            last["repeat"] += 1
+            last["until"] = timestamp
+            return
         data_with_timestamp = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": timestamp,
             **data
         }
+        if self.run_length:
+            data_with_timestamp["repeat"] = 1
+            data_with_timestamp["until"] = timestamp
         self.data.append(data_with_timestamp)
 
+    @staticmethod
+    def _same_values(record: Dict[str, Any], data: Dict[str, Any]) -> bool:
+        """Cek apakah data sama dengan record (tanpa kolom waktu dan repeat)."""
+        keys = record.keys() - {"timestamp", "repeat", "until"}
+        return keys == data.keys() and all(record[k] == data[k] for k in keys)
+
     def end(self) -> str:
         """Akhiri sesi dan ekspor data ke CSV."""
+        filepath = self._finish()
+        from .exporter import export_to_csv
+        export_to_csv(self.data, filepath)
+        logger.info(f"Data diekspor ke: {filepath}")
+        
+        return filepath
+
+    def end_async(
+        self,
+        manager: Optional["ExportManager"] = None,
+        on_done: Optional[Callable[["ExportJob"], None]] = None
+    ) -> "ExportJob":
+        """Akhiri sesi dan ekspor di background; sesi baru bisa langsung dimulai."""
+        filepath = self._finish()
+        from .export_jobs import get_export_manager
+        return (manager or get_export_manager()).submit(self.data, filepath, on_done=on_done)
+
+    def _finish(self) -> str:
+        """Tandai akhir sesi dan tentukan path file ekspor."""
         self.end_time = datetime.now()
         if not self.start_time:
             raise ValueError("Sesi belum dimulai")
+        logger.info(f"Sesi monitoring berakhir: {self.end_time}")
         
         # Format nama file: YYYY-MM-DD_HH-MM-SS.csv
         filename = self.start_time.strftime("%Y-%m-%d_%H-%M-%S") + ".csv"
-        filepath = os.path.join(self.export_dir, filename)
-        
-        export_to_csv(self.data, filepath)
-        logger.info(f"Sesi monitoring berakhir: {self.end_time}")
-        logger.info(f"Data diekspor ke: {filepath}")
-        
-        return filepath
+        return os.path.join(self.export_dir, filename)
 
     def get_current_values(self) -> Dict[str, Any]:
         """Ambil nilai terkini dari data monitoring."""
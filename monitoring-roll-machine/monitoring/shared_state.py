@@ -0,0 +1,361 @@
+"""
+Tabel state terkini per mesin di shared memory, dilindungi seqlock.
+
+Setiap proses akuisisi memiliki segmennya sendiri (``segment_name``) dan
+menjadi satu-satunya writer segmen itu; ia menulis count, speed, shift serta
+panjang ternormalisasi (``length_um``/``total_um``) setiap sampel;
+UI dan proses lain membaca langsung dari memori tanpa syscall maupun
+serialisasi. Setiap slot diawali nomor urut: ganjil berarti sedang ditulis,
+reader mengulang jika nomor urut berubah selama membaca. Header mencatat PID
+writer: segmen milik proses yang masih hidup tidak pernah ditimpa.
+
+Header juga mencatat generasi writer (nol setelah writer ditutup). Setelah
+daemon di-restart reader lama masih memetakan segmen yang sudah di-unlink;
+``SharedStateLink`` mendeteksinya lewat generasi/PID dan attach ulang.
+"""
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Optional, Dict, Any, List
+import logging
+import os
+import re
+import struct
+import time
+
+from .parser import RECEIVED_NS, RECEIVED_MONO_NS
+
+logger = logging.getLogger(__name__)
+
+SHM_NAME = "monitoring_roll_state"
+DEFAULT_SLOTS = 16
+MACHINE_NAME_SIZE = 16
+
+# Header: magic, versi, jumlah slot, PID writer, generasi writer (0 = ditutup)
+_HEADER = struct.Struct("<4sHHI4xQ")
+_MAGIC = b"JSKS"
+_VERSION = 4
+
+# Interval pemeriksaan PID writer oleh reader (syscall, tidak setiap frame)
+PID_CHECK_INTERVAL = 1.0
+
+# Slot: seq, timestamp_ns, nama mesin, count, length_um, total_um, speed, shift, flags, state
+_SEQ = struct.Struct("<Q")
+_SLOT = struct.Struct(f"<Qq{MACHINE_NAME_SIZE}sdqqIBBH")
+
+_FLAG_DECIMAL = 0x01
+_FLAG_YARD = 0x02
+
+# Batas retry reader sebelum menyerah pada slot yang terus ditulis
+_MAX_READ_RETRIES = 100
+
+
+@dataclass(frozen=True)
+class MachineState:
+    """Snapshot konsisten satu slot mesin."""
+    machine: str
+    sequence: int
+    timestamp_ns: int
+    current_count: float
+    current_speed: int
+    shift: int
+    decimal_place: bool
+    unit: str
+    length_um: int = 0
+    total_um: int = 0
+
+    @property
+    def fields(self) -> Dict[str, Any]:
+        """Field dalam format ``parse_fields`` plus ``length_um``/``total_um``."""
+        return {
+            "decimal_place": self.decimal_place,
+            "unit": self.unit,
+            "current_count": self.current_count,
+            "current_speed": self.current_speed,
+            "shift": self.shift,
+            "length_um": self.length_um,
+            "total_um": self.total_um,
+        }
+
+    def to_data(self) -> Dict[str, Any]:
+        """Data dalam format callback ``on_data`` Monitor.
+
+        Slot hanya menyimpan wall clock; stempel monotonic diturunkan dari
+        umur sampel agar ``received_at`` tidak jatuh ke waktu baca UI.
+        """
+        age_ns = max(0, time.time_ns() - self.timestamp_ns)
+        return {
+            "fields": self.fields,
+            RECEIVED_NS: self.timestamp_ns,
+            RECEIVED_MONO_NS: time.monotonic_ns() - age_ns,
+        }
+
+
+def _slot_offset(index: int) -> int:
+    """Offset byte slot ke-``index`` di segmen shared memory."""
+    return _HEADER.size + index * _SLOT.size
+
+
+def segment_size(slots: int = DEFAULT_SLOTS) -> int:
+    """Ukuran segmen shared memory untuk ``slots`` mesin."""
+    return _slot_offset(slots)
+
+
+def segment_name(base: str, machine: str) -> str:
+    """Nama segmen milik daemon mesin ``machine``."""
+    return f"{base}_{re.sub(r'[^A-Za-z0-9_.-]', '_', machine)}"
+
+
+def _pid_alive(pid: int) -> bool:
+    """Apakah proses ``pid`` masih berjalan."""
+    if pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Attach ke segmen yang sudah ada tanpa ikut mengelola umurnya."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13: resource tracker akan meng-unlink segmen saat reader
+        # keluar, jadi daftarkan ulang agar hanya writer yang menghapusnya
+        shm = shared_memory.SharedMemory(name=name)
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+class SharedStateWriter:
+    """Writer tunggal satu segmen state; dipakai oleh satu proses akuisisi.
+
+    Raise ``FileExistsError`` jika segmen ``name`` milik writer yang masih hidup.
+    """
+    def __init__(self, name: str = SHM_NAME, slots: int = DEFAULT_SLOTS) -> None:
+        self.name = name
+        self.slots = slots
+        try:
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=segment_size(slots))
+        except FileExistsError:
+            self._shm = self._reuse_stale(name, slots)
+        self._buf = self._shm.buf
+        self._buf[:segment_size(slots)] = bytes(segment_size(slots))
+        self.generation = time.time_ns()
+        _HEADER.pack_into(self._buf, 0, _MAGIC, _VERSION, slots, os.getpid(), self.generation)
+        self._slots: Dict[str, int] = {}
+        self._sequences = [0] * slots
+
+    @staticmethod
+    def _reuse_stale(name: str, slots: int) -> shared_memory.SharedMemory:
+        """Ambil alih segmen sisa writer yang sudah mati; tolak jika writer masih hidup."""
+        shm = _attach(name)
+        magic, pid = b"", 0
+        if shm.size >= _HEADER.size:
+            magic, _, _, pid, _ = _HEADER.unpack_from(shm.buf, 0)
+        if magic == _MAGIC and _pid_alive(pid):
+            shm.close()
+            raise FileExistsError(f"Shared memory {name} dipakai proses {pid}")
+        if shm.size < segment_size(slots):
+            shm.close()
+            raise ValueError(f"Shared memory {name} terlalu kecil untuk {slots} slot")
+        # Sisa proses akuisisi sebelumnya yang tidak sempat membersihkan
+        logger.warning(f"Shared memory {name} sisa writer {pid} yang sudah berhenti, dipakai ulang")
+        return shm
+
+    def slot_for(self, machine: str) -> int:
+        """Index slot untuk mesin; slot baru dialokasikan saat pertama ditulis."""
+        index = self._slots.get(machine)
+        if index is None:
+            if len(self._slots) >= self.slots:
+                raise ValueError(f"Tabel state penuh ({self.slots} mesin)")
+            index = self._slots[machine] = len(self._slots)
+        return index
+
+    def write(
+        self, machine: str, fields: Dict[str, Any], timestamp_ns: Optional[int] = None
+    ) -> None:
+        """Tulis field terbaru mesin (format ``parse_fields``)."""
+        index = self.slot_for(machine)
+        offset = _slot_offset(index)
+        flags = (_FLAG_DECIMAL if fields.get("decimal_place") else 0)
+        flags |= _FLAG_YARD if fields.get("unit") == "yard" else 0
+
+        seq = self._sequences[index] + 1
+        # Nomor urut ganjil: reader tahu slot sedang ditulis
+        _SEQ.pack_into(self._buf, offset, seq)
+        _SLOT.pack_into(
+            self._buf,
+            offset,
+            seq,
+            timestamp_ns if timestamp_ns is not None else time.time_ns(),
+            machine.encode("utf-8")[:MACHINE_NAME_SIZE],
+            float(fields.get("current_count", 0)),
+            int(fields.get("length_um", 0)),
+            int(fields.get("total_um", 0)),
+            int(fields.get("current_speed", 0)),
+            int(fields.get("shift", 0)),
+            flags,
+            0
+        )
+        self._sequences[index] = seq + 1
+        _SEQ.pack_into(self._buf, offset, seq + 1)
+
+    def close(self) -> None:
+        """Tutup dan hapus segmen shared memory."""
+        # Reader yang masih memetakan segmen ini tahu writer-nya sudah pergi
+        _HEADER.pack_into(self._buf, 0, _MAGIC, _VERSION, self.slots, 0, 0)
+        self._buf.release()
+        self._shm.close()
+        try:
+            self._shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class SharedStateReader:
+    """Reader tabel state; boleh ada banyak di proses mana pun."""
+    def __init__(self, name: str = SHM_NAME) -> None:
+        self.name = name
+        self._shm = _attach(name)
+        self._buf = self._shm.buf
+        header = _HEADER.unpack_from(self._buf, 0)
+        magic, version, self.slots, self.writer_pid, self.generation = header
+        if magic != _MAGIC or version != _VERSION:
+            self.close()
+            raise ValueError(f"Shared memory {name} bukan tabel state versi {_VERSION}")
+        self._pid_checked = 0.0
+
+    @classmethod
+    def attach(cls, name: str = SHM_NAME) -> Optional["SharedStateReader"]:
+        """Attach jika writer sedang berjalan, atau None."""
+        try:
+            reader = cls(name)
+        except (FileNotFoundError, ValueError) as e:
+            logger.debug(f"Shared state {name} belum tersedia: {e}")
+            return None
+        if not reader.is_current():
+            # Sisa writer yang sudah berhenti; writer baru belum membuat segmennya
+            reader.close()
+            return None
+        return reader
+
+    def is_current(self) -> bool:
+        """Writer yang membuat segmen ini masih menulisnya.
+
+        Generasi di header dibaca setiap panggilan; PID writer diperiksa paling
+        sering sekali per ``PID_CHECK_INTERVAL`` (untuk writer yang crash).
+        """
+        *_, pid, generation = _HEADER.unpack_from(self._buf, 0)
+        if generation == 0 or generation != self.generation or pid != self.writer_pid:
+            return False
+        now = time.monotonic()
+        if now - self._pid_checked >= PID_CHECK_INTERVAL:
+            if not _pid_alive(pid):
+                return False
+            self._pid_checked = now
+        return True
+
+    def read(self, index: int) -> Optional[MachineState]:
+        """Snapshot konsisten slot ke-``index``; None jika slot belum pernah ditulis."""
+        offset = _slot_offset(index)
+        for _ in range(_MAX_READ_RETRIES):
+            (before,) = _SEQ.unpack_from(self._buf, offset)
+            if before & 1:
+                continue
+            values = _SLOT.unpack_from(self._buf, offset)
+            (after,) = _SEQ.unpack_from(self._buf, offset)
+            if before == after:
+                break
+        else:
+            logger.warning(f"Slot {index} terus berubah, snapshot dilewati")
+            return None
+
+        seq, timestamp_ns, name, count, length_um, total_um, speed, shift, flags, _ = values
+        if seq == 0:
+            return None
+        return MachineState(
+            machine=name.rstrip(b"\0").decode("utf-8", "replace"),
+            sequence=seq,
+            timestamp_ns=timestamp_ns,
+            current_count=count,
+            current_speed=speed,
+            shift=shift,
+            decimal_place=bool(flags & _FLAG_DECIMAL),
+            unit="yard" if flags & _FLAG_YARD else "meter",
+            length_um=length_um,
+            total_um=total_um
+        )
+
+    def read_all(self) -> List[MachineState]:
+        """Snapshot semua slot yang sudah terisi."""
+        states = []
+        for index in range(self.slots):
+            state = self.read(index)
+            if state is None:
+                break
+            states.append(state)
+        return states
+
+    def read_machine(self, machine: str) -> Optional[MachineState]:
+        """Snapshot terbaru untuk nama mesin tertentu."""
+        for state in self.read_all():
+            if state.machine == machine:
+                return state
+        return None
+
+    def close(self) -> None:
+        """Lepas segmen (tidak menghapusnya)."""
+        self._buf.release()
+        self._shm.close()
+
+
+class SharedStateLink:
+    """Reader segmen ``name`` yang mengikuti writer-nya melewati restart daemon.
+
+    ``reader()`` dipanggil dari satu thread (thread UI) dan mengembalikan reader
+    untuk writer yang sedang berjalan, atau None. Reader yang writer-nya sudah
+    berganti ditutup lalu segmen di-attach ulang; percobaan attach dibatasi
+    sekali per ``retry_interval``. ``reset()`` boleh dipanggil dari thread lain
+    (mis. saat ``DaemonClient`` tersambung ulang) untuk memaksa attach ulang.
+    """
+    def __init__(self, name: str, retry_interval: float = 1.0) -> None:
+        self.name = name
+        self.retry_interval = retry_interval
+        self._reader: Optional[SharedStateReader] = None
+        self._next_attach = 0.0
+        self._reset = False
+
+    def reader(self) -> Optional[SharedStateReader]:
+        """Reader yang masih terhubung ke writer segmen, atau None."""
+        if self._reset:
+            self._reset = False
+            self._detach()
+            self._next_attach = 0.0
+        if self._reader is not None and not self._reader.is_current():
+            logger.info(f"Writer shared state {self.name} berganti, attach ulang")
+            self._detach()
+        if self._reader is None:
+            now = time.monotonic()
+            if now < self._next_attach:
+                return None
+            self._next_attach = now + self.retry_interval
+            self._reader = SharedStateReader.attach(self.name)
+        return self._reader
+
+    def reset(self) -> None:
+        """Attach ulang pada panggilan ``reader()`` berikutnya."""
+        self._reset = True
+
+    def _detach(self) -> None:
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+    def close(self) -> None:
+        """Lepas reader (hanya dari thread yang memanggil ``reader()``)."""
+        self._detach()
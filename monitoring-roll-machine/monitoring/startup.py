@@ -0,0 +1,88 @@
+"""
+Pengukuran waktu startup: milestone aplikasi dan laporan waktu import.
+"""
+from typing import List, Tuple, Optional
+import logging
+import subprocess
+import sys
+import time
+
+logger = logging.getLogger(__name__)
+
+# Titik nol: saat modul ini pertama di-import (awal startup aplikasi)
+_T0 = time.perf_counter()
+
+
+class StartupTimer:
+    """Catat milestone startup relatif terhadap awal proses aplikasi."""
+    def __init__(self, origin: float = _T0) -> None:
+        self.origin = origin
+        self.marks: List[Tuple[str, float]] = []
+
+    def mark(self, name: str) -> float:
+        """Catat milestone sekali saja; return detik sejak awal startup."""
+        for existing, elapsed in self.marks:
+            if existing == name:
+                return elapsed
+        elapsed = time.perf_counter() - self.origin
+        self.marks.append((name, elapsed))
+        logger.info(f"Startup: {name} setelah {elapsed * 1000:.0f} ms")
+        return elapsed
+
+    def has_mark(self, name: str) -> bool:
+        """Cek apakah milestone sudah dicatat."""
+        return any(existing == name for existing, _ in self.marks)
+
+    def summary(self) -> str:
+        """Ringkasan semua milestone dalam milidetik."""
+        return "\n".join(f"{elapsed * 1000:8.0f} ms  {name}" for name, elapsed in self.marks)
+
+
+startup_timer = StartupTimer()
+
+
+def parse_importtime(output: str) -> List[Tuple[int, int, str]]:
+    """Parse output ``-X importtime`` menjadi (cumulative_us, self_us, module)."""
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            rows.append((int(cumulative_us), int(self_us), name.strip()))
+        except ValueError:
+            continue
+    return rows
+
+
+def measure_import_times(module: str, top: int = 25) -> List[Tuple[int, int, str]]:
+    """Import ``module`` di proses baru dengan ``-X importtime``; return modul terlambat."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=False
+    )
+    if result.returncode != 0:
+        logger.error(f"Import {module} gagal: {result.stderr.strip().splitlines()[-1:]}")
+    rows = parse_importtime(result.stderr)
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+def format_import_report(
+    module: str,
+    rows: List[Tuple[int, int, str]],
+    total_us: Optional[int] = None
+) -> str:
+    """Format laporan waktu import seperti tabel ``-X importtime``."""
+    total = total_us if total_us is not None else (rows[0][0] if rows else 0)
+    lines = [f"Import time {module}: {total / 1000:.1f} ms", "cumulative [ms] | self [ms] | module"]
+    for cumulative, self_us, name in rows:
+        lines.append(f"{cumulative / 1000:15.1f} | {self_us / 1000:9.1f} | {name}")
+    return "\n".join(lines)
+
+
+def import_time_report(module: str = "monitoring.ui.main_window", top: int = 25) -> str:
+    """Ukur dan format laporan waktu import untuk ``module``."""
+    return format_import_report(module, measure_import_times(module, top))
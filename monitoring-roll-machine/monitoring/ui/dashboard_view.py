@@ -0,0 +1,248 @@
+"""
+Supervisor dashboard: speed trends of every machine in one OpenGL view.
+
+All traces live in one shared ``MultiTraceBuffer`` fed from the shared-memory
+state segments of the acquisition daemons listed in ``dashboard_machines``
+(one segment per daemon). A single ``TraceLanes`` item paints every
+machine in its own horizontal lane in one ``paint()`` call on an OpenGL
+viewport. A trace's path is only rebuilt when that machine got new samples
+or its lane scale changed; scrolling only moves the view range.
+"""
+import sys
+import time
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pyqtgraph as pg
+from PySide6.QtCore import Qt, QTimer, QRectF
+from PySide6.QtGui import QCloseEvent, QPainterPath
+from PySide6.QtWidgets import QApplication, QLabel, QVBoxLayout, QWidget
+
+from ..config import get_config
+from ..logging_utils import setup_logging
+from ..profiling import get_profiler, stage
+from ..ringbuffer import MultiTraceBuffer, nice_limits
+from ..shared_state import SharedStateLink, SHM_NAME, DEFAULT_SLOTS, segment_name
+
+logger = logging.getLogger(__name__)
+
+# Share of a lane's height used by its trace; the rest separates the lanes
+LANE_FILL = 0.8
+# x values are stored relative to an origin so float32 GL coordinates stay precise
+REBASE_AFTER_S = 24 * 3600
+
+
+class TimeAxis(pg.AxisItem):
+    """Bottom axis showing wall-clock time for x values relative to ``origin``."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.origin = 0.0
+
+    def tickStrings(self, values, scale, spacing):
+        return [time.strftime("%H:%M:%S", time.localtime(self.origin + value)) for value in values]
+
+
+class TraceLanes(pg.GraphicsObject):
+    """Every trace of a ``MultiTraceBuffer`` in its own lane, painted in one pass.
+
+    Lane ``i`` spans y = -(i + 1) .. -i and is scaled to the trace's
+    rounded min/max over the visible window.
+    """
+
+    def __init__(self, buffer: MultiTraceBuffer):
+        super().__init__()
+        self.buffer = buffer
+        self.origin: Optional[float] = None
+        self._paths: List[Optional[QPainterPath]] = [None] * buffer.traces
+        self._versions = [-1] * buffer.traces
+        self._scales: List[Optional[Tuple[float, float, float]]] = [None] * buffer.traces
+        self._pens = [
+            pg.mkPen(pg.intColor(i, hues=buffer.traces), width=1.5) for i in range(buffer.traces)
+        ]
+        self._bounds = QRectF()
+
+    def refresh(self, now: float) -> bool:
+        """Rebuild the paths of traces that changed; return True if any did."""
+        if self.origin is not None and now - self.origin > REBASE_AFTER_S:
+            self.origin = None
+            self._versions = [-1] * self.buffer.traces
+        changed = False
+        for index in range(len(self.buffer.names)):
+            limits = self.buffer.limits(index, now)
+            scale = nice_limits(*limits) if limits else None
+            version = self.buffer.versions[index]
+            if version == self._versions[index] and scale == self._scales[index]:
+                continue
+            self._versions[index] = version
+            self._scales[index] = scale
+            self._paths[index] = self._build_path(index, scale)
+            changed = True
+        if changed:
+            bounds = QRectF()
+            for path in self._paths:
+                if path is not None:
+                    bounds = bounds.united(path.boundingRect())
+            self.prepareGeometryChange()
+            self._bounds = bounds
+            self.update()
+        return changed
+
+    def _build_path(
+        self, index: int, scale: Optional[Tuple[float, float, float]]
+    ) -> Optional[QPainterPath]:
+        """Path of one trace in lane coordinates."""
+        if scale is None:
+            return None
+        with self.buffer.lock:
+            segments = self.buffer.segments(index)
+            # Views on the shared arrays; concatenate copies them out under the lock
+            times = np.frombuffer(self.buffer.times, dtype=np.float64)
+            values = np.frombuffer(self.buffer.values, dtype=np.float64)
+            x = np.concatenate([times[start:stop] for start, stop in segments])
+            y = np.concatenate([values[start:stop] for start, stop in segments])
+        if not len(x):
+            return None
+        if self.origin is None:
+            self.origin = float(x[0])
+        ymin, ymax, _ = scale
+        x -= self.origin
+        y = (y - ymin) * (LANE_FILL / (ymax - ymin)) - (index + 1) + (1 - LANE_FILL) / 2
+        return pg.arrayToQPath(x, y, connect="all")
+
+    def boundingRect(self) -> QRectF:
+        return self._bounds
+
+    def paint(self, painter, *args):
+        for path, pen in zip(self._paths, self._pens):
+            if path is not None:
+                painter.setPen(pen)
+                painter.drawPath(path)
+
+
+class DashboardView(QWidget):
+    """Scrolling speed lanes for every machine reported by the acquisition daemon."""
+
+    def __init__(self, config=None):
+        super().__init__()
+        self.config = config or get_config()
+        self.buffer = MultiTraceBuffer(
+            DEFAULT_SLOTS, window_s=self.config.get("plot_window_s", 600.0)
+        )
+        base = self.config.get("shared_state_name", SHM_NAME)
+        machines = self.config.get("dashboard_machines", ["default"])
+        # One link per daemon segment; each re-attaches when its daemon restarts
+        self.shared_states = [SharedStateLink(segment_name(base, machine)) for machine in machines]
+        self._attached = -1
+        self._sequences: Dict[str, int] = {}
+        self._last_speed: Dict[str, float] = {}
+        self._ticks = None
+
+        self.setup_ui()
+
+        self.frame_timer = QTimer(self)
+        self.frame_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.frame_timer.timeout.connect(self.update_frame)
+        self.frame_timer.start(max(1, 1000 // self.config.get("dashboard_fps", 30)))
+
+    def setup_ui(self):
+        """Set up one plot holding every lane."""
+        layout = QVBoxLayout(self)
+
+        self.status_label = QLabel("Waiting for the acquisition daemon...")
+        self.status_label.setStyleSheet("color: #888888; font-size: 12px;")
+        layout.addWidget(self.status_label)
+
+        self.time_axis = TimeAxis(orientation="bottom")
+        self.plot_widget = pg.PlotWidget(axisItems={"bottom": self.time_axis})
+        try:
+            # QPainter on a QOpenGLWidget viewport: the lanes are drawn by the GPU
+            self.plot_widget.useOpenGL(True)
+        except Exception as e:
+            logger.warning(f"OpenGL viewport not available, drawing in software: {e}")
+        self.plot_widget.setBackground("#1e1e1e")
+
+        plot = self.plot_widget.getPlotItem()
+        plot.setMouseEnabled(x=False, y=False)
+        plot.hideButtons()
+        plot.showGrid(x=True, y=False, alpha=0.2)
+        self.lanes = TraceLanes(self.buffer)
+        plot.addItem(self.lanes)
+        layout.addWidget(self.plot_widget, stretch=1)
+
+    def add_sample(self, machine: str, timestamp: float, speed: float):
+        """Add one speed sample (epoch seconds) to a machine's trace."""
+        try:
+            self.buffer.add(machine, timestamp, speed)
+        except ValueError as e:
+            if machine not in self._last_speed:
+                logger.warning(str(e))
+                self._last_speed[machine] = speed
+            return
+        self._last_speed[machine] = speed
+
+    def poll_shared_state(self):
+        """Take the samples every running daemon wrote since the last frame."""
+        readers = [reader for reader in (link.reader() for link in self.shared_states) if reader]
+        if len(readers) != self._attached:
+            self._attached = len(readers)
+            total = len(self.shared_states)
+            self.status_label.setText(f"Shared state: {self._attached}/{total} daemons")
+        for reader in readers:
+            for state in reader.read_all():
+                if self._sequences.get(state.machine) == state.sequence:
+                    continue
+                self._sequences[state.machine] = state.sequence
+                self.add_sample(state.machine, state.timestamp_ns / 1e9, state.current_speed)
+
+    def update_frame(self):
+        """Poll new samples, rebuild changed lanes and scroll; one call per frame."""
+        get_profiler().checkpoint()
+        with stage("plot"):
+            self.poll_shared_state()
+            now = time.time()
+            self.lanes.refresh(now)
+            self._update_lane_labels()
+            if self.lanes.origin is not None:
+                self.time_axis.origin = self.lanes.origin
+                x = now - self.lanes.origin
+                self.plot_widget.setXRange(x - self.buffer.window_s, x, padding=0)
+
+    def _update_lane_labels(self):
+        """Show machine name and latest speed on the left axis when they change."""
+        ticks = [
+            (-(index + 0.5), f"{name}  {self._last_speed.get(name, 0.0):.0f} m/min")
+            for index, name in enumerate(self.buffer.names)
+        ]
+        if ticks == self._ticks:
+            return
+        if self._ticks is None or len(ticks) != len(self._ticks):
+            self.plot_widget.setYRange(-max(len(ticks), 1), 0, padding=0)
+        self._ticks = ticks
+        self.plot_widget.getAxis("left").setTicks([ticks])
+
+    def closeEvent(self, event: QCloseEvent):
+        """Stop the frame tick and detach from shared memory."""
+        self.frame_timer.stop()
+        for link in self.shared_states:
+            link.close()
+        event.accept()
+
+
+def main():
+    """Run the dashboard as a standalone window."""
+    setup_logging()
+    get_profiler().install_signal_handler()
+    app = QApplication(sys.argv)
+    app.setStyle("Fusion")
+
+    view = DashboardView()
+    view.setWindowTitle("Roll Machine Dashboard")
+    view.showMaximized()
+
+    sys.exit(app.exec())
+
+
+if __name__ == "__main__":
+    main()
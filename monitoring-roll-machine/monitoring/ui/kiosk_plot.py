@@ -0,0 +1,138 @@
+"""
+Plot Kivy inkremental untuk grafik kiosk.
+
+Vertex mesh disimpan di list yang dialokasi sekali (satu slot per titik
+``TimeSeries``); sampel baru hanya menulis satu slot di list itu. ``Mesh``
+Kivy tidak punya update parsial, sehingga buffer tetap dikirim utuh (O(kapasitas)),
+tetapi paling banyak sekali per scroll walau beberapa sampel masuk sekaligus.
+Sumbu x grafik tetap ``[-window_s, 0]`` detik relatif terhadap sekarang, dan
+scroll dilakukan dengan mengubah ``Translate``/``Scale`` mesh, bukan menghitung
+ulang vertex.
+"""
+from typing import Optional, Tuple
+
+from kivy.graphics import Color, Mesh, PushMatrix, PopMatrix, Translate, Scale
+from kivy_garden.graph import Plot
+
+from ..ringbuffer import TimeSeries, nice_limits
+
+# Vertex disimpan relatif terhadap origin agar presisi float32 GPU cukup
+REBASE_AFTER_S = 24 * 3600
+
+
+class RingMeshPlot(Plot):
+    """Garis dari ``TimeSeries`` dengan vertex yang diperbarui di tempat."""
+    def __init__(self, series: TimeSeries, **kwargs):
+        self.series = series
+        self.origin: Optional[float] = None
+        self.now = 0.0
+        # Format vertex Mesh bawaan: x, y, u, v
+        self._vertices = [0.0] * (4 * series.capacity)
+        # Index line_strip untuk ring: potongan dari urutan slot yang digandakan
+        self._index_base = list(range(series.capacity)) * 2
+        # Vertex sudah berubah tetapi belum dikirim ke mesh
+        self._dirty = False
+        super().__init__(**kwargs)
+
+    def create_drawings(self):
+        self._color = Color(*self.color)
+        self._translate = Translate()
+        self._scale = Scale()
+        self._mesh = Mesh(mode="line_strip")
+        self.bind(color=lambda instr, value: setattr(self._color, "rgba", value))
+        return [self._color, PushMatrix(), self._translate, self._scale, self._mesh, PopMatrix()]
+
+    def add(self, timestamp: float, value: float) -> None:
+        """Tambah sampel (detik epoch); mesh diperbarui pada ``scroll_to`` berikutnya."""
+        if self.origin is None:
+            self.origin = timestamp
+        elif timestamp - self.origin > REBASE_AFTER_S:
+            self._rebase(timestamp)
+        slot, _ = self.series.add(timestamp, value)
+        self._vertices[4 * slot] = timestamp - self.origin
+        self._vertices[4 * slot + 1] = value
+        self._dirty = True
+
+    def load(self, points) -> None:
+        """Ganti isi plot dengan titik (detik epoch, nilai) terurut."""
+        self.series.clear()
+        self.origin = None
+        for timestamp, value in points:
+            if self.origin is None:
+                self.origin = timestamp
+            slot, _ = self.series.add(timestamp, value)
+            self._vertices[4 * slot] = timestamp - self.origin
+            self._vertices[4 * slot + 1] = value
+        self._upload()
+
+    def scroll_to(self, now: float) -> None:
+        """Geser sumbu x sehingga 0 = ``now``; vertex dikirim hanya jika ada sampel baru."""
+        self.now = now
+        if self._dirty:
+            self._upload()
+        self.draw()
+
+    def draw(self, *args):
+        params = self.params
+        x0, y0, x1, y1 = params["size"]
+        xspan = params["xmax"] - params["xmin"]
+        yspan = params["ymax"] - params["ymin"]
+        if not xspan or not yspan:
+            return
+        sx = (x1 - x0) / xspan
+        sy = (y1 - y0) / yspan
+        # Vertex x = t - origin, sumbu x = t - now
+        offset = self.now - self.origin if self.origin is not None else 0.0
+        self._scale.x = sx
+        self._scale.y = sy
+        self._translate.x = x0 + (-offset - params["xmin"]) * sx
+        self._translate.y = y0 - params["ymin"] * sy
+
+    def _upload(self) -> None:
+        """Kirim seluruh vertex dan urutan index ring ke mesh."""
+        self._dirty = False
+        ring = self.series.ring
+        start = ring.oldest_slot
+        self._mesh.vertices = self._vertices
+        self._mesh.indices = self._index_base[start:start + len(ring)]
+
+    def _rebase(self, timestamp: float) -> None:
+        """Pindahkan origin (sekali sehari) agar vertex tetap kecil."""
+        shift = timestamp - self.origin
+        for slot in range(self.series.capacity):
+            self._vertices[4 * slot] -= shift
+        self.origin = timestamp
+
+
+class ScrollingGraph:
+    """Menghubungkan ``RingMeshPlot`` ke ``Graph``: scroll dan autoscale sumbu y."""
+    def __init__(self, graph, plot: RingMeshPlot, window_s: float) -> None:
+        self.graph = graph
+        self.plot = plot
+        self._limits: Optional[Tuple[float, float, float]] = None
+        self.set_window(window_s)
+        graph.add_plot(plot)
+
+    def set_window(self, window_s: float) -> None:
+        """Lebar jendela waktu yang ditampilkan."""
+        self.plot.series.set_window(window_s)
+        self.graph.xmin = -window_s
+        self.graph.xmax = 0
+        self.graph.x_ticks_major = window_s / 4
+
+    def add(self, timestamp: float, value: float) -> None:
+        """Tambah sampel lalu scroll dan sesuaikan sumbu y."""
+        self.plot.add(timestamp, value)
+        self.refresh(timestamp)
+
+    def refresh(self, now: float) -> None:
+        """Scroll ke ``now`` dan autoscale atas min/max jendela."""
+        self.plot.scroll_to(now)
+        limits = self.plot.series.limits(now)
+        if limits is None:
+            return
+        nice = nice_limits(*limits)
+        if nice != self._limits:
+            # Label sumbu hanya digambar ulang saat batasnya berubah
+            self._limits = nice
+            self.graph.ymin, self.graph.ymax, self.graph.y_ticks_major = nice
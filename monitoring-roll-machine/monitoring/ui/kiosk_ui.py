@@ -2,47 +2,85 @@
 Kiosk UI untuk monitoring mesin roll menggunakan Kivy dan KivyMD.
 """
 from pathlib import Path
-import serial.tools.list_ports
 import logging
-from typing import List, Optional, Dict, Any
+import threading
+import time
+from typing import List, Optional, Dict, Any, Callable, TYPE_CHECKING
 from datetime import datetime
-import os
 
 from kivy.metrics import dp
 from kivy.clock import Clock
-from kivy.properties import BooleanProperty, StringProperty, ObjectProperty
 from kivy.uix.boxlayout import BoxLayout
-from kivy.uix.gridlayout import GridLayout
 from kivy.core.window import Window
-from kivy.app import App
 
 from kivymd.app import MDApp
 from kivymd.uix.button import MDButton, MDButtonText, MDButtonIcon
 from kivymd.uix.label import MDLabel
-from kivymd.uix.menu import MDDropdownMenu
 from kivymd.uix.progressindicator import MDCircularProgressIndicator
 from kivymd.uix.scrollview import MDScrollView
 from kivymd.uix.selectioncontrol import MDSwitch
-from kivymd.icon_definitions import md_icons
 from kivymd.uix.behaviors.focus_behavior import StateFocusBehavior
 from kivymd.uix.boxlayout import MDBoxLayout
 from kivymd.uix.card import MDCard
 from kivymd.uix.textfield import MDTextField
-from kivymd.uix.dialog import MDDialog
-from kivy_garden.graph import Graph, MeshLinePlot
-from collections import deque
-import csv
-
-from ..monitor import Monitor
-from ..serial_handler import JSKSerialPort
-from ..config import load_config, save_config
+
+from ..ports import get_port_registry, PortInfo
+from ..config import get_config, ConfigError
 from ..logging_utils import setup_logging
+from ..normalize import convert_length
+from ..parser import received_at
+from ..profiling import get_profiler, stage
+from ..startup import startup_timer
+from .view_model import (
+    ViewModel, monitor_values, eta_value, format_eta, forecast_value, format_forecast
+)
+
+if TYPE_CHECKING:
+    from ..monitor import Monitor
+    from ..serial_handler import ConnectionState
+    from ..query import HistoryPoint
+    from ..export_jobs import ExportJob
+    from ..journal import Event
+
+# Menu, dialog, grafik, CSV dan stack serial/monitor di-import saat pertama dipakai
 
 logger = logging.getLogger(__name__)
 
+
+def _clock(fmt: str) -> Callable[[int], str]:
+    return lambda seconds: datetime.fromtimestamp(seconds).strftime(fmt)
+
+
+# Teks label status per field view-model
+STATUS_FORMATS = {
+    "length": lambda value: f"Rolled Length: {value:.1f} m",
+    "speed": lambda value: f"Speed: {value:.1f} m/min",
+    "shift": lambda value: f"Shift: {value}",
+    "target_reached": lambda reached: (
+        "Target Status: -" if reached is None
+        else "Target Status: Reached ✅" if reached else "Target Status: Not Reached ❌"
+    ),
+    "roll_eta": lambda value: f"Roll ETA: {format_eta(value)}",
+    "shift_forecast": lambda value: f"Shift Forecast: {format_forecast(value)}",
+    "alert": lambda alert: (
+        f"{datetime.fromtimestamp(alert[0]):%H:%M:%S} "
+        f"{alert[1].replace('_', ' ').title()}: {alert[2]}"
+    ),
+    "clock": _clock("%Y-%m-%d %H:%M:%S"),
+    "time": _clock("%H:%M:%S"),
+}
+
+
 class FormField(BoxLayout, StateFocusBehavior):
     """A single form field with label and input."""
-    def __init__(self, label_text: str, hint_text: str, input_filter: Optional[str] = None, readonly: bool = False, **kwargs):
+    def __init__(
+        self,
+        label_text: str,
+        hint_text: str,
+        input_filter: Optional[str] = None,
+        readonly: bool = False,
+        **kwargs
+    ):
         super().__init__(**kwargs)
         self.orientation = "vertical"
         self.spacing = dp(8)  # Increased spacing
@@ -80,6 +118,7 @@ class FormField(BoxLayout, StateFocusBehavior):
         self.add_widget(self.label)
         self.add_widget(self.text_field)
 
+
 class ProductForm(MDCard):
     """Form untuk input informasi produk."""
     def __init__(self, **kwargs):
@@ -261,6 +300,7 @@ class ProductForm(MDCard):
                     "on_release": lambda x: None,
                 })
             
+            from kivymd.uix.menu import MDDropdownMenu
             self.item_menu = MDDropdownMenu(
                 caller=self.item_code_button,
                 items=menu_items,
@@ -284,6 +324,7 @@ class ProductForm(MDCard):
                 }
             ]
             
+            from kivymd.uix.menu import MDDropdownMenu
             self.unit_menu = MDDropdownMenu(
                 caller=self.unit_button,
                 items=menu_items,
@@ -318,8 +359,8 @@ class ProductForm(MDCard):
         try:
             actual_length = float(self.actual_length_field.text_field.text or 0)
             if self.unit_button.text == "yard":
-                # Convert meters to yards (1 meter = 1.09361 yards)
-                converted = actual_length * 1.09361
+                # Lewat mikrometer: 1 yard = 0,9144 m eksak
+                converted = convert_length(actual_length, "meter", "yard")
                 self.converted_length_field.text_field.text = f"{converted:.2f} yard"
             else:
                 # Keep in meters
@@ -351,6 +392,7 @@ class ProductForm(MDCard):
         ]
         self.item_menu = None  # Reset menu to update items
 
+
 class MachineStatus(MDCard):
     """Panel untuk menampilkan status mesin."""
     def __init__(self, **kwargs):
@@ -359,7 +401,7 @@ class MachineStatus(MDCard):
         self.padding = dp(20)
         self.spacing = dp(16)
         self.size_hint_y = None
-        self.height = dp(400)  # Increased height
+        self.height = dp(530)  # Increased height
         self.elevation = 2
         self.radius = [dp(8)]
 
@@ -509,22 +551,57 @@ class MachineStatus(MDCard):
         info_box.add_widget(shift_box)
         info_box.add_widget(time_box)
 
+        self.target_status = MDLabel(
+            text="Target Status: -",
+            theme_text_color="Secondary",
+            role="medium",
+            halign="center",
+            size_hint_y=None,
+            height=dp(30)
+        )
+        self.roll_eta = MDLabel(
+            text="Roll ETA: -",
+            theme_text_color="Secondary",
+            role="medium",
+            halign="center",
+            size_hint_y=None,
+            height=dp(30)
+        )
+        self.shift_forecast = MDLabel(
+            text="Shift Forecast: -",
+            theme_text_color="Secondary",
+            role="medium",
+            halign="center",
+            size_hint_y=None,
+            height=dp(30)
+        )
+        # Anomali terakhir (stall, slip, speed drop, glitch counter)
+        self.alert = MDLabel(
+            text="",
+            theme_text_color="Error",
+            role="medium",
+            halign="center",
+            size_hint_y=None,
+            height=dp(30)
+        )
+
         # Add all status components
         for widget in [
             self.rolled_length,
             self.rolled_length_unit,
             self.speed,
             self.speed_unit,
-            info_box
+            info_box,
+            self.target_status,
+            self.roll_eta,
+            self.shift_forecast,
+            self.alert
         ]:
             self.add_widget(widget)
 
-        # Start clock update
-        Clock.schedule_interval(self.update_time, 1)
-
-    def update_time(self, dt):
-        """Update current time display."""
-        self.current_time.text = datetime.now().strftime("%H:%M:%S")
+    def update_time(self, text: str):
+        """Update current time display (dipanggil dari tick aplikasi)."""
+        self.current_time.text = text
 
     def update_connection_status(self, connected: bool):
         """Update connection status display."""
@@ -543,6 +620,7 @@ class MachineStatus(MDCard):
         self.speed.text = f"{speed:.1f}"
         self.shift.text = str(shift)
 
+
 class ConnectionSettings(MDCard):
     """Panel untuk pengaturan koneksi serial."""
     def __init__(self, **kwargs):
@@ -581,8 +659,24 @@ class ConnectionSettings(MDCard):
             bold=True
         )
         
+        # Diagnostik: snapshot profiling thread monitor dan UI
+        self.profile_text = MDButtonText(
+            text="Profile",
+        )
+        self.profile_button = MDButton(
+            MDButtonIcon(
+                icon="speedometer",
+            ),
+            self.profile_text,
+            style="text",
+            size_hint_x=None,
+            width=dp(140)
+        )
+        self.profile_button.bind(on_release=lambda *_: MDApp.get_running_app().capture_profile())
+
         title_box.add_widget(title_icon)
         title_box.add_widget(title)
+        title_box.add_widget(self.profile_button)
         self.add_widget(title_box)
 
         # Port selection with large touch targets
@@ -710,15 +804,17 @@ class ConnectionSettings(MDCard):
         info_box.add_widget(self.last_connected)
         self.add_widget(info_box)
 
-        # Initialize port menu
+        # Initialize port menu; port list comes from the background registry
         self.port_menu = None
-        self.refresh_ports()
+        self.registry = get_port_registry()
+        self.port_spinner.active = not self.registry.is_ready
+        self.registry.subscribe(self._on_ports_changed)
 
     def show_port_menu(self, button):
         """Show the port selection dropdown menu."""
         if not self.port_menu:
             menu_items = []
-            ports = list(serial.tools.list_ports.comports())
+            ports = self.available_ports
             
             if not ports:
                 menu_items.append({
@@ -729,11 +825,12 @@ class ConnectionSettings(MDCard):
             else:
                 for port in ports:
                     menu_items.append({
-                        "text": port.device,
+                        "text": port,
                         "viewclass": "OneLineListItem",
-                        "on_release": lambda x, p=port.device: self.select_port(p),
+                        "on_release": lambda x, p=port: self.choose_port(p),
                     })
             
+            from kivymd.uix.menu import MDDropdownMenu
             self.port_menu = MDDropdownMenu(
                 caller=self.port_button,
                 items=menu_items,
@@ -753,6 +850,28 @@ class ConnectionSettings(MDCard):
             self.port_menu.dismiss()
             self.port_menu = None
 
+    def choose_port(self, port_name: str) -> None:
+        """Port dipilih operator: tampilkan lalu simpan ke konfigurasi."""
+        self.select_port(port_name)
+        if port_name:
+            self._save_port(port_name)
+
+    def _save_port(self, port_name: str) -> None:
+        """Simpan port dan key adapternya; monitor yang berjalan ikut pindah port."""
+        try:
+            get_config().update({
+                "serial_port": port_name,
+                "serial_port_key": self.registry.key_for(port_name),
+            })
+        except ConfigError as e:
+            logger.error(f"Error saving port: {e}")
+
+    def _configured_port(self) -> Optional[str]:
+        """Port tersimpan, diikuti lewat key adapter jika nama device berubah."""
+        config = get_config()
+        port_key = config.get("serial_port_key")
+        return (port_key and self.registry.resolve(port_key)) or config.get("serial_port")
+
     def _set_no_port_state(self):
         """Set UI state when no port is available."""
         self.port_button.text = "PORT"  # Keep showing PORT as the button text
@@ -764,19 +883,27 @@ class ConnectionSettings(MDCard):
         self._is_port_available = False
 
     def refresh_ports(self, *args) -> None:
-        """Refresh the list of available serial ports."""
+        """Minta registry mengenumerasi ulang port serial di background."""
         self.port_spinner.active = True
-        self.available_ports = []
-        
+        self.registry.refresh()
+
+    def _on_ports_changed(self, ports: List[PortInfo]) -> None:
+        """Terima daftar port dari thread registry dan pindahkan ke thread UI."""
+        Clock.schedule_once(lambda dt: self.update_ports([p.device for p in ports]))
+
+    def update_ports(self, devices: List[str]) -> None:
+        """Tampilkan daftar port serial terbaru."""
+        self.available_ports = devices
         try:
-            ports = list(serial.tools.list_ports.comports())
-            self.available_ports = [port.device for port in ports]
-            
             if self.available_ports:
                 # Check if currently selected port is still available
                 current_port = self.port_button.text
+                configured = self._configured_port()
                 if current_port != "PORT" and current_port in self.available_ports:
                     self.select_port(current_port)
+                elif configured in self.available_ports:
+                    # Pilihan tersimpan didahulukan saat pertama kali daftar port tiba
+                    self.select_port(configured)
                 else:
                     self.select_port(self.available_ports[0])
                 self.port_status.text = "Silakan pilih port yang tersedia"
@@ -793,7 +920,6 @@ class ConnectionSettings(MDCard):
         finally:
             self.port_spinner.active = False
             self.port_menu = None
-            logger.info(f"Found ports: {self.available_ports}")
 
     def get_selected_port(self) -> str:
         """Get the currently selected port."""
@@ -805,6 +931,7 @@ class ConnectionSettings(MDCard):
         """Get auto-connect setting."""
         return self.auto_connect.active and self._is_port_available
 
+
 class ControlButtons(MDBoxLayout):
     """Panel untuk tombol kontrol."""
     def __init__(self, **kwargs):
@@ -826,10 +953,11 @@ class ControlButtons(MDBoxLayout):
         )
 
         # Save button
+        self.save_text = MDButtonText(
+            text="Save Data",
+        )
         self.save_button = MDButton(
-            MDButtonText(
-                text="Save Data",
-            ),
+            self.save_text,
             style="filled",
             md_bg_color=(0.2, 0.2, 0.8, 1),  # Blue
             size_hint_x=0.5,
@@ -839,20 +967,23 @@ class ControlButtons(MDBoxLayout):
         self.add_widget(self.start_button)
         self.add_widget(self.save_button)
 
+
 class Statistics(MDCard):
     """Panel untuk statistik dan visualisasi data."""
-    def __init__(self, **kwargs):
+    def __init__(self, window_s: float = 600.0, **kwargs):
         super().__init__(**kwargs)
         self.orientation = "vertical"
         self.padding = dp(20)
         self.spacing = dp(10)
         self.elevation = 2
 
-        # Data storage
-        self.max_points = 100
-        self.length_data = deque(maxlen=self.max_points)
-        self.speed_data = deque(maxlen=self.max_points)
-        self.timestamps = deque(maxlen=self.max_points)
+        # Deret waktu berkapasitas tetap; grafik hanya memperbarui slot yang berubah
+        from ..ringbuffer import TimeSeries
+        self.window_s = window_s
+        self.length_series = TimeSeries(window_s=self.window_s)
+        self.speed_series = TimeSeries(window_s=self.window_s)
+        # True selama grafik menampilkan rollup historis (jendela diperlebar)
+        self._showing_history = False
 
         # Title
         title = MDLabel(
@@ -864,103 +995,128 @@ class Statistics(MDCard):
         )
         self.add_widget(title)
 
-        # Graphs layout
-        graphs_layout = MDBoxLayout(
+        # Graphs layout; grafik dibuat setelah frame pertama (kivy_garden.graph lambat di-import)
+        self.graphs_layout = MDBoxLayout(
             orientation="horizontal",
             spacing=dp(10)
         )
+        self.add_widget(self.graphs_layout)
+        self.length_plot = None
+        self.speed_plot = None
+        Clock.schedule_once(self.create_graphs)
+
+    def create_graphs(self, *args) -> None:
+        """Buat grafik panjang dan kecepatan dengan sumbu waktu yang bergulir."""
+        from kivy_garden.graph import Graph
+        from .kiosk_plot import RingMeshPlot, ScrollingGraph
 
         # Length graph
         self.length_graph = Graph(
-            xlabel='Time',
+            xlabel='Time (s)',
             ylabel='Length (m)',
             x_ticks_minor=5,
-            x_ticks_major=25,
             y_ticks_major=10,
             y_grid=True,
             x_grid=True,
             padding=5,
             x_grid_label=True,
             y_grid_label=True,
-            xmin=0,
-            xmax=100,
             ymin=0,
             ymax=50
         )
-        self.length_plot = MeshLinePlot(color=[0, 1, 0, 1])
-        self.length_graph.add_plot(self.length_plot)
-        graphs_layout.add_widget(self.length_graph)
+        self.length_plot = ScrollingGraph(
+            self.length_graph,
+            RingMeshPlot(self.length_series, color=[0, 1, 0, 1]),
+            self.window_s
+        )
+        self.graphs_layout.add_widget(self.length_graph)
 
         # Speed graph
         self.speed_graph = Graph(
-            xlabel='Time',
-            ylabel='Speed (m/s)',
+            xlabel='Time (s)',
+            ylabel='Speed (m/min)',
             x_ticks_minor=5,
-            x_ticks_major=25,
             y_ticks_major=1,
             y_grid=True,
             x_grid=True,
             padding=5,
             x_grid_label=True,
             y_grid_label=True,
-            xmin=0,
-            xmax=100,
             ymin=0,
             ymax=5
         )
-        self.speed_plot = MeshLinePlot(color=[1, 0, 0, 1])
-        self.speed_graph.add_plot(self.speed_plot)
-        graphs_layout.add_widget(self.speed_graph)
-
-        self.add_widget(graphs_layout)
+        self.speed_plot = ScrollingGraph(
+            self.speed_graph,
+            RingMeshPlot(self.speed_series, color=[1, 0, 0, 1]),
+            self.window_s
+        )
+        self.graphs_layout.add_widget(self.speed_graph)
 
-    def update_data(self, data: Dict[str, Any]) -> None:
-        """Update data dan grafik."""
+    def update_data(self, timestamp: float, length: float, speed: float) -> None:
+        """Tambah satu sampel (detik epoch) ke grafik."""
         try:
-            timestamp = datetime.now()
-            length = data.get('length', 0)
-            speed = data.get('speed', 0)
-
-            # Store data
-            self.timestamps.append(timestamp)
-            self.length_data.append(length)
-            self.speed_data.append(speed)
-
-            # Update length plot
-            length_points = [(i, y) for i, y in enumerate(self.length_data)]
-            self.length_plot.points = length_points
-
-            # Update speed plot
-            speed_points = [(i, y) for i, y in enumerate(self.speed_data)]
-            self.speed_plot.points = speed_points
-
-            # Adjust y-axis limits if needed
-            if length > self.length_graph.ymax:
-                self.length_graph.ymax = length * 1.2
-            if speed > self.speed_graph.ymax:
-                self.speed_graph.ymax = speed * 1.2
-
+            with stage("plot"):
+                if self.length_plot is None:
+                    self.length_series.add(timestamp, length)
+                    self.speed_series.add(timestamp, speed)
+                    return
+                if self._showing_history:
+                    self._end_history()
+                self.length_plot.add(timestamp, length)
+                self.speed_plot.add(timestamp, speed)
         except Exception as e:
             logger.error(f"Error updating statistics: {e}")
 
-    def export_data(self, filename: str) -> None:
-        """Export data ke file CSV."""
-        try:
-            export_dir = Path("export")
-            export_dir.mkdir(exist_ok=True)
-            filepath = export_dir / filename
-
-            with open(filepath, 'w', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow(['Timestamp', 'Length (m)', 'Speed (m/s)'])
-                for ts, length, speed in zip(self.timestamps, self.length_data, self.speed_data):
-                    writer.writerow([ts.isoformat(), length, speed])
+    def show_history(self, points: List["HistoryPoint"]) -> None:
+        """Tampilkan hasil query historis (rollup) di grafik hingga data live tiba."""
+        if self.length_plot is None or not points:
+            return
+        self._showing_history = True
+        now = time.time()
+        window_s = max(self.window_s, now - points[0].start_ms / 1000)
+        for graph in (self.length_plot, self.speed_plot):
+            graph.set_window(window_s)
+        self.length_plot.plot.load((p.start_ms / 1000, p.length) for p in points)
+        self.speed_plot.plot.load((p.start_ms / 1000, p.speed_mean) for p in points)
+        self.length_plot.refresh(now)
+        self.speed_plot.refresh(now)
+
+    def _end_history(self) -> None:
+        """Buang titik rollup dan kembalikan jendela live agar bucket tidak ikut melebar."""
+        self._showing_history = False
+        for graph in (self.length_plot, self.speed_plot):
+            graph.set_window(self.window_s)
+            graph.plot.load(())
+
+    def export_data(
+        self,
+        filename: str,
+        on_progress: Optional[Callable[["ExportJob"], None]] = None,
+        on_done: Optional[Callable[["ExportJob"], None]] = None
+    ) -> "ExportJob":
+        """Export data ke file CSV di background; callback dari thread worker."""
+        from ..export_jobs import get_export_manager
+
+        export_dir = Path("export")
+        export_dir.mkdir(exist_ok=True)
+        # Kedua deret ditulis bersamaan sehingga slot dan waktunya sama
+        rows = [
+            {
+                "Timestamp": datetime.fromtimestamp(ts).isoformat(),
+                "Length (m)": length,
+                "Speed (m/min)": speed
+            }
+            for (ts, length), (_, speed) in zip(
+                self.length_series.items(), self.speed_series.items()
+            )
+        ]
+        return get_export_manager().submit(
+            rows,
+            str(export_dir / filename),
+            on_progress=on_progress,
+            on_done=on_done
+        )
 
-            logger.info(f"Data exported to {filepath}")
-
-        except Exception as e:
-            logger.error(f"Error exporting data: {e}")
-            raise
 
 class MonitoringKioskApp(MDApp):
     """Aplikasi utama monitoring kiosk."""
@@ -973,14 +1129,17 @@ class MonitoringKioskApp(MDApp):
         Config.set('kivy', 'keyboard_mode', 'systemanddock')  # Enable both system and dock keyboard
         
         super().__init__(**kwargs)
-        self.monitor: Optional[Monitor] = None
-        self.config = {
-            "port": "COM1",
-            "baudrate": 19200,
-            "auto_connect": False,
-            "language": "en"
-        }
-        self.config.update(load_config())
+        self.monitor: Optional["Monitor"] = None
+        self.shared_state = None
+        self.history = None
+        self.journal = None
+        # Sampel bus terakhir (sudah dinormalisasi); diganti utuh oleh thread monitor
+        self._latest_data: Optional[Dict[str, Any]] = None
+        self.export_job: Optional["ExportJob"] = None
+        # Label hanya di-set jika teksnya berubah
+        self.view_model = ViewModel(STATUS_FORMATS)
+        # Defaults come from the config schema; "port"/"port_key" map to serial_port*
+        self.config = get_config()
         setup_logging()
         
         # Set up window properties
@@ -988,6 +1147,15 @@ class MonitoringKioskApp(MDApp):
         Window.fullscreen = 'auto'
         Window.allow_screensaver = False
 
+    def on_start(self):
+        """Catat waktu hingga UI tampil dan muat riwayat 24 jam terakhir."""
+        startup_timer.mark("window_shown")
+        # kill -USR1 <pid> menulis snapshot sampling ke profiles/
+        get_profiler().install_signal_handler()
+        if self.config.get("show_history_on_start", True):
+            # Setelah grafik statistik dibuat (Clock.schedule_once di Statistics)
+            Clock.schedule_once(lambda dt: self.load_history(), 0.5)
+
     def build(self):
         """Build UI aplikasi."""
         self.theme_cls.primary_palette = "Blue"
@@ -1074,7 +1242,7 @@ class MonitoringKioskApp(MDApp):
         content_layout.add_widget(self.control_buttons)
         
         # Statistics section
-        self.statistics = Statistics()
+        self.statistics = Statistics(window_s=self.config.get("plot_window_s", 600.0))
         content_layout.add_widget(self.statistics)
         
         # Add content to a scroll view for very small screens
@@ -1090,32 +1258,83 @@ class MonitoringKioskApp(MDApp):
         Window.keyboard_anim_args = {'d': .2, 't': 'in_out_expo'}
         Window.softinput_mode = "below_target"
         
-        # Start update timers
+        # Satu tick untuk status mesin, grafik dan kedua jam
         Clock.schedule_interval(self.update_status, 1.0)
-        Clock.schedule_interval(self.update_clock, 1.0)
         
         return main_layout
 
+    def _create_monitor(self):
+        """Buat monitor lokal, atau client daemon akuisisi jika dikonfigurasi."""
+        daemon_address = self.config.get("daemon_address")
+        if daemon_address:
+            from ..daemon import DaemonClient
+            from ..shared_state import SharedStateLink, SHM_NAME, segment_name
+            # Status dibaca langsung dari shared memory daemon di update_status,
+            # mengikuti daemon yang di-restart; tanpa segmen dipakai sampel socket
+            self.shared_state = SharedStateLink(segment_name(
+                self.config.get("shared_state_name", SHM_NAME),
+                self.config.get("machine_id", "default")
+            ))
+            # Akuisisi tetap berjalan di daemon walau UI di-restart
+            return DaemonClient(
+                daemon_address,
+                on_data=self.handle_data,
+                on_error=self.handle_error,
+                on_state=self.handle_connection_state,
+                on_alert=self.handle_alert,
+                on_connect=self.shared_state.reset
+            )
+        
+        from ..monitor import Monitor
+        from ..serial_handler import JSKSerialPort
+        from ..scheduler import AdaptivePollScheduler
+        from ..change_filter import create_change_detector
+        from ..anomaly import create_anomaly_detector
+        from ..journal import create_journal
+        
+        registry = get_port_registry()
+        port_key = self.config.get("serial_port_key")
+        # Ikuti adapter jika nama device node berubah sejak terakhir dipakai
+        port = (port_key and registry.resolve(port_key)) or self.config.get("serial_port", "COM1")
+        baudrate = self.config.get("baudrate", 19200)
+        serial_port = JSKSerialPort(
+            port=port,
+            baudrate=baudrate,
+            hardware_key=port_key or registry.key_for(port),
+            port_resolver=registry.resolve
+        )
+        serial_port.open()
+        serial_port.enable_auto_recover()
+        if self.journal is None:
+            # Jurnal event hanya ditulis oleh proses yang melakukan akuisisi
+            self.journal = create_journal(self.config)
+        
+        return Monitor(
+            serial_port=serial_port,
+            on_data=self.handle_data,
+            on_error=self.handle_error,
+            poll_interval=self.config.get("poll_interval", 1.0),
+            scheduler=AdaptivePollScheduler.from_config(self.config),
+            on_state=self.handle_connection_state,
+            change_detector=create_change_detector(self.config),
+            config=self.config,
+            journal=self.journal,
+            anomaly_detector=create_anomaly_detector(self.config),
+            on_alert=self.handle_alert
+        )
+
     def start_monitoring(self, *args):
         """Mulai monitoring mesin."""
         try:
             if not self.monitor:
-                port = self.config.get("port", "COM1")
-                baudrate = self.config.get("baudrate", 19200)
-                serial_port = JSKSerialPort(port=port, baudrate=baudrate)
-                serial_port.open()
-                serial_port.enable_auto_recover()
-                
-                self.monitor = Monitor(
-                    serial_port=serial_port,
-                    on_data=self.handle_data,
-                    on_error=self.handle_error
-                )
+                self.monitor = self._create_monitor()
             
             self.monitor.start()
+            self.control_buttons.save_button.disabled = False
             self.conn_settings.conn_status.text = "Connection Status: Connected ✅"
             self.conn_settings.conn_status.theme_text_color = "Success"
-            self.conn_settings.last_connected.text = f"Last Connected: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+            connected_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            self.conn_settings.last_connected.text = f"Last Connected: {connected_at}"
         except Exception as e:
             logger.error(f"Error starting monitoring: {e}")
             self.show_error("Failed to start monitoring", str(e))
@@ -1125,7 +1344,11 @@ class MonitoringKioskApp(MDApp):
         try:
             if self.monitor:
                 self.monitor.stop()
-                self.monitor.serial_port.disable_auto_recover()
+                serial_port = getattr(self.monitor, "serial_port", None)
+                if serial_port:
+                    serial_port.disable_auto_recover()
+            self._latest_data = None
+            self._close_shared_state()
             self.conn_settings.conn_status.text = "Connection Status: Disconnected ❌"
             self.conn_settings.conn_status.theme_text_color = "Error"
         except Exception as e:
@@ -1134,48 +1357,174 @@ class MonitoringKioskApp(MDApp):
 
     def handle_data(self, data: Dict[str, Any]) -> None:
         """Handle data dari monitor."""
-        # Data handling akan diupdate di update_status
-        pass
+        if not startup_timer.has_mark("first_reading"):
+            startup_timer.mark("first_reading")
+        # Dirender pada tick update_status berikutnya; thread UI tidak pernah
+        # menunggu I/O serial lewat get_status()
+        self._latest_data = data
+
+    def handle_connection_state(self, state: "ConnectionState") -> None:
+        """Handle perubahan state koneksi dari thread monitor."""
+        from ..serial_handler import ConnectionState
+        connected = state in (ConnectionState.CONNECTED, ConnectionState.DEGRADED)
+        Clock.schedule_once(
+            lambda dt: self.machine_status.update_connection_status(connected)
+        )
+
+    def handle_alert(self, event: "Event") -> None:
+        """Anomali dari jalur akuisisi; tampil pada tick berikutnya."""
+        fields = event.fields
+        self.view_model.update(
+            {"alert": (time.time(), fields.get("kind", ""), fields.get("message", ""))}
+        )
 
     def handle_error(self, error: Exception) -> None:
         """Handle error dari monitor."""
         logger.error(f"Monitor error: {error}")
         self.show_error("Monitor Error", str(error))
 
+    def load_history(self, hours: float = 24, resolution_s: int = 900) -> None:
+        """Query data historis di background lalu tampilkan di panel statistik."""
+        def run():
+            try:
+                if self.history is None:
+                    from ..archive import Archive
+                    from ..query import HistoryQuery
+                    archive_dir = self.config.get("archive_dir", "exports/archive")
+                    self.history = HistoryQuery(Archive(archive_dir))
+                end_ms = int(time.time() * 1000)
+                points = self.history.query(
+                    self.config.get("machine_id", "default"),
+                    end_ms - int(hours * 3600 * 1000),
+                    end_ms,
+                    resolution_s
+                )
+                Clock.schedule_once(lambda dt: self.statistics.show_history(points))
+            except Exception as e:
+                logger.error(f"Error loading history: {e}")
+
+        threading.Thread(target=run, daemon=True).start()
+
     def save_data(self, *args):
-        """Simpan data monitoring ke file."""
+        """Simpan data monitoring ke file tanpa menahan thread UI."""
+        if self.export_job and not self.export_job.finished:
+            # Tekan lagi saat menyimpan = batalkan
+            self.export_job.cancel()
+            return
         try:
-            if self.monitor:
-                # TODO: Implement data saving
-                pass
+            filename = datetime.now().strftime("%Y-%m-%d_%H-%M-%S") + ".csv"
+            self.export_job = self.statistics.export_data(
+                filename,
+                on_progress=lambda job: Clock.schedule_once(
+                    lambda dt: self._show_export_progress(job)
+                ),
+                on_done=lambda job: Clock.schedule_once(lambda dt: self._export_finished(job))
+            )
+            self.control_buttons.save_text.text = "Cancel Save"
         except Exception as e:
             logger.error(f"Error saving data: {e}")
             self.show_error("Failed to save data", str(e))
 
+    def _show_export_progress(self, job: "ExportJob") -> None:
+        """Tampilkan progress ekspor di tombol save."""
+        if not job.finished:
+            self.control_buttons.save_text.text = f"Saving {job.progress:.0%} (tap to cancel)"
+
+    def _export_finished(self, job: "ExportJob") -> None:
+        """Kembalikan tombol save dan laporkan hasil ekspor."""
+        from ..export_jobs import JobState
+        self.control_buttons.save_text.text = "Save Data"
+        if job.state is JobState.FAILED:
+            self.show_error("Failed to save data", str(job.error))
+        elif job.state is JobState.DONE:
+            logger.info(f"Data saved to {job.path}")
+
     def update_status(self, dt):
         """Update status display setiap interval."""
+        # cProfile on-demand untuk thread UI dimulai/dihentikan di sini
+        get_profiler().checkpoint()
+        with stage("ui_update"):
+            self.view_model.update({"clock": int(time.time()), "time": int(time.time())})
+            self._update_status()
+            self._apply_changes()
+
+    def _apply_changes(self) -> None:
+        """Set teks label yang berubah sejak tick sebelumnya."""
+        status = self.machine_status
+        for name, text in self.view_model.take_changes().items():
+            if name == "clock":
+                self.clock_display.text = text
+            elif name == "time":
+                status.update_time(text)
+            elif name == "length":
+                status.rolled_length.text = text
+            elif name == "target_reached":
+                status.target_status.text = text
+                reached = self.view_model.value(name)
+                status.target_status.theme_text_color = (
+                    "Secondary" if reached is None else "Success" if reached else "Error"
+                )
+            else:
+                getattr(status, name).text = text
+
+    def _update_status(self) -> None:
+        """Ambil status terbaru mesin ke view-model."""
         if self.monitor and self.monitor.is_running:
             try:
-                status = self.monitor.get_status()
+                # Waktu sampel = saat frame diterima dari mesin
+                reader = self.shared_state.reader() if self.shared_state else None
+                if reader:
+                    state = reader.read_machine(self.config.get("machine_id", "default"))
+                    status = state.fields if state else None
+                    received_ns = state.timestamp_ns if state else None
+                else:
+                    # Sampel bus dari monitor lokal atau socket daemon, sudah
+                    # melewati CountNormalizer sehingga length_um tersedia
+                    data = self._latest_data
+                    received_ns = received_at(data)[0] if data else None
+                    status = data.get("fields") if data else None
                 if status:
-                    self.machine_status.rolled_length.text = f"Rolled Length: {status['current_count']:.1f} m"
-                    self.machine_status.speed.text = f"Speed: {status['current_speed']:.1f} m/min"
-                    self.machine_status.shift.text = f"Shift: {status['shift']}"
-                    
-                    # Update target status
-                    target = float(self.product_form.target_length.text or 0)
-                    if status['current_count'] >= target:
-                        self.machine_status.target_status.text = "Target Status: Reached ✅"
-                        self.machine_status.target_status.theme_text_color = "Success"
-                    else:
-                        self.machine_status.target_status.text = "Target Status: Not Reached ❌"
-                        self.machine_status.target_status.theme_text_color = "Error"
+                    # Panjang dalam meter dari length_um, sama dengan target dan ETA
+                    values = monitor_values({"fields": status})
+                    self.statistics.update_data(
+                        received_ns / 1e9, values['length'], values['speed']
+                    )
+                    # Panjang target = Actual Length di form produk
+                    target = self.product_form.actual_length_field.text_field.text
+                    self.view_model.update(dict(
+                        values,
+                        target_reached=values['length'] >= float(target) if target else None
+                    ))
+                    # Estimator monitor lokal, atau snapshot terakhir dari daemon
+                    eta = getattr(self.monitor, "eta", None)
+                    if eta is not None:
+                        now = time.time()
+                        self.view_model.update({
+                            "roll_eta": (
+                                eta_value(eta.roll_eta(float(target), now)) if target else None
+                            ),
+                            "shift_forecast": forecast_value(eta.shift_projection(now)),
+                        })
             except Exception as e:
                 logger.error(f"Error updating status: {e}")
 
+    def capture_profile(self, mode: str = "sample", duration: float = 10.0) -> None:
+        """Ambil snapshot profiling di background; path laporan tampil di tombol."""
+        button_text = self.conn_settings.profile_text
+
+        def done(path: Optional[str]) -> None:
+            text = f"Profile: {Path(path).name}" if path else "Profile gagal"
+            Clock.schedule_once(lambda dt: setattr(button_text, "text", text))
+            if path:
+                logger.info(f"Profil ditulis ke {path}")
+
+        if get_profiler().snapshot(mode, duration, on_done=done):
+            button_text.text = f"Profiling {duration:.0f} s..."
+
     def show_error(self, title: str, message: str):
         """Show error dialog."""
         if not hasattr(self, 'dialog') or not self.dialog:
+            from kivymd.uix.dialog import MDDialog
             self.dialog = MDDialog(
                 title=title,
                 text=message,
@@ -1191,15 +1540,24 @@ class MonitoringKioskApp(MDApp):
             )
         self.dialog.open()
 
+    def _close_shared_state(self) -> None:
+        """Lepas shared memory state daemon."""
+        if self.shared_state:
+            self.shared_state.close()
+            self.shared_state = None
+
     def on_stop(self):
         """Cleanup saat aplikasi ditutup."""
         if self.monitor:
             self.monitor.stop()
-        save_config(self.config)
+        self._close_shared_state()
+        if self.export_job:
+            # Biarkan ekspor yang sedang berjalan selesai (rename atomik)
+            self.export_job.wait()
+        if self.journal:
+            self.journal.close()
+        self.config.flush()
 
-    def update_clock(self, dt):
-        """Update clock display."""
-        self.clock_display.text = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
 if __name__ == "__main__":
     MonitoringKioskApp().run() 
\ No newline at end of file
@@ -2,31 +2,35 @@
 Main window for the monitoring application using Qt.
 """
 import sys
+import time
 import logging
-from pathlib import Path
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, TYPE_CHECKING
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
-    QLabel, QPushButton, QComboBox, QSpinBox,
-    QLineEdit, QFormLayout, QGroupBox, QScrollArea,
-    QSizePolicy, QApplication, QMessageBox, QFrame,
-    QStackedWidget
+    QLabel, QPushButton, QComboBox, QGroupBox,
+    QApplication, QMessageBox, QFrame
 )
 from PySide6.QtCore import Qt, QTimer, Slot, Signal
-from PySide6.QtGui import QIcon, QFont, QCloseEvent, QPalette, QColor
-import pyqtgraph as pg
+from PySide6.QtGui import QFont, QCloseEvent, QPalette, QColor
 
-from ..monitor import Monitor
-from ..serial_handler import JSKSerialPort
-from ..config import load_config, save_config
+from ..ports import get_port_registry, PortInfo
+from ..config import get_config, ConfigError
 from ..logging_utils import setup_logging
+from ..profiling import get_profiler
+from ..startup import startup_timer
 from .monitoring_view import MonitoringView
 from .product_form import ProductForm
-from .settings_dialog import SettingsDialog
+from .view_model import ViewModel
+
+if TYPE_CHECKING:
+    from ..monitor import Monitor
+
+# pyqtgraph, the serial/monitor stack and the settings dialog are imported on first use
 
 logger = logging.getLogger(__name__)
 
+
 class MachineStatus(QGroupBox):
     """Panel for displaying machine status."""
     
@@ -97,14 +101,9 @@ class MachineStatus(QGroupBox):
         info_layout.addLayout(time_box)
         layout.addLayout(info_layout)
         
-        # Start clock update timer
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update_time)
-        self.timer.start(1000)  # Update every second
-        
-    def update_time(self):
-        """Update current time display."""
-        self.current_time.setText(datetime.now().strftime("%H:%M:%S"))
+    def update_time(self, text: str):
+        """Update current time display; driven by the window's frame tick."""
+        self.current_time.setText(text)
         
     def update_connection_status(self, connected: bool):
         """Update connection status display."""
@@ -121,11 +120,16 @@ class MachineStatus(QGroupBox):
         self.speed.setText(f"{speed:.1f}")
         self.shift.setText(str(shift))
 
+
 class ConnectionSettings(QGroupBox):
     """Panel for serial connection settings."""
     
+    # Emitted from the port registry thread; Qt queues it onto the UI thread
+    ports_changed = Signal(list)
+    
     def __init__(self, parent: Optional[QWidget] = None):
         super().__init__("Connection Settings", parent)
+        self.registry = get_port_registry()
         self.setup_ui()
         
     def setup_ui(self):
@@ -152,31 +156,35 @@ class ConnectionSettings(QGroupBox):
         
         # Connect signals
         self.refresh_btn.clicked.connect(self.refresh_ports)
+        self.ports_changed.connect(self.update_ports)
         
-        # Initial port refresh
-        self.refresh_ports()
+        # Fill from the registry cache; enumeration happens in the background
+        if not self.registry.is_ready:
+            self.port_combo.addItem("Scanning ports...")
+        self.registry.subscribe(self.ports_changed.emit)
         
     def refresh_ports(self):
-        """Refresh the list of available serial ports."""
-        import serial.tools.list_ports
+        """Ask the port registry to re-enumerate serial ports."""
+        self.registry.refresh()
+    
+    @Slot(list)
+    def update_ports(self, ports: List[PortInfo]):
+        """Show the ports reported by the registry."""
+        current = self.port_combo.currentText()
         self.port_combo.clear()
-        
-        try:
-            ports = list(serial.tools.list_ports.comports())
-            for port in ports:
-                self.port_combo.addItem(port.device)
+        for port in ports:
+            self.port_combo.addItem(port.device)
             
-            if not ports:
-                self.port_combo.addItem("No ports available")
-                
-        except Exception as e:
-            logger.error(f"Error refreshing ports: {e}")
-            self.port_combo.addItem("Error getting ports")
+        if not ports:
+            self.port_combo.addItem("No ports available")
+        elif self.port_combo.findText(current) >= 0:
+            self.port_combo.setCurrentText(current)
             
     def get_selected_port(self) -> str:
         """Get the currently selected port."""
         return self.port_combo.currentText()
 
+
 class Statistics(QGroupBox):
     """Panel for statistics and data visualization."""
     
@@ -190,6 +198,8 @@ class Statistics(QGroupBox):
         layout.setSpacing(15)
         layout.setContentsMargins(20, 20, 20, 20)
         
+        import pyqtgraph as pg
+        
         # Create graphs
         graphs_layout = QHBoxLayout()
         
@@ -232,13 +242,30 @@ class Statistics(QGroupBox):
         self.length_curve.setData(self.time_data, self.length_data)
         self.speed_curve.setData(self.time_data, self.speed_data)
 
+
 class ModernMainWindow(QMainWindow):
     """Main window for the monitoring application with modern industrial design."""
     
+    # Emitted from the monitor thread; Qt queues it onto the UI thread
+    connection_state_changed = Signal(str)
+    # Anomaly kind and message, also emitted from the monitor/daemon-client thread
+    alert_received = Signal(str, str)
+    # Profiler report path; outlives the settings dialog that started the snapshot
+    profile_finished = Signal(str)
+    
+    # Status bar text and color per connection state
+    CONNECTION_STATUS_STYLES = {
+        "connected": ("Connected", "#4CAF50"),
+        "degraded": ("Connected (no response)", "#ffb300"),
+        "reconnecting": ("Reconnecting...", "#ffb300"),
+        "failed": ("Connection Failed", "#ff4444"),
+        "closed": ("Not Connected", "#ff4444"),
+    }
+    
     def __init__(self):
         super().__init__()
-        self.monitor: Optional[Monitor] = None
-        self.config = load_config()
+        self.monitor: Optional["Monitor"] = None
+        self.config = get_config()
         
         self.setWindowTitle("Roll Machine Monitor")
         self.setWindowState(Qt.WindowState.WindowFullScreen)  # Start in fullscreen for kiosk mode
@@ -262,13 +289,29 @@ class ModernMainWindow(QMainWindow):
         # Create status bar
         self.setup_status_bar()
         
-        # Setup update timer
-        self.update_timer = QTimer()
-        self.update_timer.timeout.connect(self.update_display)
-        self.update_timer.start(1000)  # Update every second
+        # One frame tick drives the clock and every pending widget update
+        self.status_model = ViewModel({
+            "clock": lambda seconds: datetime.fromtimestamp(seconds).strftime("%Y-%m-%d %H:%M:%S"),
+        })
+        self.frame_timer = QTimer()
+        self.frame_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.frame_timer.timeout.connect(self.update_display)
+        self.frame_timer.start(self.config.get("ui_frame_ms", 100))
+        
+        # Shared-memory state from the acquisition daemon, read at display rate;
+        # follows the daemon across restarts
+        self.shared_state = None
+        self._shared_sequence = 0
+        self._shared_attached = False
+        # Event journal, opened on the first local monitor
+        self.journal = None
+        self.shared_state_timer = QTimer()
+        self.shared_state_timer.timeout.connect(self.poll_shared_state)
         
         # Connect signals
         self.product_form.product_updated.connect(self.handle_product_update)
+        self.connection_state_changed.connect(self.handle_connection_state)
+        self.alert_received.connect(self.handle_alert)
     
     def setup_dark_theme(self):
         """Set up dark theme colors and styling."""
@@ -363,6 +406,10 @@ class ModernMainWindow(QMainWindow):
         self.connection_status.setStyleSheet("color: #ff4444;")
         status_layout.addWidget(self.connection_status)
         
+        self.alert_label = QLabel()
+        self.alert_label.setStyleSheet("color: #ffb300;")
+        status_layout.addWidget(self.alert_label)
+        
         status_layout.addStretch()
         
         self.clock_label = QLabel()
@@ -371,12 +418,24 @@ class ModernMainWindow(QMainWindow):
         self.main_layout.addWidget(status_frame)
     
     def update_display(self):
-        """Update dynamic display elements."""
-        self.clock_label.setText(datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        """Apply everything that changed since the last frame."""
+        # Lets an on-demand cProfile snapshot start and stop on the UI thread
+        get_profiler().checkpoint()
+        # The clock text only changes once per second
+        self.status_model.update({"clock": int(time.time())})
+        clock = self.status_model.take_changes().get("clock")
+        if clock is not None:
+            self.clock_label.setText(clock)
+        # Local estimator, or the snapshot the daemon sent (None until the first one)
+        eta = getattr(self.monitor, "eta", None)
+        if eta is not None:
+            self.monitoring_view.update_eta(eta, time.time())
+        self.monitoring_view.flush()
     
     def show_settings(self):
         """Show the settings dialog."""
-        dialog = SettingsDialog(self.config)
+        from .settings_dialog import SettingsDialog
+        dialog = SettingsDialog(self.config, self.profile_finished)
         dialog.settings_updated.connect(self.handle_settings_update)
         dialog.exec()
     
@@ -384,11 +443,15 @@ class ModernMainWindow(QMainWindow):
     def handle_settings_update(self, settings: Dict[str, Any]):
         """Handle settings updates."""
         logger.info(f"Settings updated: {settings}")
-        self.config.update(settings)
-        save_config(self.config)
-        
-        # Restart monitoring if active
-        if self.monitor and self.monitor.is_running:
+        try:
+            # The running monitor applies port, baudrate and poll changes itself
+            changed = self.config.update(settings)
+        except ConfigError as e:
+            QMessageBox.warning(self, "Invalid Settings", str(e))
+            return
+        
+        # Switching between local acquisition and the daemon needs a new monitor
+        if "daemon_address" in changed and self.monitor and self.monitor.is_running:
             self.toggle_monitoring()  # Stop
             self.toggle_monitoring()  # Start with new settings
     
@@ -396,26 +459,84 @@ class ModernMainWindow(QMainWindow):
     def handle_product_update(self, product_info: Dict[str, Any]):
         """Handle product information updates."""
         logger.info(f"Product info updated: {product_info}")
+        self.monitoring_view.update_product(product_info)
         if self.monitor:
-            self.monitor.update_product_info(product_info)
+            # Queued between status polls; the monitor keeps running
+            self.monitor.update_product_info(
+                product_info,
+                push_to_machine=self.config.get("push_target_length", False)
+            )
+    
+    def _create_monitor(self):
+        """Create a local monitor, or a client of the acquisition daemon if configured."""
+        def on_state(state):
+            self.connection_state_changed.emit(state.value)
+
+        def on_alert(event):
+            self.alert_received.emit(event.fields.get("kind", ""), event.fields.get("message", ""))
+
+        daemon_address = self.config.get("daemon_address")
+        if daemon_address:
+            from ..daemon import DaemonClient
+            from ..shared_state import SharedStateLink, SHM_NAME, segment_name
+            self.shared_state = SharedStateLink(segment_name(
+                self.config.get("shared_state_name", SHM_NAME),
+                self.config.get("machine_id", "default")
+            ))
+            self.shared_state_timer.start(self.config.get("shared_state_interval_ms", 100))
+            # Acquisition keeps running in the daemon when this window closes
+            return DaemonClient(
+                daemon_address,
+                on_data=self.handle_daemon_data,
+                on_error=self.handle_error,
+                on_state=on_state,
+                on_alert=on_alert,
+                on_connect=self.shared_state.reset
+            )
+        
+        from ..monitor import Monitor
+        from ..serial_handler import JSKSerialPort
+        from ..scheduler import AdaptivePollScheduler
+        from ..change_filter import create_change_detector
+        from ..anomaly import create_anomaly_detector
+        from ..journal import create_journal
+        
+        registry = get_port_registry()
+        port_key = self.config.get("serial_port_key")
+        # Follow the adapter if its device node was renamed since last run
+        port = (port_key and registry.resolve(port_key)) or self.config.get("serial_port", "COM1")
+        baudrate = self.config.get("baudrate", 19200)
+        
+        serial_port = JSKSerialPort(
+            port=port,
+            baudrate=baudrate,
+            hardware_key=port_key or registry.key_for(port),
+            port_resolver=registry.resolve
+        )
+        serial_port.open()
+        serial_port.enable_auto_recover()
+        if self.journal is None:
+            self.journal = create_journal(self.config)
+        
+        return Monitor(
+            serial_port=serial_port,
+            on_data=self.handle_data,
+            on_error=self.handle_error,
+            poll_interval=self.config.get("poll_interval", 1.0),
+            scheduler=AdaptivePollScheduler.from_config(self.config),
+            on_state=on_state,
+            change_detector=create_change_detector(self.config),
+            config=self.config,
+            journal=self.journal,
+            anomaly_detector=create_anomaly_detector(self.config),
+            on_alert=on_alert
+        )
     
     def toggle_monitoring(self):
         """Toggle monitoring start/stop."""
         if not self.monitor or not self.monitor.is_running:
             try:
-                port = self.config.get("serial_port", "COM1")
-                baudrate = self.config.get("baudrate", 19200)
-                
-                serial_port = JSKSerialPort(port=port, baudrate=baudrate)
-                serial_port.open()
-                serial_port.enable_auto_recover()
-                
-                self.monitor = Monitor(
-                    serial_port=serial_port,
-                    on_data=self.handle_data,
-                    on_error=self.handle_error
-                )
-                
+                self.monitor = self._create_monitor()
                 self.monitor.start()
                 self.connection_status.setText("Connected")
                 self.connection_status.setStyleSheet("color: #4CAF50;")
@@ -443,7 +564,10 @@ class ModernMainWindow(QMainWindow):
         else:
             try:
                 self.monitor.stop()
-                self.monitor.serial_port.disable_auto_recover()
+                self._close_shared_state()
+                serial_port = getattr(self.monitor, "serial_port", None)
+                if serial_port:
+                    serial_port.disable_auto_recover()
                 self.connection_status.setText("Not Connected")
                 self.connection_status.setStyleSheet("color: #ff4444;")
                 self.start_button.setText("Start Monitoring")
@@ -468,8 +592,47 @@ class ModernMainWindow(QMainWindow):
                     f"Failed to stop monitoring: {str(e)}"
                 )
     
+    @Slot(str)
+    def handle_connection_state(self, state: str):
+        """Update the status bar when the serial connection state changes."""
+        text, color = self.CONNECTION_STATUS_STYLES.get(state, (state, "#ff4444"))
+        self.connection_status.setText(text)
+        self.connection_status.setStyleSheet(f"color: {color};")
+    
+    @Slot(str, str)
+    def handle_alert(self, kind: str, message: str):
+        """Show the latest anomaly reported by the acquisition path."""
+        stamp = datetime.now().strftime("%H:%M:%S")
+        self.alert_label.setText(f"{stamp} {kind.replace('_', ' ').title()}: {message}")
+    
+    def poll_shared_state(self):
+        """Show the daemon's latest sample if it changed since the last tick."""
+        reader = self.shared_state.reader() if self.shared_state else None
+        self._shared_attached = reader is not None
+        if reader is None:
+            return
+        state = reader.read_machine(self.config.get("machine_id", "default"))
+        if state and state.sequence != self._shared_sequence:
+            self._shared_sequence = state.sequence
+            self.handle_data(state.to_data())
+    
+    def handle_daemon_data(self, data: Dict[str, Any]):
+        """Samples from the daemon socket, used while shared memory is not attached."""
+        if not self._shared_attached:
+            self.handle_data(data)
+    
+    def _close_shared_state(self):
+        """Stop reading the daemon's shared-memory state."""
+        self.shared_state_timer.stop()
+        self._shared_attached = False
+        if self.shared_state:
+            self.shared_state.close()
+            self.shared_state = None
+    
     def handle_data(self, data: Dict[str, Any]):
-        """Handle data from monitor."""
+        """Handle data from monitor; widgets are updated on the next frame tick."""
+        if not startup_timer.has_mark("first_reading"):
+            startup_timer.mark("first_reading")
         self.monitoring_view.update_data(data)
     
     def handle_error(self, error: Exception):
@@ -485,11 +648,20 @@ class ModernMainWindow(QMainWindow):
         """Handle application close."""
         if self.monitor:
             self.monitor.stop()
-        save_config(self.config)
+        self._close_shared_state()
+        if self.journal:
+            self.journal.close()
+        self.config.flush()
         event.accept()
 
+
 def main():
     """Main entry point."""
+    setup_logging()
+    # kill -USR1 <pid> writes a sampling profile to profiles/
+    get_profiler().install_signal_handler()
+    # Start port enumeration in the background while the UI is built
+    get_port_registry()
     app = QApplication(sys.argv)
     
     # Set application style
@@ -498,8 +670,10 @@ def main():
     # Create and show main window
     window = ModernMainWindow()
     window.showMaximized()  # Start maximized
+    startup_timer.mark("window_shown")
     
     sys.exit(app.exec())
 
+
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -2,10 +2,40 @@ from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel,
     QFrame, QGridLayout
 )
-from PySide6.QtCore import Qt, Slot
-import pyqtgraph as pg
-from typing import List, Dict, Any, Tuple
-from datetime import datetime
+from PySide6.QtCore import Qt, Slot, QTimer
+from collections import deque
+from typing import Deque, Dict, Any, Tuple, Union
+
+from ..profiling import stage
+from ..eta import EtaEstimator, EtaSnapshot
+from ..parser import received_at
+from .view_model import (
+    ViewModel, monitor_values, eta_value, format_eta, forecast_value, format_forecast
+)
+
+# Seconds of samples kept in the graphs
+PLOT_HISTORY_S = 60
+
+
+def _length(value: float) -> str:
+    return f"{value:.1f} m"
+
+
+def _text(value: Any) -> str:
+    return str(value) if value not in (None, "") else "Not Set"
+
+
+CARD_FORMATS = {
+    "length": _length,
+    "speed": lambda value: f"{value:.1f} m/min",
+    "shift": str,
+    "product_code": _text,
+    "batch_number": _text,
+    "target_length": lambda value: _length(value) if value else "Not Set",
+    "roll_eta": format_eta,
+    "shift_forecast": format_forecast,
+}
+
 
 class MonitoringView(QWidget):
     """Main monitoring view with real-time data display."""
@@ -13,10 +43,13 @@ class MonitoringView(QWidget):
     def __init__(self):
         super().__init__()
         
+        # Written from any thread, applied to the widgets on the window's frame tick
+        self.view_model = ViewModel(CARD_FORMATS)
+        
         # Initialize data storage
-        self.time_data: List[float] = []
-        self.speed_data: List[float] = []
-        self.length_data: List[float] = []
+        self.time_data: Deque[float] = deque(maxlen=PLOT_HISTORY_S)
+        self.speed_data: Deque[float] = deque(maxlen=PLOT_HISTORY_S)
+        self.length_data: Deque[float] = deque(maxlen=PLOT_HISTORY_S)
         
         # Initialize value labels
         self.length_value_label: QLabel = None
@@ -25,8 +58,15 @@ class MonitoringView(QWidget):
         self.product_value_label: QLabel = None
         self.batch_value_label: QLabel = None
         self.target_value_label: QLabel = None
+        self.eta_value_label: QLabel = None
+        self.forecast_value_label: QLabel = None
+        
+        # Plots are created after the first paint (pyqtgraph is slow to import)
+        self.speed_curve = None
+        self.length_curve = None
         
         self.setup_ui()
+        QTimer.singleShot(0, self.create_plots)
         
     def setup_ui(self):
         """Set up the monitoring view UI."""
@@ -61,8 +101,29 @@ class MonitoringView(QWidget):
         target_card, self.target_value_label = self.create_info_card("Target Length", "Not Set")
         info_grid.addWidget(target_card, 1, 2)
         
+        # Roll completion card
+        eta_card, self.eta_value_label = self.create_info_card("Roll Completes At", "-")
+        info_grid.addWidget(eta_card, 2, 0)
+        
+        # End-of-shift forecast card
+        forecast_card, self.forecast_value_label = self.create_info_card(
+            "Shift Output Forecast", "-"
+        )
+        info_grid.addWidget(forecast_card, 2, 1, 1, 2)
+        
         layout.addLayout(info_grid)
         
+        self.value_labels = {
+            "length": self.length_value_label,
+            "speed": self.speed_value_label,
+            "shift": self.shift_value_label,
+            "product_code": self.product_value_label,
+            "batch_number": self.batch_value_label,
+            "target_length": self.target_value_label,
+            "roll_eta": self.eta_value_label,
+            "shift_forecast": self.forecast_value_label,
+        }
+        
         # Create graphs
         graphs_layout = QHBoxLayout()
         
@@ -80,13 +141,7 @@ class MonitoringView(QWidget):
         speed_label = QLabel("Speed Over Time")
         speed_label.setStyleSheet("color: white; font-size: 14px; font-weight: bold;")
         speed_layout.addWidget(speed_label)
-        
-        self.speed_plot = pg.PlotWidget()
-        self.speed_plot.setBackground('transparent')
-        self.speed_plot.setTitle("Speed (m/min)")
-        self.speed_plot.showGrid(x=True, y=True, alpha=0.3)
-        self.speed_curve = self.speed_plot.plot(pen='g')
-        speed_layout.addWidget(self.speed_plot)
+        self.speed_layout = speed_layout
         
         graphs_layout.addWidget(speed_frame)
         
@@ -104,17 +159,34 @@ class MonitoringView(QWidget):
         length_label = QLabel("Length Progress")
         length_label.setStyleSheet("color: white; font-size: 14px; font-weight: bold;")
         length_layout.addWidget(length_label)
+        self.length_layout = length_layout
+        
+        graphs_layout.addWidget(length_frame)
+        
+        layout.addLayout(graphs_layout)
+    
+    def create_plots(self):
+        """Create the pyqtgraph plots inside the graph frames."""
+        if self.speed_curve is not None:
+            return
+        import pyqtgraph as pg
+        
+        self.speed_plot = pg.PlotWidget()
+        self.speed_plot.setBackground('transparent')
+        self.speed_plot.setTitle("Speed (m/min)")
+        self.speed_plot.showGrid(x=True, y=True, alpha=0.3)
+        self.speed_curve = self.speed_plot.plot(pen='g')
+        self.speed_layout.addWidget(self.speed_plot)
         
         self.length_plot = pg.PlotWidget()
         self.length_plot.setBackground('transparent')
         self.length_plot.setTitle("Length (m)")
         self.length_plot.showGrid(x=True, y=True, alpha=0.3)
         self.length_curve = self.length_plot.plot(pen='b')
-        length_layout.addWidget(self.length_plot)
-        
-        graphs_layout.addWidget(length_frame)
+        self.length_layout.addWidget(self.length_plot)
         
-        layout.addLayout(graphs_layout)
+        # Show anything received before the plots existed
+        self._set_curves()
     
     def create_info_card(self, title: str, initial_value: str) -> Tuple[QFrame, QLabel]:
         """Create an info card with title and value."""
@@ -141,29 +213,61 @@ class MonitoringView(QWidget):
         
         return card, value_label
     
-    @Slot(dict)
     def update_data(self, data: Dict[str, Any]):
-        """Update display with new data."""
-        # Update info cards
-        self.length_value_label.setText(f"{data.get('length', 0.0):.1f} m")
-        self.speed_value_label.setText(f"{data.get('speed', 0.0):.1f} m/min")
-        self.shift_value_label.setText(data.get('shift', 'Day'))
-        self.product_value_label.setText(data.get('product_code', 'Not Set'))
-        self.batch_value_label.setText(data.get('batch_number', 'Not Set'))
-        self.target_value_label.setText(f"{data.get('target_length', 0.0):.1f} m")
-        
-        # Update graphs
-        current_time = datetime.now().timestamp()
-        
-        self.time_data.append(current_time)
-        self.speed_data.append(data.get('speed', 0.0))
-        self.length_data.append(data.get('length', 0.0))
-        
-        # Keep last 60 seconds of data
-        if len(self.time_data) > 60:
-            self.time_data = self.time_data[-60:]
-            self.speed_data = self.speed_data[-60:]
-            self.length_data = self.length_data[-60:]
-        
-        self.speed_curve.setData(self.time_data, self.speed_data)
-        self.length_curve.setData(self.time_data, self.length_data) 
\ No newline at end of file
+        """Queue a monitor sample; safe to call from the monitor thread."""
+        values = monitor_values(data)
+        self.view_model.update(values)
+        # Plot at the time the frame was received, not when this callback ran
+        wall_ns, _ = received_at(data)
+        self.view_model.add_sample(wall_ns / 1e9, {
+            "length": values.get("length", 0.0),
+            "speed": values.get("speed", 0.0),
+        })
+    
+    @Slot(dict)
+    def update_product(self, product_info: Dict[str, Any]):
+        """Show the product the operator entered."""
+        self.view_model.update(product_info)
+    
+    def update_eta(self, estimator: Union[EtaEstimator, EtaSnapshot], now: float):
+        """Refresh the roll ETA and shift forecast; cheap enough to call every frame.
+
+        ``estimator`` is the local monitor's estimator or the daemon's latest snapshot.
+        """
+        target = self.view_model.value("target_length")
+        self.view_model.update({
+            "roll_eta": eta_value(estimator.roll_eta(target, now)) if target else None,
+            "shift_forecast": forecast_value(estimator.shift_projection(now)),
+        })
+    
+    def flush(self):
+        """Apply pending changes to the widgets; called once per UI frame."""
+        if not self.view_model.dirty:
+            return
+        with stage("ui_update"):
+            self._update_labels()
+        with stage("plot"):
+            self._update_plots()
+    
+    def _update_labels(self):
+        """Set the text of the info cards whose value changed."""
+        for name, text in self.view_model.take_changes().items():
+            self.value_labels[name].setText(text)
+    
+    def _update_plots(self):
+        """Append the queued samples to the graphs in one redraw."""
+        samples = self.view_model.take_samples()
+        if not samples:
+            return
+        for timestamp, values in samples:
+            self.time_data.append(timestamp)
+            self.speed_data.append(values["speed"])
+            self.length_data.append(values["length"])
+        self._set_curves()
+    
+    def _set_curves(self):
+        """Hand the buffered samples to both curves."""
+        if self.speed_curve is not None:
+            times = list(self.time_data)
+            self.speed_curve.setData(times, list(self.speed_data))
+            self.length_curve.setData(times, list(self.length_data))
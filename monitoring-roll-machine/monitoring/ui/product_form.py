@@ -6,6 +6,7 @@ from PySide6.QtWidgets import (
 from PySide6.QtCore import Signal, Qt
 from typing import Dict, Any
 
+
 class ProductForm(QWidget):
     """Form for entering and editing product information."""
     
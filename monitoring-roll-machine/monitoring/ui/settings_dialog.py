@@ -2,23 +2,48 @@ from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QFormLayout, QComboBox,
     QPushButton, QFrame, QLabel, QHBoxLayout
 )
-from PySide6.QtCore import Qt, Signal
-from typing import Dict, Any
-import serial.tools.list_ports
+from PySide6.QtCore import Qt, Signal, SignalInstance, Slot
+from typing import Dict, Any, List, Optional
 import logging
 
+from ..ports import get_port_registry, PortInfo
+from ..profiling import get_profiler
+
 logger = logging.getLogger(__name__)
 
+
 class SettingsDialog(QDialog):
     """Dialog for configuring application settings."""
     
     # Signal emitted when settings are saved
     settings_updated = Signal(dict)
     
-    def __init__(self, current_settings: Dict[str, Any]):
+    # Emitted from the port registry thread; Qt queues it onto the UI thread
+    ports_changed = Signal(list)
+    
+    # Emitted from the profiler thread with the report path ("" on failure)
+    profile_finished = Signal(str)
+    
+    def __init__(
+        self,
+        current_settings: Dict[str, Any],
+        profile_finished: Optional[SignalInstance] = None
+    ):
         super().__init__()
         self.current_settings = current_settings
+        self.registry = get_port_registry()
         self.setup_ui()
+        self.ports_changed.connect(self.update_ports)
+        # The profiler thread may finish after this dialog is gone, so it emits on a
+        # signal of a long-lived object (the main window); Qt drops the connection
+        # to this dialog when it is destroyed.
+        self._profile_finished = (
+            profile_finished if profile_finished is not None else self.profile_finished
+        )
+        self._profile_finished.connect(self.show_profile_result)
+        self._ports_listener = self.ports_changed.emit
+        self.registry.subscribe(self._ports_listener)
+        self.finished.connect(lambda _: self.registry.unsubscribe(self._ports_listener))
         
     def setup_ui(self):
         """Set up the settings dialog UI."""
@@ -77,7 +102,9 @@ class SettingsDialog(QDialog):
         
         # Port selection
         self.port_combo = QComboBox()
-        self.refresh_ports()
+        current_port = self.current_settings.get("serial_port")
+        if current_port:
+            self.port_combo.addItem(current_port)
         settings_layout.addRow("Serial Port:", self.port_combo)
         
         # Baudrate selection
@@ -90,6 +117,19 @@ class SettingsDialog(QDialog):
         )
         settings_layout.addRow("Baudrate:", self.baudrate_combo)
         
+        # Diagnostics: on-demand profile of the monitor and UI threads
+        self.profile_mode_combo = QComboBox()
+        self.profile_mode_combo.addItems(["Sampling", "cProfile"])
+        settings_layout.addRow("Profile Mode:", self.profile_mode_combo)
+        
+        self.profile_btn = QPushButton("Capture Profile (10 s)")
+        self.profile_btn.clicked.connect(self.capture_profile)
+        settings_layout.addRow(self.profile_btn)
+        
+        self.profile_status = QLabel("")
+        self.profile_status.setWordWrap(True)
+        settings_layout.addRow(self.profile_status)
+        
         layout.addWidget(settings_frame)
         
         # Buttons
@@ -128,27 +168,51 @@ class SettingsDialog(QDialog):
         layout.addLayout(button_layout)
     
     def refresh_ports(self):
-        """Refresh the list of available serial ports."""
-        try:
-            self.port_combo.clear()
-            ports = serial.tools.list_ports.comports()
-            for port in ports:
-                self.port_combo.addItem(port.device)
-                
-            # Set current port if available
-            current_port = self.current_settings.get("serial_port")
-            if current_port:
-                index = self.port_combo.findText(current_port)
-                if index >= 0:
-                    self.port_combo.setCurrentIndex(index)
-                    
-        except Exception as e:
-            logger.error(f"Error refreshing ports: {e}")
+        """Ask the port registry to re-enumerate serial ports."""
+        self.registry.refresh()
+    
+    @Slot(list)
+    def update_ports(self, ports: List[PortInfo]):
+        """Show the ports reported by the registry."""
+        selected = self.port_combo.currentText() or self.current_settings.get("serial_port")
+        self.port_combo.clear()
+        for port in ports:
+            self.port_combo.addItem(port.device)
+            
+        # Keep the current port selected if it is still available
+        if selected:
+            index = self.port_combo.findText(selected)
+            if index >= 0:
+                self.port_combo.setCurrentIndex(index)
+    
+    def capture_profile(self):
+        """Start a profiling snapshot in the background."""
+        mode = "cprofile" if self.profile_mode_combo.currentText() == "cProfile" else "sample"
+        started = get_profiler().snapshot(
+            mode,
+            duration=10.0,
+            on_done=lambda path, signal=self._profile_finished: signal.emit(path or "")
+        )
+        if started:
+            self.profile_btn.setEnabled(False)
+            self.profile_status.setText("Profiling for 10 seconds...")
+        else:
+            self.profile_status.setText("A profile is already being captured")
+    
+    @Slot(str)
+    def show_profile_result(self, path: str):
+        """Show where the profiling report was written."""
+        self.profile_btn.setEnabled(True)
+        self.profile_status.setText(
+            f"Profile written to {path}" if path else "Profiling failed, see log"
+        )
     
     def save_settings(self):
         """Save the current settings."""
+        port = self.port_combo.currentText()
         settings = {
-            "serial_port": self.port_combo.currentText(),
+            "serial_port": port,
+            "serial_port_key": self.registry.key_for(port),
             "baudrate": int(self.baudrate_combo.currentText())
         }
         
@@ -0,0 +1,167 @@
+"""
+View-model untuk kartu info dan label status UI.
+
+Thread monitor memanggil ``update()`` yang hanya menyimpan nilai mentah dan
+menandai field yang berubah. Timer UI memanggil ``take_changes()`` sekali
+per frame: hanya field yang ditandai yang diformat, dan hanya teks yang
+berbeda dari yang sedang tampil yang dikembalikan untuk ``setText``.
+Sampel grafik dikumpulkan dengan ``add_sample()`` dan diambil sekaligus
+per frame. Modul ini tidak bergantung pada Qt/Kivy.
+"""
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple, TYPE_CHECKING
+import threading
+
+from ..normalize import UM_PER_METER, convert_length
+
+if TYPE_CHECKING:
+    from ..eta import RollEta, Estimate
+
+Formatter = Callable[[Any], str]
+
+
+class ViewModel:
+    """Nilai tampilan per field dengan dirty-checking dan antrian sampel grafik."""
+    def __init__(self, formatters: Dict[str, Formatter], max_samples: int = 1024) -> None:
+        self.formatters = dict(formatters)
+        self._values: Dict[str, Any] = {}
+        self._dirty: Set[str] = set()
+        # Hanya disentuh thread UI
+        self._displayed: Dict[str, str] = {}
+        # Dibatasi agar memori tetap jika thread UI tertahan
+        self._samples: Deque[Tuple[float, Dict[str, float]]] = deque(maxlen=max_samples)
+        self._lock = threading.Lock()
+
+    def update(self, values: Dict[str, Any]) -> bool:
+        """Simpan nilai baru (aman dari thread mana pun); return True jika ada yang berubah."""
+        changed = False
+        with self._lock:
+            for name, value in values.items():
+                if name not in self.formatters:
+                    continue
+                if name in self._values and self._values[name] == value:
+                    continue
+                self._values[name] = value
+                self._dirty.add(name)
+                changed = True
+        return changed
+
+    def take_changes(self) -> Dict[str, str]:
+        """Teks baru untuk field yang tampilannya berubah sejak frame sebelumnya."""
+        with self._lock:
+            if not self._dirty:
+                return {}
+            pending = {name: self._values[name] for name in self._dirty}
+            self._dirty.clear()
+        changes = {}
+        for name, value in pending.items():
+            text = self.formatters[name](value)
+            # Nilai mentah berubah tapi teksnya sama (mis. 12.34 -> 12.31): tidak digambar ulang
+            if self._displayed.get(name) != text:
+                self._displayed[name] = text
+                changes[name] = text
+        return changes
+
+    @property
+    def dirty(self) -> bool:
+        """True jika ada field atau sampel yang belum diambil."""
+        return bool(self._dirty or self._samples)
+
+    def value(self, name: str, default: Any = None) -> Any:
+        """Nilai mentah terakhir field."""
+        with self._lock:
+            return self._values.get(name, default)
+
+    def displayed(self, name: str) -> Optional[str]:
+        """Teks yang terakhir dikembalikan untuk field."""
+        return self._displayed.get(name)
+
+    def add_sample(self, timestamp: float, values: Dict[str, float]) -> None:
+        """Antrikan satu sampel grafik."""
+        with self._lock:
+            self._samples.append((timestamp, values))
+
+    def take_samples(self) -> List[Tuple[float, Dict[str, float]]]:
+        """Ambil semua sampel grafik sejak frame sebelumnya."""
+        with self._lock:
+            samples = list(self._samples)
+            self._samples.clear()
+        return samples
+
+    def invalidate(self) -> None:
+        """Paksa semua field diformat dan dikirim ulang pada frame berikutnya."""
+        with self._lock:
+            self._displayed.clear()
+            self._dirty.update(self._values)
+
+
+def monitor_values(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Nilai kartu info dari data callback ``on_data`` Monitor/daemon."""
+    fields = data.get("fields")
+    if fields is None:
+        # Format datar lama: {"length", "speed", "shift", ...}
+        return dict(data)
+    # Panjang ternormalisasi sudah dalam mikrometer, apa pun satuan panel mesin
+    length_um = fields.get("length_um")
+    if length_um is not None:
+        length = length_um / UM_PER_METER
+    else:
+        # Sampel belum dinormalisasi: tetap tampilkan meter, bukan yard panel
+        length = convert_length(
+            fields.get("current_count", 0.0), fields.get("unit", "meter"), "meter"
+        )
+    values = {
+        "length": length,
+        "speed": fields.get("current_speed", 0.0),
+    }
+    if "shift" in fields:
+        values["shift"] = fields["shift"]
+    return values
+
+
+def eta_value(eta: Optional["RollEta"]) -> Optional[Tuple[Optional[int], ...]]:
+    """Perkiraan selesai roll dibulatkan ke menit, agar teksnya tidak berubah setiap frame.
+
+    ``()`` berarti target sudah tercapai.
+    """
+    if eta is None:
+        return None
+    if eta.seconds == 0:
+        return ()
+
+    def minute(seconds: Optional[float]) -> Optional[int]:
+        return None if seconds is None else int((eta.now + seconds) // 60) * 60
+
+    return minute(eta.seconds), minute(eta.seconds_low), minute(eta.seconds_high)
+
+
+def format_eta(value: Optional[Tuple[Optional[int], ...]]) -> str:
+    """Teks ``HH:MM (paling cepat-paling lambat)`` untuk ``eta_value``."""
+    if value is None:
+        return "-"
+    if not value:
+        return "Target reached"
+    at, low, high = value
+    if at is None:
+        return "Stopped"
+
+    def clock(timestamp: Optional[int]) -> str:
+        return "?" if timestamp is None else datetime.fromtimestamp(timestamp).strftime("%H:%M")
+
+    return f"{clock(at)} ({clock(low)}-{clock(high)})"
+
+
+def forecast_value(estimate: Optional["Estimate"]) -> Optional[Tuple[int, int, int]]:
+    """Perkiraan output akhir shift dibulatkan ke satuan panjang."""
+    if estimate is None:
+        return None
+    return round(estimate.value), round(estimate.low), round(estimate.high)
+
+
+def format_forecast(value: Optional[Tuple[int, int, int]]) -> str:
+    """Teks ``nilai m (bawah-atas)`` untuk ``forecast_value``."""
+    if value is None:
+        return "-"
+    expected, low, high = value
+    return f"{expected} m ({low}-{high})"
@@ -16,6 +16,9 @@ setup(
     entry_points={
         "console_scripts": [
             "monitoring-roll-machine=monitoring.__main__:main",
+            "monitoring-roll-daemon=monitoring.daemon:main",
+            "monitoring-roll-convert=monitoring.convert:main",
+            "monitoring-roll-journal=monitoring.journal:main",
         ],
     },
 ) 
\ No newline at end of file
@@ -0,0 +1,105 @@
+"""
+Test untuk deteksi anomali stream count/speed.
+"""
+import random
+import threading
+import time
+from unittest.mock import MagicMock
+
+from monitoring.anomaly import AnomalyDetector, AnomalyKind, create_anomaly_detector
+from monitoring.bus import DataBus
+from monitoring.journal import EventType
+from monitoring.monitor import Monitor
+
+def run(detector, samples, start=0.0, interval=1.0):
+    """Jalankan (count, speed) per detik; return jenis anomali beserta waktunya."""
+    found = []
+    for i, (count, speed) in enumerate(samples):
+        t = start + i * interval
+        found += [(a.kind, t) for a in detector.update(t, count, speed)]
+    return found
+
+def running(seconds, speed=60.0, count=0.0, noise=0.0, rng=None):
+    """Sampel mesin berjalan stabil: count naik speed/60 per detik."""
+    samples = []
+    for _ in range(seconds):
+        count += speed / 60.0
+        samples.append((count, speed + (rng.gauss(0, noise) if rng else 0.0)))
+    return samples
+
+def test_normal_run_and_roll_reset_are_quiet():
+    """Test produksi normal berisik dan reset roll tidak memicu alarm."""
+    rng = random.Random(7)
+    samples = running(300, noise=2.0, rng=rng)
+    # Roll selesai: counter kembali ke nol dan lanjut
+    samples += running(300, noise=2.0, rng=rng, count=0.0)
+    assert run(AnomalyDetector(), samples) == []
+
+def test_sudden_drop_detected_within_seconds():
+    """Test CUSUM menandai penurunan speed mendadak dalam beberapa sampel, sekali saja."""
+    rng = random.Random(2)
+    samples = running(120, noise=1.0, rng=rng)
+    samples += running(120, speed=40.0, noise=1.0, rng=rng, count=samples[-1][0])
+    found = run(AnomalyDetector(), samples)
+    assert [kind for kind, _ in found] == [AnomalyKind.SPEED_DROP]
+    assert found[0][1] - 120 <= 3
+
+def test_stall_and_slippage():
+    """Test stall setelah berhenti lama dan slip saat speed ada tetapi count diam."""
+    samples = running(60)
+    last = samples[-1][0]
+    samples += [(last, 60.0)] * 15          # count macet pada speed penuh
+    samples += running(30, count=last)
+    last = samples[-1][0]
+    samples += [(last, 0.0)] * 40           # berhenti total
+    found = run(AnomalyDetector(slip_s=10.0, stall_s=30.0), samples)
+    assert [kind for kind, _ in found] == [AnomalyKind.SLIPPAGE, AnomalyKind.STALL]
+
+def test_count_glitch_vs_reset():
+    """Test count mundur di tengah roll adalah glitch; mundur ke nol adalah reset."""
+    detector = AnomalyDetector()
+    samples = running(30) + [(12.0, 60.0), (13.0, 60.0)] + running(30, count=0.0)
+    kinds = [kind for kind, _ in run(detector, samples)]
+    assert kinds == [AnomalyKind.COUNT_GLITCH]
+    # Loncatan jauh melebihi speed
+    assert AnomalyKind.COUNT_GLITCH in [k for k, _ in run(AnomalyDetector(), [(10.0, 60.0), (500.0, 60.0)])]
+
+def test_update_cost_is_microseconds():
+    """Test biaya per sampel cukup kecil untuk jalur akuisisi."""
+    detector = AnomalyDetector()
+    samples = running(20000, noise=1.0, rng=random.Random(0))
+    start = time.perf_counter()
+    for i, (count, speed) in enumerate(samples):
+        detector.update(float(i), count, speed)
+    per_sample_us = (time.perf_counter() - start) / len(samples) * 1e6
+    assert per_sample_us < 100
+
+def test_thresholds_from_config():
+    """Test parameter dari ``anomaly_thresholds``, key tidak dikenal diabaikan."""
+    detector = create_anomaly_detector({"anomaly_thresholds": {"stall_s": 5.0, "bogus": 1}})
+    assert detector.stall_s == 5.0
+    assert create_anomaly_detector({"anomaly_detection": False}) is None
+
+def test_monitor_publishes_alerts():
+    """Test monitor menjalankan detector di loop polling dan meneruskan alert."""
+    counts = iter([1.0, 2.0, 20.0, 3.0, 4.0])
+
+    def query_status():
+        return {"fields": {"current_count": next(counts, 4.0), "current_speed": 60, "shift": 1}}
+
+    port = MagicMock()
+    port.query_status.side_effect = query_status
+    bus = DataBus()
+    alerts = []
+    received = threading.Event()
+    monitor = Monitor(
+        port, poll_interval=0.01, bus=bus, machine="m1",
+        anomaly_detector=AnomalyDetector(),
+        on_alert=lambda event: (alerts.append(event), received.set())
+    )
+    monitor.start()
+    assert received.wait(2.0)
+    monitor.stop()
+    bus.close()
+    assert alerts[0].type is EventType.ANOMALY
+    assert alerts[0].fields["kind"] == AnomalyKind.COUNT_GLITCH.value
@@ -0,0 +1,112 @@
+"""
+Test untuk arsip terpartisi.
+"""
+import os
+import zlib
+from datetime import datetime
+from monitoring.archive import (
+    Archive, ArchiveSample, encode_block, decode_block, day_range_ms, _BLOCK_HEADER, _BLOCK_MAGIC_V1
+)
+from monitoring.session import MonitoringSession
+
+DAY_MS = 24 * 3600 * 1000
+
+def day_start(text):
+    """Awal hari lokal dalam ms epoch."""
+    return int(datetime.fromisoformat(text).timestamp() * 1000)
+
+def samples(start_ms, n, step_ms=1000):
+    """Sampel mesin yang berjalan lalu idle."""
+    return [
+        ArchiveSample(start_ms + i * step_ms, min(i, 50) / 10.0, 30 if i < 50 else 0, 1, decimal_place=True)
+        for i in range(n)
+    ]
+
+def test_block_roundtrip_and_compression():
+    """Test encode/decode blok dan ukuran jauh di bawah CSV."""
+    original = samples(day_start("2024-05-01"), 1000)
+    original[10] = ArchiveSample(original[10].timestamp_ms + 7, 12, 5, 2, unit="yard")
+    payload = encode_block(original)
+    assert decode_block(payload, len(original), original[0].timestamp_ms) == original
+    # Interval tetap dan nilai idle: setelah zlib jauh di bawah 1 byte per sampel
+    assert len(zlib.compress(payload)) < len(original) // 4
+
+def test_partitions_and_query_across_days(tmp_path):
+    """Test sampel dipartisi per hari dan query lintas partisi."""
+    archive = Archive(str(tmp_path), block_size=100)
+    start = day_start("2024-05-01") + DAY_MS - 60_000
+    for sample in samples(start, 120):
+        archive.append("m1", sample)
+    archive.append("m2", samples(start, 1)[0])
+    archive.flush()
+
+    assert [d.isoformat() for d in archive.partitions("m1")] == ["2024-05-01", "2024-05-02"]
+    assert archive.machines() == ["m1", "m2"]
+    result = list(archive.query("m1", start + 30_000, start + 90_000))
+    assert [s.timestamp_ms for s in result] == list(range(start + 30_000, start + 90_000, 1000))
+
+    first_day = list(archive.query("m1", *day_range_ms(archive.partitions("m1")[0])))
+    assert len(first_day) == 60
+
+def test_query_reads_only_matching_blocks(tmp_path):
+    """Test index blok dipakai dan dibangun ulang jika hilang."""
+    archive = Archive(str(tmp_path), block_size=10)
+    start = day_start("2024-05-01") + 3600_000
+    for sample in samples(start, 100):
+        archive.append("m1", sample)
+    path = archive.partition_path("m1", archive.partitions("m1")[0])
+    blocks = archive.load_index("m1", archive.partitions("m1")[0])
+    assert len(blocks) == 10
+
+    os.remove(path + ".idx")
+    assert archive.load_index("m1", archive.partitions("m1")[0]) == blocks
+    assert len(list(archive.query("m1", start + 45_000, start + 55_000))) == 10
+
+def test_unflushed_samples_visible(tmp_path):
+    """Test sampel di buffer ikut terbaca sebelum flush."""
+    archive = Archive(str(tmp_path))
+    archive.append_record("m1", {"timestamp": "2024-05-01T10:00:00", "fields": {"current_count": 7}})
+    start, end = day_range_ms(datetime(2024, 5, 1).date())
+    assert [s.current_count for s in archive.query("m1", start, end)] == [7]
+
+
+def test_append_session_record_with_integer_timestamp(tmp_path):
+    """Test record sesi dengan timestamp integer nanodetik (format MonitoringSession)."""
+    archive = Archive(str(tmp_path))
+    session = MonitoringSession(export_dir=str(tmp_path / "exports"))
+    session.add_data({"fields": {"current_count": 3}, "received_ns": 1_714_557_600_123_456_789})
+    archive.append_record("m1", session.data[0])
+    start = 1_714_557_600_000
+    assert [s.timestamp_ms for s in archive.query("m1", start, start + 1000)] == [1_714_557_600_123]
+
+
+def test_normalized_length_and_total_roundtrip():
+    """Test ``total_um`` disimpan per sampel dan ``length_um`` eksak untuk panel yard."""
+    start = day_start("2024-05-01")
+    original = [
+        ArchiveSample(start + i * 1000, 120.0 + i / 10.0, 30, 1, decimal_place=True, unit="yard",
+                      total_um=5_000_000 + i * 91_440)
+        for i in range(10)
+    ]
+    decoded = decode_block(encode_block(original), len(original), start)
+    assert decoded == original
+    assert decoded[3].length_um == 1203 * 91_440
+    assert decoded[3].fields["total_um"] == 5_000_000 + 3 * 91_440
+    assert ArchiveSample.from_fields(decoded[3].timestamp_ms, decoded[3].fields) == decoded[3]
+
+
+def test_reads_first_version_blocks(tmp_path):
+    """Test blok versi pertama (tanpa kolom total) tetap terbaca."""
+    archive = Archive(str(tmp_path))
+    start = day_start("2024-05-01")
+    original = samples(start, 20)
+    payload = zlib.compress(encode_block(original)[:-len(original)])
+    day = datetime(2024, 5, 1).date()
+    path = archive.partition_path("m1", day)
+    os.makedirs(os.path.dirname(path))
+    with open(path, "wb") as f:
+        f.write(_BLOCK_HEADER.pack(
+            _BLOCK_MAGIC_V1, len(original), start, original[-1].timestamp_ms, len(payload), zlib.crc32(payload)
+        ))
+        f.write(payload)
+    assert list(archive.query("m1", *day_range_ms(day))) == original
@@ -0,0 +1,106 @@
+"""
+Test untuk DataBus.
+"""
+import threading
+import time
+from unittest.mock import MagicMock
+from monitoring.bus import DataBus, Subscription, Message, OverflowPolicy, TOPIC_DATA
+from monitoring.journal import EventType
+from monitoring.monitor import Monitor
+
+
+def sample(count, machine="m1"):
+    """Pesan data dengan field count dan speed."""
+    return Message(TOPIC_DATA, machine, {"fields": {"current_count": count, "current_speed": 1}}, 0.0)
+
+
+def blocked_subscriber(policy, maxsize=2):
+    """Subscriber yang callback-nya tertahan sampai event dilepas."""
+    release = threading.Event()
+    received = []
+
+    def callback(payload):
+        release.wait()
+        received.append(payload["fields"]["current_count"])
+    sub = Subscription(callback, maxsize=maxsize, policy=policy, block_timeout=0.05)
+    return sub, release, received
+
+
+def test_slow_subscriber_does_not_block_publisher():
+    """Test publish langsung kembali walau subscriber lambat (drop oldest)."""
+    sub, release, received = blocked_subscriber(OverflowPolicy.DROP_OLDEST)
+    sub.offer(sample(0))
+    time.sleep(0.05)  # callback sedang memproses sampel 0
+    start = time.monotonic()
+    for i in range(1, 6):
+        sub.offer(sample(i))
+    assert time.monotonic() - start < 0.05
+    release.set()
+    sub.close()
+    assert received == [0, 4, 5]
+    assert sub.dropped == 3
+
+
+def test_coalesce_keeps_latest_per_machine():
+    """Test coalesce hanya menyimpan sampel terbaru per mesin."""
+    sub, release, received = blocked_subscriber(OverflowPolicy.COALESCE, maxsize=10)
+    sub.offer(sample(0))
+    time.sleep(0.05)
+    for i in range(1, 4):
+        sub.offer(sample(i))
+    sub.offer(sample(100, machine="m2"))
+    release.set()
+    sub.close()
+    assert received == [0, 3, 100]
+
+
+def test_block_waits_then_drops_after_timeout():
+    """Test policy block menunggu ruang lalu membuang setelah timeout."""
+    sub, release, received = blocked_subscriber(OverflowPolicy.BLOCK, maxsize=1)
+    sub.offer(sample(0))
+    time.sleep(0.05)
+    assert sub.offer(sample(1))
+    assert not sub.offer(sample(2))
+    release.set()
+    sub.close()
+    assert received == [0, 1]
+
+
+def test_filter_by_machine_and_field():
+    """Test filter mesin dan proyeksi field."""
+    bus = DataBus()
+    received = []
+    done = threading.Event()
+
+    def callback(payload):
+        received.append(payload)
+        done.set()
+    bus.subscribe(callback, machines=["m2"], fields=["current_speed"])
+    assert bus.publish(TOPIC_DATA, {"fields": {"current_count": 1}}, "m2") == 0
+    assert bus.publish(TOPIC_DATA, sample(1).payload, "m1") == 0
+    assert bus.publish(TOPIC_DATA, sample(2).payload, "m2") == 1
+    assert done.wait(timeout=1.0)
+    bus.close()
+    assert received == [{"fields": {"current_speed": 1}}]
+
+
+def test_stalled_journal_does_not_delay_publish():
+    """Test publish dari thread akuisisi tetap cepat walau jurnal tertahan."""
+    release = threading.Event()
+    journal = MagicMock()
+    journal.write_event.side_effect = lambda event: release.wait()
+    port = MagicMock()
+    port.query_status.return_value = None
+    monitor = Monitor(port, poll_interval=0.05, journal=journal)
+    monitor.start()
+    try:
+        slowest = 0.0
+        for i in range(2000):
+            start = time.monotonic()
+            monitor.publish_event(EventType.ANOMALY, kind="test", value=float(i), message="")
+            slowest = max(slowest, time.monotonic() - start)
+        assert slowest < 0.05
+        assert monitor.bus.stats()["journal"]["dropped"] > 0
+    finally:
+        release.set()
+        monitor.stop()
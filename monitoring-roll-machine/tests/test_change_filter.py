@@ -0,0 +1,44 @@
+"""
+Test untuk ChangeDetector.
+"""
+from monitoring.change_filter import ChangeDetector, create_change_detector
+
+IDLE = {"current_count": 0, "current_speed": 0, "shift": 1, "unit": "meter"}
+
+class FakeClock:
+    """Jam monotonic yang dikendalikan test."""
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_identical_frames_suppressed_until_heartbeat():
+    """Test frame idle ditahan dan hanya heartbeat yang lolos."""
+    clock = FakeClock()
+    detector = ChangeDetector(heartbeat_interval=10.0, clock=clock)
+    emitted = []
+    for second in range(25):
+        clock.now = float(second)
+        emitted.append(detector.should_emit(IDLE))
+    assert [i for i, e in enumerate(emitted) if e] == [0, 10, 20]
+    assert detector.suppressed == 22
+
+def test_deadband_accumulates_small_changes():
+    """Test perubahan kecil diteruskan setelah totalnya melewati deadband."""
+    detector = ChangeDetector(deadbands={"current_count": 0.5}, heartbeat_interval=1e9)
+    assert detector.should_emit(dict(IDLE, current_count=10.0))
+    assert not detector.should_emit(dict(IDLE, current_count=10.3))
+    assert detector.should_emit(dict(IDLE, current_count=10.6))
+    # Field tanpa deadband berubah sekecil apa pun
+    assert detector.should_emit(dict(IDLE, current_count=10.6, current_speed=1))
+    assert detector.should_emit(dict(IDLE, current_count=10.6, current_speed=1, shift=2))
+
+def test_reset_and_config():
+    """Test reset memaksa emit dan config bisa mematikan detector."""
+    detector = create_change_detector({"change_deadbands": {"current_speed": 2}})
+    assert detector.deadbands["current_speed"] == 2
+    assert detector.should_emit(IDLE)
+    detector.reset()
+    assert detector.should_emit(IDLE)
+    assert create_change_detector({"change_detection": False}) is None
@@ -0,0 +1,71 @@
+"""
+Test untuk antrian command JSK3588.
+"""
+import threading
+import pytest
+from monitoring.serial_handler import JSKSerialPort
+from monitoring.commands import CommandQueue, CommandError, CMD_SET_LENGTH, PRIORITY_HIGH, PRIORITY_LOW
+from monitoring.parser import build_packet
+
+@pytest.fixture
+def port():
+    """Fixture port simulasi yang sudah terbuka."""
+    port = JSKSerialPort('SIM', timeout=0.2, simulation_mode=True)
+    port.open()
+    yield port
+    port.stop()
+
+def test_build_packet_checksum():
+    """Test paket command memakai format header/COM/LEN/data/CHK."""
+    packet = build_packet(0x10, bytes([0x00, 0x01, 0xF4]))
+    assert packet[:4] == bytes([0x55, 0xAA, 0x10, 0x03])
+    assert packet[-1] == sum(packet[:-1]) & 0xFF
+
+def test_set_target_length_ack(port):
+    """Test Future berisi ack mesin dan nilai sampai ke device."""
+    ack = port.set_target_length(50.5, decimal_place=True).result(timeout=1.0)
+    assert ack["com"] == 0x20
+    assert port._serial._device.parameters[CMD_SET_LENGTH] == 505
+
+def test_set_parameter_validation(port):
+    """Test command/nilai di luar protokol ditolak."""
+    with pytest.raises(ValueError):
+        port.set_parameter(0x20, 1)
+    with pytest.raises(ValueError):
+        port.set_parameter(CMD_SET_LENGTH, 1 << 24)
+
+def test_batch_priority_and_no_collision_with_polling(port):
+    """Test command mengantri dikirim per batch sesuai prioritas, bergantian dengan polling."""
+    queue = CommandQueue(port)
+    writes = []
+    original_send = port.send
+    port.send = lambda data: writes.append(data) or original_send(data)
+
+    with port.exclusive():
+        # Bus sedang dipakai: semua command mengantri dulu
+        low = queue.submit(0x11, b"\x00\x00\x01", priority=PRIORITY_LOW)
+        high = queue.submit(0x12, b"\x00\x00\x02", priority=PRIORITY_HIGH)
+        threading.Event().wait(0.05)
+        assert not writes
+    assert high.result(timeout=1.0)["com"] == 0x20
+    assert low.result(timeout=1.0)["com"] == 0x20
+    assert port.query_status() is not None
+    batch = writes[-2]
+    # Satu write berisi dua command, prioritas tinggi lebih dulu
+    assert batch[2] == 0x12 and batch[len(batch) // 2 + 2] == 0x11
+    queue.stop()
+
+def test_command_fails_when_disconnected():
+    """Test Future gagal jika port tidak terhubung."""
+    port = JSKSerialPort('SIM', simulation_mode=True)
+    port.open()
+    port._serial.is_open = False
+    with pytest.raises(CommandError):
+        port.reset_count().result(timeout=1.0)
+
+def test_stop_rejects_new_commands(port):
+    """Test queue yang dihentikan menolak command baru."""
+    queue = CommandQueue(port)
+    queue.stop()
+    with pytest.raises(CommandError):
+        queue.submit(0x01)
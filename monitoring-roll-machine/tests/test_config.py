@@ -0,0 +1,147 @@
+"""
+Test untuk AppConfig.
+"""
+from unittest.mock import MagicMock
+import json
+import os
+import time
+import pytest
+
+from monitoring.config import AppConfig, ConfigError
+from monitoring.monitor import Monitor
+from monitoring.scheduler import AdaptivePollScheduler
+
+def test_defaults_and_aliases():
+    """Test default dari schema dan key lama dari UI Kivy."""
+    config = AppConfig({"port": "/dev/ttyUSB0", "port_key": "usb-1"})
+    assert config["serial_port"] == "/dev/ttyUSB0"
+    assert config.get("port_key") == "usb-1"
+    assert config.baudrate == 19200
+    assert config.get("poll_interval") == 1.0
+
+def test_invalid_update_not_applied():
+    """Test nilai tidak valid ditolak tanpa mengubah sebagian nilai."""
+    config = AppConfig()
+    with pytest.raises(ConfigError):
+        config.update({"poll_interval": 0.5, "baudrate": 12345})
+    assert config.poll_interval == 1.0
+    assert config.update({"baudrate": "9600", "poll_interval": 2}) == {"baudrate": 9600, "poll_interval": 2.0}
+    # Nilai yang sama tidak dianggap perubahan
+    assert config.update({"baudrate": 9600}) == {}
+
+def test_poll_min_above_max_rejected():
+    """Test poll_min_interval > poll_max_interval ditolak tanpa mengubah nilai apa pun."""
+    config = AppConfig()
+    with pytest.raises(ConfigError):
+        config.update({"poll_min_interval": 6.0, "baudrate": 9600})
+    with pytest.raises(ConfigError):
+        config.update({"poll_min_interval": 2.0, "poll_max_interval": 1.0})
+    assert config.baudrate == 19200
+    assert (config.poll_min_interval, config.poll_max_interval) == (0.2, 5.0)
+    # Dinaikkan bersama dalam satu update valid
+    config.update({"poll_min_interval": 6.0, "poll_max_interval": 10.0})
+    assert (config.poll_min_interval, config.poll_max_interval) == (6.0, 10.0)
+    # Nilai file yang bertentangan diganti default
+    config = AppConfig({"poll_min_interval": 3.0, "poll_max_interval": 1.0})
+    assert (config.poll_min_interval, config.poll_max_interval) == (0.2, 5.0)
+
+def test_invalid_file_value_uses_default(tmp_path):
+    """Test nilai tidak valid di file diganti default saat dimuat."""
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"baudrate": "fast", "language": "id"}))
+    config = AppConfig.load(str(path))
+    assert config.baudrate == 19200
+    assert config.language == "id"
+
+def test_debounced_atomic_save(tmp_path):
+    """Test perubahan beruntun disimpan sekali tanpa file sementara tersisa."""
+    path = tmp_path / "config.json"
+    config = AppConfig(path=str(path), save_delay=0.05)
+    for interval in (1.5, 2.0, 2.5):
+        config["poll_interval"] = interval
+    assert not path.exists()
+    time.sleep(0.3)
+    assert json.loads(path.read_text()) == {"poll_interval": 2.5}
+    assert [p.name for p in tmp_path.iterdir()] == ["config.json"]
+
+
+def test_save_respects_umask(tmp_path):
+    """Test file config tersimpan dengan izin sesuai umask, bukan 0600."""
+    path = tmp_path / "config.json"
+    config = AppConfig(path=str(path), save_delay=0.0)
+    old_umask = os.umask(0o022)
+    try:
+        config["poll_interval"] = 2.0
+        config.save()
+    finally:
+        os.umask(old_umask)
+    assert path.stat().st_mode & 0o777 == 0o644
+
+def test_save_ignores_leftover_tmp_file(tmp_path):
+    """Test file sementara sisa crash tidak menggagalkan save dan tidak dihapus."""
+    path = tmp_path / "config.json"
+    leftover = tmp_path / f".config-{os.getpid()}.tmp"
+    leftover.write_text("partial")
+    config = AppConfig(path=str(path), save_delay=60.0)
+    config["poll_interval"] = 2.0
+    config.save()
+    assert json.loads(path.read_text()) == {"poll_interval": 2.0}
+    assert leftover.read_text() == "partial"
+    assert sorted(p.name for p in tmp_path.iterdir()) == [leftover.name, "config.json"]
+
+def test_subscribe_filters_keys():
+    """Test subscriber hanya menerima key yang didaftarkan."""
+    config = AppConfig()
+    received = []
+    config.subscribe(received.append, keys=["baudrate"])
+    config.update({"language": "id"})
+    config.update({"baudrate": 9600, "language": "en"})
+    config.unsubscribe(received.append)
+    config.update({"baudrate": 4800})
+    assert received == [{"baudrate": 9600}]
+
+def test_monitor_applies_changes_live():
+    """Test monitor menerapkan interval dan baudrate baru tanpa restart."""
+    port = MagicMock()
+    port.query_status.return_value = None
+    config = AppConfig()
+    monitor = Monitor(port, poll_interval=0.02, config=config)
+    monitor.start()
+    try:
+        config.update({"poll_interval": 0.03, "baudrate": 9600})
+        deadline = time.monotonic() + 1.0
+        while not port.reconfigure.called and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert monitor.poll_interval == 0.03
+        port.reconfigure.assert_called_once_with(port=None, baudrate=9600, hardware_key=None)
+    finally:
+        monitor.stop()
+    assert monitor.apply_config not in [cb for cb, _ in config._listeners]
+
+def test_monitor_ignores_inverted_poll_bounds():
+    """Test monitor tidak memasang batas polling min > max ke scheduler."""
+    scheduler = AdaptivePollScheduler(base_interval=1.0, min_interval=0.2, max_interval=5.0)
+    monitor = Monitor(MagicMock(), scheduler=scheduler)
+    monitor.apply_config({"poll_min_interval": 8.0})
+    monitor._apply_pending_config()
+    assert (scheduler.min_interval, scheduler.max_interval) == (0.2, 5.0)
+    monitor.apply_config({"poll_min_interval": 1.0, "poll_max_interval": 2.0})
+    monitor._apply_pending_config()
+    assert (scheduler.min_interval, scheduler.max_interval) == (1.0, 2.0)
+
+def test_monitor_applies_eta_config_live():
+    """Test jendela ETA dan jam shift baru diterapkan ke estimator yang berjalan."""
+    port = MagicMock()
+    port.query_status.return_value = None
+    config = AppConfig()
+    monitor = Monitor(port, poll_interval=0.02, config=config)
+    monitor.start()
+    try:
+        config.update({"eta_window_s": 45.0, "shift_start_hours": [8, 20]})
+        deadline = time.monotonic() + 1.0
+        while monitor.eta.rate.tau_s != 45.0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert monitor.eta.rate.tau_s == 45.0
+        assert monitor.eta.shift_start_hours == (8, 20)
+    finally:
+        monitor.stop()
@@ -0,0 +1,90 @@
+"""
+Test untuk CLI konversi CSV sesi lama.
+"""
+import csv
+import queue
+import sqlite3
+import pytest
+from monitoring.convert import convert, convert_file, parse_fields, main, RowError
+from monitoring.archive import Archive
+
+HEADER = "timestamp,com,length,fields\n"
+ROW = '2025-06-20T15:37:{:02d}.5,32,7,"{{\'decimal_place\': False, \'unit\': \'meter\', \'current_count\': {}, \'current_speed\': 3, \'shift\': 2}}"\n'
+
+@pytest.fixture
+def exports(tmp_path):
+    """Dua file ekspor lama, satu dengan baris rusak."""
+    directory = tmp_path / "exports"
+    directory.mkdir()
+    (directory / "a.csv").write_text(HEADER + "".join(ROW.format(i, i) for i in range(10)))
+    (directory / "b.csv").write_text(
+        HEADER + ROW.format(30, 5) + '2025-06-20T15:38:00,32,7,"__import__(\'os\')"\n' + "bad,32,7,{}\n"
+    )
+    return directory
+
+def test_parse_fields_rejects_code():
+    """Test kolom fields diparse tanpa eval."""
+    assert parse_fields("{'current_count': 1, 'current_speed': 0, 'shift': 1}")["current_count"] == 1
+    with pytest.raises(RowError):
+        parse_fields("__import__('os').system('true')")
+    with pytest.raises(RowError):
+        parse_fields("{'current_count': 'x', 'current_speed': 0, 'shift': 1}")
+
+def test_convert_to_flat_csv(exports, tmp_path):
+    """Test CSV datar dan laporan baris tidak valid."""
+    summary = convert([str(exports)], "csv", str(tmp_path / "flat"), workers=2)
+    assert (summary["files"], summary["rows"], summary["invalid"]) == (2, 11, 2)
+    with open(tmp_path / "flat" / "a.csv") as f:
+        rows = list(csv.DictReader(f))
+    assert list(rows[0].keys()) == [
+        "timestamp", "com", "length", "decimal_place", "unit", "current_count", "current_speed", "shift"
+    ]
+    assert rows[9]["current_count"] == "9"
+
+def test_convert_to_sqlite_and_archive(exports, tmp_path):
+    """Test output SQLite dan arsip kolomnar."""
+    db_path = tmp_path / "store.db"
+    assert main([str(exports), "--format", "sqlite", "--output", str(db_path), "--workers", "2"]) == 0
+    with sqlite3.connect(db_path) as db:
+        assert db.execute("SELECT COUNT(*), MAX(current_count) FROM samples").fetchone() == (11, 9)
+
+    convert([str(exports)], "archive", str(tmp_path / "archive"), machine="m1", workers=2)
+    archive = Archive(str(tmp_path / "archive"))
+    span = archive.span("m1")
+    assert len(list(archive.query("m1", *span))) == 11
+
+
+def test_worker_streams_chunks(exports):
+    """Test worker mengirim sampel per potongan, bukan satu list per file."""
+    chunks = queue.Queue()
+    result = convert_file(str(exports / "a.csv"), "archive", "", chunks, chunk_rows=4)
+    sizes = []
+    while not chunks.empty():
+        sizes.append(len(chunks.get()[1]))
+    assert sizes == [4, 4, 2]
+    assert result.rows == 10
+
+
+def test_run_length_rows_expanded_in_archive(tmp_path):
+    """Test baris ``repeat`` menjadi sampel sebanyak repeat antara timestamp dan until."""
+    directory = tmp_path / "exports"
+    directory.mkdir()
+    fields = "{'current_count': 4, 'current_speed': 0, 'shift': 1}"
+    (directory / "rl.csv").write_text(
+        "timestamp,fields,repeat,until\n"
+        f'2025-06-20T15:00:00,"{fields}",5,2025-06-20T15:00:08\n'
+    )
+    convert([str(directory)], "archive", str(tmp_path / "archive"), machine="m1", workers=1)
+    archive = Archive(str(tmp_path / "archive"))
+    times = [s.timestamp_ms for s in archive.query("m1", *archive.span("m1"))]
+    assert [t - times[0] for t in times] == [0, 2000, 4000, 6000, 8000]
+
+
+def test_all_invalid_file_writes_no_output(tmp_path):
+    """Test file tanpa baris valid tidak menghasilkan file output kosong."""
+    directory = tmp_path / "exports"
+    directory.mkdir()
+    (directory / "bad.csv").write_text(HEADER + "bad,32,7,{}\n")
+    summary = convert([str(directory)], "csv", str(tmp_path / "flat"), workers=1)
+    assert (summary["rows"], summary["invalid"]) == (0, 1)
+    assert list((tmp_path / "flat").iterdir()) == []
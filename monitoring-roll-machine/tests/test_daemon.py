@@ -0,0 +1,88 @@
+"""
+Test untuk daemon akuisisi headless dan client UI-nya.
+"""
+import os
+import threading
+import time
+from monitoring.daemon import AcquisitionDaemon, DaemonClient, parse_address
+from monitoring.serial_handler import ConnectionState
+from monitoring.shared_state import SharedStateReader, segment_name
+
+def test_parse_address():
+    """Test parsing alamat host:port."""
+    assert parse_address("0.0.0.0:9000") == ("0.0.0.0", 9000)
+    assert parse_address("9000") == ("127.0.0.1", 9000)
+
+def test_client_receives_data_and_survives_reconnect(tmp_path):
+    """Test client menerima data daemon dan menyambung ulang setelah terputus."""
+    daemon = AcquisitionDaemon(
+        {
+            "poll_interval": 0.05,
+            "poll_min_interval": 0.05,
+            "shared_state_name": f"test_daemon_{os.getpid()}"
+        },
+        port=0,
+        export_dir=str(tmp_path),
+        simulation_mode=True
+    )
+    daemon.start()
+    host, port = daemon.address
+    received = threading.Event()
+    states = []
+    connects = []
+    client = DaemonClient(
+        f"{host}:{port}",
+        on_data=lambda data: received.set(),
+        on_state=states.append,
+        reconnect_interval=0.05,
+        on_connect=lambda: connects.append(True)
+    )
+    try:
+        client.start()
+        assert received.wait(timeout=5.0)
+        assert ConnectionState.CONNECTED in states
+        assert "current_count" in client.get_status()["fields"]
+
+        # Sampel yang sama tersedia di shared memory
+        reader = SharedStateReader.attach(segment_name(f"test_daemon_{os.getpid()}", "default"))
+        assert reader.read_machine("default") is not None
+        reader.close()
+
+        # Restart client: daemon tetap merekam tanpa kehilangan sesi
+        client.stop()
+        count = len(daemon.session.data)
+        received.clear()
+        client.start()
+        assert received.wait(timeout=5.0)
+        assert len(daemon.session.data) >= count
+        # Setiap sambungan (ulang) dilaporkan agar UI attach ulang shared state
+        assert len(connects) == 2
+        # Estimator ETA berjalan di daemon; client menerima snapshot-nya
+        deadline = time.monotonic() + 5.0
+        while client.eta is None and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert client.eta is not None
+        assert client.eta.roll_eta(client.eta.last_count + 10.0).remaining > 0
+    finally:
+        client.stop()
+        filepath = daemon.stop()
+    assert filepath is not None
+
+def test_daemon_eta_uses_config(tmp_path):
+    """Test estimator ETA daemon memakai jendela dan jam shift dari config."""
+    daemon = AcquisitionDaemon(
+        {
+            "eta_window_s": 30.0,
+            "shift_start_hours": [7, 19],
+            "shared_state_name": f"test_daemon_eta_{os.getpid()}"
+        },
+        port=0,
+        export_dir=str(tmp_path),
+        simulation_mode=True
+    )
+    daemon.start()
+    try:
+        assert daemon.monitor.eta.rate.tau_s == 30.0
+        assert daemon.monitor.eta.shift_start_hours == (7, 19)
+    finally:
+        daemon.stop()
@@ -0,0 +1,107 @@
+"""
+Test untuk perkiraan selesai roll dan output akhir shift.
+"""
+import json
+import random
+from datetime import datetime
+
+import pytest
+
+from monitoring.eta import EtaEstimator, EtaSnapshot, RateFilter, shift_window
+
+def at(hour, minute=0, day=15, second=0):
+    """Detik epoch waktu lokal pada tanggal uji."""
+    return datetime(2024, 5, day, hour, minute, second).timestamp()
+
+def feed(estimator, start, seconds, rate, count=0.0, interval=1.0, noise=0.0, rng=None):
+    """Isi estimator dengan counter yang naik ``rate`` per detik."""
+    t = start
+    while t < start + seconds:
+        t += interval
+        count += rate * interval + (rng.uniform(-noise, noise) if rng else 0.0)
+        estimator.update(t, count)
+    return t, count
+
+def test_rate_filter_converges_with_irregular_intervals():
+    """Test EWMA berbasis waktu mengikuti perubahan laju meski interval tidak rata."""
+    rng = random.Random(3)
+    rate = RateFilter(tau_s=30.0)
+    for _ in range(200):
+        rate.update(2.0, rng.uniform(0.2, 3.0))
+    for _ in range(300):
+        rate.update(1.0, rng.uniform(0.2, 3.0))
+    assert rate.mean == pytest.approx(1.0, abs=0.01)
+    assert rate.stderr == pytest.approx(0.0, abs=0.01)
+
+def test_roll_eta_and_bounds():
+    """Test ETA = sisa / laju, dengan batas yang melebar jika laju berisik."""
+    estimator = EtaEstimator(tau_s=60.0)
+    t, count = feed(estimator, at(8), 300, 0.5)
+    eta = estimator.roll_eta(count + 100.0, now=t)
+    assert eta.rate == pytest.approx(0.5)
+    assert eta.seconds == pytest.approx(200.0)
+    assert eta.completes_at == pytest.approx(t + 200.0)
+
+    noisy = EtaEstimator(tau_s=60.0)
+    t, count = feed(noisy, at(8), 300, 0.5, noise=0.4, rng=random.Random(1))
+    eta = noisy.roll_eta(count + 100.0, now=t)
+    assert eta.seconds_low < eta.seconds < eta.seconds_high
+    # Hitung mundur berjalan di antara sampel
+    assert noisy.roll_eta(count + 100.0, now=t + 10).seconds == pytest.approx(eta.seconds - 10, rel=0.01)
+    assert noisy.roll_eta(count - 1.0, now=t).seconds == 0.0
+
+def test_roll_reset_and_stall():
+    """Test reset counter (roll baru) tidak merusak laju, mesin berhenti memberi ETA None."""
+    estimator = EtaEstimator(tau_s=10.0)
+    t, count = feed(estimator, at(8), 60, 1.0, count=95.0)
+    # Roll selesai: counter mulai dari nol lagi
+    t, count = feed(estimator, t, 30, 1.0, count=-1.0)
+    # Hanya sampel saat reset yang tidak diketahui produksinya
+    assert estimator.rate.mean == pytest.approx(1.0, abs=0.01)
+    # Mesin berhenti lama
+    for _ in range(300):
+        t += 1.0
+        estimator.update(t, count)
+    assert estimator.roll_eta(count + 50.0, now=t).seconds is None
+
+def test_shift_projection():
+    """Test output akhir shift = output sejauh ini + laju x sisa waktu shift."""
+    estimator = EtaEstimator(tau_s=60.0, shift_start_hours=(6, 14, 22))
+    # Sampel dari shift malam sebelumnya tidak dihitung
+    estimator.update(at(13, 59, second=30), 500.0)
+    t, count = feed(estimator, at(14), 3600, 0.25, count=0.0)
+    projection = estimator.shift_projection(now=t)
+    assert estimator.shift_output == pytest.approx(900.0)
+    assert projection.value == pytest.approx(900.0 + 0.25 * 7 * 3600)
+    assert projection.low <= projection.value <= projection.high
+
+def test_shift_window_wraps_midnight():
+    """Test shift malam berjalan melewati tengah malam."""
+    assert shift_window(at(23), (6, 14, 22)) == (at(22), at(6, day=16))
+    assert shift_window(at(2), (6, 14, 22)) == (at(22, day=14), at(6))
+    assert shift_window(at(6), (22, 6, 14)) == (at(6), at(14))
+
+
+def test_production_from_monotonic_total():
+    """Test produksi dihitung dari total monoton (meter), bukan dari panjang roll."""
+    estimator = EtaEstimator(tau_s=10.0)
+    t = at(8)
+    for i in range(60):
+        t += 1.0
+        estimator.update(t, i * 0.9144, i * 0.9144)
+    # Glitch: panjang roll turun tanpa reset, total tidak bertambah
+    t += 1.0
+    estimator.update(t, 10.0, 59 * 0.9144)
+    assert estimator.shift_output == pytest.approx(59 * 0.9144)
+    assert estimator.roll_eta(100.0, now=t).remaining == pytest.approx(90.0)
+
+
+def test_snapshot_gives_same_estimates():
+    """Test snapshot (dikirim daemon ke client lewat JSON) menghasilkan perkiraan yang sama."""
+    estimator = EtaEstimator(tau_s=60.0)
+    assert estimator.snapshot() is None
+    t, count = feed(estimator, at(8), 300, 0.5, noise=0.2, rng=random.Random(2))
+    snapshot = EtaSnapshot.from_dict(json.loads(json.dumps(estimator.snapshot().to_dict())))
+    for now in (t, t + 10.0, t + 120.0):
+        assert snapshot.roll_eta(count + 100.0, now) == estimator.roll_eta(count + 100.0, now)
+        assert snapshot.shift_projection(now) == estimator.shift_projection(now)
@@ -0,0 +1,101 @@
+"""
+Test untuk job ekspor background.
+"""
+import os
+import threading
+from monitoring.export_jobs import ExportManager, JobState
+from monitoring.exporter import export_to_csv
+from monitoring.session import MonitoringSession
+
+ROWS = [{"timestamp": str(i), "current_count": i} for i in range(5000)]
+
+def test_export_in_background_with_progress(tmp_path):
+    """Test ekspor selesai di background dengan progress naik hingga 1.0."""
+    manager = ExportManager()
+    progress = []
+    path = str(tmp_path / "out.csv")
+    job = manager.submit(ROWS, path, on_progress=lambda j: progress.append(j.progress))
+    assert job.wait(timeout=5) is JobState.DONE
+    assert progress == sorted(progress) and progress[-1] == 1.0
+    with open(path) as f:
+        assert len(f.readlines()) == len(ROWS) + 1
+    assert os.listdir(tmp_path) == ["out.csv"]
+    manager.shutdown()
+
+def test_cancel_keeps_existing_file(tmp_path):
+    """Test pembatalan tidak menyentuh file tujuan dan membersihkan file sementara."""
+    path = tmp_path / "out.csv"
+    path.write_text("old\n")
+    manager = ExportManager()
+    started = threading.Event()
+    release = threading.Event()
+
+    def on_progress(job):
+        started.set()
+        release.wait()
+
+    job = manager.submit(ROWS, str(path), on_progress=on_progress)
+    assert started.wait(timeout=5)
+    job.cancel()
+    release.set()
+    assert job.wait(timeout=5) is JobState.CANCELLED
+    assert path.read_text() == "old\n"
+    assert os.listdir(tmp_path) == ["out.csv"]
+    manager.shutdown()
+
+def test_finished_jobs_pruned(tmp_path):
+    """Test manager hanya menyimpan job selesai terakhir."""
+    manager = ExportManager(keep_finished=2)
+    for i in range(5):
+        job = manager.submit(ROWS[:10], str(tmp_path / f"out{i}.csv"))
+        assert job.wait(timeout=5) is JobState.DONE
+    assert list(manager.jobs) == [3, 4, 5]
+    manager.shutdown()
+
+def test_submit_copies_rows(tmp_path):
+    """Test baris yang diubah setelah submit tidak ikut terekspor."""
+    manager = ExportManager()
+    release = threading.Event()
+    first = manager.submit(ROWS, str(tmp_path / "first.csv"), on_progress=lambda j: release.wait())
+    rows = [{"timestamp": "1", "current_count": 1}]
+    job = manager.submit(rows, str(tmp_path / "second.csv"))
+    rows[0]["current_count"] = 99
+    release.set()
+    assert first.wait(timeout=5) is JobState.DONE
+    assert job.wait(timeout=5) is JobState.DONE
+    assert (tmp_path / "second.csv").read_text().splitlines()[1] == "1,1"
+    manager.shutdown()
+
+def test_session_end_async(tmp_path):
+    """Test sesi diekspor di background dan data sesi berikutnya tidak ikut."""
+    session = MonitoringSession(export_dir=str(tmp_path))
+    session.add_data({"test": "data1"})
+    done = threading.Event()
+    job = session.end_async(manager=ExportManager(), on_done=lambda j: done.set())
+    session.start()
+    session.add_data({"test": "data2"})
+    assert done.wait(timeout=5)
+    with open(job.path) as f:
+        content = f.read()
+    assert "data1" in content and "data2" not in content
+
+
+def test_export_respects_umask(tmp_path):
+    """Test CSV hasil ekspor mengikuti umask (0644 dengan umask 022), bukan 0600."""
+    path = tmp_path / "out.csv"
+    old_umask = os.umask(0o022)
+    try:
+        export_to_csv(ROWS[:10], str(path))
+    finally:
+        os.umask(old_umask)
+    assert path.stat().st_mode & 0o777 == 0o644
+
+
+def test_export_ignores_leftover_tmp_file(tmp_path):
+    """Test file sementara ekspor lain di direktori tidak mengganggu dan tidak dihapus."""
+    path = tmp_path / "out.csv"
+    leftover = tmp_path / f".export-{os.getpid()}-{threading.get_ident()}.tmp"
+    leftover.write_text("partial")
+    export_to_csv(ROWS[:10], str(path))
+    assert len(path.read_text().splitlines()) == 11
+    assert leftover.read_text() == "partial"
@@ -0,0 +1,112 @@
+"""
+Test untuk jurnal event biner.
+"""
+import os
+import time
+from datetime import datetime
+from unittest.mock import MagicMock
+
+from monitoring.bus import DataBus
+from monitoring.journal import EventJournal, EventType, INDEX_SUFFIX, encode_record
+from monitoring.monitor import Monitor
+
+HOUR_MS = 3600 * 1000
+
+def at(text):
+    """Waktu lokal dalam ms epoch."""
+    return int(datetime.fromisoformat(text).timestamp() * 1000)
+
+def test_query_by_type_machine_and_time(tmp_path):
+    """Test query memakai filter tipe, mesin dan rentang waktu lintas hari."""
+    journal = EventJournal(str(tmp_path))
+    start = at("2024-05-06 22:00")
+    for i in range(6):
+        journal.record(EventType.CONNECTED, "line4", start + i * HOUR_MS, port="COM3", baudrate=19200)
+        journal.record(EventType.DISCONNECTED, "line4", start + i * HOUR_MS + 1, port="COM3", state="reconnecting")
+        journal.record(EventType.PARSE_ERROR, "line2", start + i * HOUR_MS, message="Checksum tidak valid")
+    journal.close()
+    assert journal.days("line4") == [datetime(2024, 5, 6).date(), datetime(2024, 5, 7).date()]
+
+    events = list(journal.query(
+        types=[EventType.DISCONNECTED], machine="line4",
+        start_ms=at("2024-05-06 23:00"), end_ms=at("2024-05-07 02:00")
+    ))
+    assert [e.timestamp_ms for e in events] == [start + h * HOUR_MS + 1 for h in (1, 2, 3)]
+    assert events[0].fields == {"port": "COM3", "state": "reconnecting"}
+    assert {e.machine for e in journal.query(types=[EventType.PARSE_ERROR])} == {"line2"}
+
+def test_record_format_is_compact(tmp_path):
+    """Test record biner jauh lebih kecil dari baris log teks."""
+    journal = EventJournal(str(tmp_path))
+    event = journal.record(EventType.ROLL_COMPLETED, "m1", at("2024-05-06 10:00"), length=100.5, duration_s=61.0, shift=2)
+    journal.close()
+    assert event.fields == {"length": 100.5, "duration_s": 61.0, "shift": 2}
+    assert os.path.getsize(journal.journal_path("m1", datetime(2024, 5, 6).date())) == 15 + 17
+
+def test_torn_tail_and_missing_index_recovered(tmp_path):
+    """Test record terpotong dibuang dan index yang tertinggal dilengkapi."""
+    journal = EventJournal(str(tmp_path))
+    ts = at("2024-05-06 10:00")
+    for i in range(3):
+        journal.record(EventType.SETTINGS_CHANGED, "m1", ts + i, key="baudrate", value=str(9600 + i))
+    journal.close()
+    path = journal.journal_path("m1", datetime(2024, 5, 6).date())
+    # Index hanya memuat record pertama, ekor jurnal terpotong
+    with open(path + INDEX_SUFFIX, "r+b") as f:
+        f.truncate(13)
+    with open(path, "ab") as f:
+        f.write(b"\x20\x00\x01\x02")
+
+    reader = EventJournal(str(tmp_path))
+    assert [e.fields["value"] for e in reader.query(machine="m1")] == ["9600", "9601", "9602"]
+
+    writer = EventJournal(str(tmp_path))
+    writer.record(EventType.SETTINGS_CHANGED, "m1", ts + 3, key="baudrate", value="9603")
+    writer.close()
+    assert len(writer.load_index("m1", datetime(2024, 5, 6).date())) == 4
+    assert [e.fields["value"] for e in writer.query(machine="m1")][-1] == "9603"
+
+
+def test_unknown_event_type_kept_and_skipped(tmp_path):
+    """Test record tipe baru (dari versi lebih baru) tidak dianggap rusak dan tidak dipotong."""
+    journal = EventJournal(str(tmp_path))
+    ts = at("2024-05-06 10:00")
+    journal.record(EventType.PARSE_ERROR, "m1", ts, message="a")
+    journal.close()
+    path = journal.journal_path("m1", datetime(2024, 5, 6).date())
+    with open(path, "ab") as f:
+        f.write(encode_record(99, ts + 1, b"future payload"))
+    size = os.path.getsize(path)
+
+    writer = EventJournal(str(tmp_path))
+    writer.record(EventType.PARSE_ERROR, "m1", ts + 2, message="b")
+    writer.close()
+    assert os.path.getsize(path) > size
+    assert [e.fields["message"] for e in writer.query(machine="m1")] == ["a", "b"]
+    assert len(writer.load_index("m1", datetime(2024, 5, 6).date())) == 3
+
+def test_monitor_journals_parse_errors_and_rolls(tmp_path):
+    """Test monitor mencatat parse error dan roll selesai lewat bus."""
+    from monitoring.parser import PacketParseError
+    journal = EventJournal(str(tmp_path))
+    counts = iter([10.0, 55.0, 0.0, 3.0])
+
+    def query_status():
+        count = next(counts, None)
+        if count is None:
+            raise PacketParseError("Checksum tidak valid")
+        return {"fields": {"current_count": count, "current_speed": 5, "shift": 2}}
+
+    port = MagicMock()
+    port.query_status.side_effect = query_status
+    bus = DataBus()
+    monitor = Monitor(port, poll_interval=0.01, bus=bus, machine="m1", journal=journal)
+    monitor.start()
+    time.sleep(0.2)
+    monitor.stop()
+    bus.close()
+
+    rolls = list(journal.query(types=[EventType.ROLL_COMPLETED]))
+    assert len(rolls) == 1
+    assert rolls[0].fields["length"] == 55.0 and rolls[0].fields["shift"] == 2
+    assert list(journal.query(types=[EventType.PARSE_ERROR], machine="m1"))
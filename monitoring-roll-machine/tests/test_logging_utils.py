@@ -0,0 +1,81 @@
+"""
+Test untuk pipeline logging berbasis antrian.
+"""
+import logging
+import queue
+
+from monitoring.logging_utils import RateLimitFilter, DroppingQueueHandler, setup_logging, shutdown_logging
+
+class FakeClock:
+    """Jam monotonic yang dikendalikan test."""
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def make_record(msg, level=logging.WARNING):
+    """Buat LogRecord sederhana."""
+    return logging.LogRecord("test", level, __file__, 1, msg, None, None)
+
+def test_rate_limit_repeated_messages():
+    """Test pesan identik dibatasi per jendela dan jumlah yang ditahan dilaporkan."""
+    clock = FakeClock()
+    limiter = RateLimitFilter(burst=3, interval=10.0, clock=clock)
+    passed = [limiter.filter(make_record("deprecated")) for _ in range(100)]
+    assert passed.count(True) == 3
+    assert limiter.filter(make_record("pesan lain"))
+    assert limiter.suppressed == 97
+
+    clock.now = 10.0
+    record = make_record("deprecated")
+    assert limiter.filter(record)
+    assert "97 pesan serupa ditahan" in record.getMessage()
+
+
+def test_rate_limit_reports_held_count_when_storm_stops():
+    """Test jumlah yang ditahan dilaporkan oleh flush meski pesannya tidak muncul lagi."""
+    clock = FakeClock()
+    limiter = RateLimitFilter(burst=2, interval=10.0, clock=clock)
+    for _ in range(10):
+        limiter.filter(make_record("port hilang"))
+    assert limiter.flush() == []
+    clock.now = 10.0
+    records = limiter.flush()
+    assert [r.getMessage() for r in records] == ["port hilang (8 pesan serupa ditahan)"]
+    assert records[0].levelno == logging.WARNING
+    # Sudah dilaporkan: tidak diulang oleh flush atau record berikutnya
+    assert limiter.flush() == []
+    record = make_record("port hilang")
+    assert limiter.filter(record) and record.getMessage() == "port hilang"
+
+def test_full_queue_drops_without_blocking():
+    """Test antrian penuh membuang record lalu melaporkan jumlahnya."""
+    log_queue = queue.Queue(maxsize=2)
+    handler = DroppingQueueHandler(log_queue)
+    for i in range(5):
+        handler.handle(make_record(f"pesan {i}"))
+    assert handler.dropped == 3
+    assert log_queue.get_nowait().getMessage() == "pesan 0"
+    handler.handle(make_record("pesan 5"))
+    messages = [log_queue.get_nowait().getMessage() for _ in range(2)]
+    assert messages[0] == "pesan 1"
+    assert messages[1].startswith("3 log record dibuang")
+    assert handler.dropped == 4
+
+def test_setup_logging_writes_through_listener(tmp_path):
+    """Test record sampai ke file setelah listener dihentikan."""
+    root = logging.getLogger()
+    level = root.level
+    try:
+        handler = setup_logging(log_dir=str(tmp_path))
+        assert setup_logging(log_dir=str(tmp_path)) is handler
+        logging.getLogger("monitoring.test").info("dari thread polling")
+    finally:
+        shutdown_logging()
+        logging.captureWarnings(False)
+        root.setLevel(level)
+    assert handler not in root.handlers
+    log_files = list(tmp_path.iterdir())
+    assert len(log_files) == 1
+    assert "dari thread polling" in log_files[0].read_text()
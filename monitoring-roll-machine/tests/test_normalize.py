@@ -0,0 +1,65 @@
+"""
+Test untuk normalisasi counter ke mikrometer.
+"""
+import pytest
+
+from monitoring.normalize import (
+    COUNTER_MODULUS, UM_PER_METER, UM_PER_YARD, CountNormalizer,
+    raw_scale, raw_count, convert_length
+)
+
+def fields(count, unit="meter", decimal_place=False):
+    return {"current_count": count, "unit": unit, "decimal_place": decimal_place}
+
+def test_scale_is_exact_for_all_units():
+    """Test satu langkah counter adalah integer mikrometer untuk semua satuan/desimal."""
+    assert raw_scale("meter", False) == UM_PER_METER
+    assert raw_scale("meter", True) == 100_000
+    assert raw_scale("yard", True) == 91_440
+    assert raw_count(fields(1234.5, decimal_place=True)) == 12345
+    # 0,1 yard dijumlah berkali-kali tetap eksak
+    normalizer = CountNormalizer()
+    for raw in range(0, 10001):
+        normalizer.update(raw, raw_scale("yard", True))
+    assert normalizer.total_um == 1000 * UM_PER_YARD
+
+def test_wraparound_keeps_total_monotonic():
+    """Test counter 24 bit yang wrap tetap menambah total."""
+    normalizer = CountNormalizer()
+    normalizer.update(COUNTER_MODULUS - 3, 1)
+    length_um, total_um = normalizer.update(2, 1)
+    assert length_um == 2
+    assert total_um == 5
+    assert normalizer.wraps == 1
+
+def test_roll_reset_and_glitch():
+    """Test reset ke sekitar nol menambah panjang sejak reset; glitch tidak menambah apa pun."""
+    normalizer = CountNormalizer()
+    scale = raw_scale("meter", False)
+    for raw in (100, 150):
+        normalizer.update(raw, scale)
+    _, total_um = normalizer.update(2, scale)
+    assert total_um == 52 * UM_PER_METER
+    assert normalizer.resets == 1
+    # Turun di tengah roll: baseline pindah tanpa menambah total
+    normalizer.update(80, scale)
+    _, total_um = normalizer.update(40, scale)
+    assert total_um == 130 * UM_PER_METER
+    _, total_um = normalizer.update(45, scale)
+    assert total_um == 135 * UM_PER_METER
+
+def test_unit_change_starts_new_baseline():
+    """Test ganti satuan di panel tidak menghasilkan loncatan total."""
+    normalizer = CountNormalizer()
+    normalizer.apply(fields(100.0))
+    normalizer.apply(fields(110.0))
+    data = normalizer.apply(fields(120.3, unit="yard", decimal_place=True))
+    assert data["length_um"] == 1203 * 91_440
+    assert data["total_um"] == 10 * UM_PER_METER
+    data = normalizer.apply(fields(120.5, unit="yard", decimal_place=True))
+    assert data["total_um"] == 10 * UM_PER_METER + 2 * 91_440
+
+def test_convert_length():
+    """Test konversi meter/yard memakai definisi 1 yard = 0,9144 m."""
+    assert convert_length(0.9144, "meter", "yard") == pytest.approx(1.0)
+    assert convert_length(100.0, "yard", "meter") == pytest.approx(91.44)
@@ -1,5 +1,5 @@
 import pytest
-from monitoring.parser import validate_checksum, parse_packet, PacketParseError
+from monitoring.parser import validate_checksum, parse_packet, PacketParseError, FrameDecoder
 
 def test_validate_checksum_valid():
     # Paket dummy: 55 AA 20 08 01 02 03 04 05 06 07 08 CHK
@@ -30,4 +30,26 @@ def test_parse_packet_invalid_header():
 def test_parse_packet_invalid_checksum():
     packet = bytes([0x55, 0xAA, 0x20, 0x08, 1,2,3,4,5,6,7,8,0x00])
     with pytest.raises(PacketParseError):
-        parse_packet(packet) 
\ No newline at end of file
+        parse_packet(packet)
+
+
+def _status_frame(count=0, speed=0, shift=1):
+    data = [0x55, 0xAA, 0x20, 0x07, 0x00] + list(count.to_bytes(3, 'big')) + list(speed.to_bytes(2, 'big')) + [shift]
+    return bytes(data + [sum(data) & 0xFF])
+
+def test_frame_decoder_split_chunks():
+    decoder = FrameDecoder()
+    frame = _status_frame(count=42)
+    assert decoder.frames(frame[:5]) == []
+    assert decoder.frames(frame[5:]) == [frame]
+    assert decoder.pending == 0
+
+def test_frame_decoder_resync_after_garbage():
+    decoder = FrameDecoder()
+    first, second = _status_frame(count=1), _status_frame(count=2)
+    assert decoder.frames(b'\x00\x13\x55' + first + second) == [first, second]
+
+def test_frame_decoder_rejects_bogus_length():
+    decoder = FrameDecoder(max_data_length=16)
+    frame = _status_frame()
+    assert decoder.frames(bytes([0x55, 0xAA, 0x20, 0xFF]) + frame) == [frame]
@@ -0,0 +1,67 @@
+"""
+Test untuk PortRegistry.
+"""
+import threading
+from monitoring.ports import PortRegistry, PortInfo
+
+ADAPTER = dict(vid=0x1A86, pid=0x7523, serial_number="A1")
+
+class FakeEnumerator:
+    """Enumerator port yang bisa diubah dari test."""
+    def __init__(self, ports):
+        self.ports = ports
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return list(self.ports)
+
+def test_key_uses_usb_identity():
+    """Test key adapter memakai VID/PID/serial, bukan nama device."""
+    usb = PortInfo("/dev/ttyUSB0", **ADAPTER)
+    assert usb.key == "1A86:7523:A1"
+    assert PortInfo("COM1").key == "COM1"
+
+def test_rescan_caches_and_notifies_on_change():
+    """Test listener hanya dipanggil saat daftar port berubah."""
+    enum = FakeEnumerator([PortInfo("/dev/ttyUSB0", **ADAPTER)])
+    registry = PortRegistry(enumerate_ports=enum)
+    seen = []
+    registry.subscribe(seen.append)
+    registry.rescan()
+    registry.rescan()
+    assert registry.devices() == ["/dev/ttyUSB0"]
+    assert len(seen) == 1
+    # Listener baru langsung menerima cache
+    late = []
+    registry.subscribe(late.append)
+    assert late == [registry.ports()]
+
+def test_resolve_follows_renamed_device():
+    """Test remap key adapter ke nama device baru setelah hotplug."""
+    enum = FakeEnumerator([PortInfo("/dev/ttyUSB0", **ADAPTER)])
+    registry = PortRegistry(enumerate_ports=enum)
+    registry.rescan()
+    key = registry.key_for("/dev/ttyUSB0")
+    enum.ports = []
+    registry.rescan()
+    assert registry.key_for("/dev/ttyUSB0") is None
+    enum.ports = [PortInfo("/dev/ttyUSB1", **ADAPTER)]
+    registry.rescan()
+    assert registry.resolve(key) == "/dev/ttyUSB1"
+
+def test_background_refresh():
+    """Test refresh() memicu enumerasi di thread registry."""
+    enum = FakeEnumerator([PortInfo("COM3")])
+    registry = PortRegistry(watch_interval=10.0, rescan_interval=100.0, enumerate_ports=enum)
+    changed = threading.Event()
+    registry.start()
+    try:
+        assert registry.wait_ready(timeout=1.0)
+        registry.subscribe(lambda ports: changed.set() if len(ports) == 2 else None)
+        enum.ports = [PortInfo("COM3"), PortInfo("COM4")]
+        registry.refresh()
+        assert changed.wait(timeout=1.0)
+        assert registry.devices() == ["COM3", "COM4"]
+    finally:
+        registry.stop()
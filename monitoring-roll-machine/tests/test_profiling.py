@@ -0,0 +1,87 @@
+"""
+Test untuk profiling on-demand.
+"""
+import os
+import signal
+import threading
+import time
+
+import pytest
+
+from monitoring.profiling import Profiler, StageTimers, sample_threads, collapsed_stacks
+
+def busy_loop(stop, profiler=None):
+    """Loop sibuk seperti thread monitor."""
+    while not stop.is_set():
+        if profiler:
+            profiler.checkpoint()
+        sum(i * i for i in range(2000))
+
+def start_thread(target, *args):
+    """Jalankan loop di thread bernama ``monitor``."""
+    stop = threading.Event()
+    thread = threading.Thread(target=target, args=(stop, *args), name="monitor", daemon=True)
+    thread.start()
+    return stop, thread
+
+def test_stage_timers():
+    """Test timer tahap menghitung jumlah, maksimum dan nilai terakhir."""
+    timers = StageTimers()
+    for ms in (1, 3, 2):
+        timers.record("parse", ms * 1_000_000)
+    with timers.time("plot"):
+        pass
+    stats = timers.snapshot()
+    assert stats["parse"]["count"] == 3
+    assert stats["parse"]["max_ms"] == 3.0 and stats["parse"]["last_ms"] == 2.0
+    assert stats["parse"]["mean_ms"] == 2.0
+    assert "plot" in timers.report()
+
+def test_sampling_only_named_threads():
+    """Test sampling hanya mengambil stack thread yang diminta."""
+    stop, thread = start_thread(busy_loop)
+    try:
+        samples = sample_threads(0.2, interval=0.002, threads=("monitor",))
+    finally:
+        stop.set()
+        thread.join()
+    assert list(samples) == ["monitor"]
+    assert "busy_loop" in collapsed_stacks(samples)
+
+def test_cprofile_snapshot_written(tmp_path):
+    """Test snapshot cProfile diaktifkan lewat checkpoint di thread target."""
+    profiler = Profiler(str(tmp_path))
+    profiler.timers.record("poll", 5_000_000)
+    stop, thread = start_thread(busy_loop, profiler)
+    results = []
+    done = threading.Event()
+    try:
+        assert profiler.snapshot("cprofile", 0.2, threads=("monitor",), on_done=lambda p: (results.append(p), done.set()))
+        assert not profiler.snapshot("sample", 0.2)
+        assert done.wait(3.0)
+    finally:
+        stop.set()
+        thread.join()
+    report = open(results[0], encoding="utf-8").read()
+    assert "== thread monitor" in report
+    # Fungsi yang dipanggil loop setelah profile aktif
+    assert "<genexpr>" in report
+    assert "poll" in report
+    assert not profiler.busy
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGUSR1"), reason="butuh SIGUSR1 (POSIX)")
+def test_signal_while_lock_held_does_not_deadlock(tmp_path):
+    """Test SIGUSR1 saat thread utama memegang lock profiler (mis. di checkpoint)."""
+    profiler = Profiler(str(tmp_path))
+    previous = signal.getsignal(signal.SIGUSR1)
+    try:
+        assert profiler.install_signal_handler(duration=0.05)
+        with profiler._lock:
+            signal.raise_signal(signal.SIGUSR1)
+        deadline = time.monotonic() + 3.0
+        while not os.listdir(tmp_path) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert any(name.endswith(".txt") for name in os.listdir(tmp_path))
+    finally:
+        signal.signal(signal.SIGUSR1, previous)
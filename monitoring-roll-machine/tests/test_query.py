@@ -0,0 +1,117 @@
+"""
+Test untuk HistoryQuery.
+"""
+import os
+from datetime import datetime
+
+import pytest
+
+from monitoring.archive import Archive, ArchiveSample
+from monitoring.query import HistoryQuery, RollupStore
+
+START = int(datetime(2024, 5, 1, 8, 0).timestamp() * 1000)
+
+def record_hours(history, hours, machine="m1"):
+    """Rekam sampel per 10 detik; speed = menit ke-n dalam jam."""
+    for i in range(hours * 360):
+        ts = START + i * 10_000
+        history.record(machine, ArchiveSample(ts, i / 10.0, (i // 6) % 60, 1, decimal_place=True))
+
+def test_rollup_matches_raw_aggregation(tmp_path):
+    """Test hasil dari rollup sama dengan agregasi data mentah."""
+    history = HistoryQuery(Archive(str(tmp_path)))
+    record_hours(history, 2)
+    end = START + 2 * 3600_000
+    hourly = history.query("m1", START, end, 3600)
+    assert [p.samples for p in hourly] == [360, 360]
+    assert hourly[0].speed_max == 59
+    assert hourly[0].speed_mean == 29.5
+    assert hourly[1].length == (720 - 1) / 10.0
+
+    # Resolusi 30 detik tidak punya rollup: dihitung dari arsip mentah
+    assert HistoryQuery.rollup_for(30) is None
+    assert HistoryQuery.rollup_for(1800) == 900
+    raw = history.query("m1", START, START + 60_000, 30)
+    assert [p.samples for p in raw] == [3, 3]
+
+def test_rollups_built_from_archive_and_updated_incrementally(tmp_path):
+    """Test rollup dibangun dari arsip lama lalu mengikuti sampel baru."""
+    archive = Archive(str(tmp_path))
+    record_hours(HistoryQuery(archive), 1)
+    archive.flush()
+
+    history = HistoryQuery(Archive(str(tmp_path)))
+    end = START + 2 * 3600_000
+    assert [p.samples for p in history.query("m1", START, end, 3600)] == [360]
+    history.record("m1", ArchiveSample(START + 3600_000, 1.0, 5, 1))
+    assert [p.samples for p in history.query("m1", START, end, 3600)] == [360, 1]
+
+def test_lru_cache(tmp_path):
+    """Test hasil query di-cache dan entri terlama dibuang."""
+    history = HistoryQuery(Archive(str(tmp_path)), cache_size=2)
+    record_hours(history, 1)
+    end = START + 3600_000
+    history.query("m1", START, end, 60)
+    history.query("m1", START, end, 60)
+    assert (history.hits, history.misses) == (1, 1)
+    history.query("m1", START, end, 900)
+    history.query("m1", START, end, 3600)
+    history.query("m1", START, end, 60)
+    assert history.misses == 4
+
+
+def forbid_raw_scan(monkeypatch, archive):
+    """Gagal jika rollup dibangun dengan memindai sampel mentah."""
+    def scan(*args, **kwargs):
+        raise AssertionError("arsip mentah dipindai")
+    monkeypatch.setattr(archive, "query", scan)
+    monkeypatch.setattr(archive, "span", scan)
+
+
+def test_rollups_persisted_per_day_and_loaded(tmp_path, monkeypatch):
+    """Test file rollup ditulis saat blok di-flush dan dimuat proses baru tanpa scan mentah."""
+    archive = Archive(str(tmp_path))
+    record_hours(HistoryQuery(archive), 1)
+    archive.flush()
+    day = datetime.fromtimestamp(START / 1000).date()
+    store = RollupStore(archive)
+    assert os.path.exists(store.path("m1", day))
+
+    reopened = Archive(str(tmp_path))
+    forbid_raw_scan(monkeypatch, reopened)
+    # File sudah mencakup seluruh partisi: tidak ada blok yang di-decode ulang
+    monkeypatch.setattr(reopened, "read_blocks", lambda *args: pytest.fail("blok dibaca ulang"))
+    history = HistoryQuery(reopened)
+    hourly = history.query("m1", START, START + 3600_000, 3600)
+    assert [p.samples for p in hourly] == [360]
+    assert hourly[0].length == (360 - 1) / 10.0
+
+
+def test_rollups_caught_up_for_archive_without_files(tmp_path, monkeypatch):
+    """Test arsip lama tanpa file rollup dilengkapi sekali dari bloknya."""
+    archive = Archive(str(tmp_path))
+    for i in range(360):
+        archive.append("m1", ArchiveSample(START + i * 10_000, i, 5, 1))
+    archive.flush()
+    day = datetime.fromtimestamp(START / 1000).date()
+    path = RollupStore(archive).path("m1", day)
+    assert not os.path.exists(path)
+
+    reopened = Archive(str(tmp_path))
+    forbid_raw_scan(monkeypatch, reopened)
+    history = HistoryQuery(reopened)
+    assert [p.samples for p in history.query("m1", START, START + 3600_000, 900)] == [90] * 4
+    assert os.path.exists(path)
+    # Sampel baru setelah dimuat tetap masuk ke rollup dan ke file hari itu
+    history.record("m1", ArchiveSample(START + 3600_000, 400, 5, 1))
+    reopened.flush()
+    assert RollupStore(reopened).sync("m1", day)[3600][START + 3600_000].samples == 1
+
+
+def test_rollup_length_in_meters_for_yard_panel(tmp_path):
+    """Test panjang rollup dari ``length_um``: panel yard dan meter sebanding."""
+    history = HistoryQuery(Archive(str(tmp_path)))
+    history.record("m1", ArchiveSample(START, 100, 5, 1, unit="yard"))
+    history.record("m1", ArchiveSample(START + 60_000, 100, 5, 1))
+    points = history.query("m1", START, START + 120_000, 60)
+    assert [p.length for p in points] == [91.44, 100.0]
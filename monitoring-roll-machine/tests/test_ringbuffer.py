@@ -0,0 +1,75 @@
+"""
+Test untuk deret waktu grafik berkapasitas tetap.
+"""
+import random
+
+import pytest
+
+from monitoring.ringbuffer import RingBuffer, WindowedExtrema, TimeSeries, MultiTraceBuffer, nice_limits
+
+def test_ring_buffer_wraps_in_order():
+    """Test buffer penuh menimpa titik tertua dan urutan tetap kronologis."""
+    ring = RingBuffer(4)
+    slots = [ring.append(float(t), t * 10.0) for t in range(6)]
+    assert slots == [0, 1, 2, 3, 0, 1]
+    assert len(ring) == 4
+    assert ring.oldest_slot == 2
+    assert [t for t, _ in ring.items()] == [2.0, 3.0, 4.0, 5.0]
+
+def test_windowed_extrema_matches_brute_force():
+    """Test min/max berjendela sama dengan perhitungan langsung dan bisa turun lagi."""
+    rng = random.Random(1)
+    extrema = WindowedExtrema(window_s=10.0)
+    history = []
+    for t in range(200):
+        value = rng.uniform(0, 100) if t < 150 else 1.0
+        extrema.push(float(t), value)
+        history.append((t, value))
+        extrema.expire(float(t))
+        visible = [v for ts, v in history if ts >= t - 10]
+        assert (extrema.min, extrema.max) == (min(visible), max(visible))
+    # Setelah puncak keluar dari jendela, maksimum ikut mengecil
+    assert extrema.max == 1.0
+
+def test_time_series_memory_is_constant():
+    """Test sampel rapat digabung sehingga titik tersimpan tidak melebihi kapasitas."""
+    series = TimeSeries(capacity=100, window_s=100.0)
+    new_slots = 0
+    for i in range(10000):
+        _, new = series.add(i * 0.1, float(i % 7))
+        new_slots += new
+    assert new_slots == 1000
+    assert len(series.ring) == 100
+    assert series.limits(999.9) == (0.0, 6.0)
+
+def test_nice_limits_stable_and_shrinks():
+    """Test batas sumbu dibulatkan, tidak berubah untuk variasi kecil, dan bisa mengecil."""
+    assert nice_limits(0.0, 47.0) == (0.0, 60.0, 20.0)
+    assert nice_limits(0.0, 48.5) == nice_limits(0.0, 47.0)
+    assert nice_limits(0.0, 4.2)[1] < 10
+    assert nice_limits(5.0, 5.0)[0] <= 5.0 <= nice_limits(5.0, 5.0)[1]
+
+def test_multi_trace_shared_layout_and_wrap():
+    """Test setiap trace punya blok sendiri di array bersama dan segmen urut kronologis."""
+    buffer = MultiTraceBuffer(traces=2, capacity=4, window_s=4.0)
+    for t in range(6):
+        buffer.add("M1", float(t), t * 10.0)
+    buffer.add("M2", 0.0, 7.0)
+    assert buffer.names == ["M1", "M2"]
+    assert buffer.segments(0) == [(2, 4), (0, 2)]
+    assert [t for t, _ in buffer.items(0)] == [2.0, 3.0, 4.0, 5.0]
+    assert buffer.segments(1) == [(4, 5)]
+    assert buffer.values[4] == 7.0
+    assert buffer.versions[:2] == [6, 1]
+    with pytest.raises(ValueError):
+        buffer.add("M3", 0.0, 1.0)
+
+def test_multi_trace_decimation_per_trace():
+    """Test sampel rapat digabung per trace tanpa mempengaruhi trace lain."""
+    buffer = MultiTraceBuffer(traces=2, capacity=10, window_s=10.0)
+    new = [buffer.add("M1", i * 0.25, float(i)) for i in range(8)]
+    assert new == [True, False, False, False, True, False, False, False]
+    assert buffer.add("M2", 0.1, 1.0)
+    assert [v for _, v in buffer.items(0)] == [3.0, 7.0]
+    assert buffer.limits(0, 2.0) == (0.0, 7.0)
+    assert buffer.limits(1, 2.0) == (1.0, 1.0)
@@ -0,0 +1,58 @@
+"""
+Test untuk AdaptivePollScheduler dan integrasinya dengan Monitor.
+"""
+import time
+import pytest
+from unittest.mock import MagicMock
+from monitoring.scheduler import AdaptivePollScheduler
+from monitoring.monitor import Monitor
+
+def fields(count=0, speed=0):
+    return {"current_count": count, "current_speed": speed, "shift": 1}
+
+def test_invalid_bounds():
+    """Test floor lebih besar dari ceiling ditolak."""
+    with pytest.raises(ValueError):
+        AdaptivePollScheduler(min_interval=2.0, max_interval=1.0)
+
+def test_idle_backoff_until_ceiling():
+    """Test backoff eksponensial saat mesin diam, dibatasi max_interval."""
+    sched = AdaptivePollScheduler(min_interval=0.1, max_interval=4.0, base_interval=1.0, idle_polls=2)
+    intervals = [sched.next_interval(fields(speed=0)) for _ in range(10)]
+    assert intervals[:2] == [1.0, 1.0]
+    assert intervals[2] == 2.0
+    assert intervals[-1] == 4.0
+
+def test_speed_change_polls_fast():
+    """Test perubahan kecepatan langsung mempercepat polling."""
+    sched = AdaptivePollScheduler(min_interval=0.1, max_interval=4.0, idle_polls=0)
+    for _ in range(5):
+        sched.next_interval(fields(speed=0))
+    assert sched.interval == 4.0
+    assert sched.next_interval(fields(speed=30)) == 0.1
+    # Kecepatan stabil kembali ke interval dasar
+    assert sched.next_interval(fields(speed=30)) == 1.0
+
+def test_near_target_polls_fast():
+    """Test count mendekati target memakai interval minimum."""
+    sched = AdaptivePollScheduler(min_interval=0.1, near_target_margin=5.0)
+    sched.set_target(100)
+    sched.next_interval(fields(count=50, speed=40))
+    assert sched.next_interval(fields(count=60, speed=40)) == 1.0
+    assert sched.next_interval(fields(count=97, speed=40)) == 0.1
+
+def test_no_data_keeps_interval():
+    """Test tidak ada data tidak mengubah interval."""
+    sched = AdaptivePollScheduler()
+    assert sched.next_interval(None) == sched.base_interval
+
+def test_monitor_stop_not_blocked_by_interval():
+    """Test stop monitor tidak menunggu interval polling penuh."""
+    port = MagicMock()
+    port.query_status.return_value = {"fields": fields(speed=0)}
+    monitor = Monitor(port, poll_interval=30.0)
+    monitor.start()
+    time.sleep(0.05)
+    started = time.monotonic()
+    monitor.stop()
+    assert time.monotonic() - started < 1.0
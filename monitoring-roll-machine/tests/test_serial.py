@@ -1,6 +1,10 @@
+import os
+import threading
+import time
+import tty
 import pytest
 from unittest.mock import MagicMock, patch
-from monitoring.serial_handler import JSKSerialPort
+from monitoring.serial_handler import JSKSerialPort, ConnectionState
 
 @patch('monitoring.serial_handler.serial.Serial')
 def test_open_close(mock_serial):
@@ -37,4 +41,150 @@ def test_auto_recover(mock_serial):
     # Jalankan auto_recover satu iterasi
     port._stop_event.is_set = MagicMock(side_effect=[False, True])
     port.auto_recover()
-    port.open.assert_called() 
\ No newline at end of file
+    port.open.assert_called()
+
+
+def test_read_frame_returns_before_timeout():
+    port = JSKSerialPort('SIM', timeout=2.0, simulation_mode=True)
+    port.open()
+    started = time.monotonic()
+    status = port.query_status()
+    assert time.monotonic() - started < 0.5
+    assert status["length"] == 7
+    assert status["fields"]["shift"] in (1, 2, 3)
+    # Stempel waktu terima diambil sebelum query_status kembali
+    assert started * 1e9 <= status["received_mono_ns"] <= time.monotonic_ns()
+    assert isinstance(status["received_ns"], int)
+
+def test_read_frame_deadline():
+    port = JSKSerialPort('SIM', timeout=0.05, simulation_mode=True)
+    port.open()
+    assert port.read_frame(deadline=time.monotonic() + 0.05) is None
+
+@pytest.mark.skipif(not hasattr(os, 'openpty'), reason="butuh pty (POSIX)")
+def test_read_frame_select_on_pty():
+    master, slave = os.openpty()
+    port = JSKSerialPort(os.ttyname(slave), timeout=2.0)
+    port.open()
+    try:
+        assert port._fd is not None
+        frame = bytes([0x55, 0xAA, 0x20, 0x01, 0x07])
+        frame += bytes([sum(frame) & 0xFF])
+        os.write(master, frame[:3])
+        os.write(master, frame[3:])
+        started = time.monotonic()
+        assert port.read_frame() == frame
+        assert time.monotonic() - started < 0.5
+    finally:
+        port.close()
+        os.close(master)
+        os.close(slave)
+
+def test_io_error_triggers_reconnect():
+    port = JSKSerialPort('SIM', timeout=0.1, simulation_mode=True,
+                         reconnect_interval=0.01, max_reconnect_interval=0.05)
+    states = []
+    port.add_state_listener(states.append)
+    port.open()
+    port.enable_auto_recover()
+
+    # Simulasi kabel dicabut: write gagal, port belum bisa dibuka 3x
+    port._serial.write = MagicMock(side_effect=OSError("device disconnected"))
+    open_mock = port._serial_class
+    port._serial_class = MagicMock(side_effect=[OSError("no device")] * 3 + [open_mock()])
+
+    assert port.query_status() is None
+    assert port.wait_connected(timeout=1.0)
+    assert states == [ConnectionState.CONNECTED, ConnectionState.RECONNECTING,
+                      ConnectionState.CONNECTED]
+    assert port.query_status() is not None
+    port.stop()
+    assert port.state is ConnectionState.CLOSED
+
+def test_reconnect_gives_up_after_max_attempts():
+    port = JSKSerialPort('SIM', simulation_mode=True, reconnect_interval=0.01,
+                         max_reconnect_interval=0.02, max_reconnect_attempts=2)
+    port.open()
+    port.enable_auto_recover()
+    port._serial_class = MagicMock(side_effect=OSError("no device"))
+    port._handle_io_error(OSError("device disconnected"))
+    port._recover_thread.join(timeout=1.0)
+    assert port.state is ConnectionState.FAILED
+
+def test_timeouts_degrade_connection():
+    port = JSKSerialPort('SIM', timeout=0.01, simulation_mode=True, max_failures=3)
+    port.open()
+    port._serial._device.process_command = MagicMock(return_value=None)
+    assert port.query_status() is None
+    assert port.state is ConnectionState.DEGRADED
+    port._serial._device.process_command = MagicMock(return_value=None)
+    port.query_status()
+    port.query_status()
+    # Tanpa auto-recover, port dinyatakan gagal setelah max_failures
+    assert port.state is ConnectionState.FAILED
+
+def test_reconnect_follows_remapped_port():
+    port = JSKSerialPort('SIM0', simulation_mode=True, hardware_key='1A86:7523:A1',
+                         port_resolver=lambda key: 'SIM1')
+    port.open()
+    assert port._try_recover()
+    assert port.port == 'SIM1'
+
+
+def status_frame(count):
+    """Frame status JSK3588 dengan count tertentu (meter, tanpa desimal)."""
+    frame = bytes([0x55, 0xAA, 0x20, 0x07, 0x00]) + count.to_bytes(3, 'big') + bytes([0, 10, 1])
+    return frame + bytes([sum(frame) & 0xFF])
+
+
+@pytest.mark.skipif(not hasattr(os, 'openpty'), reason="butuh pty (POSIX)")
+def test_late_reply_discarded_before_next_query():
+    """Test balasan yang terlambat (di buffer OS) tidak dibaca sebagai jawaban query berikutnya."""
+    master, slave = os.openpty()
+    tty.setraw(slave)
+    port = JSKSerialPort(os.ttyname(slave), timeout=0.5)
+    port.open()
+    try:
+        # Balasan poll sebelumnya datang setelah deadline-nya
+        os.write(master, status_frame(111))
+        time.sleep(0.05)
+
+        def reply():
+            os.read(master, 6)
+            os.write(master, status_frame(222))
+
+        responder = threading.Thread(target=reply)
+        responder.start()
+        status = port.query_status()
+        responder.join()
+        assert status["fields"]["current_count"] == 222
+    finally:
+        port.close()
+        os.close(master)
+        os.close(slave)
+
+
+class _NoFdSerial:
+    """Port tanpa fileno (seperti COM Windows) yang read()-nya memblok selama timeout."""
+    timeout = 1.0
+    in_waiting = 0
+
+    def read(self, size=1):
+        time.sleep(self.timeout)
+        return b""
+
+
+def test_read_without_fd_bounded_by_deadline():
+    """Test port tanpa fd tidak membaca melewati deadline frame."""
+    port = JSKSerialPort('COM1', timeout=1.0)
+    port._serial = _NoFdSerial()
+    port._fd = None
+    started = time.monotonic()
+    assert port.read_frame(deadline=time.monotonic() + 0.05) is None
+    assert time.monotonic() - started < 0.3
+
+    del _NoFdSerial.in_waiting
+    started = time.monotonic()
+    assert port.read_frame(deadline=time.monotonic() + 0.05) is None
+    assert time.monotonic() - started < 0.3
+    assert port._serial.timeout == 1.0
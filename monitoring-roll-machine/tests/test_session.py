@@ -58,4 +58,31 @@ def test_get_current_values(session):
     session.add_data({"test": "data1"})
     session.add_data({"test": "data2"})
     current = session.get_current_values()
-    assert current["test"] == "data2" 
\ No newline at end of file
+    assert current["test"] == "data2"
+
+
+def test_run_length_collapses_repeated_samples(tmp_path):
+    """Test sampel identik berturut-turut digabung dengan jumlah pengulangan."""
+    session = MonitoringSession(export_dir=str(tmp_path), run_length=True)
+    for count in (0, 0, 0, 5, 5, 0):
+        session.add_data({"current_count": count})
+    assert [(r["current_count"], r["repeat"]) for r in session.data] == [(0, 3), (5, 2), (0, 1)]
+    assert session.data[0]["until"] >= session.data[0]["timestamp"]
+    with open(session.end()) as f:
+        assert f.readline().strip() == "timestamp,current_count,repeat,until"
+
+
+def test_timestamp_from_receive_time_formatted_on_export(tmp_path):
+    """Test timestamp sesi = waktu frame diterima (integer ns), diformat ISO saat ekspor."""
+    session = MonitoringSession(export_dir=str(tmp_path), run_length=True)
+    received_ns = int(datetime(2024, 5, 1, 10, 0, 0).timestamp()) * 1_000_000_000 + 123_456_000
+    for i in range(2):
+        session.add_data({"current_count": 5, "received_ns": received_ns + i * 1000, "received_mono_ns": i})
+    record = session.data[0]
+    # Stempel berbeda tidak menghalangi penggabungan sampel identik
+    assert record["repeat"] == 2
+    assert isinstance(record["timestamp"], int)
+    assert "received_mono_ns" not in record
+    with open(session.end()) as f:
+        f.readline()
+        assert f.readline().strip() == "2024-05-01T10:00:00.123456,5,2,2024-05-01T10:00:00.123457"
@@ -0,0 +1,149 @@
+"""
+Test untuk tabel state shared memory.
+"""
+import os
+import threading
+import pytest
+from monitoring.parser import received_at
+from monitoring.shared_state import (
+    SharedStateWriter, SharedStateReader, SharedStateLink, segment_name, _HEADER, _SEQ, _slot_offset
+)
+
+FIELDS = {
+    "decimal_place": True, "unit": "meter", "current_count": 12.5, "current_speed": 40, "shift": 2,
+    "length_um": 12_500_000, "total_um": 40_000_000
+}
+
+@pytest.fixture
+def writer():
+    """Writer dengan nama segmen unik per test."""
+    writer = SharedStateWriter(f"test_state_{os.getpid()}", slots=4)
+    yield writer
+    writer.close()
+
+def test_roundtrip(writer):
+    """Test reader melihat field terakhir yang ditulis per mesin."""
+    reader = SharedStateReader(writer.name)
+    try:
+        assert reader.read_machine("m1") is None
+        writer.write("m1", FIELDS, timestamp_ns=123)
+        writer.write("m2", dict(FIELDS, unit="yard", shift=1))
+        state = reader.read_machine("m1")
+        assert state.fields == FIELDS
+        assert state.timestamp_ns == 123
+        # Waktu terima sampel ikut ke data untuk UI, bukan waktu baca
+        assert received_at(state.to_data())[0] == 123
+        assert "timestamp_ns" not in state.to_data()
+        assert [s.machine for s in reader.read_all()] == ["m1", "m2"]
+        assert reader.read_machine("m2").unit == "yard"
+        # Nomor urut naik setiap penulisan
+        writer.write("m1", dict(FIELDS, current_count=13.0))
+        assert reader.read_machine("m1").sequence > state.sequence
+    finally:
+        reader.close()
+
+def test_reader_skips_slot_being_written(writer):
+    """Test nomor urut ganjil (sedang ditulis) tidak menghasilkan snapshot robek."""
+    writer.write("m1", FIELDS)
+    reader = SharedStateReader(writer.name)
+    try:
+        _SEQ.pack_into(writer._buf, _slot_offset(0), 3)
+        assert reader.read(0) is None
+    finally:
+        reader.close()
+
+def test_concurrent_reads_are_consistent(writer):
+    """Test reader tidak pernah melihat campuran dua penulisan."""
+    reader = SharedStateReader(writer.name)
+    done = threading.Event()
+
+    def write_loop():
+        for i in range(20000):
+            writer.write("m1", dict(FIELDS, current_count=float(i), current_speed=i))
+        done.set()
+
+    thread = threading.Thread(target=write_loop)
+    thread.start()
+    try:
+        while not done.is_set():
+            state = reader.read(0)
+            if state:
+                assert state.current_count == state.current_speed
+    finally:
+        thread.join()
+        reader.close()
+
+def test_attach_missing_segment():
+    """Test attach return None jika daemon belum berjalan."""
+    assert SharedStateReader.attach(f"missing_{os.getpid()}") is None
+
+
+def test_one_segment_per_daemon(writer):
+    """Test daemon kedua tidak menimpa segmen yang masih dipakai; segmen per mesin terbaca semua."""
+    writer.write("m1", FIELDS)
+    with pytest.raises(FileExistsError):
+        SharedStateWriter(writer.name, slots=4)
+    reader = SharedStateReader(writer.name)
+    try:
+        assert [s.machine for s in reader.read_all()] == ["m1"]
+    finally:
+        reader.close()
+
+    base = f"test_state_{os.getpid()}"
+    writers = [SharedStateWriter(segment_name(base, m), slots=1) for m in ("m2", "line/3")]
+    try:
+        for w, machine in zip(writers, ("m2", "line/3")):
+            w.write(machine, FIELDS)
+        readers = [SharedStateReader(segment_name(base, m)) for m in ("m2", "line/3")]
+        assert [r.read_all()[0].machine for r in readers] == ["m2", "line/3"]
+        for r in readers:
+            r.close()
+    finally:
+        for w in writers:
+            w.close()
+
+
+def test_stale_segment_reused(writer):
+    """Test segmen sisa writer yang sudah mati diambil alih dan dikosongkan."""
+    writer.write("m1", FIELDS)
+    magic, version, slots, _, generation = _HEADER.unpack_from(writer._buf, 0)
+    # PID di atas pid_max Linux: tidak ada proses dengan nomor ini
+    _HEADER.pack_into(writer._buf, 0, magic, version, slots, 2**31 - 1, generation)
+    replacement = SharedStateWriter(writer.name, slots=4)
+    reader = SharedStateReader(writer.name)
+    try:
+        assert reader.writer_pid == os.getpid()
+        assert reader.read_all() == []
+    finally:
+        reader.close()
+        replacement._buf.release()
+        replacement._shm.close()
+
+
+def test_link_follows_restarted_writer():
+    """Test reader lama terdeteksi basi setelah daemon restart dan link attach ulang."""
+    name = f"test_restart_{os.getpid()}"
+    link = SharedStateLink(name, retry_interval=0.0)
+    assert link.reader() is None
+    first = SharedStateWriter(name, slots=1)
+    try:
+        first.write("m1", FIELDS)
+        old = link.reader()
+        assert old.is_current()
+        assert old.read_machine("m1").current_count == 12.5
+    finally:
+        first.close()
+    # Segmen lama sudah di-unlink; reader lama masih memetakannya
+    assert not old.is_current()
+    second = SharedStateWriter(name, slots=1)
+    try:
+        second.write("m1", dict(FIELDS, current_count=1.0))
+        reader = link.reader()
+        assert reader is not old
+        assert reader.read_machine("m1").current_count == 1.0
+        # reset() (daemon tersambung ulang) memaksa attach baru
+        link.reset()
+        assert link.reader() is not reader
+    finally:
+        link.close()
+        second.close()
@@ -0,0 +1,39 @@
+"""
+Test untuk pengukuran waktu startup.
+"""
+import subprocess
+import sys
+from monitoring.startup import StartupTimer, parse_importtime, measure_import_times
+
+def test_parse_importtime():
+    """Test parsing output -X importtime."""
+    output = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   _io\n"
+        "import time:      2500 |       4000 | pyqtgraph\n"
+        "garbage line\n"
+    )
+    assert parse_importtime(output) == [(120, 120, "_io"), (4000, 2500, "pyqtgraph")]
+
+def test_measure_import_times_sorted():
+    """Test modul diurutkan dari waktu kumulatif terbesar."""
+    rows = measure_import_times("monitoring.parser", top=5)
+    assert rows[0][2] == "monitoring.parser" or rows[0][0] >= rows[-1][0]
+    assert len(rows) <= 5
+
+def test_serial_stack_does_not_import_mock():
+    """Test mock serial dan list_ports tidak di-import di mode produksi."""
+    code = (
+        "import sys, monitoring.monitor; "
+        "print('monitoring.mock.mock_serial' in sys.modules, 'serial.tools.list_ports' in sys.modules)"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.split() == ["False", "False"]
+
+def test_startup_timer_marks_once():
+    """Test milestone hanya dicatat sekali."""
+    timer = StartupTimer()
+    first = timer.mark("first_reading")
+    assert timer.mark("first_reading") == first
+    assert timer.has_mark("first_reading")
+    assert "first_reading" in timer.summary()
@@ -0,0 +1,78 @@
+"""
+Test untuk view-model kartu info UI.
+"""
+import threading
+
+from monitoring.eta import RollEta
+from monitoring.ui.view_model import ViewModel, monitor_values, eta_value, format_eta
+
+def make_model():
+    return ViewModel({
+        "length": lambda value: f"{value:.1f} m",
+        "shift": str,
+    })
+
+def test_only_changed_text_is_returned():
+    """Test hanya field yang teksnya berubah yang dikembalikan, sekali per frame."""
+    model = make_model()
+    model.update({"length": 12.34, "shift": 1, "unknown": "x"})
+    assert model.take_changes() == {"length": "12.3 m", "shift": "1"}
+    assert model.take_changes() == {}
+    # Nilai sama: tidak ditandai sama sekali
+    assert not model.update({"length": 12.34})
+    # Nilai berubah tapi teksnya sama: tidak digambar ulang
+    assert model.update({"length": 12.31})
+    assert model.take_changes() == {}
+    model.update({"length": 12.5})
+    assert model.take_changes() == {"length": "12.5 m"}
+    assert model.displayed("length") == "12.5 m"
+
+def test_formatter_runs_once_per_frame():
+    """Test update beruntun dari thread monitor diformat sekali di frame berikutnya."""
+    calls = []
+    model = ViewModel({"length": lambda value: calls.append(value) or str(value)})
+    threads = [threading.Thread(target=model.update, args=({"length": float(i)},)) for i in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    changes = model.take_changes()
+    assert len(calls) == 1
+    assert changes == {"length": str(calls[0])}
+
+def test_samples_batched_and_invalidate():
+    """Test sampel grafik diambil sekaligus dan invalidate mengirim ulang semua field."""
+    model = make_model()
+    for t in range(3):
+        model.add_sample(float(t), {"length": t * 1.0})
+    assert model.dirty
+    assert [t for t, _ in model.take_samples()] == [0.0, 1.0, 2.0]
+    assert model.take_samples() == []
+    model.update({"length": 1.0, "shift": 2})
+    model.take_changes()
+    assert not model.dirty
+    model.invalidate()
+    assert model.take_changes() == {"length": "1.0 m", "shift": "2"}
+
+def test_monitor_values_from_fields():
+    """Test nilai kartu diambil dari ``fields`` data monitor, bukan panjang paket."""
+    data = {"com": "COM1", "length": 22, "fields": {"current_count": 15.5, "current_speed": 3.0, "shift": 2}}
+    assert monitor_values(data) == {"length": 15.5, "speed": 3.0, "shift": 2}
+    assert monitor_values({"length": 1.0, "speed": 2.0}) == {"length": 1.0, "speed": 2.0}
+    # Panjang ternormalisasi (mikrometer) diutamakan
+    data["fields"]["length_um"] = 14_173_200
+    assert monitor_values(data)["length"] == 14.1732
+
+def test_monitor_values_raw_count_in_meters():
+    """Test count mentah tanpa ``length_um`` tetap dikonversi ke meter."""
+    data = {"fields": {"current_count": 100.0, "unit": "yard", "current_speed": 0.0}}
+    assert monitor_values(data)["length"] == 91.44
+
+def test_eta_value_rounded_to_minute():
+    """Test ETA dibulatkan ke menit sehingga label tidak berubah setiap frame."""
+    first = eta_value(RollEta(10.0, 0.1, 100.0, 80.0, None, now=600.0))
+    later = eta_value(RollEta(9.5, 0.1, 95.0, 76.0, None, now=605.0))
+    assert first == later == (660, 660, None)
+    assert format_eta(first).endswith("-?)")
+    assert format_eta(eta_value(RollEta(0.0, 0.1, 0.0, 0.0, 0.0, now=600.0))) == "Target reached"
+    assert format_eta(None) == "-"